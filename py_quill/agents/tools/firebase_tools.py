@@ -22,14 +22,15 @@ async def get_all_jokes() -> list[str]:
   Returns:
       A list of jokes, where each joke is a string.
   """
-  jokes = await firestore.get_all_jokes_async()
+  jokes = await firestore.get_all_jokes_async(
+    field_paths=firestore.JOKE_TEXT_FIELDS)
   return [f"{joke.setup_text} {joke.punchline_text}" for joke in jokes]
 
 
 def populate_state_with_all_storage_jokes(
     callback_context: CallbackContext) -> None:
   """Populates the state with all storage jokes."""
-  jokes = firestore.get_all_jokes()
+  jokes = firestore.get_all_jokes(field_paths=firestore.JOKE_TEXT_FIELDS)
   joke_strs = [f"{joke.setup_text} {joke.punchline_text}" for joke in jokes]
   callback_context.state[constants.STATE_ALL_STORAGE_JOKES] = joke_strs
 
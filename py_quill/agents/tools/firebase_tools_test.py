@@ -45,7 +45,8 @@ async def test_get_all_jokes(tool, monkeypatch):
                      punchline_text="An Impasta."),
   ]
 
-  async def fake_get_all_jokes_async():
+  async def fake_get_all_jokes_async(*, field_paths=None):
+    assert field_paths == ("setup_text", "punchline_text")
     return mock_jokes
 
   monkeypatch.setattr("services.firestore.get_all_jokes_async",
@@ -73,7 +74,8 @@ def test_populate_state_with_all_storage_jokes(tool, monkeypatch, fake_ctx):
                      punchline_text="An Impasta."),
   ]
 
-  def fake_get_all_jokes():
+  def fake_get_all_jokes(*, field_paths=None):
+    assert field_paths == ("setup_text", "punchline_text")
     return mock_jokes
 
   monkeypatch.setattr("services.firestore.get_all_jokes", fake_get_all_jokes)
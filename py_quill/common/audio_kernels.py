@@ -0,0 +1,141 @@
+"""Vectorized kernels for analyzing 16-bit PCM audio.
+
+These operate on NumPy views of raw WAV frame bytes, and reproduce exactly the
+per-sample Python loops they replace (same peaks, same averages, same
+percentile interpolation), so callers keep identical results.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def pcm16_samples(frames: bytes) -> np.ndarray:
+  """Return a zero-copy int16 view of little-endian PCM16 frame bytes."""
+  if len(frames) % 2:
+    raise ValueError("PCM16 frame bytes must have an even length")
+  return np.frombuffer(frames, dtype="<i2")
+
+
+def block_peaks(samples: np.ndarray, block_size: int) -> np.ndarray:
+  """Return the peak absolute sample value of each consecutive block.
+
+  The final block may be shorter than `block_size`. Peaks are int32 so that
+  `abs(-32768)` does not overflow.
+  """
+  block_size = max(1, int(block_size))
+  if samples.size == 0:
+    return np.zeros(0, dtype=np.int32)
+  num_full_blocks = samples.size // block_size
+  full = samples[:num_full_blocks * block_size].reshape(
+    num_full_blocks, block_size)
+  peaks = np.abs(full.astype(np.int32)).max(axis=1, initial=0)
+  tail = samples[num_full_blocks * block_size:]
+  if tail.size:
+    tail_peak = np.abs(tail.astype(np.int32)).max()
+    peaks = np.append(peaks, np.int32(tail_peak))
+  return peaks
+
+
+def moving_average(values: np.ndarray, window_frames: int) -> np.ndarray:
+  """Return the centered moving average, truncating the window at the edges.
+
+  `values` must be integer-valued: window sums are taken from an int64
+  cumulative sum, so they are exact and each average is a single rounding.
+  """
+  values = np.asarray(values)
+  if values.size == 0:
+    return np.zeros(0, dtype=np.float64)
+  if window_frames <= 1:
+    return values.astype(np.float64)
+  half_window = max(0, int(window_frames) // 2)
+  cumulative = np.concatenate(
+    ([0], np.cumsum(values.astype(np.int64), dtype=np.int64)))
+  indices = np.arange(values.size)
+  starts = np.maximum(0, indices - half_window)
+  ends = np.minimum(values.size, indices + half_window + 1)
+  return (cumulative[ends] - cumulative[starts]) / (ends - starts)
+
+
+def percentile(values: np.ndarray, percentile_value: float) -> float:
+  """Compute a percentile by linear interpolation between nearest ranks."""
+  values = np.asarray(values)
+  if values.size == 0:
+    return 0.0
+  if values.size == 1:
+    return float(values[0])
+  p = max(0.0, min(100.0, percentile_value))
+  position = (p / 100.0) * (values.size - 1)
+  lower_index = int(position)
+  upper_index = min(values.size - 1, lower_index + 1)
+  partitioned = np.partition(values, (lower_index, upper_index))
+  lower_value = float(partitioned[lower_index])
+  upper_value = float(partitioned[upper_index])
+  weight = position - lower_index
+  return (lower_value * (1.0 - weight)) + (upper_value * weight)
+
+
+def find_true_runs(
+  mask: np.ndarray,
+  *,
+  min_run_length: int,
+) -> list[tuple[int, int]]:
+  """Return [(start, end_exclusive)] for True runs >= `min_run_length`."""
+  mask = np.asarray(mask, dtype=bool)
+  if mask.size == 0:
+    return []
+  padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+  edges = np.diff(padded)
+  starts = np.flatnonzero(edges == 1)
+  ends = np.flatnonzero(edges == -1)
+  keep = (ends - starts) >= min_run_length
+  return [(int(start), int(end))
+          for start, end in zip(starts[keep], ends[keep])]
+
+
+def find_prominent_peaks(
+  envelope: np.ndarray,
+  *,
+  start_idx: int,
+  end_idx: int,
+  min_value_exclusive: float,
+  valley_window_frames: int,
+  min_prominence: float,
+) -> np.ndarray:
+  """Return indices in [start_idx, end_idx] of prominent local maxima.
+
+  A frame is a local peak if it is >= the previous frame and > the next frame
+  (frames at either end of `envelope` compare against themselves), and it
+  exceeds `min_value_exclusive`. Its prominence is its value minus the higher
+  of the minima within `valley_window_frames` on each side, with the windows
+  clamped to [start_idx, end_idx].
+  """
+  envelope = np.asarray(envelope, dtype=np.float64)
+  if envelope.size == 0 or end_idx < start_idx:
+    return np.zeros(0, dtype=np.int64)
+
+  indices = np.arange(start_idx, end_idx + 1)
+  current = envelope[indices]
+  previous = np.where(indices > 0, envelope[np.maximum(indices - 1, 0)],
+                      current)
+  following = np.where(indices < envelope.size - 1,
+                       envelope[np.minimum(indices + 1,
+                                           envelope.size - 1)], current)
+  is_candidate = ((current >= previous) & (current > following)
+                  & (current > min_value_exclusive))
+  positions = np.flatnonzero(is_candidate)
+  if positions.size == 0:
+    return np.zeros(0, dtype=np.int64)
+
+  window = max(0, int(valley_window_frames))
+  active = envelope[start_idx:end_idx + 1]
+  padding = np.full(window, np.inf)
+  left_windows = sliding_window_view(np.concatenate((padding, active)),
+                                     window + 1)
+  right_windows = sliding_window_view(np.concatenate((active, padding)),
+                                      window + 1)
+  left_valley = left_windows[positions].min(axis=1)
+  right_valley = right_windows[positions].min(axis=1)
+  prominence = current[positions] - np.maximum(left_valley, right_valley)
+  return indices[positions[prominence >= min_prominence]]
@@ -0,0 +1,68 @@
+"""Tests for audio_kernels."""
+
+import numpy as np
+import pytest
+from common import audio_kernels
+
+
+def test_pcm16_samples_reads_little_endian_without_copy():
+  frames = np.array([1, -2, 32767, -32768], dtype="<i2").tobytes()
+
+  samples = audio_kernels.pcm16_samples(frames)
+
+  assert samples.tolist() == [1, -2, 32767, -32768]
+  assert not samples.flags.owndata
+
+
+def test_pcm16_samples_rejects_odd_length():
+  with pytest.raises(ValueError):
+    audio_kernels.pcm16_samples(b"\x00\x00\x00")
+
+
+def test_block_peaks_includes_partial_tail_and_min_int16():
+  samples = np.array([1, -5, 3, -32768, 2, 7, -9], dtype=np.int16)
+
+  peaks = audio_kernels.block_peaks(samples, 3)
+
+  assert peaks.tolist() == [5, 32768, 9]
+
+
+def test_moving_average_truncates_window_at_edges():
+  values = np.array([3, 6, 9, 12])
+
+  assert audio_kernels.moving_average(values,
+                                      3).tolist() == [4.5, 6.0, 9.0, 10.5]
+  assert audio_kernels.moving_average(values,
+                                      1).tolist() == [3.0, 6.0, 9.0, 12.0]
+
+
+def test_percentile_interpolates_between_nearest_ranks():
+  values = np.array([40.0, 10.0, 30.0, 20.0])
+
+  assert audio_kernels.percentile(values, 0) == 10.0
+  assert audio_kernels.percentile(values, 50) == 25.0
+  assert audio_kernels.percentile(values, 100) == 40.0
+  assert audio_kernels.percentile(np.array([]), 50) == 0.0
+
+
+def test_find_true_runs_filters_short_runs():
+  mask = np.array([True, True, False, True, False, True, True, True])
+
+  assert audio_kernels.find_true_runs(mask, min_run_length=2) == [(0, 2),
+                                                                  (5, 8)]
+
+
+def test_find_prominent_peaks_requires_prominence_within_window():
+  envelope = np.array([0.0, 10.0, 0.0, 4.0, 3.0, 5.0, 0.0, 0.0])
+
+  peaks = audio_kernels.find_prominent_peaks(
+    envelope,
+    start_idx=0,
+    end_idx=7,
+    min_value_exclusive=0.0,
+    valley_window_frames=1,
+    min_prominence=2.0,
+  )
+
+  # Index 3 rises only 1.0 above its right neighbour, so it is not prominent.
+  assert peaks.tolist() == [1, 5]
@@ -1,8 +1,6 @@
 """Audio operations module."""
 
-import array
 import io
-import sys
 import wave
 from dataclasses import dataclass
 from typing import Any, cast
@@ -10,6 +8,7 @@ from typing import Any, cast
 import librosa
 import numpy as np
 import soundfile as sf
+from common import audio_kernels
 
 # --- Tuning Constants ---
 
@@ -365,7 +364,7 @@ def _compute_silent_frame_mask(
   *,
   params: Any,
   silence_abs_amplitude_threshold: int,
-) -> list[bool]:
+) -> np.ndarray:
   """Return a per-frame boolean mask for silence detection."""
   nchannels = int(params.nchannels)
   sampwidth = int(params.sampwidth)
@@ -373,37 +372,21 @@ def _compute_silent_frame_mask(
 
   frame_size_bytes = nchannels * sampwidth
   if nframes == 0:
-    return []
+    return np.zeros(0, dtype=bool)
   if len(frames) != nframes * frame_size_bytes:
     raise ValueError("Frame byte length does not match WAV params")
 
   # Gemini output is LINEAR16 (signed int16). Support that robustly.
   if sampwidth == 2:
-    samples = array.array("h")
-    samples.frombytes(frames)
-    if sys.byteorder == "big":
-      # WAV PCM is little-endian. Ensure consistent interpretation.
-      samples.byteswap()
-
     # Compute a per-frame peak amplitude.
-    peaks: list[int] = [0] * nframes
-    sample_index = 0
-    for frame_index in range(nframes):
-      peak = 0
-      for _ch in range(nchannels):
-        sample = samples[sample_index]
-        sample_index += 1
-        value = abs(int(sample))
-        if value > peak:
-          peak = value
-      peaks[frame_index] = peak
+    peaks = audio_kernels.block_peaks(audio_kernels.pcm16_samples(frames),
+                                      nchannels)
 
     # Adaptive threshold: sample peaks to estimate noise floor.
     step = max(1, nframes // SILENCE_ADAPTIVE_SAMPLE_TARGET)
-    sampled = [peaks[i] for i in range(0, nframes, step)]
-    sampled.sort()
-    if not sampled:
-      return [True] * nframes
+    sampled = np.sort(peaks[::step])
+    if not sampled.size:
+      return np.ones(nframes, dtype=bool)
 
     def percentile(p: float) -> int:
       idx = int(round((len(sampled) - 1) * p))
@@ -422,35 +405,18 @@ def _compute_silent_frame_mask(
       int(round(p50 * SILENCE_ADAPTIVE_LEVEL_MULTIPLIER)),
     )
 
-    return [peak <= adaptive_threshold for peak in peaks]
+    return peaks <= adaptive_threshold
 
   # Fallback: treat only all-zero frames as silence.
-  zero_frame = b"\x00" * frame_size_bytes
-  silent = [False] * nframes
-  for frame_index in range(nframes):
-    chunk = frames[frame_index * frame_size_bytes:(frame_index + 1) *
-                   frame_size_bytes]
-    silent[frame_index] = chunk == zero_frame
-  return silent
+  frame_bytes = np.frombuffer(frames, dtype=np.uint8)
+  frame_bytes = frame_bytes.reshape(nframes, frame_size_bytes)
+  return ~frame_bytes.any(axis=1)
 
 
 def _find_silent_runs(
-  mask: list[bool],
+  mask: np.ndarray,
   *,
   min_run_frames: int,
 ) -> list[tuple[int, int]]:
   """Return [(start_frame, end_frame_exclusive)] for silent runs >= min_run."""
-  runs: list[tuple[int, int]] = []
-  i = 0
-  n = len(mask)
-  while i < n:
-    if not mask[i]:
-      i += 1
-      continue
-    start = i
-    while i < n and mask[i]:
-      i += 1
-    end = i
-    if (end - start) >= min_run_frames:
-      runs.append((start, end))
-  return runs
+  return audio_kernels.find_true_runs(mask, min_run_length=min_run_frames)
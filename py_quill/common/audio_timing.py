@@ -7,7 +7,9 @@ that window.
 
 from __future__ import annotations
 
+import dataclasses
 from dataclasses import dataclass, field
+from typing import Any
 
 
 @dataclass(frozen=True)
@@ -18,6 +20,19 @@ class CharTiming:
   start_time: float
   end_time: float
 
+  def to_dict(self) -> dict[str, Any]:
+    """Convert the timing to a dictionary."""
+    return dataclasses.asdict(self)
+
+  @classmethod
+  def from_dict(cls, data: dict[str, Any]) -> CharTiming:
+    """Create a CharTiming from a dictionary."""
+    return cls(
+      char=str(data["char"]),
+      start_time=float(data["start_time"]),
+      end_time=float(data["end_time"]),
+    )
+
 
 @dataclass(frozen=True)
 class WordTiming:
@@ -28,6 +43,23 @@ class WordTiming:
   end_time: float
   char_timings: list[CharTiming]
 
+  def to_dict(self) -> dict[str, Any]:
+    """Convert the timing to a dictionary."""
+    return dataclasses.asdict(self)
+
+  @classmethod
+  def from_dict(cls, data: dict[str, Any]) -> WordTiming:
+    """Create a WordTiming from a dictionary."""
+    return cls(
+      word=str(data["word"]),
+      start_time=float(data["start_time"]),
+      end_time=float(data["end_time"]),
+      char_timings=[
+        CharTiming.from_dict(char_data)
+        for char_data in data.get("char_timings") or []
+      ],
+    )
+
 
 @dataclass(frozen=True)
 class VoiceSegment:
@@ -44,6 +76,22 @@ class VoiceSegment:
   word_end_index: int
   dialogue_input_index: int
 
+  def to_dict(self) -> dict[str, Any]:
+    """Convert the segment to a dictionary."""
+    return dataclasses.asdict(self)
+
+  @classmethod
+  def from_dict(cls, data: dict[str, Any]) -> VoiceSegment:
+    """Create a VoiceSegment from a dictionary."""
+    return cls(
+      voice_id=str(data["voice_id"]),
+      start_time_seconds=float(data["start_time_seconds"]),
+      end_time_seconds=float(data["end_time_seconds"]),
+      word_start_index=int(data["word_start_index"]),
+      word_end_index=int(data["word_end_index"]),
+      dialogue_input_index=int(data["dialogue_input_index"]),
+    )
+
 
 @dataclass(frozen=True)
 class TtsTiming:
@@ -63,3 +111,25 @@ class TtsTiming:
   def alignment_data(self) -> list[WordTiming] | None:
     """Alignment data, preferring normalized alignment when available."""
     return self.normalized_alignment or self.alignment
+
+  def to_dict(self) -> dict[str, Any]:
+    """Convert the timing to a dictionary."""
+    return dataclasses.asdict(self)
+
+  @classmethod
+  def from_dict(cls, data: dict[str, Any]) -> TtsTiming:
+    """Create a TtsTiming from a dictionary."""
+
+    def _parse_words(value: Any) -> list[WordTiming] | None:
+      if value is None:
+        return None
+      return [WordTiming.from_dict(word) for word in value]
+
+    return cls(
+      alignment=_parse_words(data.get("alignment")),
+      normalized_alignment=_parse_words(data.get("normalized_alignment")),
+      voice_segments=[
+        VoiceSegment.from_dict(segment)
+        for segment in data.get("voice_segments") or []
+      ],
+    )
@@ -6,16 +6,24 @@ This implementation must strictly conform to:
 
 from __future__ import annotations
 
+import bisect
 import math
-from collections.abc import Iterator
-
-from common.posable_character import (MouthState, PosableCharacter, PoseState,
-                                      Transform)
-from common.posable_character_sequence import (
-  PosableCharacterSequence, SequenceBooleanEvent, SequenceFloatEvent,
-  SequenceMouthEvent, SequenceSoundEvent, SequenceTransformEvent)
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from common.posable_character import PosableCharacter, PoseState, Transform
+from common.posable_character_sequence import (PosableCharacterSequence,
+                                               SequenceEvent,
+                                               SequenceFloatEvent,
+                                               SequenceSoundEvent,
+                                               SequenceTransformEvent)
 from PIL import Image
 
+# Events shorter than this apply their target instantly.
+_MIN_INTERPOLATION_DURATION_SEC = 1e-6
+
 
 class CharacterAnimator:
   """Evaluate a `PosableCharacterSequence` at arbitrary timestamps.
@@ -27,68 +35,74 @@ class CharacterAnimator:
   def __init__(self, sequence: PosableCharacterSequence):
     sequence.validate()
     self._sequence: PosableCharacterSequence = sequence
-    self._initial_pose: PoseState = sequence.initial_pose or PoseState()
-    self._left_eye_track: list[SequenceBooleanEvent] = sorted(
+    initial_pose = sequence.initial_pose or PoseState()
+    self._initial_pose: PoseState = initial_pose
+    self._left_eye_track: _StateTrack = _StateTrack.compile(
       sequence.sequence_left_eye_open,
-      key=lambda event: event.start_time,
+      [event.value for event in sequence.sequence_left_eye_open],
+      initial_pose.left_eye_open,
     )
-    self._right_eye_track: list[SequenceBooleanEvent] = sorted(
+    self._right_eye_track: _StateTrack = _StateTrack.compile(
       sequence.sequence_right_eye_open,
-      key=lambda event: event.start_time,
+      [event.value for event in sequence.sequence_right_eye_open],
+      initial_pose.right_eye_open,
     )
-    self._mouth_track: list[SequenceMouthEvent] = sorted(
+    self._mouth_track: _StateTrack = _StateTrack.compile(
       sequence.sequence_mouth_state,
-      key=lambda event: event.start_time,
+      [event.mouth_state for event in sequence.sequence_mouth_state],
+      initial_pose.mouth_state,
     )
-    self._left_hand_visible_track: list[SequenceBooleanEvent] = sorted(
+    self._left_hand_visible_track: _StateTrack = _StateTrack.compile(
       sequence.sequence_left_hand_visible,
-      key=lambda event: event.start_time,
+      [event.value for event in sequence.sequence_left_hand_visible],
+      initial_pose.left_hand_visible,
     )
-    self._right_hand_visible_track: list[SequenceBooleanEvent] = sorted(
+    self._right_hand_visible_track: _StateTrack = _StateTrack.compile(
       sequence.sequence_right_hand_visible,
-      key=lambda event: event.start_time,
-    )
-    self._left_hand_transform_track: list[SequenceTransformEvent] = sorted(
-      sequence.sequence_left_hand_transform,
-      key=lambda event: event.start_time,
-    )
-    self._right_hand_transform_track: list[SequenceTransformEvent] = sorted(
-      sequence.sequence_right_hand_transform,
-      key=lambda event: event.start_time,
+      [event.value for event in sequence.sequence_right_hand_visible],
+      initial_pose.right_hand_visible,
     )
-    self._head_transform_track: list[SequenceTransformEvent] = sorted(
-      sequence.sequence_head_transform,
-      key=lambda event: event.start_time,
-    )
-    self._surface_line_offset_track: list[SequenceFloatEvent] = sorted(
-      sequence.sequence_surface_line_offset,
-      key=lambda event: event.start_time,
-    )
-    self._mask_boundary_offset_track: list[SequenceFloatEvent] = sorted(
-      sequence.sequence_mask_boundary_offset,
-      key=lambda event: event.start_time,
-    )
-    self._surface_line_visible_track: list[SequenceBooleanEvent] = sorted(
+    self._left_hand_transform_track: _InterpolatedTrack = (
+      _compile_transform_track(sequence.sequence_left_hand_transform,
+                               initial_pose.left_hand_transform))
+    self._right_hand_transform_track: _InterpolatedTrack = (
+      _compile_transform_track(sequence.sequence_right_hand_transform,
+                               initial_pose.right_hand_transform))
+    self._head_transform_track: _InterpolatedTrack = _compile_transform_track(
+      sequence.sequence_head_transform, initial_pose.head_transform)
+    self._surface_line_offset_track: _InterpolatedTrack = (
+      _compile_float_track(sequence.sequence_surface_line_offset,
+                           initial_pose.surface_line_offset))
+    self._mask_boundary_offset_track: _InterpolatedTrack = (
+      _compile_float_track(sequence.sequence_mask_boundary_offset,
+                           initial_pose.mask_boundary_offset))
+    self._surface_line_visible_track: _StateTrack = _StateTrack.compile(
       sequence.sequence_surface_line_visible,
-      key=lambda event: event.start_time,
+      [event.value for event in sequence.sequence_surface_line_visible],
+      initial_pose.surface_line_visible,
     )
-    self._head_masking_enabled_track: list[SequenceBooleanEvent] = sorted(
+    self._head_masking_enabled_track: _StateTrack = _StateTrack.compile(
       sequence.sequence_head_masking_enabled,
-      key=lambda event: event.start_time,
+      [event.value for event in sequence.sequence_head_masking_enabled],
+      initial_pose.head_masking_enabled,
     )
-    self._left_hand_masking_enabled_track: list[SequenceBooleanEvent] = sorted(
+    self._left_hand_masking_enabled_track: _StateTrack = _StateTrack.compile(
       sequence.sequence_left_hand_masking_enabled,
-      key=lambda event: event.start_time,
+      [event.value for event in sequence.sequence_left_hand_masking_enabled],
+      initial_pose.left_hand_masking_enabled,
+    )
+    self._right_hand_masking_enabled_track: _StateTrack = _StateTrack.compile(
+      sequence.sequence_right_hand_masking_enabled,
+      [event.value for event in sequence.sequence_right_hand_masking_enabled],
+      initial_pose.right_hand_masking_enabled,
     )
-    self._right_hand_masking_enabled_track: list[
-      SequenceBooleanEvent] = sorted(
-        sequence.sequence_right_hand_masking_enabled,
-        key=lambda event: event.start_time,
-      )
     self._sound_track: list[SequenceSoundEvent] = sorted(
       sequence.sequence_sound_events,
       key=lambda event: event.start_time,
     )
+    self._sound_starts: list[float] = [
+      event.start_time for event in self._sound_track
+    ]
     self._duration_sec: float = self._compute_duration_sec()
 
   @property
@@ -98,62 +112,72 @@ class CharacterAnimator:
 
   def sample_pose(self, time_sec: float) -> PoseState:
     """Return the resolved pose state at `time_sec`."""
+    surface_line_offset = self._surface_line_offset_track.sample(time_sec)[0]
+    mask_boundary_offset = self._mask_boundary_offset_track.sample(time_sec)[0]
     return PoseState(
-      left_eye_open=self._sample_boolean(self._left_eye_track, time_sec,
-                                         self._initial_pose.left_eye_open),
-      right_eye_open=self._sample_boolean(self._right_eye_track, time_sec,
-                                          self._initial_pose.right_eye_open),
-      mouth_state=self._sample_mouth(self._mouth_track, time_sec,
-                                     self._initial_pose.mouth_state),
-      left_hand_visible=self._sample_boolean(
-        self._left_hand_visible_track, time_sec,
-        self._initial_pose.left_hand_visible),
-      right_hand_visible=self._sample_boolean(
-        self._right_hand_visible_track, time_sec,
-        self._initial_pose.right_hand_visible),
-      left_hand_transform=self._sample_transform(
-        self._left_hand_transform_track, time_sec,
-        self._initial_pose.left_hand_transform),
-      right_hand_transform=self._sample_transform(
-        self._right_hand_transform_track,
-        time_sec,
-        self._initial_pose.right_hand_transform,
-      ),
-      head_transform=self._sample_transform(self._head_transform_track,
-                                            time_sec,
-                                            self._initial_pose.head_transform),
-      surface_line_offset=self._sample_float(
-        self._surface_line_offset_track,
-        time_sec,
-        self._initial_pose.surface_line_offset,
-      ),
-      mask_boundary_offset=self._sample_float(
-        self._mask_boundary_offset_track,
-        time_sec,
-        self._initial_pose.mask_boundary_offset,
-      ),
-      surface_line_visible=self._sample_boolean(
-        self._surface_line_visible_track,
-        time_sec,
-        self._initial_pose.surface_line_visible,
-      ),
-      head_masking_enabled=self._sample_boolean(
-        self._head_masking_enabled_track,
-        time_sec,
-        self._initial_pose.head_masking_enabled,
-      ),
-      left_hand_masking_enabled=self._sample_boolean(
-        self._left_hand_masking_enabled_track,
-        time_sec,
-        self._initial_pose.left_hand_masking_enabled,
-      ),
-      right_hand_masking_enabled=self._sample_boolean(
-        self._right_hand_masking_enabled_track,
-        time_sec,
-        self._initial_pose.right_hand_masking_enabled,
-      ),
+      left_eye_open=self._left_eye_track.sample(time_sec),
+      right_eye_open=self._right_eye_track.sample(time_sec),
+      mouth_state=self._mouth_track.sample(time_sec),
+      left_hand_visible=self._left_hand_visible_track.sample(time_sec),
+      right_hand_visible=self._right_hand_visible_track.sample(time_sec),
+      left_hand_transform=Transform(
+        *self._left_hand_transform_track.sample(time_sec)),
+      right_hand_transform=Transform(
+        *self._right_hand_transform_track.sample(time_sec)),
+      head_transform=Transform(*self._head_transform_track.sample(time_sec)),
+      surface_line_offset=surface_line_offset,
+      mask_boundary_offset=mask_boundary_offset,
+      surface_line_visible=self._surface_line_visible_track.sample(time_sec),
+      head_masking_enabled=self._head_masking_enabled_track.sample(time_sec),
+      left_hand_masking_enabled=self._left_hand_masking_enabled_track.sample(
+        time_sec),
+      right_hand_masking_enabled=(
+        self._right_hand_masking_enabled_track.sample(time_sec)),
     )
 
+  def sample_poses(self, times_sec: np.ndarray) -> list[PoseState]:
+    """Return the resolved pose state for every time in `times_sec`.
+
+    Equivalent to calling `sample_pose` per time, but each track is resolved
+    for the whole grid with one vectorized lookup.
+    """
+    times = np.asarray(times_sec, dtype=np.float64).reshape(-1)
+    left_eye_open = self._left_eye_track.sample_many(times)
+    right_eye_open = self._right_eye_track.sample_many(times)
+    mouth_state = self._mouth_track.sample_many(times)
+    left_hand_visible = self._left_hand_visible_track.sample_many(times)
+    right_hand_visible = self._right_hand_visible_track.sample_many(times)
+    left_hand_transform = self._left_hand_transform_track.sample_many(times)
+    right_hand_transform = self._right_hand_transform_track.sample_many(times)
+    head_transform = self._head_transform_track.sample_many(times)
+    surface_line_offset = self._surface_line_offset_track.sample_many(times)
+    mask_boundary_offset = self._mask_boundary_offset_track.sample_many(times)
+    surface_line_visible = self._surface_line_visible_track.sample_many(times)
+    head_masking_enabled = self._head_masking_enabled_track.sample_many(times)
+    left_hand_masking_enabled = (
+      self._left_hand_masking_enabled_track.sample_many(times))
+    right_hand_masking_enabled = (
+      self._right_hand_masking_enabled_track.sample_many(times))
+
+    return [
+      PoseState(
+        left_eye_open=left_eye_open[i],
+        right_eye_open=right_eye_open[i],
+        mouth_state=mouth_state[i],
+        left_hand_visible=left_hand_visible[i],
+        right_hand_visible=right_hand_visible[i],
+        left_hand_transform=Transform(*left_hand_transform[i]),
+        right_hand_transform=Transform(*right_hand_transform[i]),
+        head_transform=Transform(*head_transform[i]),
+        surface_line_offset=surface_line_offset[i][0],
+        mask_boundary_offset=mask_boundary_offset[i][0],
+        surface_line_visible=surface_line_visible[i],
+        head_masking_enabled=head_masking_enabled[i],
+        left_hand_masking_enabled=left_hand_masking_enabled[i],
+        right_hand_masking_enabled=right_hand_masking_enabled[i],
+      ) for i in range(times.shape[0])
+    ]
+
   def apply_pose(self, character: PosableCharacter,
                  time_sec: float) -> PoseState:
     """Apply sampled pose to `character` and return the sampled pose."""
@@ -179,21 +203,15 @@ class CharacterAnimator:
     if end_time_sec < start_time_sec:
       return []
 
-    out: list[SequenceSoundEvent] = []
-    for event in self._sound_track:
-      event_time = event.start_time
-      lower_ok = (event_time >= start_time_sec
-                  if include_start else event_time > start_time_sec)
-      if not lower_ok:
-        continue
-
-      upper_ok = (event_time <= end_time_sec
-                  if include_end else event_time < end_time_sec)
-      if not upper_ok:
-        break
-
-      out.append(event)
-    return out
+    if include_start:
+      lower = bisect.bisect_left(self._sound_starts, start_time_sec)
+    else:
+      lower = bisect.bisect_right(self._sound_starts, start_time_sec)
+    if include_end:
+      upper = bisect.bisect_right(self._sound_starts, end_time_sec)
+    else:
+      upper = bisect.bisect_left(self._sound_starts, end_time_sec)
+    return self._sound_track[lower:upper]
 
   def generate_frames(
     self,
@@ -220,129 +238,206 @@ class CharacterAnimator:
   def _compute_duration_sec(self) -> float:
     duration = 0.0
     for track in (
-        self._left_eye_track,
-        self._right_eye_track,
-        self._mouth_track,
-        self._left_hand_visible_track,
-        self._right_hand_visible_track,
-        self._left_hand_transform_track,
-        self._right_hand_transform_track,
-        self._head_transform_track,
-        self._surface_line_offset_track,
-        self._mask_boundary_offset_track,
-        self._surface_line_visible_track,
-        self._head_masking_enabled_track,
-        self._left_hand_masking_enabled_track,
-        self._right_hand_masking_enabled_track,
+        self._sequence.sequence_left_eye_open,
+        self._sequence.sequence_right_eye_open,
+        self._sequence.sequence_mouth_state,
+        self._sequence.sequence_left_hand_visible,
+        self._sequence.sequence_right_hand_visible,
+        self._sequence.sequence_left_hand_transform,
+        self._sequence.sequence_right_hand_transform,
+        self._sequence.sequence_head_transform,
+        self._sequence.sequence_surface_line_offset,
+        self._sequence.sequence_mask_boundary_offset,
+        self._sequence.sequence_surface_line_visible,
+        self._sequence.sequence_head_masking_enabled,
+        self._sequence.sequence_left_hand_masking_enabled,
+        self._sequence.sequence_right_hand_masking_enabled,
         self._sound_track,
     ):
       for event in track:
-        duration = max(duration, self._event_end_time(event))
+        duration = max(duration, event.end_time)
     return duration
 
-  @staticmethod
-  def _event_end_time(
-    event: SequenceBooleanEvent | SequenceMouthEvent
-    | SequenceTransformEvent | SequenceFloatEvent
-    | SequenceSoundEvent
-  ) -> float:
-    return event.end_time
-
-  @staticmethod
-  def _sample_boolean(
-    track: list[SequenceBooleanEvent],
-    time_sec: float,
-    default: bool,
-  ) -> bool:
-    for event in track:
-      start = event.start_time
-      end = event.end_time
-      if start <= time_sec < end:
-        return event.value
-      if start > time_sec:
-        break
-    return default
-
-  @staticmethod
-  def _sample_mouth(
-    track: list[SequenceMouthEvent],
-    time_sec: float,
-    default: MouthState,
-  ) -> MouthState:
-    for event in track:
-      start = event.start_time
-      end = event.end_time
-      if start <= time_sec < end:
-        return event.mouth_state
-      if start > time_sec:
-        break
-    return default
-
-  @staticmethod
-  def _sample_transform(
-    track: list[SequenceTransformEvent],
-    time_sec: float,
-    default: Transform,
-  ) -> Transform:
-    if not track:
-      return default
-
-    previous_target = default
-    for event in track:
-      start = event.start_time
-      end = event.end_time
-
-      if time_sec < start:
-        return previous_target
-
-      if start <= time_sec < end:
-        duration = end - start
-        if duration <= 1e-6:
-          return event.target_transform
-        progress = (time_sec - start) / duration
-        progress = max(0.0, min(1.0, progress))
-        return Transform(
-          translate_x=_lerp(previous_target.translate_x,
-                            event.target_transform.translate_x, progress),
-          translate_y=_lerp(previous_target.translate_y,
-                            event.target_transform.translate_y, progress),
-          scale_x=_lerp(previous_target.scale_x,
-                        event.target_transform.scale_x, progress),
-          scale_y=_lerp(previous_target.scale_y,
-                        event.target_transform.scale_y, progress),
-        )
-
-      previous_target = event.target_transform
-
-    return previous_target
-
-  @staticmethod
-  def _sample_float(
-    track: list[SequenceFloatEvent],
-    time_sec: float,
-    default: float,
-  ) -> float:
-    if not track:
-      return default
-
-    previous_target = default
-    for event in track:
-      start = event.start_time
-      end = event.end_time
-      target = event.target_value
-      if time_sec < start:
-        return previous_target
-      if start <= time_sec < end:
-        duration = end - start
-        if duration <= 1e-6:
-          return target
-        progress = (time_sec - start) / duration
-        progress = max(0.0, min(1.0, progress))
-        return _lerp(previous_target, target, progress)
-      if start > time_sec:
-        break
-      previous_target = target
-    return previous_target
+
+@dataclass(frozen=True)
+class _StateTrack:
+  """A boolean or mouth track compiled for bisect lookups.
+
+  Tracks are validated as sorted and non-overlapping, so the only event that
+  can be active at `t` is the last one starting at or before `t`.
+  """
+
+  starts: np.ndarray
+  ends: np.ndarray
+  values: np.ndarray
+  default: Any
+  start_list: list[float]
+  end_list: list[float]
+  value_list: list[Any]
+
+  @classmethod
+  def compile(
+    cls,
+    track: Sequence[SequenceEvent],
+    values: Sequence[Any],
+    default: Any,
+  ) -> _StateTrack:
+    """Compile sorted `track` events, with `values[i]` held by `track[i]`."""
+    start_list = [event.start_time for event in track]
+    end_list = [event.end_time for event in track]
+    value_array = np.empty(len(values), dtype=object)
+    value_array[:] = list(values)
+    return cls(
+      starts=np.asarray(start_list, dtype=np.float64),
+      ends=np.asarray(end_list, dtype=np.float64),
+      values=value_array,
+      default=default,
+      start_list=start_list,
+      end_list=end_list,
+      value_list=list(values),
+    )
+
+  def sample(self, time_sec: float) -> Any:
+    """Return the active event value at `time_sec`, or the default."""
+    index = bisect.bisect_right(self.start_list, time_sec) - 1
+    if index >= 0 and time_sec < self.end_list[index]:
+      return self.value_list[index]
+    return self.default
+
+  def sample_many(self, times: np.ndarray) -> list[Any]:
+    """Vectorized `sample` over a 1-D array of times."""
+    out = np.empty(times.shape[0], dtype=object)
+    out[:] = [self.default] * times.shape[0]
+    if self.starts.size:
+      index = np.searchsorted(self.starts, times, side="right") - 1
+      safe_index = np.maximum(index, 0)
+      active = (index >= 0) & (times < self.ends[safe_index])
+      out[active] = self.values[safe_index[active]]
+    return out.tolist()
+
+
+@dataclass(frozen=True)
+class _InterpolatedTrack:
+  """A transform or float track compiled for bisect lookups.
+
+  Each event row stores the event's target and the target it interpolates
+  from (the previous event's target, or the track default for the first
+  event). Values are tuples of floats; transforms use
+  `(translate_x, translate_y, scale_x, scale_y)`.
+  """
+
+  starts: np.ndarray
+  ends: np.ndarray
+  targets: np.ndarray
+  previous_targets: np.ndarray
+  default: tuple[float, ...]
+  start_list: list[float]
+  end_list: list[float]
+  target_list: list[tuple[float, ...]]
+  previous_target_list: list[tuple[float, ...]]
+
+  @classmethod
+  def compile(
+    cls,
+    track: Sequence[SequenceEvent],
+    targets: Sequence[tuple[float, ...]],
+    default: tuple[float, ...],
+  ) -> _InterpolatedTrack:
+    """Compile sorted `track` events, with `targets[i]` owned by `track[i]`."""
+    target_list = [tuple(float(v) for v in target) for target in targets]
+    previous_target_list = [default] + target_list[:-1]
+    width = len(default)
+    return cls(
+      starts=np.asarray([event.start_time for event in track],
+                        dtype=np.float64),
+      ends=np.asarray([event.end_time for event in track], dtype=np.float64),
+      targets=np.asarray(target_list, dtype=np.float64).reshape(-1, width),
+      previous_targets=np.asarray(previous_target_list[:len(target_list)],
+                                  dtype=np.float64).reshape(-1, width),
+      default=default,
+      start_list=[event.start_time for event in track],
+      end_list=[event.end_time for event in track],
+      target_list=target_list,
+      previous_target_list=previous_target_list,
+    )
+
+  def sample(self, time_sec: float) -> tuple[float, ...]:
+    """Return the interpolated value at `time_sec`."""
+    index = bisect.bisect_right(self.start_list, time_sec) - 1
+    if index < 0:
+      return self.default
+    target = self.target_list[index]
+    start = self.start_list[index]
+    end = self.end_list[index]
+    if time_sec >= end:
+      return target
+    duration = end - start
+    if duration <= _MIN_INTERPOLATION_DURATION_SEC:
+      return target
+    progress = (time_sec - start) / duration
+    progress = max(0.0, min(1.0, progress))
+    previous = self.previous_target_list[index]
+    return tuple(
+      _lerp(a, b, progress) for a, b in zip(previous, target, strict=True))
+
+  def sample_many(self, times: np.ndarray) -> list[tuple[float, ...]]:
+    """Vectorized `sample` over a 1-D array of times."""
+    width = len(self.default)
+    out = np.broadcast_to(
+      np.asarray(self.default, dtype=np.float64),
+      (times.shape[0], width),
+    ).copy()
+    if self.starts.size:
+      index = np.searchsorted(self.starts, times, side="right") - 1
+      started = index >= 0
+      safe_index = np.maximum(index, 0)
+      starts = self.starts[safe_index]
+      durations = self.ends[safe_index] - starts
+      interpolating = (started & (times < self.ends[safe_index])
+                       & (durations > _MIN_INTERPOLATION_DURATION_SEC))
+      progress = np.clip(
+        (times - starts) / np.where(interpolating, durations, 1.0),
+        0.0,
+        1.0,
+      )[:, np.newaxis]
+      previous = self.previous_targets[safe_index]
+      targets = self.targets[safe_index]
+      interpolated = previous + (targets - previous) * progress
+      out[started] = np.where(interpolating[:, np.newaxis], interpolated,
+                              targets)[started]
+    return [tuple(row) for row in out.tolist()]
+
+
+def _compile_transform_track(
+  track: list[SequenceTransformEvent],
+  default: Transform,
+) -> _InterpolatedTrack:
+  return _InterpolatedTrack.compile(
+    track,
+    [_transform_tuple(event.target_transform) for event in track],
+    _transform_tuple(default),
+  )
+
+
+def _compile_float_track(
+  track: list[SequenceFloatEvent],
+  default: float,
+) -> _InterpolatedTrack:
+  return _InterpolatedTrack.compile(
+    track,
+    [(event.target_value, ) for event in track],
+    (float(default), ),
+  )
+
+
+def _transform_tuple(
+    transform: Transform) -> tuple[float, float, float, float]:
+  return (
+    float(transform.translate_x),
+    float(transform.translate_y),
+    float(transform.scale_x),
+    float(transform.scale_y),
+  )
 
 
 def _lerp(a: float, b: float, t: float) -> float:
@@ -6,12 +6,12 @@ import json
 import unittest
 from pathlib import Path
 
+import numpy as np
 from common.character_animator import CharacterAnimator
 from common.posable_character import MouthState, PoseState, Transform
-from common.posable_character_sequence import (PosableCharacterSequence,
-                                               SequenceBooleanEvent,
-                                               SequenceMouthEvent,
-                                               SequenceTransformEvent)
+from common.posable_character_sequence import (
+  PosableCharacterSequence, SequenceBooleanEvent, SequenceFloatEvent,
+  SequenceMouthEvent, SequenceSoundEvent, SequenceTransformEvent)
 
 
 def _fixture_path() -> Path:
@@ -175,6 +175,68 @@ class CharacterAnimatorTest(unittest.TestCase):
     self.assertEqual(sample.mouth_state, MouthState.O)
     self.assertEqual(sample.head_transform.translate_y, 400.0)
 
+  def test_sample_poses_matches_sample_pose(self):
+    sequence = PosableCharacterSequence(
+      initial_pose=PoseState(head_transform=Transform(translate_y=10.0)),
+      sequence_mouth_state=[
+        SequenceMouthEvent(
+          start_time=float(index) * 0.1,
+          end_time=float(index) * 0.1 + 0.05,
+          mouth_state=MouthState.OPEN if index % 2 else MouthState.O,
+        ) for index in range(200)
+      ],
+      sequence_left_eye_open=[
+        SequenceBooleanEvent(start_time=1.0, end_time=1.2, value=False),
+        SequenceBooleanEvent(start_time=2.0, end_time=2.0, value=False),
+      ],
+      sequence_head_transform=[
+        SequenceTransformEvent(
+          start_time=0.5,
+          end_time=1.5,
+          target_transform=Transform(translate_y=20.0, scale_x=2.0),
+        ),
+        SequenceTransformEvent(
+          start_time=3.0,
+          end_time=3.0,
+          target_transform=Transform(translate_x=-5.0),
+        ),
+      ],
+      sequence_surface_line_offset=[
+        SequenceFloatEvent(start_time=0.0, end_time=2.0, target_value=80.0),
+      ],
+    )
+    animator = CharacterAnimator(sequence)
+    times = np.arange(0, int(animator.duration_sec * 30) + 2) / 30.0
+
+    poses = animator.sample_poses(times)
+
+    self.assertEqual(len(poses), len(times))
+    for time_sec, pose in zip(times, poses):
+      self.assertEqual(pose, animator.sample_pose(float(time_sec)))
+    self.assertEqual(poses[30].head_transform,
+                     Transform(translate_y=15.0, scale_x=1.5))
+    self.assertEqual(poses[-1].head_transform, Transform(translate_x=-5.0))
+
+  def test_sound_events_between_respects_window_bounds(self):
+    sequence = PosableCharacterSequence(sequence_sound_events=[
+      SequenceSoundEvent(start_time=1.0, end_time=2.0, gcs_uri="gs://a"),
+      SequenceSoundEvent(start_time=1.0, end_time=1.5, gcs_uri="gs://b"),
+      SequenceSoundEvent(start_time=2.0, end_time=3.0, gcs_uri="gs://c"),
+    ])
+    animator = CharacterAnimator(sequence)
+
+    self.assertEqual(
+      [event.gcs_uri for event in animator.sound_events_between(1.0, 2.0)],
+      ["gs://a", "gs://b"],
+    )
+    self.assertEqual(
+      [
+        event.gcs_uri for event in animator.sound_events_between(
+          1.0, 2.0, include_start=False, include_end=True)
+      ],
+      ["gs://c"],
+    )
+
 
 if __name__ == "__main__":
   unittest.main()
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import datetime
 import math
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import lru_cache, partial
 from typing import Callable, cast
@@ -42,6 +44,65 @@ _SOCIAL_BACKGROUND_4X5_WEBSITE_MORE_URL = (
 _SOCIAL_4X5_CANVAS_SIZE_PX = (1024, 1280)
 _SOCIAL_4X5_JOKE_IMAGE_SIZE_PX = (1024, 1024)
 
+_IMAGE_POOL_MAX_WORKERS = 8
+
+
+class ImagePool:
+  """Downloads and decodes source images at most once per URL.
+
+  Shared by several layouts rendered concurrently: every URL is fetched on a
+  worker thread the first time it is requested (or prefetched), and later
+  requests for the same URL wait on that download. Pooled images are fully
+  decoded and must be treated as read-only.
+
+  Use as a context manager, or call `close` to stop the download workers.
+  """
+
+  def __init__(self, max_workers: int = _IMAGE_POOL_MAX_WORKERS):
+    self._executor = ThreadPoolExecutor(max_workers=max_workers)
+    self._futures: dict[str, Future[Image.Image]] = {}
+    self._lock = threading.Lock()
+
+  def __enter__(self) -> ImagePool:
+    return self
+
+  def __exit__(self, *_exc_info) -> None:
+    self.close()
+
+  def prefetch(self, urls: list[str | None]) -> None:
+    """Start downloading `urls` in the background."""
+    for url in urls:
+      if url:
+        _ = self._future(url)
+
+  def get(self, url: str) -> Image.Image:
+    """Return the decoded image at `url`, downloading it if needed."""
+    return self._future(url).result()
+
+  def close(self) -> None:
+    self._executor.shutdown(wait=True, cancel_futures=True)
+
+  def _future(self, url: str) -> Future[Image.Image]:
+    with self._lock:
+      future = self._futures.get(url)
+      if future is None:
+        future = self._executor.submit(_download_decoded_image, url)
+        self._futures[url] = future
+      return future
+
+
+def _download_decoded_image(url: str) -> Image.Image:
+  image = cloud_storage.download_image_from_gcs(url)
+  image.load()
+  return image
+
+
+def _download_image(url: str, image_pool: ImagePool | None) -> Image.Image:
+  """Download an image through `image_pool` when one is given."""
+  if image_pool is not None:
+    return image_pool.get(url)
+  return cloud_storage.download_image_from_gcs(url)
+
 
 def generate_and_populate_book_pages(
   joke_id: str,
@@ -862,9 +923,10 @@ def _compute_joke_grid_divider_color(
 def _get_social_background_4x5(background_url: str) -> Image.Image:
   """Fetch a 4:5 social background canvas image.
 
-  Returns a PIL image at the background's native resolution.
+  Returns a decoded PIL image at the background's native resolution. The
+  cached image is shared across threads, so it is never lazily loaded.
   """
-  return cloud_storage.download_image_from_gcs(background_url)
+  return _download_decoded_image(background_url)
 
 
 def _place_square_image_on_4x5_canvas(
@@ -891,7 +953,11 @@ def _place_square_image_on_4x5_canvas(
   return output
 
 
-def create_joke_giraffe_image(jokes: list[models.PunnyJoke], ) -> Image.Image:
+def create_joke_giraffe_image(
+  jokes: list[models.PunnyJoke],
+  *,
+  image_pool: ImagePool | None = None,
+) -> Image.Image:
   """Create a tall 1024x(2048*num_jokes) image stacked by joke panels.
 
   Stacks the setup image on top of the punchline image for each joke,
@@ -899,6 +965,7 @@ def create_joke_giraffe_image(jokes: list[models.PunnyJoke], ) -> Image.Image:
 
   Args:
     jokes: List of jokes to process.
+    image_pool: Optional shared pool to download joke images through.
 
   Returns:
     A single stacked PIL Image.
@@ -920,9 +987,8 @@ def create_joke_giraffe_image(jokes: list[models.PunnyJoke], ) -> Image.Image:
         f"Joke {joke.key or 'unknown'} is missing setup or punchline image URL"
       )
 
-    setup_img = cloud_storage.download_image_from_gcs(joke.setup_image_url)
-    punchline_img = cloud_storage.download_image_from_gcs(
-      joke.punchline_image_url)
+    setup_img = _download_image(joke.setup_image_url, image_pool)
+    punchline_img = _download_image(joke.punchline_image_url, image_pool)
 
     if setup_img.mode != 'RGB':
       setup_img = setup_img.convert('RGB')
@@ -946,7 +1012,10 @@ def create_joke_giraffe_image(jokes: list[models.PunnyJoke], ) -> Image.Image:
 
 
 def create_single_joke_images_4by5(
-  jokes: list[models.PunnyJoke], ) -> list[Image.Image]:
+  jokes: list[models.PunnyJoke],
+  *,
+  image_pool: ImagePool | None = None,
+) -> list[Image.Image]:
   """Create 4:5 setup/punchline images by adding header/footer padding.
 
   Downloads each joke's square setup/punchline images, resizes each to
@@ -955,6 +1024,7 @@ def create_single_joke_images_4by5(
 
   Args:
     jokes: List of jokes to process.
+    image_pool: Optional shared pool to download joke images through.
 
   Returns:
     List of PIL Images in sequence: [joke1_setup, joke1_punchline,
@@ -975,9 +1045,8 @@ def create_single_joke_images_4by5(
         f"Joke {joke.key or 'unknown'} is missing setup or punchline image URL"
       )
 
-    setup_img = cloud_storage.download_image_from_gcs(joke.setup_image_url)
-    punchline_img = cloud_storage.download_image_from_gcs(
-      joke.punchline_image_url)
+    setup_img = _download_image(joke.setup_image_url, image_pool)
+    punchline_img = _download_image(joke.punchline_image_url, image_pool)
 
     setup_result = _place_square_image_on_4x5_canvas(
       setup_img,
@@ -1002,6 +1071,7 @@ def create_joke_grid_image_3x2(
   joke_ids: list[str] | None = None,
   jokes: list[models.PunnyJoke] | None = None,
   block_last_panel: bool = True,
+  image_pool: ImagePool | None = None,
 ) -> Image.Image:
   """Create a 3x2 image for a joke grid social post. If more than 3 jokes are provided, the last 3 jokes are used."""
   num_jokes = 3
@@ -1009,6 +1079,7 @@ def create_joke_grid_image_3x2(
     joke_ids=joke_ids[-num_jokes:] if joke_ids else None,
     jokes=jokes[-num_jokes:] if jokes else None,
     block_last_panel=block_last_panel,
+    image_pool=image_pool,
   )
 
 
@@ -1017,12 +1088,14 @@ def create_joke_grid_image_4by5(
   joke_ids: list[str] | None = None,
   jokes: list[models.PunnyJoke] | None = None,
   block_last_panel: bool = True,
+  image_pool: ImagePool | None = None,
 ) -> Image.Image:
   """Create a 4:5 image for a joke grid social post."""
   square_image = create_joke_grid_image_square(
     joke_ids=joke_ids,
     jokes=jokes,
     block_last_panel=block_last_panel,
+    image_pool=image_pool,
   )
   return _place_square_image_on_4x5_canvas(
     square_image,
@@ -1035,6 +1108,7 @@ def create_joke_grid_image_square(
   joke_ids: list[str] | None = None,
   jokes: list[models.PunnyJoke] | None = None,
   block_last_panel: bool = True,
+  image_pool: ImagePool | None = None,
 ) -> Image.Image:
   """Create a square image for a joke grid social post. If more than 2 jokes are provided, the last 2 jokes are used."""
   num_jokes = 2
@@ -1042,6 +1116,7 @@ def create_joke_grid_image_square(
     joke_ids=joke_ids[-num_jokes:] if joke_ids else None,
     jokes=jokes[-num_jokes:] if jokes else None,
     block_last_panel=block_last_panel,
+    image_pool=image_pool,
   )
 
 
@@ -1050,6 +1125,7 @@ def _create_joke_grid_image(  # pylint: disable=too-many-branches,too-many-state
   joke_ids: list[str] | None = None,
   jokes: list[models.PunnyJoke] | None = None,
   block_last_panel: bool = True,
+  image_pool: ImagePool | None = None,
 ) -> Image.Image:
   """Create a Pinterest pin image from multiple jokes.
   
@@ -1063,6 +1139,7 @@ def _create_joke_grid_image(  # pylint: disable=too-many-branches,too-many-state
     jokes: Optional list of joke models to render (skips Firestore fetch).
     block_last_panel: If True, overlay a blocker image over the bottom right
       punchline panel. Defaults to True.
+    image_pool: Optional shared pool to download images through.
     
   Returns:
     A PIL Image with dimensions 1000x(n*500) where n is the number of jokes.
@@ -1106,13 +1183,13 @@ def _create_joke_grid_image(  # pylint: disable=too-many-branches,too-many-state
       raise ValueError(f"Joke {joke.key} is missing setup or punchline image")
 
     # Download and process setup image
-    setup_img = cloud_storage.download_image_from_gcs(setup_url)
+    setup_img = _download_image(setup_url, image_pool)
     setup_img = setup_img.resize(
       (_PINTEREST_PANEL_SIZE_PX, _PINTEREST_PANEL_SIZE_PX),
       Image.Resampling.LANCZOS)
 
     # Download and process punchline image
-    punchline_img = cloud_storage.download_image_from_gcs(punchline_url)
+    punchline_img = _download_image(punchline_url, image_pool)
     punchline_img = punchline_img.resize(
       (_PINTEREST_PANEL_SIZE_PX, _PINTEREST_PANEL_SIZE_PX),
       Image.Resampling.LANCZOS)
@@ -1135,8 +1212,8 @@ def _create_joke_grid_image(  # pylint: disable=too-many-branches,too-many-state
 
   # Overlay blocker image on bottom right punchline if requested
   if block_last_panel and num_jokes > 0:
-    blocker_img = cloud_storage.download_image_from_gcs(
-      _PANEL_BLOCKER_OVERLAY_URL_POST_IT)
+    blocker_img = _download_image(_PANEL_BLOCKER_OVERLAY_URL_POST_IT,
+                                  image_pool)
     # Ensure blocker image is RGBA for alpha transparency
     if blocker_img.mode != 'RGBA':
       blocker_img = blocker_img.convert('RGBA')
@@ -2062,6 +2062,55 @@ class CreateJokeGiraffeImageTest(unittest.TestCase):
       image_operations.create_joke_giraffe_image([joke])
 
 
+class ImagePoolTest(unittest.TestCase):
+  """Tests for ImagePool."""
+
+  @patch('common.image_operations.cloud_storage')
+  def test_image_pool_downloads_each_url_once(self, mock_cloud_storage):
+    mock_cloud_storage.download_image_from_gcs.side_effect = (
+      lambda url: Image.new('RGB', (8, 8), color=(255, 0, 0)))
+
+    with image_operations.ImagePool() as image_pool:
+      image_pool.prefetch(["setup-1", None, "punch-1", "setup-1"])
+      setup_image = image_pool.get("setup-1")
+      self.assertIs(image_pool.get("setup-1"), setup_image)
+      _ = image_pool.get("punch-1")
+
+    self.assertCountEqual(
+      mock_cloud_storage.download_image_from_gcs.call_args_list,
+      [call("setup-1"), call("punch-1")],
+    )
+
+  @patch('common.image_operations.cloud_storage')
+  def test_layouts_sharing_pool_download_joke_images_once(
+    self,
+    mock_cloud_storage,
+  ):
+    jokes = [
+      models.PunnyJoke(
+        setup_text="Setup 1",
+        punchline_text="Punchline 1",
+        setup_image_url="setup-1",
+        punchline_image_url="punch-1",
+      ),
+    ]
+    mock_cloud_storage.download_image_from_gcs.side_effect = (
+      lambda url: Image.new('RGB', (1024, 1024), color=(255, 0, 0)))
+
+    with image_operations.ImagePool() as image_pool:
+      giraffe = image_operations.create_joke_giraffe_image(
+        jokes, image_pool=image_pool)
+      giraffe_again = image_operations.create_joke_giraffe_image(
+        jokes, image_pool=image_pool)
+
+    self.assertEqual(giraffe.size, (1024, 2048))
+    self.assertEqual(giraffe_again.getpixel((512, 1536)), (255, 0, 0))
+    self.assertCountEqual(
+      mock_cloud_storage.download_image_from_gcs.call_args_list,
+      [call("setup-1"), call("punch-1")],
+    )
+
+
 class CreateSingleJokeImages4By5Test(unittest.TestCase):
   """Tests for create_single_joke_images_4by5."""
 
@@ -2,11 +2,20 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from common import config, joke_notes_sheet_operations, models
 from firebase_functions import logger
 from google.cloud.firestore import FieldFilter
 from services import firestore, search
 
+_CATEGORY_REFRESH_MAX_WORKERS = 8
+_CATEGORY_CACHE_MAX_JOKES = 100
+_REFRESHABLE_CATEGORY_STATES = ("APPROVED", "SEASONAL", "PROPOSED", "BOOK")
+
 
 def rebuild_joke_categories_index(
   *,
@@ -101,42 +110,70 @@ def refresh_category_caches(
     {joke_id, setup, punchline, setup_image_url, punchline_image_url}
   - If a category yields no results, writes an empty array and forces state to
     PROPOSED on the category document
-    
+  - Categories are refreshed in parallel. When `jokes_by_id` is provided, tag,
+    seasonal and book lookups are served from indexes built once for the
+    whole run, and cache documents whose content is unchanged are not
+    rewritten.
+  - Joke `category_id` fields are updated in one serial pass after all caches
+    are computed, so jokes claimed by several categories resolve the same way
+    on every run regardless of thread timing.
+
   Returns:
-    Dictionary with maintenance statistics: categories_processed, categories_updated, categories_emptied, categories_failed
+    Dictionary with maintenance statistics: categories_processed, categories_updated, categories_unchanged, categories_emptied, categories_failed
   """
   client = firestore.db()
   categories_collection = client.collection("joke_categories")
-  docs = categories_collection.stream()
+  categories = [(doc.id, doc.to_dict() or {})
+                for doc in categories_collection.stream() if doc.exists]
 
-  total = 0
-  updated = 0
-  emptied = 0
-  failed = 0
+  index = _CategoryRebuildIndex(
+    client,
+    jokes_by_id,
+    categories,
+  ) if jokes_by_id is not None else None
 
-  for doc in docs:
-    if not doc.exists:
-      continue
-    total += 1
-    data = doc.to_dict() or {}
+  # Filled concurrently (one key per category) and applied serially below.
+  category_id_changes: dict[str, tuple[set[str], set[str]]] = {}
 
+  def _refresh(category: tuple[str, dict[str, object]]) -> str | None:
+    category_id, data = category
     try:
-      result = refresh_single_category_cache(
-        doc.id,
+      return _refresh_category_cache(
+        category_id,
         data,
         jokes_by_id=jokes_by_id,
+        index=index,
+        category_id_changes=category_id_changes,
       )
-      if result == "updated":
-        updated += 1
-      elif result == "emptied":
-        emptied += 1
-      # If result is None, category was skipped (invalid state or missing query)
     except Exception as exc:  # pylint: disable=broad-except
-      logger.error(f"Failed refreshing category cache for {doc.id}: {exc}")
-      failed += 1
+      logger.error(
+        f"Failed refreshing category cache for {category_id}: {exc}")
+      return "failed"
+
+  with ThreadPoolExecutor(
+      max_workers=_CATEGORY_REFRESH_MAX_WORKERS) as executor:
+    results = list(executor.map(_refresh, categories))
+
+  try:
+    _apply_joke_category_id_changes(
+      client,
+      [(category_id, category_id_changes[category_id])
+       for category_id, _ in categories if category_id in category_id_changes],
+      jokes_by_id=jokes_by_id,
+    )
+  except Exception as exc:  # pylint: disable=broad-except
+    logger.error(f"Failed updating joke category_id fields: {exc}")
+
+  # A result of None means the category was skipped (invalid state or
+  # missing query).
+  total = len(categories)
+  updated = results.count("updated")
+  unchanged = results.count("unchanged")
+  emptied = results.count("emptied")
+  failed = results.count("failed")
 
   logger.info(
-    f"Category caches refreshed: processed={total}, updated={updated}, emptied={emptied}, failed={failed}"
+    f"Category caches refreshed: processed={total}, updated={updated}, unchanged={unchanged}, emptied={emptied}, failed={failed}"
   )
 
   try:
@@ -147,6 +184,7 @@ def refresh_category_caches(
   return {
     "categories_processed": total,
     "categories_updated": updated,
+    "categories_unchanged": unchanged,
     "categories_emptied": emptied,
     "categories_failed": failed,
   }
@@ -183,18 +221,42 @@ def refresh_single_category_cache(
     category_data: The category document data dictionary
 
   Returns:
-    "updated" if cache was updated with jokes, "emptied" if cache was set to empty,
-    None if the category was skipped (invalid state or missing query/seasonal)
+    "updated" if cache was updated with jokes, "unchanged" if the cached jokes
+    were already up to date, "emptied" if cache was set to empty, None if the
+    category was skipped (invalid state or missing query/seasonal)
     
   Raises:
     Exception if cache refresh fails (caller should handle)
   """
+  return _refresh_category_cache(
+    category_id,
+    category_data,
+    jokes_by_id=jokes_by_id,
+    index=None,
+  )
+
+
+def _refresh_category_cache(
+  category_id: str,
+  category_data: dict[str, object],
+  *,
+  jokes_by_id: dict[str, models.PunnyJoke] | None,
+  index: _CategoryRebuildIndex | None,
+  category_id_changes: dict[str, tuple[set[str], set[str]]] | None = None,
+) -> str | None:
+  """Refresh one category cache, using the shared rebuild index if given.
+
+  When `category_id_changes` is given, the joke ids added to and removed from
+  the cache are recorded there under `category_id` instead of being written
+  to the jokes, so the caller can apply them with
+  `_apply_joke_category_id_changes`.
+  """
   category = models.JokeCategory.from_firestore_dict(category_data,
                                                      key=category_id)
 
   # Filter to categories with valid state and query
   state = (category.state or "").upper()
-  if state not in ("APPROVED", "SEASONAL", "PROPOSED", "BOOK"):
+  if state not in _REFRESHABLE_CATEGORY_STATES:
     return None
 
   raw_query = (category.joke_description_query or "").strip()
@@ -211,9 +273,13 @@ def refresh_single_category_cache(
   client = firestore.db()
   cache_ref = client.collection("joke_categories").document(
     category_id).collection("category_jokes").document("cache")
-  previous_cache_doc = cache_ref.get()
-  previous_joke_ids = _extract_cached_joke_ids(previous_cache_doc.to_dict(
-  ) if getattr(previous_cache_doc, "exists", False) else {})
+  previous_cache = index.previous_cache(
+    category_id) if index is not None else None
+  if previous_cache is None:
+    previous_cache_doc = cache_ref.get()
+    previous_cache = previous_cache_doc.to_dict() if getattr(
+      previous_cache_doc, "exists", False) else {}
+  previous_joke_ids = _extract_cached_joke_ids(previous_cache)
 
   if not raw_query and not seasonal_name and not tags and not book_id:
     if state != "PROPOSED":
@@ -226,27 +292,42 @@ def refresh_single_category_cache(
 
   if raw_query:
     search_query = f"jokes about {raw_query}"
-    joke_ids.update(
-      search_category_jokes(
-        search_query,
-        category_id,
-        distance_threshold=search_distance,
-        jokes_by_id=jokes_by_id,
-      ))
+    if index is not None:
+      joke_ids.update(
+        index.search_jokes(search_query,
+                           category_id,
+                           distance_threshold=search_distance))
+    else:
+      joke_ids.update(
+        search_category_jokes(
+          search_query,
+          category_id,
+          distance_threshold=search_distance,
+          jokes_by_id=jokes_by_id,
+        ))
 
   if seasonal_name:
-    joke_ids.update(
-      query_seasonal_category_jokes(client,
-                                    seasonal_name,
-                                    jokes_by_id=jokes_by_id))
+    if index is not None:
+      joke_ids.update(index.seasonal_joke_ids(seasonal_name))
+    else:
+      joke_ids.update(
+        query_seasonal_category_jokes(client,
+                                      seasonal_name,
+                                      jokes_by_id=jokes_by_id))
 
   if book_id:
-    joke_ids.update(
-      query_book_category_jokes(client, book_id, jokes_by_id=jokes_by_id))
+    if index is not None:
+      joke_ids.update(index.book_joke_ids(book_id))
+    else:
+      joke_ids.update(
+        query_book_category_jokes(client, book_id, jokes_by_id=jokes_by_id))
 
   if tags:
-    joke_ids.update(
-      query_tags_category_jokes(client, tags, jokes_by_id=jokes_by_id))
+    if index is not None:
+      joke_ids.update(index.tag_joke_ids(tags))
+    else:
+      joke_ids.update(
+        query_tags_category_jokes(client, tags, jokes_by_id=jokes_by_id))
 
   if jokes_by_id is not None:
     jokes = [jokes_by_id[jid] for jid in joke_ids if jid in jokes_by_id]
@@ -286,18 +367,21 @@ def refresh_single_category_cache(
   jokes = ordered_jokes + remaining_jokes
 
   # Cap cache size to 100, even if union exceeds it.
-  jokes = jokes[:100]
+  jokes = jokes[:_CATEGORY_CACHE_MAX_JOKES]
 
   jokes_payload = [j.get_category_cache_joke_data() for j in jokes if j.key]
 
-  # Write cache document with a sole 'jokes' field
-  cache_ref.set({
+  cache_payload = {
     "jokes": jokes_payload,
     "joke_id_order": joke_id_order,
-  })
-  logger.info(
-    f"Category cache updated for {category_id}, with {len(jokes_payload)} jokes"
-  )
+  }
+  cache_changed = _category_cache_content_hash(
+    cache_payload) != _category_cache_content_hash(previous_cache)
+  if cache_changed:
+    cache_ref.set(cache_payload)
+    logger.info(
+      f"Category cache updated for {category_id}, with {len(jokes_payload)} jokes"
+    )
 
   new_joke_ids = {
     item.get("joke_id")
@@ -307,26 +391,14 @@ def refresh_single_category_cache(
   added = new_joke_ids - previous_joke_ids
   removed = previous_joke_ids - new_joke_ids
 
-  added_writes = _sync_joke_category_ids(
-    client=client,
-    joke_ids=added,
-    expected_existing_category_id=None,
-    new_category_id=category_id,
-    jokes_by_id=jokes_by_id,
-  )
-  # Only mark uncategorized if this category is the currently recorded owner;
-  # avoids clobbering jokes that another category already "won".
-  removed_writes = _sync_joke_category_ids(
-    client=client,
-    joke_ids=removed,
-    expected_existing_category_id=category_id,
-    new_category_id=firestore.UNCATEGORIZED_CATEGORY_ID,
-    jokes_by_id=jokes_by_id,
-  )
-  if added_writes or removed_writes:
-    logger.info(
-      f"Updated joke category_id fields for {category_id}: "
-      f"added_writes={added_writes} removed_writes={removed_writes}")
+  if category_id_changes is not None:
+    category_id_changes[category_id] = (added, removed)
+  else:
+    _apply_joke_category_id_changes(
+      client,
+      [(category_id, (added, removed))],
+      jokes_by_id=jokes_by_id,
+    )
 
   if not jokes_payload:
     # Force category state to PROPOSED when empty
@@ -337,7 +409,192 @@ def refresh_single_category_cache(
     return "emptied"
 
   _ensure_category_joke_sheets(category_id, jokes)
-  return "updated"
+  return "updated" if cache_changed else "unchanged"
+
+
+def _apply_joke_category_id_changes(
+  client,
+  changes: list[tuple[str, tuple[set[str], set[str]]]],
+  *,
+  jokes_by_id: dict[str, models.PunnyJoke] | None,
+) -> None:
+  """Write joke `category_id` fields for `(category_id, (added, removed))`.
+
+  Conflicts are resolved from `changes` order before any write: a joke added
+  by several categories goes to the last of them, and a joke removed from one
+  category but added to another is never reset to uncategorized first. Each
+  joke is therefore written at most once.
+  """
+  owners: dict[str, str] = {}
+  for category_id, (added, _) in changes:
+    for joke_id in added:
+      owners[joke_id] = category_id
+  owned_by_category: dict[str, set[str]] = {}
+  for joke_id, category_id in owners.items():
+    owned_by_category.setdefault(category_id, set()).add(joke_id)
+
+  for category_id, (_, removed) in changes:
+    # Only mark uncategorized if this category is the currently recorded
+    # owner; avoids clobbering jokes that another category already "won".
+    removed_writes = _sync_joke_category_ids(
+      client=client,
+      joke_ids=removed - owners.keys(),
+      expected_existing_category_id=category_id,
+      new_category_id=firestore.UNCATEGORIZED_CATEGORY_ID,
+      jokes_by_id=jokes_by_id,
+    )
+    added_writes = _sync_joke_category_ids(
+      client=client,
+      joke_ids=owned_by_category.get(category_id, set()),
+      expected_existing_category_id=None,
+      new_category_id=category_id,
+      jokes_by_id=jokes_by_id,
+    )
+    if added_writes or removed_writes:
+      logger.info(
+        f"Updated joke category_id fields for {category_id}: "
+        f"added_writes={added_writes} removed_writes={removed_writes}")
+
+
+def _category_cache_content_hash(cache_payload: object) -> str:
+  """Hash the fields of a category cache doc that a refresh writes."""
+  if not isinstance(cache_payload, dict):
+    cache_payload = {}
+  content = {
+    "jokes": cache_payload.get("jokes"),
+    "joke_id_order": cache_payload.get("joke_id_order"),
+  }
+  encoded = json.dumps(content, sort_keys=True, default=str)
+  return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class _CategoryRebuildIndex:
+  """Lookups shared by every category in one `refresh_category_caches` run.
+
+  Built once from `jokes_by_id`: tag and seasonal inverted indexes over public
+  jokes, the referenced joke books and the previous cache documents (each
+  fetched with a single `get_all`), plus a memo of search results per query.
+  Results match the per-category `query_*_category_jokes` functions.
+  """
+
+  def __init__(
+    self,
+    client,
+    jokes_by_id: dict[str, models.PunnyJoke],
+    categories: list[tuple[str, dict[str, object]]],
+  ):
+    self._jokes_by_id = jokes_by_id
+    # Public jokes in `jokes_by_id` order. Indexes hold positions in this list
+    # so a union of postings can be cut to the first 100 in the same order the
+    # linear scans used.
+    self._public_joke_ids: list[str] = []
+    self._positions_by_tag: dict[str, list[int]] = {}
+    self._joke_ids_by_seasonal: dict[str, list[str]] = {}
+    for joke in jokes_by_id.values():
+      if not joke.key or not joke.is_public_and_in_public_state:
+        continue
+      position = len(self._public_joke_ids)
+      self._public_joke_ids.append(joke.key)
+      self._joke_ids_by_seasonal.setdefault(joke.seasonal or "",
+                                            []).append(joke.key)
+      for tag in {t.lower() for t in (joke.tags or []) if isinstance(t, str)}:
+        self._positions_by_tag.setdefault(tag, []).append(position)
+
+    self._search_results: dict[tuple[str, float | None], set[str]] = {}
+    self._search_lock = threading.Lock()
+
+    category_ids = [
+      category_id for category_id, data in categories
+      if str(data.get("state") or "").upper() in _REFRESHABLE_CATEGORY_STATES
+    ]
+    self._previous_caches = self._get_previous_caches(client, category_ids)
+    book_ids = {
+      str(data.get("book_id") or "").strip()
+      for _, data in categories
+    }
+    self._book_docs = self._get_book_docs(client, book_ids - {""})
+
+  @staticmethod
+  def _get_previous_caches(
+    client,
+    category_ids: list[str],
+  ) -> dict[str, dict[str, object]]:
+    refs = [
+      client.collection("joke_categories").document(category_id).collection(
+        "category_jokes").document("cache") for category_id in category_ids
+    ]
+    if not refs:
+      return {}
+    category_id_by_path = {
+      ref.path: category_id
+      for ref, category_id in zip(refs, category_ids)
+    }
+    previous_caches = {category_id: {} for category_id in category_ids}
+    for snap in client.get_all(refs):
+      category_id = category_id_by_path.get(snap.reference.path)
+      if category_id and getattr(snap, "exists", False):
+        previous_caches[category_id] = snap.to_dict() or {}
+    return previous_caches
+
+  @staticmethod
+  def _get_book_docs(client, book_ids: set[str]) -> dict[str, object]:
+    if not book_ids:
+      return {}
+    refs = [
+      client.collection("joke_books").document(book_id) for book_id in book_ids
+    ]
+    return {snap.id: snap for snap in client.get_all(refs)}
+
+  def previous_cache(self, category_id: str) -> dict[str, object] | None:
+    """Return the prefetched cache doc data, or None if it was not fetched."""
+    return self._previous_caches.get(category_id)
+
+  def search_jokes(
+    self,
+    search_query: str,
+    category_id: str,
+    *,
+    distance_threshold: float | None,
+  ) -> set[str]:
+    """Search once per distinct query and threshold across all categories."""
+    key = (search_query, distance_threshold)
+    with self._search_lock:
+      cached = self._search_results.get(key)
+    if cached is not None:
+      return set(cached)
+    joke_ids = search_category_jokes(
+      search_query,
+      category_id,
+      distance_threshold=distance_threshold,
+      jokes_by_id=self._jokes_by_id,
+    )
+    with self._search_lock:
+      self._search_results[key] = set(joke_ids)
+    return joke_ids
+
+  def seasonal_joke_ids(self, seasonal_name: str) -> set[str]:
+    """Equivalent to `query_seasonal_category_jokes` over `jokes_by_id`."""
+    joke_ids = self._joke_ids_by_seasonal.get(seasonal_name, [])
+    return set(joke_ids[:_CATEGORY_CACHE_MAX_JOKES])
+
+  def tag_joke_ids(self, tags: list[str]) -> set[str]:
+    """Equivalent to `query_tags_category_jokes` over `jokes_by_id`."""
+    normalized_lower = {
+      t.strip().lower()
+      for t in tags or [] if isinstance(t, str) and t.strip()
+    }
+    positions: set[int] = set()
+    for tag in normalized_lower:
+      positions.update(self._positions_by_tag.get(tag, []))
+    first_positions = sorted(positions)[:_CATEGORY_CACHE_MAX_JOKES]
+    return {self._public_joke_ids[position] for position in first_positions}
+
+  def book_joke_ids(self, book_id: str) -> set[str]:
+    """Equivalent to `query_book_category_jokes` over `jokes_by_id`."""
+    book_doc = self._book_docs.get(book_id)
+    return _get_public_book_joke_ids(book_id,
+                                     book_doc,
+                                     jokes_by_id=self._jokes_by_id)
 
 
 def _ensure_category_joke_sheets(
@@ -472,6 +729,7 @@ def search_category_jokes(
     limit=100,
     distance_threshold=distance_threshold
     if distance_threshold else config.JOKE_SEARCH_TIGHT_THRESHOLD,
+    cache_query_embedding=True,
   )
 
   joke_ids = {result.joke_id for result in results if result.joke_id}
@@ -533,8 +791,18 @@ def query_book_category_jokes(
     Set of joke IDs. Returns empty set if book not found or has no jokes.
   """
   book_ref = client.collection("joke_books").document(book_id)
-  book_doc = book_ref.get()
+  return _get_public_book_joke_ids(book_id,
+                                   book_ref.get(),
+                                   jokes_by_id=jokes_by_id)
+
 
+def _get_public_book_joke_ids(
+  book_id: str,
+  book_doc,
+  *,
+  jokes_by_id: dict[str, models.PunnyJoke] | None,
+) -> set[str]:
+  """Return the public joke IDs listed in a `joke_books` snapshot."""
   if not getattr(book_doc, "exists", False):
     logger.warn(f"Joke book {book_id} not found for category")
     return set()
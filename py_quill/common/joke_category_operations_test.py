@@ -5,6 +5,7 @@ from types import SimpleNamespace
 import pytest
 
 from common import joke_category_operations, models
+from services import firestore_fake
 
 
 class _FakeDoc:
@@ -265,6 +266,190 @@ def test_refresh_updates_cache_for_approved_category(monkeypatch, fake_env):
   assert fake_env.category_updates == {}
 
 
+def _make_index_jokes() -> dict[str, models.PunnyJoke]:
+  jokes_by_id: dict[str, models.PunnyJoke] = {}
+  for i in range(260):
+    joke = models.PunnyJoke(
+      key=f"j{i}",
+      setup_text="S",
+      punchline_text="P",
+      tags=[["Cats", "dogs"], ["cats"], ["Birds"], []][i % 4],
+      seasonal=["Halloween", None, "Christmas"][i % 3],
+      state=models.JokeState.PUBLISHED if i % 5 else models.JokeState.APPROVED,
+      is_public=i % 7 != 0,
+    )
+    jokes_by_id[joke.key] = joke
+  return jokes_by_id
+
+
+def test_category_rebuild_index_matches_linear_queries():
+  jokes_by_id = _make_index_jokes()
+  index = joke_category_operations._CategoryRebuildIndex(  # pylint: disable=protected-access
+    firestore_fake.FakeFirestore({}), jokes_by_id, [])
+
+  for tags in (["cats"], [" CATS ", "birds"], ["dogs", "dogs"], ["none"], []):
+    assert index.tag_joke_ids(tags) == (
+      joke_category_operations.query_tags_category_jokes(
+        None, tags, jokes_by_id=jokes_by_id))
+  for seasonal_name in ("Halloween", "Christmas", "Easter"):
+    assert index.seasonal_joke_ids(seasonal_name) == (
+      joke_category_operations.query_seasonal_category_jokes(
+        None, seasonal_name, jokes_by_id=jokes_by_id))
+
+
+def test_refresh_with_jokes_by_id_batches_reads_and_skips_unchanged_writes(
+    monkeypatch):
+  jokes_by_id = {
+    f"j{i}":
+    models.PunnyJoke(
+      key=f"j{i}",
+      setup_text="S",
+      punchline_text="P",
+      tags=["cats"] if i < 2 else ["books"],
+      state=models.JokeState.PUBLISHED,
+      is_public=True,
+    )
+    for i in range(4)
+  }
+  fake_db = firestore_fake.FakeFirestore({
+    "joke_categories/animals": {
+      "display_name": "Animals",
+      "joke_description_query": "cats",
+      "tags": ["cats"],
+      "state": "APPROVED",
+    },
+    "joke_categories/pets": {
+      "display_name": "Pets",
+      "joke_description_query": "cats",
+      "state": "APPROVED",
+    },
+    "joke_categories/reading": {
+      "display_name": "Reading",
+      "book_id": "book-1",
+      "state": "BOOK",
+    },
+    "joke_books/book-1": {
+      "jokes": ["j2", "j3", "missing"],
+    },
+  })
+  search_calls: list[str] = []
+
+  def fake_search_category_jokes(query,
+                                 category_id,
+                                 *,
+                                 distance_threshold=None,
+                                 jokes_by_id=None):  # pylint: disable=unused-argument
+    search_calls.append(category_id)
+    return {"j0"}
+
+  monkeypatch.setattr("services.firestore.db", lambda: fake_db)
+  monkeypatch.setattr("common.joke_category_operations.search_category_jokes",
+                      fake_search_category_jokes)
+  monkeypatch.setattr("common.joke_category_operations._sync_joke_category_ids",
+                      lambda **_kwargs: 0)
+  monkeypatch.setattr(
+    "common.joke_category_operations._ensure_category_joke_sheets",
+    lambda *_args: None)
+  monkeypatch.setattr(
+    "common.joke_category_operations._refresh_joke_sheets_cache", lambda: None)
+
+  first = joke_category_operations.refresh_category_caches(
+    jokes_by_id=jokes_by_id)
+
+  assert first["categories_updated"] == 3
+  assert len(search_calls) == 1
+  assert fake_db.get_calls == []
+  assert len(fake_db.get_all_calls) == 2
+  cache_ids = {
+    item["joke_id"]
+    for item in fake_db.docs["joke_categories/animals/category_jokes/cache"]
+    ["jokes"]
+  }
+  assert cache_ids == {"j0", "j1"}
+  reading_ids = {
+    item["joke_id"]
+    for item in fake_db.docs["joke_categories/reading/category_jokes/cache"]
+    ["jokes"]
+  }
+  assert reading_ids == {"j2", "j3"}
+
+  fake_db.set_calls.clear()
+  second = joke_category_operations.refresh_category_caches(
+    jokes_by_id=jokes_by_id)
+
+  assert second["categories_updated"] == 0
+  assert second["categories_unchanged"] == 3
+  assert fake_db.set_calls == []
+
+
+def test_refresh_resolves_joke_category_id_conflicts_serially(monkeypatch):
+  jokes_by_id = {
+    f"j{i}":
+    models.PunnyJoke(
+      key=f"j{i}",
+      setup_text="S",
+      punchline_text="P",
+      tags=["cats"] if i < 2 else ["books"],
+      state=models.JokeState.PUBLISHED,
+      is_public=True,
+    )
+    for i in range(4)
+  }
+  fake_db = firestore_fake.FakeFirestore({
+    "joke_categories/animals": {
+      "joke_description_query": "cats",
+      "tags": ["cats"],
+      "state": "APPROVED",
+    },
+    "joke_categories/pets": {
+      "joke_description_query": "cats",
+      "state": "APPROVED",
+    },
+    "joke_categories/reading": {
+      "book_id": "book-1",
+      "state": "BOOK",
+    },
+    # `reading` previously cached j0, which `animals` and `pets` now claim.
+    "joke_categories/reading/category_jokes/cache": {
+      "jokes": [{
+        "joke_id": "j0"
+      }],
+    },
+    "joke_books/book-1": {
+      "jokes": ["j2", "j3"],
+    },
+  })
+  sync_calls: list[tuple[str | None, str, set[str]]] = []
+
+  def fake_sync(*, client, joke_ids, expected_existing_category_id,
+                new_category_id, jokes_by_id):  # pylint: disable=unused-argument
+    if joke_ids:
+      sync_calls.append(
+        (expected_existing_category_id, new_category_id, set(joke_ids)))
+    return len(joke_ids)
+
+  monkeypatch.setattr("services.firestore.db", lambda: fake_db)
+  monkeypatch.setattr("common.joke_category_operations.search_category_jokes",
+                      lambda *_args, **_kwargs: {"j0"})
+  monkeypatch.setattr(
+    "common.joke_category_operations._sync_joke_category_ids", fake_sync)
+  monkeypatch.setattr(
+    "common.joke_category_operations._ensure_category_joke_sheets",
+    lambda *_args: None)
+  monkeypatch.setattr(
+    "common.joke_category_operations._refresh_joke_sheets_cache", lambda: None)
+
+  joke_category_operations.refresh_category_caches(jokes_by_id=jokes_by_id)
+
+  # Category order decides the owner of j0; the removal from `reading` does
+  # not reset it to uncategorized, and every joke is written once.
+  assert sync_calls == [
+    (None, "animals", {"j1"}),
+    (None, "pets", {"j0"}),
+    (None, "reading", {"j2", "j3"}),
+  ]
+
+
 def test_sync_joke_category_ids_updates_only_when_needed():
   from common import joke_category_operations as ops  # local import for direct access
 
@@ -807,6 +992,7 @@ class TestSearchCategoryJokesSorting:
 
     def fake_search_jokes(**kwargs):
       assert kwargs["distance_threshold"] == 0.123
+      assert kwargs["cache_query_embedding"] is True
       return results
 
     monkeypatch.setattr("services.search.search_jokes", fake_search_jokes)
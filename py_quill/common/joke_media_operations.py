@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
-import array
-import sys
+import bisect
+import hashlib
+import json
 from dataclasses import dataclass
+from typing import Any
 
-from common import audio_operations, audio_timing, models, utils
+import numpy as np
+from common import (audio_kernels, audio_operations, audio_timing, models,
+                    utils)
 from common.posable_character import MouthState, PosableCharacter, Transform
 from common.posable_character_sequence import (
   PosableCharacterSequence, SequenceBooleanEvent, SequenceMouthEvent,
@@ -15,7 +19,7 @@ from firebase_functions import logger
 from functions.prompts import social_post_prompts
 from services import (audio_client, audio_voices, cloud_storage, firestore,
                       gen_video, mouth_event_detection)
-from storage import joke_videos_firestore
+from storage import joke_audio_artifacts_firestore, joke_videos_firestore
 
 _JOKE_AUDIO_RESPONSE_GAP_SEC = 0.8
 _JOKE_AUDIO_PUNCHLINE_GAP_SEC = 1.0
@@ -26,6 +30,15 @@ _LIP_SYNC_METADATA_RESPONSE = "animation_lip_sync_response"
 _LIP_SYNC_METADATA_PUNCHLINE = "animation_lip_sync_punchline"
 _MIN_POSITIVE_WORD_DURATION_SEC = 0.02
 _MIN_SPEECH_CLIP_DURATION_SEC = 0.05
+_LIP_SYNC_DETECTION_MODE = "timing"
+_LIP_SYNC_SEGMENT_NAMES = ("intro", "setup", "response", "punchline")
+
+# Bump when the way cached audio artifacts are produced changes (splitting,
+# timing shifts, mouth detection), so stale artifacts stop matching.
+_AUDIO_ARTIFACT_CACHE_VERSION = 1
+_AUDIO_ARTIFACT_STAGE_DIALOG = "dialog"
+_AUDIO_ARTIFACT_STAGE_CLIPS = "clips"
+_AUDIO_ARTIFACT_STAGE_LIP_SYNC = "lip_sync"
 
 DEFAULT_JOKE_AUDIO_SPEAKER_1_VOICE = audio_voices.Voice.ELEVENLABS_LULU_LOLLIPOP
 DEFAULT_JOKE_AUDIO_SPEAKER_2_VOICE = audio_voices.Voice.ELEVENLABS_AERISITA
@@ -137,6 +150,8 @@ class JokeAudioResult:
   punchline_gcs_uri: str | None
   generation_metadata: models.GenerationMetadata
   clip_timing: JokeAudioTiming | None = None
+  artifact_key: str | None = None
+  """Content hash of the split clips when the artifact cache is in use."""
 
 
 @dataclass(frozen=True)
@@ -410,6 +425,7 @@ def generate_joke_audio(
   script_template: list[audio_client.DialogTurn] | None = None,
   audio_model: audio_client.AudioModel | None = None,
   allow_partial: bool = False,
+  use_artifact_cache: bool = False,
 ) -> JokeAudioResult:
   """Generate a full dialog WAV plus split clips.
 
@@ -423,6 +439,11 @@ def generate_joke_audio(
   If allow_partial is True and timing/splitting fails, returns the full
   dialog WAV (dialog_gcs_uri) and leaves split clip URIs and clip timing as
   None.
+
+  If use_artifact_cache is True (and temp_output is False), artifacts are
+  looked up by a hash of the rendered turns and audio model: cached split
+  clips are returned as-is, and a cached dialog WAV with its timing skips TTS
+  and forced alignment.
   """
   if not joke.setup_text or not joke.punchline_text:
     raise ValueError("Joke must have setup_text and punchline_text")
@@ -434,31 +455,18 @@ def generate_joke_audio(
     dialog_turns)
   _validate_audio_model_for_turns(resolved_audio_model, dialog_turns)
 
-  if resolved_audio_model == audio_client.AudioModel.ELEVENLABS_ELEVEN_V3:
-    # `generate_joke_audio` expects a WAV so we can split on silences.
-    client = audio_client.get_audio_client(
-      label="generate_joke_audio",
-      model=resolved_audio_model,
-      output_format="wav_24000",
-    )
-  else:
-    client = audio_client.get_audio_client(
-      label="generate_joke_audio",
-      model=resolved_audio_model,
-    )
-  audio_result = client.generate_multi_turn_dialog(
-    turns=dialog_turns,
-    output_filename_base=f"joke_dialog_{joke_id_for_filename}",
-    temp_output=temp_output,
-    label="generate_joke_audio",
-    extra_log_data={
-      "joke_id": joke.key,
-      "turn_voices": [turn.voice.name for turn in dialog_turns],
-    },
-  )
-  dialog_gcs_uri = audio_result.gcs_uri
+  dialog_artifact_key: str | None = None
+  clips_artifact_key: str | None = None
+  if use_artifact_cache and not temp_output:
+    dialog_artifact_key = _dialog_artifact_key(dialog_turns,
+                                               resolved_audio_model)
+    clips_artifact_key = _clips_artifact_key(dialog_artifact_key)
+    cached_audio = _load_cached_clips_artifact(clips_artifact_key)
+    if cached_audio is not None:
+      return cached_audio
+
+  dialog_gcs_uri = ""
   combined_generation_metadata = models.GenerationMetadata()
-  combined_generation_metadata.add_generation(audio_result.metadata)
 
   def _partial_audio_result() -> JokeAudioResult:
     return JokeAudioResult(
@@ -471,34 +479,72 @@ def generate_joke_audio(
       clip_timing=None,
     )
 
-  dialog_wav_bytes = cloud_storage.get_and_convert_wave_bytes_from_gcs(
-    dialog_gcs_uri)
-  tts_timing = audio_result.timing
-  if not tts_timing or not tts_timing.alignment_data:
-    try:
-      tts_timing, forced_alignment_metadata = client.create_forced_alignment(
-        audio_bytes=dialog_wav_bytes,
-        turns=dialog_turns,
-        audio_filename=f"joke_dialog_{joke_id_for_filename}.wav",
+  cached_dialog = (_load_cached_dialog_artifact(dialog_artifact_key)
+                   if dialog_artifact_key else None)
+  if cached_dialog is not None:
+    dialog_gcs_uri, dialog_wav_bytes, tts_timing = cached_dialog
+  else:
+    if resolved_audio_model == audio_client.AudioModel.ELEVENLABS_ELEVEN_V3:
+      # `generate_joke_audio` expects a WAV so we can split on silences.
+      client = audio_client.get_audio_client(
+        label="generate_joke_audio",
+        model=resolved_audio_model,
+        output_format="wav_24000",
+      )
+    else:
+      client = audio_client.get_audio_client(
+        label="generate_joke_audio",
+        model=resolved_audio_model,
+      )
+    audio_result = client.generate_multi_turn_dialog(
+      turns=dialog_turns,
+      output_filename_base=f"joke_dialog_{joke_id_for_filename}",
+      temp_output=temp_output,
+      label="generate_joke_audio",
+      extra_log_data={
+        "joke_id": joke.key,
+        "turn_voices": [turn.voice.name for turn in dialog_turns],
+      },
+    )
+    dialog_gcs_uri = audio_result.gcs_uri
+    combined_generation_metadata.add_generation(audio_result.metadata)
+
+    dialog_wav_bytes = cloud_storage.get_and_convert_wave_bytes_from_gcs(
+      dialog_gcs_uri)
+    tts_timing = audio_result.timing
+    if not tts_timing or not tts_timing.alignment_data:
+      try:
+        tts_timing, forced_alignment_metadata = client.create_forced_alignment(
+          audio_bytes=dialog_wav_bytes,
+          turns=dialog_turns,
+          audio_filename=f"joke_dialog_{joke_id_for_filename}.wav",
+        )
+        combined_generation_metadata.add_generation(forced_alignment_metadata)
+      except NotImplementedError:
+        if allow_partial:
+          return _partial_audio_result()
+        raise ValueError(
+          "Audio timing is required and forced alignment is not supported for this model"
+        ) from None
+      except Exception as exc:  # pylint: disable=broad-except
+        if allow_partial:
+          return _partial_audio_result()
+        raise ValueError(f"Forced alignment fallback failed: {exc}") from exc
+
+      if not tts_timing or not tts_timing.alignment_data or len(
+          tts_timing.voice_segments) != 4:
+        if allow_partial:
+          return _partial_audio_result()
+        raise ValueError(
+          "Forced alignment fallback returned unusable timing data")
+
+    if dialog_artifact_key and tts_timing and len(
+        tts_timing.voice_segments) == 4:
+      _store_dialog_artifact(
+        dialog_artifact_key,
+        dialog_gcs_uri=dialog_gcs_uri,
+        tts_timing=tts_timing,
       )
-      combined_generation_metadata.add_generation(forced_alignment_metadata)
-    except NotImplementedError:
-      if allow_partial:
-        return _partial_audio_result()
-      raise ValueError(
-        "Audio timing is required and forced alignment is not supported for this model"
-      ) from None
-    except Exception as exc:  # pylint: disable=broad-except
-      if allow_partial:
-        return _partial_audio_result()
-      raise ValueError(f"Forced alignment fallback failed: {exc}") from exc
-
-    if not tts_timing or not tts_timing.alignment_data or len(
-        tts_timing.voice_segments) != 4:
-      if allow_partial:
-        return _partial_audio_result()
-      raise ValueError(
-        "Forced alignment fallback returned unusable timing data")
 
   timing: JokeAudioTiming | None = None
   intro_wav: bytes | None = None
@@ -535,41 +581,41 @@ def generate_joke_audio(
     raise ValueError(
       f"Error splitting joke dialog WAV by timing: {exc}") from exc
 
-  intro_gcs_uri = cloud_storage.upload_bytes_to_gcs(
-    intro_wav,
-    cloud_storage.get_audio_gcs_uri(
-      f"joke_{joke_id_for_filename}_intro",
+  def _clip_gcs_uri(segment_name: str) -> str:
+    if clips_artifact_key:
+      return cloud_storage.get_audio_artifact_gcs_uri(
+        clips_artifact_key,
+        segment_name,
+        "wav",
+      )
+    return cloud_storage.get_audio_gcs_uri(
+      f"joke_{joke_id_for_filename}_{segment_name}",
       "wav",
       temp=temp_output,
-    ),
-    content_type="audio/wav") if intro_wav else None
+    )
 
+  intro_gcs_uri = cloud_storage.upload_bytes_to_gcs(
+    intro_wav,
+    _clip_gcs_uri("intro"),
+    content_type="audio/wav",
+  ) if intro_wav else None
   setup_gcs_uri = cloud_storage.upload_bytes_to_gcs(
     setup_wav,
-    cloud_storage.get_audio_gcs_uri(
-      f"joke_{joke_id_for_filename}_setup",
-      "wav",
-      temp=temp_output,
-    ),
-    content_type="audio/wav")
+    _clip_gcs_uri("setup"),
+    content_type="audio/wav",
+  )
   response_gcs_uri = cloud_storage.upload_bytes_to_gcs(
     response_wav,
-    cloud_storage.get_audio_gcs_uri(
-      f"joke_{joke_id_for_filename}_response",
-      "wav",
-      temp=temp_output,
-    ),
-    content_type="audio/wav")
+    _clip_gcs_uri("response"),
+    content_type="audio/wav",
+  )
   punchline_gcs_uri = cloud_storage.upload_bytes_to_gcs(
     punchline_wav,
-    cloud_storage.get_audio_gcs_uri(
-      f"joke_{joke_id_for_filename}_punchline",
-      "wav",
-      temp=temp_output,
-    ),
-    content_type="audio/wav")
+    _clip_gcs_uri("punchline"),
+    content_type="audio/wav",
+  )
 
-  return JokeAudioResult(
+  result = JokeAudioResult(
     dialog_gcs_uri=dialog_gcs_uri,
     intro_gcs_uri=intro_gcs_uri,
     setup_gcs_uri=setup_gcs_uri,
@@ -577,7 +623,11 @@ def generate_joke_audio(
     punchline_gcs_uri=punchline_gcs_uri,
     generation_metadata=combined_generation_metadata,
     clip_timing=timing,
+    artifact_key=clips_artifact_key,
   )
+  if clips_artifact_key:
+    _store_clips_artifact(clips_artifact_key, result)
+  return result
 
 
 def build_laugh_sequence(
@@ -841,6 +891,7 @@ def get_joke_lip_sync_media(
     audio_model=audio_model,
     allow_partial=allow_partial,
     transcripts=transcripts,
+    use_artifact_cache=use_audio_cache,
   )
 
 
@@ -852,14 +903,20 @@ def _generate_joke_lip_sync_sequences(
   audio_model: audio_client.AudioModel | None,
   allow_partial: bool,
   transcripts: JokeAudioTranscripts,
+  use_artifact_cache: bool = False,
 ) -> JokeLipSyncResult:
-  """Generate audio clips and build/store 4 lip-sync sequences."""
+  """Generate audio clips and build/store 4 lip-sync sequences.
+
+  With use_artifact_cache, each upstream artifact (dialog audio, split clips,
+  lip-sync sequences) is reused when its inputs hash to a cached entry.
+  """
   audio_result = generate_joke_audio(
     joke,
     temp_output=temp_output,
     script_template=script_template,
     audio_model=audio_model,
     allow_partial=allow_partial,
+    use_artifact_cache=use_artifact_cache,
   )
   if not all([
       audio_result.intro_gcs_uri, audio_result.setup_gcs_uri,
@@ -888,33 +945,60 @@ def _generate_joke_lip_sync_sequences(
   if audio_result.clip_timing.intro is None:
     raise ValueError("Intro/setup split failed; expected 4 lip-sync segments")
 
-  intro_sequence = _build_lipsync_sequence(
-    audio_gcs_uri=audio_result.intro_gcs_uri,
-    transcript=transcripts.intro,
-    timing=audio_result.clip_timing.intro,
-  )
-  setup_sequence = _build_lipsync_sequence(
-    audio_gcs_uri=audio_result.setup_gcs_uri,
-    transcript=transcripts.setup,
-    timing=audio_result.clip_timing.setup,
-  )
-  response_sequence = _build_lipsync_sequence(
-    audio_gcs_uri=audio_result.response_gcs_uri,
-    transcript=transcripts.response,
-    timing=audio_result.clip_timing.response,
-  )
-  punchline_sequence = _build_lipsync_sequence(
-    audio_gcs_uri=audio_result.punchline_gcs_uri,
-    transcript=transcripts.punchline,
-    timing=audio_result.clip_timing.punchline,
-  )
-  _store_lip_sync_sequences(
-    joke_id=joke.key,
-    intro_sequence=intro_sequence,
-    setup_sequence=setup_sequence,
-    response_sequence=response_sequence,
-    punchline_sequence=punchline_sequence,
-  )
+  lip_sync_artifact_key = _lip_sync_artifact_key(
+    audio_result.artifact_key,
+    transcripts,
+  ) if audio_result.artifact_key else None
+  cached = _load_cached_lip_sync_artifact(
+    lip_sync_artifact_key) if lip_sync_artifact_key else None
+  if cached:
+    intro_sequence = cached["intro"]
+    setup_sequence = cached["setup"]
+    response_sequence = cached["response"]
+    punchline_sequence = cached["punchline"]
+    _link_lip_sync_sequences_to_joke(
+      joke_id=joke.key,
+      intro_sequence=intro_sequence,
+      setup_sequence=setup_sequence,
+      response_sequence=response_sequence,
+      punchline_sequence=punchline_sequence,
+    )
+  else:
+    intro_sequence = _build_lipsync_sequence(
+      audio_gcs_uri=audio_result.intro_gcs_uri,
+      transcript=transcripts.intro,
+      timing=audio_result.clip_timing.intro,
+    )
+    setup_sequence = _build_lipsync_sequence(
+      audio_gcs_uri=audio_result.setup_gcs_uri,
+      transcript=transcripts.setup,
+      timing=audio_result.clip_timing.setup,
+    )
+    response_sequence = _build_lipsync_sequence(
+      audio_gcs_uri=audio_result.response_gcs_uri,
+      transcript=transcripts.response,
+      timing=audio_result.clip_timing.response,
+    )
+    punchline_sequence = _build_lipsync_sequence(
+      audio_gcs_uri=audio_result.punchline_gcs_uri,
+      transcript=transcripts.punchline,
+      timing=audio_result.clip_timing.punchline,
+    )
+    _store_lip_sync_sequences(
+      joke_id=joke.key,
+      intro_sequence=intro_sequence,
+      setup_sequence=setup_sequence,
+      response_sequence=response_sequence,
+      punchline_sequence=punchline_sequence,
+    )
+    if lip_sync_artifact_key:
+      _store_lip_sync_artifact(
+        lip_sync_artifact_key,
+        intro_sequence=intro_sequence,
+        setup_sequence=setup_sequence,
+        response_sequence=response_sequence,
+        punchline_sequence=punchline_sequence,
+      )
   return JokeLipSyncResult(
     dialog_gcs_uri=audio_result.dialog_gcs_uri,
     intro_audio_gcs_uri=audio_result.intro_gcs_uri,
@@ -945,6 +1029,24 @@ def _store_lip_sync_sequences(
     sequence.key = utils.create_timestamped_firestore_key(sequence.transcript
                                                           or "")
     _ = firestore.upsert_posable_character_sequence(sequence)
+  _link_lip_sync_sequences_to_joke(
+    joke_id=joke_id,
+    intro_sequence=intro_sequence,
+    setup_sequence=setup_sequence,
+    response_sequence=response_sequence,
+    punchline_sequence=punchline_sequence,
+  )
+
+
+def _link_lip_sync_sequences_to_joke(
+  *,
+  joke_id: str | None,
+  intro_sequence: PosableCharacterSequence,
+  setup_sequence: PosableCharacterSequence,
+  response_sequence: PosableCharacterSequence,
+  punchline_sequence: PosableCharacterSequence,
+) -> None:
+  """Record stored sequence IDs in the joke metadata; failures are logged."""
   if not joke_id:
     return
   try:
@@ -1006,6 +1108,218 @@ def _load_cached_lip_sync_sequences(
   }
 
 
+def _audio_artifact_key(stage: str, inputs: dict[str, Any]) -> str:
+  """Return the content hash that identifies an audio pipeline artifact."""
+  encoded = json.dumps(
+    {
+      "version": _AUDIO_ARTIFACT_CACHE_VERSION,
+      "stage": stage,
+      "inputs": inputs,
+    },
+    sort_keys=True,
+    separators=(",", ":"),
+  )
+  return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _dialog_artifact_key(
+  dialog_turns: list[audio_client.DialogTurn],
+  audio_model: audio_client.AudioModel,
+) -> str:
+  return _audio_artifact_key(
+    _AUDIO_ARTIFACT_STAGE_DIALOG, {
+      "audio_model":
+      audio_model.value,
+      "turns": [{
+        "voice": turn.voice.voice_name,
+        "script": turn.script,
+        "pause_sec_before": turn.pause_sec_before,
+        "pause_sec_after": turn.pause_sec_after,
+      } for turn in dialog_turns],
+    })
+
+
+def _clips_artifact_key(dialog_artifact_key: str) -> str:
+  return _audio_artifact_key(_AUDIO_ARTIFACT_STAGE_CLIPS,
+                             {"dialog": dialog_artifact_key})
+
+
+def _lip_sync_artifact_key(
+  clips_artifact_key: str,
+  transcripts: JokeAudioTranscripts,
+) -> str:
+  return _audio_artifact_key(
+    _AUDIO_ARTIFACT_STAGE_LIP_SYNC, {
+      "clips":
+      clips_artifact_key,
+      "detection_mode":
+      _LIP_SYNC_DETECTION_MODE,
+      "transcripts": [
+        transcripts.intro,
+        transcripts.setup,
+        transcripts.response,
+        transcripts.punchline,
+      ],
+    })
+
+
+def _load_cached_dialog_artifact(
+    artifact_key: str) -> tuple[str, bytes, audio_timing.TtsTiming] | None:
+  """Load a cached dialog WAV and its timing, or None on any miss."""
+  try:
+    data = joke_audio_artifacts_firestore.get_joke_audio_artifact(
+      artifact_key,
+      stage=_AUDIO_ARTIFACT_STAGE_DIALOG,
+    )
+    if not data:
+      return None
+    dialog_gcs_uri = str(data.get("dialog_gcs_uri") or "").strip()
+    tts_timing = audio_timing.TtsTiming.from_dict(data.get("tts_timing") or {})
+    if not dialog_gcs_uri or len(tts_timing.voice_segments) != 4:
+      return None
+    dialog_wav_bytes = cloud_storage.get_and_convert_wave_bytes_from_gcs(
+      dialog_gcs_uri)
+  except Exception as exc:  # pylint: disable=broad-except
+    logger.warn(f"Ignoring unusable dialog artifact {artifact_key}: {exc}")
+    return None
+  return dialog_gcs_uri, dialog_wav_bytes, tts_timing
+
+
+def _store_dialog_artifact(
+  artifact_key: str,
+  *,
+  dialog_gcs_uri: str,
+  tts_timing: audio_timing.TtsTiming,
+) -> None:
+  try:
+    joke_audio_artifacts_firestore.set_joke_audio_artifact(
+      artifact_key,
+      stage=_AUDIO_ARTIFACT_STAGE_DIALOG,
+      data={
+        "dialog_gcs_uri": dialog_gcs_uri,
+        "tts_timing": tts_timing.to_dict(),
+      },
+    )
+  except Exception as exc:  # pylint: disable=broad-except
+    logger.warn(f"Failed storing dialog artifact {artifact_key}: {exc}")
+
+
+def _load_cached_clips_artifact(artifact_key: str) -> JokeAudioResult | None:
+  """Load cached split clips and their timing, or None on any miss."""
+  try:
+    data = joke_audio_artifacts_firestore.get_joke_audio_artifact(
+      artifact_key,
+      stage=_AUDIO_ARTIFACT_STAGE_CLIPS,
+    )
+    if not data:
+      return None
+    clip_uris = data.get("clip_gcs_uris") or {}
+    clip_timing = data.get("clip_timing") or {}
+    if not all(clip_uris.get(name) for name in _LIP_SYNC_SEGMENT_NAMES):
+      return None
+    words_by_segment = {
+      name: [
+        audio_timing.WordTiming.from_dict(word)
+        for word in clip_timing.get(name) or []
+      ]
+      for name in _LIP_SYNC_SEGMENT_NAMES
+    }
+  except Exception as exc:  # pylint: disable=broad-except
+    logger.warn(f"Ignoring unusable clips artifact {artifact_key}: {exc}")
+    return None
+  return JokeAudioResult(
+    dialog_gcs_uri=str(data.get("dialog_gcs_uri") or ""),
+    intro_gcs_uri=clip_uris["intro"],
+    setup_gcs_uri=clip_uris["setup"],
+    response_gcs_uri=clip_uris["response"],
+    punchline_gcs_uri=clip_uris["punchline"],
+    generation_metadata=models.GenerationMetadata(),
+    clip_timing=JokeAudioTiming(**words_by_segment),
+    artifact_key=artifact_key,
+  )
+
+
+def _store_clips_artifact(artifact_key: str, result: JokeAudioResult) -> None:
+  clip_uris = {
+    "intro": result.intro_gcs_uri,
+    "setup": result.setup_gcs_uri,
+    "response": result.response_gcs_uri,
+    "punchline": result.punchline_gcs_uri,
+  }
+  if not result.clip_timing or not all(clip_uris.values()):
+    return
+  clip_timing = {
+    name: [word.to_dict() for word in words or []]
+    for name, words in (
+      ("intro", result.clip_timing.intro),
+      ("setup", result.clip_timing.setup),
+      ("response", result.clip_timing.response),
+      ("punchline", result.clip_timing.punchline),
+    )
+  }
+  try:
+    joke_audio_artifacts_firestore.set_joke_audio_artifact(
+      artifact_key,
+      stage=_AUDIO_ARTIFACT_STAGE_CLIPS,
+      data={
+        "dialog_gcs_uri": result.dialog_gcs_uri,
+        "clip_gcs_uris": clip_uris,
+        "clip_timing": clip_timing,
+      },
+    )
+  except Exception as exc:  # pylint: disable=broad-except
+    logger.warn(f"Failed storing clips artifact {artifact_key}: {exc}")
+
+
+def _load_cached_lip_sync_artifact(
+    artifact_key: str) -> dict[str, PosableCharacterSequence] | None:
+  """Load cached lip-sync sequences, or None on any miss."""
+  try:
+    data = joke_audio_artifacts_firestore.get_joke_audio_artifact(
+      artifact_key,
+      stage=_AUDIO_ARTIFACT_STAGE_LIP_SYNC,
+    )
+    if not data:
+      return None
+    sequence_ids = data.get("sequence_ids") or {}
+    sequences: dict[str, PosableCharacterSequence] = {}
+    for name in _LIP_SYNC_SEGMENT_NAMES:
+      sequence = firestore.get_posable_character_sequence(
+        str(sequence_ids.get(name) or ""))
+      if sequence is None:
+        return None
+      sequences[name] = sequence
+  except Exception as exc:  # pylint: disable=broad-except
+    logger.warn(f"Ignoring unusable lip-sync artifact {artifact_key}: {exc}")
+    return None
+  return sequences
+
+
+def _store_lip_sync_artifact(
+  artifact_key: str,
+  *,
+  intro_sequence: PosableCharacterSequence,
+  setup_sequence: PosableCharacterSequence,
+  response_sequence: PosableCharacterSequence,
+  punchline_sequence: PosableCharacterSequence,
+) -> None:
+  try:
+    joke_audio_artifacts_firestore.set_joke_audio_artifact(
+      artifact_key,
+      stage=_AUDIO_ARTIFACT_STAGE_LIP_SYNC,
+      data={
+        "sequence_ids": {
+          "intro": intro_sequence.key,
+          "setup": setup_sequence.key,
+          "response": response_sequence.key,
+          "punchline": punchline_sequence.key,
+        },
+      },
+    )
+  except Exception as exc:  # pylint: disable=broad-except
+    logger.warn(f"Failed storing lip-sync artifact {artifact_key}: {exc}")
+
+
 def _resolve_clip_transcripts(
   dialog_turns: list[audio_client.DialogTurn],
   joke: models.PunnyJoke,
@@ -1072,7 +1386,7 @@ def _build_lipsync_sequence(
   if timing:
     detected_events = mouth_event_detection.detect_mouth_events(
       b"",
-      mode="timing",
+      mode=_LIP_SYNC_DETECTION_MODE,
       transcript=transcript,
       timing=timing,
     )
@@ -1183,7 +1497,7 @@ def _append_head_transform_event(
 
 
 def _decode_wav_to_peak_envelope(
-  audio_bytes: bytes, ) -> tuple[list[float], float, float]:
+  audio_bytes: bytes, ) -> tuple[np.ndarray, float, float]:
   """Decode WAV bytes and return a smoothed per-frame amplitude envelope."""
   try:
     params, frames = audio_operations.read_wav_bytes(audio_bytes)
@@ -1203,33 +1517,19 @@ def _decode_wav_to_peak_envelope(
     raise ValueError(
       f"Unsupported WAV sample width for laugh analysis: {sampwidth}")
 
-  samples = array.array("h")
-  samples.frombytes(frames)
-  if sys.byteorder == "big":
-    samples.byteswap()
-  if not samples:
+  samples = audio_kernels.pcm16_samples(frames)
+  if not samples.size:
     raise ValueError("WAV audio has no samples")
 
   frame_hop_samples = max(1, int(round(framerate * _LAUGH_ENVELOPE_HOP_SEC)))
   frame_hop_sec = frame_hop_samples / framerate
   samples_per_frame = max(1, frame_hop_samples * max(1, nchannels))
-  total_samples = len(samples)
-
-  envelope: list[float] = []
-  frame_start = 0
-  while frame_start < total_samples:
-    frame_end = min(total_samples, frame_start + samples_per_frame)
-    peak = 0.0
-    for sample_index in range(frame_start, frame_end):
-      value = abs(int(samples[sample_index]))
-      peak = max(peak, value)
-    envelope.append(peak)
-    frame_start = frame_end
-
-  if not envelope:
+  envelope = audio_kernels.block_peaks(samples, samples_per_frame)
+
+  if not envelope.size:
     raise ValueError("Could not compute laugh envelope from WAV audio")
 
-  smoothed_envelope = _moving_average(
+  smoothed_envelope = audio_kernels.moving_average(
     envelope,
     window_frames=_LAUGH_SMOOTH_WINDOW_FRAMES,
   )
@@ -1237,45 +1537,47 @@ def _decode_wav_to_peak_envelope(
   return smoothed_envelope, frame_hop_sec, duration_sec
 
 
-def _find_active_window(envelope: list[float]) -> tuple[int, int, float]:
+def _find_active_window(envelope: np.ndarray) -> tuple[int, int, float]:
   """Find the start/end frame indices containing non-silent laugh activity."""
-  if not envelope:
+  if not envelope.size:
     return 0, -1, 0.0
 
-  noise_floor = _percentile(envelope, _LAUGH_ACTIVE_NOISE_PERCENTILE)
-  peak_level = _percentile(envelope, _LAUGH_ACTIVE_PEAK_PERCENTILE)
+  noise_floor = audio_kernels.percentile(envelope,
+                                         _LAUGH_ACTIVE_NOISE_PERCENTILE)
+  peak_level = audio_kernels.percentile(envelope,
+                                        _LAUGH_ACTIVE_PEAK_PERCENTILE)
   dynamic_range = max(1.0, peak_level - noise_floor)
   threshold = max(
     noise_floor + (dynamic_range * _LAUGH_ACTIVE_THRESHOLD_FRACTION),
     noise_floor + _LAUGH_ACTIVE_MIN_DELTA,
   )
 
-  active_indices = [
-    idx for idx, value in enumerate(envelope) if value >= threshold
-  ]
-  if not active_indices:
+  active_indices = np.flatnonzero(envelope >= threshold)
+  if not active_indices.size:
     return 0, -1, threshold
-  return min(active_indices), max(active_indices), threshold
+  return int(active_indices[0]), int(active_indices[-1]), threshold
 
 
 def _detect_laugh_peak_times(
   *,
-  envelope: list[float],
+  envelope: np.ndarray,
   frame_hop_sec: float,
   active_start_idx: int,
   active_end_idx: int,
   duration_sec: float,
 ) -> list[float]:
   """Detect dominant laugh peaks across changing amplitude levels."""
-  if not envelope or active_end_idx < active_start_idx:
+  if not envelope.size or active_end_idx < active_start_idx:
     return []
 
   active_values = envelope[active_start_idx:active_end_idx + 1]
-  if not active_values:
+  if not active_values.size:
     return []
 
-  noise_floor = _percentile(active_values, _LAUGH_ACTIVE_NOISE_PERCENTILE)
-  peak_level = _percentile(active_values, _LAUGH_ACTIVE_PEAK_PERCENTILE)
+  noise_floor = audio_kernels.percentile(active_values,
+                                         _LAUGH_ACTIVE_NOISE_PERCENTILE)
+  peak_level = audio_kernels.percentile(active_values,
+                                        _LAUGH_ACTIVE_PEAK_PERCENTILE)
   dynamic_range = max(1.0, peak_level - noise_floor)
   min_prominence = max(
     dynamic_range * _LAUGH_MIN_PROMINENCE_FRACTION,
@@ -1284,22 +1586,14 @@ def _detect_laugh_peak_times(
   valley_window_frames = max(
     1, int(round(_LAUGH_LOCAL_VALLEY_WINDOW_SEC / max(frame_hop_sec, 1e-6))))
 
-  peak_candidates: list[int] = []
-  for idx in range(active_start_idx, active_end_idx + 1):
-    current = envelope[idx]
-    previous = envelope[idx - 1] if idx > 0 else current
-    following = envelope[idx + 1] if idx < (len(envelope) - 1) else current
-    is_local_peak = current >= previous and current > following
-    if not is_local_peak or current <= noise_floor:
-      continue
-
-    left_start = max(active_start_idx, idx - valley_window_frames)
-    right_end = min(active_end_idx, idx + valley_window_frames)
-    left_valley = min(v for v in envelope[left_start:idx + 1])
-    right_valley = min(v for v in envelope[idx:right_end + 1])
-    prominence = current - max(left_valley, right_valley)
-    if prominence >= min_prominence:
-      peak_candidates.append(idx)
+  peak_candidates = audio_kernels.find_prominent_peaks(
+    envelope,
+    start_idx=active_start_idx,
+    end_idx=active_end_idx,
+    min_value_exclusive=noise_floor,
+    valley_window_frames=valley_window_frames,
+    min_prominence=min_prominence,
+  ).tolist()
 
   min_spacing_frames = max(
     1, int(round(_LAUGH_MIN_PEAK_SPACING_SEC / max(frame_hop_sec, 1e-6))))
@@ -1310,11 +1604,7 @@ def _detect_laugh_peak_times(
   )
 
   if not peak_indices:
-    strongest_idx = max(
-      range(active_start_idx, active_end_idx + 1),
-      key=lambda idx: envelope[idx],
-    )
-    peak_indices = [int(strongest_idx)]
+    peak_indices = [active_start_idx + int(np.argmax(active_values))]
 
   return [
     _to_time(idx, frame_hop_sec, duration_sec) for idx in sorted(peak_indices)
@@ -1324,7 +1614,7 @@ def _detect_laugh_peak_times(
 def _coalesce_peaks_with_min_spacing(
   peak_indices: list[int],
   *,
-  envelope: list[float],
+  envelope: np.ndarray,
   min_spacing_frames: int,
 ) -> list[int]:
   """Keep strongest peaks while enforcing minimum spacing in frames."""
@@ -1333,12 +1623,16 @@ def _coalesce_peaks_with_min_spacing(
   spacing = max(1, int(min_spacing_frames))
   unique_peaks = sorted(set(int(idx) for idx in peak_indices))
   by_strength = sorted(unique_peaks, key=lambda idx: (-envelope[idx], idx))
+  # Kept sorted, so only the nearest selected peak on each side can conflict.
   selected: list[int] = []
   for candidate in by_strength:
-    if all(
-        abs(int(candidate) - int(chosen)) >= spacing for chosen in selected):
-      selected.append(int(candidate))
-  return sorted(selected)
+    position = bisect.bisect_left(selected, candidate)
+    if position > 0 and candidate - selected[position - 1] < spacing:
+      continue
+    if position < len(selected) and selected[position] - candidate < spacing:
+      continue
+    selected.insert(position, candidate)
+  return selected
 
 
 def _to_time(
@@ -1351,39 +1645,6 @@ def _to_time(
   return min(duration_sec, max(0.0, center_time))
 
 
-def _moving_average(values: list[float], *, window_frames: int) -> list[float]:
-  """Return centered moving-average smoothed values."""
-  if not values:
-    return []
-  if window_frames <= 1:
-    return list(values)
-  half_window = max(0, int(window_frames) // 2)
-  smoothed: list[float] = []
-  for idx in range(len(values)):
-    start = max(0, idx - half_window)
-    end = min(len(values), idx + half_window + 1)
-    subset = values[start:end]
-    smoothed.append(sum(subset) / len(subset))
-  return smoothed
-
-
-def _percentile(values: list[float], percentile: float) -> float:
-  """Compute percentile using linear interpolation between nearest ranks."""
-  if not values:
-    return 0.0
-  ordered = sorted(values)
-  if len(ordered) == 1:
-    return ordered[0]
-  p = max(0.0, min(100.0, percentile))
-  position = (p / 100.0) * (len(ordered) - 1)
-  lower_index = int(position)
-  upper_index = min(len(ordered) - 1, lower_index + 1)
-  lower_value = ordered[lower_index]
-  upper_value = ordered[upper_index]
-  weight = position - lower_index
-  return (lower_value * (1.0 - weight)) + (upper_value * weight)
-
-
 def _resolve_sound_event_end_time_sec(
   *,
   audio_gcs_uri: str,
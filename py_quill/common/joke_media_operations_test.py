@@ -45,6 +45,19 @@ def mock_joke_videos_firestore_fixture(monkeypatch):
   return mock_joke_videos_firestore
 
 
+@pytest.fixture(name='mock_audio_artifacts_firestore', autouse=True)
+def mock_audio_artifacts_firestore_fixture(monkeypatch):
+  """Fixture that mocks the audio artifact cache index."""
+  mock_audio_artifacts_firestore = Mock()
+  mock_audio_artifacts_firestore.get_joke_audio_artifact.return_value = None
+  monkeypatch.setattr(
+    joke_media_operations,
+    'joke_audio_artifacts_firestore',
+    mock_audio_artifacts_firestore,
+  )
+  return mock_audio_artifacts_firestore
+
+
 @pytest.fixture(name='mock_cloud_storage')
 def mock_cloud_storage_fixture(monkeypatch):
   """Fixture that mocks the cloud_storage service."""
@@ -812,9 +825,246 @@ def test_get_joke_lip_sync_media_bypasses_cache_when_disabled(monkeypatch):
     audio_model=None,
     allow_partial=False,
     transcripts=transcripts,
+    use_artifact_cache=False,
   )
 
 
+def _four_clip_dialog_wav_and_timing() -> tuple[bytes, audio_timing.TtsTiming]:
+  """Build a dialog WAV with four voiced clips separated by 1s of silence."""
+  rate = 24000
+  silence = array.array("h", [0] * rate).tobytes()
+  clips = [
+    array.array("h", [amplitude] * int(rate * 0.2)).tobytes()
+    for amplitude in (500, 1000, 2000, 3000)
+  ]
+  buffer = io.BytesIO()
+  with wave.open(buffer, "wb") as wf:
+    # pylint: disable=no-member
+    wf.setnchannels(1)
+    wf.setsampwidth(2)
+    wf.setframerate(rate)
+    wf.writeframes(silence.join(clips))
+    # pylint: enable=no-member
+  words = ["intro", "setup", "response", "punchline"]
+  timing = audio_timing.TtsTiming(
+    voice_segments=[
+      audio_timing.VoiceSegment(
+        voice_id="v1",
+        start_time_seconds=index * 1.2,
+        end_time_seconds=index * 1.2 + 0.2,
+        word_start_index=index,
+        word_end_index=index + 1,
+        dialogue_input_index=index,
+      ) for index in range(4)
+    ],
+    normalized_alignment=[
+      audio_timing.WordTiming(
+        word,
+        index * 1.2,
+        index * 1.2 + 0.2,
+        char_timings=[
+          audio_timing.CharTiming(word[0], index * 1.2, index * 1.2 + 0.1)
+        ],
+      ) for index, word in enumerate(words)
+    ],
+  )
+  return buffer.getvalue(), timing
+
+
+def test_generate_joke_audio_returns_cached_clips_artifact(
+  monkeypatch,
+  mock_cloud_storage,
+  mock_audio_artifacts_firestore,
+):
+  word = audio_timing.WordTiming(
+    "setup",
+    0.0,
+    0.2,
+    char_timings=[audio_timing.CharTiming("s", 0.0, 0.1)],
+  )
+  mock_audio_artifacts_firestore.get_joke_audio_artifact.side_effect = (
+    lambda key, *, stage: {
+      "stage": "clips",
+      "dialog_gcs_uri": "gs://audio/dialog.wav",
+      "clip_gcs_uris": {
+        "intro": "gs://audio/artifacts/intro.wav",
+        "setup": "gs://audio/artifacts/setup.wav",
+        "response": "gs://audio/artifacts/response.wav",
+        "punchline": "gs://audio/artifacts/punchline.wav",
+      },
+      "clip_timing": {
+        "setup": [word.to_dict()],
+      },
+    } if stage == "clips" else None)
+  monkeypatch.setattr(
+    joke_media_operations.audio_client,
+    "get_audio_client",
+    Mock(side_effect=AssertionError("TTS should not run on a cache hit")),
+  )
+
+  result = joke_media_operations.generate_joke_audio(
+    models.PunnyJoke(key="joke-1", setup_text="Setup", punchline_text="Punch"),
+    use_artifact_cache=True,
+  )
+
+  assert result.dialog_gcs_uri == "gs://audio/dialog.wav"
+  assert result.setup_gcs_uri == "gs://audio/artifacts/setup.wav"
+  assert result.punchline_gcs_uri == "gs://audio/artifacts/punchline.wav"
+  assert result.clip_timing is not None
+  assert result.clip_timing.setup == [word]
+  assert result.clip_timing.intro == []
+  assert result.generation_metadata.generations == []
+  assert result.artifact_key
+  mock_cloud_storage.upload_bytes_to_gcs.assert_not_called()
+  mock_audio_artifacts_firestore.set_joke_audio_artifact.assert_not_called()
+
+
+def test_generate_joke_audio_reuses_cached_dialog_and_stores_clips(
+  monkeypatch,
+  mock_cloud_storage,
+  mock_audio_artifacts_firestore,
+):
+  dialog_wav_bytes, timing = _four_clip_dialog_wav_and_timing()
+  mock_audio_artifacts_firestore.get_joke_audio_artifact.side_effect = (
+    lambda key, *, stage: {
+      "stage": "dialog",
+      "dialog_gcs_uri": "gs://audio/dialog.wav",
+      "tts_timing": timing.to_dict(),
+    } if stage == "dialog" else None)
+  monkeypatch.setattr(
+    joke_media_operations.audio_client,
+    "get_audio_client",
+    Mock(side_effect=AssertionError("TTS should not run on a cache hit")),
+  )
+  mock_cloud_storage.download_bytes_from_gcs.return_value = dialog_wav_bytes
+  mock_cloud_storage.get_audio_artifact_gcs_uri.side_effect = (
+    lambda key, name, ext: f"gs://audio/artifacts/{key}/{name}.{ext}")
+  mock_cloud_storage.upload_bytes_to_gcs.side_effect = (
+    lambda _content, gcs_uri, content_type: gcs_uri)
+
+  result = joke_media_operations.generate_joke_audio(
+    models.PunnyJoke(key="joke-1", setup_text="Setup", punchline_text="Punch"),
+    use_artifact_cache=True,
+  )
+
+  assert result.dialog_gcs_uri == "gs://audio/dialog.wav"
+  assert result.artifact_key
+  assert result.setup_gcs_uri == (
+    f"gs://audio/artifacts/{result.artifact_key}/setup.wav")
+  assert result.generation_metadata.generations == []
+  mock_cloud_storage.get_audio_gcs_uri.assert_not_called()
+  set_calls = (
+    mock_audio_artifacts_firestore.set_joke_audio_artifact.call_args_list)
+  assert len(set_calls) == 1
+  assert set_calls[0].args == (result.artifact_key, )
+  assert set_calls[0].kwargs["stage"] == "clips"
+  stored = set_calls[0].kwargs["data"]
+  assert stored["clip_gcs_uris"]["punchline"] == result.punchline_gcs_uri
+  assert [w["word"] for w in stored["clip_timing"]["response"]] == ["response"]
+
+
+def test_generate_joke_audio_artifact_key_tracks_turn_content(
+  monkeypatch,
+  mock_cloud_storage,
+  mock_audio_artifacts_firestore,
+):
+  del mock_cloud_storage
+  monkeypatch.setattr(
+    joke_media_operations.audio_client,
+    "get_audio_client",
+    Mock(side_effect=RuntimeError("stop after cache lookup")),
+  )
+  joke = models.PunnyJoke(key="joke-1", setup_text="Setup", punchline_text="P")
+
+  def _looked_up_keys(joke_to_render: models.PunnyJoke) -> list[str]:
+    mock_audio_artifacts_firestore.get_joke_audio_artifact.reset_mock()
+    with pytest.raises(RuntimeError):
+      joke_media_operations.generate_joke_audio(joke_to_render,
+                                                use_artifact_cache=True)
+    return [
+      call.args[0] for call in
+      mock_audio_artifacts_firestore.get_joke_audio_artifact.call_args_list
+    ]
+
+  first_keys = _looked_up_keys(joke)
+  same_keys = _looked_up_keys(
+    models.PunnyJoke(key="joke-2", setup_text="Setup", punchline_text="P"))
+  changed_keys = _looked_up_keys(
+    models.PunnyJoke(key="joke-1", setup_text="Other", punchline_text="P"))
+
+  assert len(first_keys) == 2
+  assert first_keys == same_keys
+  assert not set(first_keys) & set(changed_keys)
+
+
+def test_generate_joke_lip_sync_sequences_reuses_cached_lip_sync_artifact(
+  monkeypatch,
+  mock_firestore,
+  mock_audio_artifacts_firestore,
+):
+  transcripts = joke_media_operations.JokeAudioTranscripts(
+    intro="intro",
+    setup="setup",
+    response="response",
+    punchline="punchline",
+  )
+  audio_result = joke_media_operations.JokeAudioResult(
+    dialog_gcs_uri="gs://audio/dialog.wav",
+    intro_gcs_uri="gs://audio/intro.wav",
+    setup_gcs_uri="gs://audio/setup.wav",
+    response_gcs_uri="gs://audio/response.wav",
+    punchline_gcs_uri="gs://audio/punchline.wav",
+    generation_metadata=models.GenerationMetadata(),
+    clip_timing=joke_media_operations.JokeAudioTiming(intro=[],
+                                                      setup=[],
+                                                      response=[],
+                                                      punchline=[]),
+    artifact_key="clips-key",
+  )
+  generate_audio_mock = Mock(return_value=audio_result)
+  monkeypatch.setattr(joke_media_operations, "generate_joke_audio",
+                      generate_audio_mock)
+  monkeypatch.setattr(
+    joke_media_operations,
+    "_build_lipsync_sequence",
+    Mock(side_effect=AssertionError("sequences should come from the cache")),
+  )
+  mock_audio_artifacts_firestore.get_joke_audio_artifact.return_value = {
+    "stage": "lip_sync",
+    "sequence_ids": {
+      "intro": "seq-intro",
+      "setup": "seq-setup",
+      "response": "seq-response",
+      "punchline": "seq-punchline",
+    },
+  }
+  mock_firestore.get_posable_character_sequence.side_effect = (
+    lambda sequence_id: joke_media_operations.PosableCharacterSequence(
+      key=sequence_id,
+      transcript=sequence_id,
+    ))
+
+  result = joke_media_operations._generate_joke_lip_sync_sequences(  # pylint: disable=protected-access
+    joke=models.PunnyJoke(key="joke-9", setup_text="S", punchline_text="P"),
+    temp_output=False,
+    script_template=[],
+    audio_model=None,
+    allow_partial=False,
+    transcripts=transcripts,
+    use_artifact_cache=True,
+  )
+
+  assert generate_audio_mock.call_args.kwargs["use_artifact_cache"] is True
+  assert result.setup_sequence is not None
+  assert result.setup_sequence.key == "seq-setup"
+  assert result.punchline_audio_gcs_uri == "gs://audio/punchline.wav"
+  mock_firestore.upsert_posable_character_sequence.assert_not_called()
+  mock_audio_artifacts_firestore.set_joke_audio_artifact.assert_not_called()
+  mock_firestore.update_punny_joke.assert_called_once()
+  assert mock_firestore.update_punny_joke.call_args.kwargs["update_metadata"][
+    "animation_lip_sync_intro"] == "seq-intro"
+
+
 def test_generate_joke_video_builds_timeline(
   monkeypatch,
   mock_cloud_storage,
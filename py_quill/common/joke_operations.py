@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import datetime
 import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from io import BytesIO
 from typing import Any, Literal, cast
 from zoneinfo import ZoneInfo
@@ -11,10 +13,12 @@ from zoneinfo import ZoneInfo
 from common import image_generation, models
 from firebase_functions import logger
 from functions.prompts import joke_operation_prompts
+from google.cloud.firestore import SERVER_TIMESTAMP, DocumentReference
 from google.cloud.firestore_v1.field_path import FieldPath
 from google.cloud.firestore_v1.vector import Vector
 from PIL import Image
-from services import cloud_storage, firestore, image_client, image_editor
+from services import (cloud_storage, firestore, image_client, image_editor,
+                      search)
 
 _IMAGE_UPSCALE_FACTOR = "x2"
 _HIGH_QUALITY_UPSCALE_FACTOR = "x2"
@@ -24,6 +28,19 @@ _MIME_TYPE_CONFIG: dict[str, tuple[str, str]] = {
   "image/jpeg": ("JPEG", "jpg"),
 }
 _BATCHES_COLLECTION = "joke_schedule_batches"
+# joke_search sync: jokes per get_all, concurrent get_alls, and write attempts.
+_SEARCH_SYNC_CHUNK_SIZE = 100
+_SEARCH_SYNC_MAX_IN_FLIGHT = 4
+_SEARCH_SYNC_MAX_WRITE_ATTEMPTS = 5
+_SEARCH_SYNC_FIELDS = [
+  "state",
+  "is_public",
+  "public_timestamp",
+  "num_saved_users_fraction",
+  "num_shared_users_fraction",
+  "popularity_score",
+  "book_id",
+]
 _DAILY_SCHEDULE_ID = "daily_jokes"
 _LA_TIMEZONE = ZoneInfo("America/Los_Angeles")
 _ADMIN_MUTABLE_STATES = {
@@ -902,11 +919,26 @@ def sync_joke_to_search_collection(
   search_doc = search_doc_ref.get()
   search_data = search_doc.to_dict() or {} if search_doc.exists else {}
 
+  update_payload = _build_search_sync_payload(joke, search_data, new_embedding)
+  if update_payload:
+    logger.info(
+      f"Syncing joke to joke_search collection: {joke_id} with payload keys {update_payload.keys()}"
+    )
+    _ = search_doc_ref.set(update_payload, merge=True)
+
+
+def _build_search_sync_payload(
+  joke: models.PunnyJoke,
+  search_data: dict[str, Any],
+  new_embedding: Vector | None,
+) -> dict[str, object]:
+  """Return the joke_search fields that are out of date for a joke."""
   update_payload: dict[str, object] = {}
 
   # 1. Sync embedding
   if new_embedding:
     update_payload["text_embedding"] = new_embedding
+    update_payload[search.EMBEDDING_MODEL_FIELD] = search.EMBEDDING_MODEL
 
   # 2. Sync state
   if search_data.get("state") != joke.state.value:
@@ -941,10 +973,136 @@ def sync_joke_to_search_collection(
     update_payload["book_id"] = joke.book_id
 
   if update_payload:
-    logger.info(
-      f"Syncing joke to joke_search collection: {joke_id} with payload keys {update_payload.keys()}"
-    )
-    _ = search_doc_ref.set(update_payload, merge=True)
+    # Lets local search indexes pick up this change incrementally.
+    update_payload[search.INDEX_UPDATED_AT_FIELD] = SERVER_TIMESTAMP
+  return update_payload
+
+
+def diff_jokes_against_search_collection(
+  jokes: list[models.PunnyJoke],
+) -> list[tuple[DocumentReference, dict[str, object]]]:
+  """Diff jokes against their joke_search docs, fetched with one get_all.
+
+  Only the synced fields are read (not the embedding).
+
+  Returns:
+    (joke_search doc ref, update payload) pairs for docs that are out of date.
+  """
+  client = firestore.db()
+  search_collection = client.collection("joke_search")
+  jokes_by_id = {joke.key: joke for joke in jokes if joke.key}
+  refs = [search_collection.document(joke_id) for joke_id in jokes_by_id]
+  if not refs:
+    return []
+
+  search_data_by_id: dict[str, dict[str, Any]] = {}
+  for snapshot in client.get_all(refs, field_paths=_SEARCH_SYNC_FIELDS):
+    if snapshot.exists:
+      search_data_by_id[snapshot.id] = snapshot.to_dict() or {}
+
+  updates: list[tuple[DocumentReference, dict[str, object]]] = []
+  for ref, (joke_id, joke) in zip(refs, jokes_by_id.items()):
+    payload = _build_search_sync_payload(joke,
+                                         search_data_by_id.get(joke_id, {}),
+                                         new_embedding=None)
+    if payload:
+      updates.append((ref, payload))
+  return updates
+
+
+class JokeSearchSyncPipeline:
+  """Batched sync of many jokes to the joke_search collection.
+
+  Jokes passed to `add` are buffered into chunks. Each chunk is fetched with a
+  single `get_all` and diffed on a worker thread (at most `max_in_flight`
+  chunks at a time), and the resulting writes are queued on a `BulkWriter`, so
+  the caller can keep streaming jokes while earlier chunks are in flight.
+
+  Use as a context manager, or call `close` to flush all pending work. Once
+  `close` returns, `docs_updated` counts the writes that succeeded and
+  `failures` counts jokes whose chunk or write failed.
+  """
+
+  def __init__(
+    self,
+    chunk_size: int = _SEARCH_SYNC_CHUNK_SIZE,
+    max_in_flight: int = _SEARCH_SYNC_MAX_IN_FLIGHT,
+  ):
+    self.docs_checked = 0
+    self.docs_updated = 0
+    self.failures = 0
+    self._chunk_size = chunk_size
+    self._max_in_flight = max_in_flight
+    self._buffer: list[models.PunnyJoke] = []
+    self._pending: list[Future[list[tuple[DocumentReference,
+                                          dict[str, object]]]]] = []
+    self._chunk_sizes: dict[Future, int] = {}
+    self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+    self._writer = firestore.db().bulk_writer()
+    self._writer.on_write_error(self._on_write_error)
+    # Counters are also updated from the BulkWriter's callback thread.
+    self._counts_lock = threading.Lock()
+
+  def __enter__(self) -> JokeSearchSyncPipeline:
+    return self
+
+  def __exit__(self, *_exc_info) -> None:
+    self.close()
+
+  def add(self, joke: models.PunnyJoke) -> None:
+    """Queue a joke for syncing."""
+    if not joke.key:
+      return
+    self._buffer.append(joke)
+    if len(self._buffer) >= self._chunk_size:
+      self._submit_buffer()
+
+  def close(self) -> None:
+    """Sync all buffered jokes and wait for every write to finish."""
+    if self._buffer:
+      self._submit_buffer()
+    self._drain(wait_for=len(self._pending))
+    self._executor.shutdown(wait=True)
+    self._writer.close()
+
+  def _submit_buffer(self) -> None:
+    chunk, self._buffer = self._buffer, []
+    if len(self._pending) >= self._max_in_flight:
+      self._drain(wait_for=len(self._pending) - self._max_in_flight + 1)
+    future = self._executor.submit(diff_jokes_against_search_collection, chunk)
+    self._chunk_sizes[future] = len(chunk)
+    self._pending.append(future)
+
+  def _drain(self, wait_for: int) -> None:
+    """Queue writes from completed chunks, waiting for at least `wait_for`."""
+    completed = 0
+    while self._pending and (completed < wait_for or self._pending[0].done()):
+      future = self._pending.pop(0)
+      chunk_size = self._chunk_sizes.pop(future)
+      completed += 1
+      try:
+        updates = future.result()
+      except Exception as sync_error:  # pylint: disable=broad-except
+        logger.warn(f"Failed to sync {chunk_size} jokes to search collection: "
+                    f"{sync_error}")
+        with self._counts_lock:
+          self.failures += chunk_size
+        continue
+      self.docs_checked += chunk_size
+      # Counted before queueing so a failed write never drives it negative.
+      with self._counts_lock:
+        self.docs_updated += len(updates)
+      for ref, payload in updates:
+        self._writer.set(ref, payload, merge=True)
+
+  def _on_write_error(self, error, _writer) -> bool:
+    if error.attempts < _SEARCH_SYNC_MAX_WRITE_ATTEMPTS:
+      return True
+    logger.warn(f"Failed to write joke_search doc: {error.message}")
+    with self._counts_lock:
+      self.failures += 1
+      self.docs_updated -= 1
+    return False
 
 
 def to_response_joke(joke: models.PunnyJoke) -> dict[str, object]:
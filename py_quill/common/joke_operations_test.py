@@ -8,6 +8,7 @@ from common import joke_operations, models, utils
 from google.api_core import datetime_helpers
 from google.cloud.firestore_v1.vector import Vector
 from PIL import Image
+from services import search
 
 
 @pytest.fixture(name='mock_firestore')
@@ -878,6 +879,7 @@ class TestSyncJokeToSearchCollection:
     assert synced["num_saved_users_fraction"] == 0.5
     assert synced["num_shared_users_fraction"] == 0.3
     assert synced["popularity_score"] == 64.0
+    assert search.INDEX_UPDATED_AT_FIELD in synced
 
   def test_creates_new_search_doc_with_partial_fields(self,
                                                       mock_search_collection,
@@ -1270,6 +1272,170 @@ class TestSyncJokeToSearchCollection:
     assert synced["popularity_score"] is None
 
 
+
+class _FakeSearchSyncClient:
+  """Minimal client supporting get_all and bulk_writer for search sync tests."""
+
+  def __init__(self, search_docs):
+    self.search_docs = search_docs
+    self.get_all_calls = []
+    self.writes = []
+    self.writer_closed = False
+    # Doc ids whose write exhausts its BulkWriter retries.
+    self.failing_write_ids = set()
+    self.write_error_results = []
+
+  def collection(self, name):
+    assert name == "joke_search"
+    collection = MagicMock()
+    collection.document.side_effect = lambda doc_id: MagicMock(id=doc_id)
+    return collection
+
+  def get_all(self, refs, field_paths=None):
+    self.get_all_calls.append(([ref.id for ref in refs], field_paths))
+    for ref in refs:
+      data = self.search_docs.get(ref.id)
+      yield MagicMock(id=ref.id,
+                      exists=data is not None,
+                      to_dict=MagicMock(return_value=data))
+
+  def bulk_writer(self):
+    client = self
+    writer = MagicMock()
+    callbacks = []
+    writer.on_write_error.side_effect = callbacks.append
+
+    def _set(ref, data, merge=False):
+      client.writes.append((ref.id, data, merge))
+      if ref.id in client.failing_write_ids:
+        for attempts in range(
+            1, joke_operations._SEARCH_SYNC_MAX_WRITE_ATTEMPTS + 1):
+          error = MagicMock(attempts=attempts, message="unavailable")
+          client.write_error_results.append(callbacks[0](error, writer))
+
+    writer.set.side_effect = _set
+
+    def _close():
+      client.writer_closed = True
+
+    writer.close.side_effect = _close
+    return writer
+
+
+def _synced_search_doc(joke: models.PunnyJoke) -> dict:
+  return {
+    "state": joke.state.value,
+    "is_public": joke.is_public,
+    "public_timestamp": joke.public_timestamp,
+    "num_saved_users_fraction": joke.num_saved_users_fraction,
+    "num_shared_users_fraction": joke.num_shared_users_fraction,
+    "popularity_score": joke.popularity_score,
+    "book_id": joke.book_id,
+  }
+
+
+def test_diff_jokes_against_search_collection_uses_single_masked_get_all(
+    mock_firestore):
+  up_to_date = models.PunnyJoke(key="j1",
+                                setup_text="s",
+                                punchline_text="p",
+                                state=models.JokeState.PUBLISHED)
+  stale = models.PunnyJoke(key="j2",
+                           setup_text="s",
+                           punchline_text="p",
+                           state=models.JokeState.PUBLISHED,
+                           popularity_score=3.0)
+  missing = models.PunnyJoke(key="j3", setup_text="s", punchline_text="p")
+  client = _FakeSearchSyncClient({
+    "j1": _synced_search_doc(up_to_date),
+    "j2": {
+      **_synced_search_doc(stale), "popularity_score": 1.0
+    },
+  })
+  mock_firestore.db = lambda: client
+
+  updates = joke_operations.diff_jokes_against_search_collection(
+    [up_to_date, stale, missing])
+
+  assert len(client.get_all_calls) == 1
+  doc_ids, field_paths = client.get_all_calls[0]
+  assert doc_ids == ["j1", "j2", "j3"]
+  assert "text_embedding" not in field_paths
+  assert [ref.id for ref, _ in updates] == ["j2", "j3"]
+  stale_payload = updates[0][1]
+  assert stale_payload["popularity_score"] == 3.0
+  assert "state" not in stale_payload
+  assert search.INDEX_UPDATED_AT_FIELD in stale_payload
+  assert updates[1][1]["book_id"] is None
+
+
+def test_joke_search_sync_pipeline_chunks_and_writes(mock_firestore):
+  jokes = [
+    models.PunnyJoke(key=f"j{i}",
+                     setup_text="s",
+                     punchline_text="p",
+                     state=models.JokeState.PUBLISHED,
+                     popularity_score=float(i)) for i in range(5)
+  ]
+  client = _FakeSearchSyncClient({
+    "j0": _synced_search_doc(jokes[0]),
+    "j1": _synced_search_doc(jokes[1]),
+  })
+  mock_firestore.db = lambda: client
+
+  with joke_operations.JokeSearchSyncPipeline(chunk_size=2,
+                                              max_in_flight=1) as pipeline:
+    for joke in jokes:
+      pipeline.add(joke)
+
+  assert [ids for ids, _ in client.get_all_calls] == [["j0", "j1"],
+                                                      ["j2", "j3"], ["j4"]]
+  assert sorted(doc_id for doc_id, _, _ in client.writes) == ["j2", "j3", "j4"]
+  assert all(merge for _, _, merge in client.writes)
+  assert client.writer_closed
+  assert pipeline.docs_checked == 5
+  assert pipeline.docs_updated == 3
+  assert pipeline.failures == 0
+
+
+def test_joke_search_sync_pipeline_excludes_failed_writes(mock_firestore):
+  jokes = [
+    models.PunnyJoke(key=f"j{i}", setup_text="s", punchline_text="p")
+    for i in range(3)
+  ]
+  client = _FakeSearchSyncClient({})
+  client.failing_write_ids = {"j1"}
+  mock_firestore.db = lambda: client
+
+  with joke_operations.JokeSearchSyncPipeline(chunk_size=3) as pipeline:
+    for joke in jokes:
+      pipeline.add(joke)
+
+  # Retried until the last attempt, then given up.
+  assert client.write_error_results[-1] is False
+  assert all(client.write_error_results[:-1])
+  assert len(client.writes) == 3
+  assert pipeline.docs_updated == 2
+  assert pipeline.failures == 1
+
+
+def test_joke_search_sync_pipeline_counts_failed_chunks(monkeypatch,
+                                                        mock_firestore):
+  client = _FakeSearchSyncClient({})
+  mock_firestore.db = lambda: client
+  monkeypatch.setattr(joke_operations, "diff_jokes_against_search_collection",
+                      MagicMock(side_effect=Exception("boom")))
+
+  with joke_operations.JokeSearchSyncPipeline(chunk_size=2) as pipeline:
+    for i in range(3):
+      pipeline.add(
+        models.PunnyJoke(key=f"j{i}", setup_text="s", punchline_text="p"))
+
+  assert pipeline.failures == 3
+  assert pipeline.docs_checked == 0
+  assert not client.writes
+
+
 def test_to_response_joke_serializes_datetime():
   """to_response_joke should convert datetime objects to ISO strings."""
   now = datetime.datetime.now(datetime.timezone.utc)
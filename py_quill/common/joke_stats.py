@@ -0,0 +1,160 @@
+"""Joke user usage stats: per-user buckets and daily rollup histograms.
+
+Each `joke_users` doc is counted once in the daily histogram of every Los
+Angeles day it was active on, under its last days-used value and jokes-viewed
+bucket of that day. When a user comes back on a later day within
+`ROLLING_WINDOW_DAYS`, the new day also records the entry they had on their
+previous active day as superseded, so a window of days can count each user
+once, under their latest entry (see `window_users`).
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime
+from typing import Iterable, Mapping
+
+UsersMatrix = dict[str, dict[str, int]]
+"""Users count keyed by days used, then by jokes-viewed bucket."""
+
+UsersMatrixByDay = dict[str, UsersMatrix]
+"""Users matrices keyed by YYYYMMDD day ID."""
+
+ROLLING_WINDOW_DAYS = 7
+"""Days in the rolling users stats window."""
+
+_DAY_ID_FORMAT = "%Y%m%d"
+
+
+@dataclasses.dataclass
+class DailyRollup:
+  """Merged daily histograms for one Los Angeles day."""
+
+  users: UsersMatrix = dataclasses.field(default_factory=dict)
+  """Users active on the day, each under their last entry of the day."""
+
+  superseded_users: UsersMatrixByDay = dataclasses.field(default_factory=dict)
+  """By previous active day: the entries there of users who came back."""
+
+
+def to_int(value: object) -> int:
+  """Best-effort conversion to int with fallback to zero."""
+  try:
+    return int(value)
+  except Exception:
+    return 0
+
+
+def bucket_jokes_viewed(count: int) -> str:
+  """Bucket joke view counts into human-friendly ranges."""
+  safe_count = max(0, count)
+  if safe_count == 0:
+    return "0"
+  if safe_count < 10:
+    return "1-9"
+  if safe_count < 100:
+    lower = (safe_count // 10) * 10
+    upper = lower + 9
+    return f"{lower}-{upper}"
+
+  lower = max(100, (safe_count // 50) * 50)
+  upper = lower + 49
+  return f"{lower}-{upper}"
+
+
+def usage_rollup(
+  day_id: str,
+  client_num_days_used: object,
+  client_num_viewed: object,
+) -> dict[str, str]:
+  """Return the daily histogram entry a user's usage counts belong to."""
+  return {
+    "day": day_id,
+    "days_used": str(to_int(client_num_days_used)),
+    "jokes_viewed": bucket_jokes_viewed(to_int(client_num_viewed)),
+  }
+
+
+def days_between(earlier_day_id: str, later_day_id: str) -> int | None:
+  """Whole days from one YYYYMMDD day ID to another; None if malformed."""
+  try:
+    earlier = datetime.datetime.strptime(earlier_day_id, _DAY_ID_FORMAT)
+    later = datetime.datetime.strptime(later_day_id, _DAY_ID_FORMAT)
+  except (TypeError, ValueError):
+    return None
+  return (later - earlier).days
+
+
+def is_usage_rollup(value: object) -> bool:
+  """Whether `value` is an entry returned by `usage_rollup`."""
+  return (isinstance(value, dict) and all(
+    isinstance(value.get(key), str) and value.get(key)
+    for key in ("day", "days_used", "jokes_viewed")))
+
+
+def merge_matrices(matrices: Iterable[object]) -> UsersMatrix:
+  """Sum daily histograms, dropping malformed and non-positive cells."""
+  merged: UsersMatrix = {}
+  for matrix in matrices:
+    if not isinstance(matrix, dict):
+      continue
+    for days_used, buckets in matrix.items():
+      if not isinstance(buckets, dict):
+        continue
+      for bucket, count in buckets.items():
+        row = merged.setdefault(str(days_used), {})
+        row[str(bucket)] = row.get(str(bucket), 0) + to_int(count)
+
+  return {
+    days_used: {
+      bucket: count
+      for bucket, count in row.items() if count > 0
+    }
+    for days_used, row in merged.items() if any(c > 0 for c in row.values())
+  }
+
+
+def row_totals(matrix: UsersMatrix) -> dict[str, int]:
+  """Users count by days used."""
+  return {days_used: sum(row.values()) for days_used, row in matrix.items()}
+
+
+def column_totals(matrix: UsersMatrix) -> dict[str, int]:
+  """Users count by jokes-viewed bucket."""
+  totals: dict[str, int] = {}
+  for row in matrix.values():
+    for bucket, count in row.items():
+      totals[bucket] = totals.get(bucket, 0) + count
+  return totals
+
+
+def window_users(
+  rollups: Mapping[str, DailyRollup],
+  day_ids: Iterable[str],
+) -> UsersMatrix:
+  """Users active on any of `day_ids`, each once under their latest entry.
+
+  A user active on several days of the window is in each day's `users`; the
+  superseded entries recorded when they came back cancel all but the last.
+  """
+  window = set(day_ids)
+  matrices: list[object] = []
+  for day_id in window:
+    rollup = rollups.get(day_id)
+    if rollup is None:
+      continue
+    matrices.append(rollup.users)
+    for previous_day_id, matrix in rollup.superseded_users.items():
+      if previous_day_id in window:
+        matrices.append(_negated(matrix))
+  return merge_matrices(matrices)
+
+
+def _negated(matrix: UsersMatrix) -> UsersMatrix:
+  return {
+    days_used: {
+      bucket: -count
+      for bucket, count in row.items()
+    }
+    for days_used, row in matrix.items()
+  }
@@ -0,0 +1,132 @@
+"""Tests for the joke_stats module."""
+
+from common import joke_stats
+
+
+def test_bucket_jokes_viewed_ranges():
+  """Ensure bucket ranges match the defined spec."""
+  assert joke_stats.bucket_jokes_viewed(0) == "0"
+  assert joke_stats.bucket_jokes_viewed(1) == "1-9"
+  assert joke_stats.bucket_jokes_viewed(9) == "1-9"
+  assert joke_stats.bucket_jokes_viewed(10) == "10-19"
+  assert joke_stats.bucket_jokes_viewed(99) == "90-99"
+  assert joke_stats.bucket_jokes_viewed(100) == "100-149"
+  assert joke_stats.bucket_jokes_viewed(149) == "100-149"
+  assert joke_stats.bucket_jokes_viewed(150) == "150-199"
+
+
+def test_to_int_best_effort():
+  """to_int should gracefully handle non-numeric input."""
+  assert joke_stats.to_int(5) == 5
+  assert joke_stats.to_int("7") == 7
+  assert joke_stats.to_int(None) == 0
+  assert joke_stats.to_int("abc") == 0
+
+
+def test_usage_rollup():
+  rollup = joke_stats.usage_rollup("20240102", 3, 12)
+
+  assert rollup == {
+    "day": "20240102",
+    "days_used": "3",
+    "jokes_viewed": "10-19",
+  }
+  assert joke_stats.is_usage_rollup(rollup)
+  assert joke_stats.usage_rollup("20240102", None, None) == {
+    "day": "20240102",
+    "days_used": "0",
+    "jokes_viewed": "0",
+  }
+  assert not joke_stats.is_usage_rollup(None)
+  assert not joke_stats.is_usage_rollup({"day": "20240102"})
+
+
+def test_merge_matrices_and_totals():
+  merged = joke_stats.merge_matrices([
+    {
+      "3": {
+        "1-9": 2,
+        "10-19": 1
+      }
+    },
+    None,
+    {
+      "3": {
+        "1-9": 1,
+        "10-19": -1
+      },
+      "5": {
+        "0": 0
+      },
+      "bad": "row",
+    },
+  ])
+
+  assert merged == {"3": {"1-9": 3}}
+  assert joke_stats.row_totals({
+    "3": {
+      "1-9": 3,
+      "0": 1
+    },
+    "5": {
+      "0": 2
+    },
+  }) == {
+    "3": 4,
+    "5": 2
+  }
+  assert joke_stats.column_totals({
+    "3": {
+      "1-9": 3,
+      "0": 1
+    },
+    "5": {
+      "0": 2
+    },
+  }) == {
+    "1-9": 3,
+    "0": 3
+  }
+
+
+def test_days_between():
+  assert joke_stats.days_between("20240228", "20240301") == 2
+  assert joke_stats.days_between("20240301", "20240301") == 0
+  assert joke_stats.days_between("bad", "20240301") is None
+
+
+def test_window_users_counts_returning_users_once():
+  # Two users were active on Jan 1. On Jan 3, one of them came back, as did a
+  # user last active before the window.
+  jan3_users = {"2": {"10-19": 1}, "6": {"1-9": 1}}
+  rollups = {
+    "20240101":
+    joke_stats.DailyRollup(users={"1": {
+      "1-9": 2
+    }}),
+    "20240103":
+    joke_stats.DailyRollup(
+      users=jan3_users,
+      superseded_users={
+        "20240101": {
+          "1": {
+            "1-9": 1
+          }
+        },
+        "20231231": {
+          "5": {
+            "0": 1
+          }
+        },
+      },
+    ),
+  }
+
+  window = ["20240103", "20240102", "20240101"]
+  assert joke_stats.window_users(rollups, window) == {
+    "1": {
+      "1-9": 1
+    },
+    **jan3_users,
+  }
+  assert joke_stats.window_users(rollups, ["20240103"]) == jan3_users
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import dataclasses
 import datetime
+import functools
 import re
 from dataclasses import dataclass, field
 from enum import Enum
@@ -13,6 +14,12 @@ from common import utils
 from services import cloud_storage
 
 
+@functools.cache
+def dataclass_field_names(cls: type) -> frozenset[str]:
+  """Return the (cached) set of field names of a dataclass type."""
+  return frozenset(f.name for f in dataclasses.fields(cls))
+
+
 class ReadingLevel(Enum):
   """Reading level enum matching the Flutter app's levels."""
   PRE_K = 0
@@ -223,6 +230,40 @@ class GenerationMetadata:
     ])
 
 
+class _LazyGenerationMetadata(GenerationMetadata):
+  """GenerationMetadata that decodes its Firestore dict on first access.
+
+  Bulk joke reads rarely look at generation metadata, so decoding every
+  generation up front is wasted work. Compares equal to an eagerly decoded
+  GenerationMetadata with the same generations.
+  """
+
+  def __init__(self, data: dict[str, Any]):  # pylint: disable=super-init-not-called
+    self._data: dict[str, Any] | None = data
+    self._generations: list[SingleGenerationMetadata] | None = None
+
+  @property
+  def generations(self) -> list[SingleGenerationMetadata]:
+    """Generations, decoded from the raw Firestore dict on first access."""
+    if self._generations is None:
+      self._generations = GenerationMetadata.from_dict(self._data).generations
+      self._data = None
+    return self._generations
+
+  @generations.setter
+  def generations(self, value: list[SingleGenerationMetadata]) -> None:
+    self._generations = value
+    self._data = None
+
+  def __eq__(self, other: object) -> bool:
+    if not isinstance(other, GenerationMetadata):
+      return NotImplemented
+    return self.generations == other.generations
+
+  def __repr__(self) -> str:
+    return f"GenerationMetadata(generations={self.generations!r})"
+
+
 @dataclass
 class Image:
   """Represents a generated image and its associated metadata."""
@@ -833,7 +874,7 @@ class JokeSheet:
     data["key"] = key
 
     # Filter to dataclass fields to avoid unexpected keys.
-    allowed = {f.name for f in dataclasses.fields(cls)}
+    allowed = dataclass_field_names(cls)
     filtered = {k: v for k, v in data.items() if k in allowed}
     return cls(**filtered)
 
@@ -877,7 +918,7 @@ class JokeBook:
       data['book_name'] = ''
     _parse_string_list(data, 'jokes', dedupe=False)
 
-    allowed = {field.name for field in dataclasses.fields(cls)}
+    allowed = dataclass_field_names(cls)
     filtered = {name: value for name, value in data.items() if name in allowed}
     return cls(**filtered)
 
@@ -1006,7 +1047,7 @@ class JokeSocialPost:
 
     data['key'] = key
 
-    allowed = {f.name for f in dataclasses.fields(cls)}
+    allowed = dataclass_field_names(cls)
     filtered = {k: v for k, v in data.items() if k in allowed}
     return cls(**filtered)
 
@@ -1059,7 +1100,7 @@ class JokeVideo:
       generation_metadata_dict)
     data["key"] = key
 
-    allowed = {f.name for f in dataclasses.fields(cls)}
+    allowed = dataclass_field_names(cls)
     filtered = {k: v for k, v in data.items() if k in allowed}
     return cls(**filtered)
 
@@ -1173,7 +1214,7 @@ class JokeCategory:
       data['state'] = "PROPOSED"
 
     # Filter to dataclass fields to avoid unexpected keys.
-    allowed = {f.name for f in dataclasses.fields(cls)}
+    allowed = dataclass_field_names(cls)
     filtered = {k: v for k, v in data.items() if k in allowed}
     return cls(**filtered)
 
@@ -1265,10 +1306,11 @@ class PunnyJoke:
     data.pop('creation_time', None)
     data.pop('last_modification_time', None)
 
-    # Convert nested metadata
+    # Convert nested metadata (decoded lazily; bulk reads rarely need it)
     if 'generation_metadata' in data:
-      data['generation_metadata'] = GenerationMetadata.from_dict(
-        data.get('generation_metadata'))
+      raw_metadata = data.get('generation_metadata')
+      data['generation_metadata'] = (_LazyGenerationMetadata(raw_metadata)
+                                     if raw_metadata else GenerationMetadata())
 
     # Convert string enums
     _parse_enum_field(
@@ -1300,7 +1342,7 @@ class PunnyJoke:
     data['key'] = key
 
     # Filter to dataclass fields to avoid unexpected keys
-    allowed = {f.name for f in dataclasses.fields(cls)}
+    allowed = dataclass_field_names(cls)
     filtered = {k: v for k, v in data.items() if k in allowed}
 
     return cls(**filtered)
@@ -1551,7 +1593,7 @@ class PosableCharacterDef:
     _parse_int_field(data, 'height', 0)
 
     # Filter to dataclass fields
-    allowed = {f.name for f in dataclasses.fields(cls)}
+    allowed = dataclass_field_names(cls)
     filtered: dict[str, Any] = {k: v for k, v in data.items() if k in allowed}
 
     return cls(**filtered)
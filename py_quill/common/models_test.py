@@ -37,6 +37,54 @@ def test_punnyjoke_from_firestore_missing_state_defaults_unknown():
   assert joke.state == models.JokeState.UNKNOWN
 
 
+def test_punnyjoke_from_firestore_decodes_generation_metadata_lazily(
+    monkeypatch):
+  """generation_metadata is only decoded on first access, and still compares
+  and serializes like an eagerly decoded GenerationMetadata."""
+  generation = {"label": "x", "model_name": "m", "cost": 1.5}
+  data = {
+    "setup_text": "s",
+    "punchline_text": "p",
+    "generation_metadata": {
+      "generations": [generation]
+    },
+  }
+  decoded: list[object] = []
+  original_from_dict = models.SingleGenerationMetadata.from_dict
+
+  def _tracking_from_dict(raw):
+    decoded.append(raw)
+    return original_from_dict(raw)
+
+  monkeypatch.setattr(models.SingleGenerationMetadata, "from_dict",
+                      _tracking_from_dict)
+
+  joke = models.PunnyJoke.from_firestore_dict(data, key="abc")
+  assert decoded == []
+
+  expected = models.GenerationMetadata(
+    generations=[models.SingleGenerationMetadata(**generation)])
+  assert joke.generation_metadata == expected
+  assert expected == joke.generation_metadata
+  assert decoded == [generation]
+  assert joke.generation_metadata.total_cost == 1.5
+  assert joke.to_dict()["generation_metadata"] == expected.as_dict
+  assert joke == models.PunnyJoke(setup_text="s",
+                                  punchline_text="p",
+                                  key="abc",
+                                  generation_metadata=expected)
+
+  empty = models.PunnyJoke.from_firestore_dict(
+    {
+      "setup_text": "s",
+      "punchline_text": "p",
+      "generation_metadata": {},
+    },
+    key="def",
+  )
+  assert empty.generation_metadata == models.GenerationMetadata()
+
+
 def test_punnyjoke_to_dict_serializes_state_and_metadata_and_key_optional():
   """Test that to_dict serializes state, metadata, and handles key inclusion."""
   joke = models.PunnyJoke(setup_text="setup", punchline_text="punchline")
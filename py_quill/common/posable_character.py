@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+import itertools
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
 
@@ -9,6 +13,14 @@ from common import models
 from PIL import Image
 from services import cloud_storage
 
+# Process-wide sprite caches, shared by every `PosableCharacter` so repeated
+# renders in a warm instance reuse both composed poses and downloaded assets.
+_POSE_SPRITE_CACHE_MAX_BYTES = 128 * 1024 * 1024
+_COMPONENT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Component assets are re-downloaded after this long, so a PNG re-uploaded to
+# the same GCS URI reaches warm instances.
+_COMPONENT_CACHE_TTL_SEC = 10 * 60
+
 
 class MouthState(Enum):
   """State of the mouth for a posable character."""
@@ -129,6 +141,94 @@ class _RenderedPoseImage:
   logical_origin_y: int
 
 
+@dataclass(frozen=True)
+class _ComponentAsset:
+  """Decoded component image plus the download it came from.
+
+  `version` is unique per download, so pose sprite keys built from a
+  re-downloaded asset never match sprites composed from the old one.
+  """
+
+  image: Image.Image
+  version: int
+
+
+class _ImageLruCache:
+  """Thread-safe LRU cache of images, bounded by total decoded pixel bytes.
+
+  Values are any object exposing an `image`, or a bare `Image.Image`. Entries
+  larger than the whole budget are not cached, and with `ttl_sec` entries
+  expire that long after they are put. Cached images are shared across
+  callers and must be treated as read-only.
+  """
+
+  def __init__(self, max_bytes: int, ttl_sec: float | None = None):
+    self._max_bytes = max_bytes
+    self._ttl_sec = ttl_sec
+    self._lock = threading.Lock()
+    self._entries: OrderedDict[object, tuple[object, int,
+                                             float | None]] = OrderedDict()
+    self._total_bytes = 0
+
+  def get(self, key: object) -> object | None:
+    """Return the cached value for `key`, marking it most recently used."""
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None:
+        return None
+      value, size_bytes, expires_at = entry
+      if expires_at is not None and time.monotonic() >= expires_at:
+        del self._entries[key]
+        self._total_bytes -= size_bytes
+        return None
+      self._entries.move_to_end(key)
+      return value
+
+  def put(self, key: object, value: object, image: Image.Image) -> None:
+    """Cache `value`, whose memory footprint is that of `image`."""
+    size_bytes = image.width * image.height * len(image.getbands())
+    if size_bytes > self._max_bytes:
+      return
+    expires_at = None
+    if self._ttl_sec is not None:
+      expires_at = time.monotonic() + self._ttl_sec
+    with self._lock:
+      previous = self._entries.pop(key, None)
+      if previous is not None:
+        self._total_bytes -= previous[1]
+      self._entries[key] = (value, size_bytes, expires_at)
+      self._total_bytes += size_bytes
+      while self._total_bytes > self._max_bytes:
+        _, (_, evicted_bytes, _) = self._entries.popitem(last=False)
+        self._total_bytes -= evicted_bytes
+
+  def clear(self) -> None:
+    """Drop all entries."""
+    with self._lock:
+      self._entries.clear()
+      self._total_bytes = 0
+
+  @property
+  def total_bytes(self) -> int:
+    """Decoded pixel bytes currently held."""
+    with self._lock:
+      return self._total_bytes
+
+
+# Composed pose sprites, keyed by `PosableCharacter._get_pose_cache_key`.
+_pose_sprite_cache = _ImageLruCache(_POSE_SPRITE_CACHE_MAX_BYTES)
+# Decoded RGBA component assets (`_ComponentAsset`), keyed by GCS URI.
+_component_cache = _ImageLruCache(_COMPONENT_CACHE_MAX_BYTES,
+                                  ttl_sec=_COMPONENT_CACHE_TTL_SEC)
+_component_versions = itertools.count(1)
+
+
+def clear_sprite_caches() -> None:
+  """Clear the process-wide pose sprite and component asset caches."""
+  _pose_sprite_cache.clear()
+  _component_cache.clear()
+
+
 class PosableCharacter:
   """Runtime character renderer with cached sprites for a pose state."""
 
@@ -140,8 +240,9 @@ class PosableCharacter:
   ):
     self.definition: models.PosableCharacterDef = definition
     self._pose_state: PoseState = pose_state or PoseState()
-    self._image_cache: dict[tuple[object, ...], _RenderedPoseImage] = {}
-    self._component_cache: dict[str, Image.Image] = {}
+    # Most recent render, so frame info stays available even if the shared
+    # cache has since evicted it.
+    self._last_rendered: tuple[PoseState, _RenderedPoseImage] | None = None
 
   @classmethod
   def from_def(
@@ -340,12 +441,12 @@ class PosableCharacter:
     Returns:
       (logical_origin_x, logical_origin_y, logical_width, logical_height)
     """
-    cache_key = self._get_pose_cache_key()
-    rendered = self._image_cache.get(cache_key)
-    if rendered is None:
+    if (self._last_rendered is None
+        or self._last_rendered[0] != self._pose_state):
       raise RuntimeError(
         "Render frame info unavailable before rendering pose. "
         "Call get_image() first for the current pose state.")
+    rendered = self._last_rendered[1]
     return (
       rendered.logical_origin_x,
       rendered.logical_origin_y,
@@ -357,9 +458,12 @@ class PosableCharacter:
     """Render current pose to an overflow-capable sprite with logical origin."""
     self._validate_assets()
     pose = self._pose_state
+    if self._last_rendered is not None and self._last_rendered[0] == pose:
+      return self._last_rendered[1]
     cache_key = self._get_pose_cache_key()
-    cached = self._image_cache.get(cache_key)
-    if cached is not None:
+    cached = _pose_sprite_cache.get(cache_key)
+    if isinstance(cached, _RenderedPoseImage):
+      self._last_rendered = (pose, cached)
       return cached
 
     def_ = self.definition
@@ -474,19 +578,84 @@ class PosableCharacter:
       logical_origin_x=logical_origin_x,
       logical_origin_y=logical_origin_y,
     )
-    self._image_cache[cache_key] = rendered
+    _pose_sprite_cache.put(cache_key, rendered, canvas)
+    self._last_rendered = (pose, rendered)
     return rendered
 
   def _get_pose_cache_key(self) -> tuple[object, ...]:
-    return (self._pose_state, )
+    """Return a key identifying the composed sprite for the current pose.
+
+    Transforms and offsets are quantized to the integer pixel geometry they
+    produce, so continuously interpolated poses that render identically share
+    one cache entry.
+    """
+    pose = self._pose_state
+    def_ = self.definition
+    logical_canvas_size = (def_.width, def_.height)
+    mask_cutoff_y = _get_mask_cutoff_y(def_.height, pose.mask_boundary_offset)
+
+    head_uris = (
+      def_.head_gcs_uri,
+      (def_.left_eye_open_gcs_uri
+       if pose.left_eye_open else def_.left_eye_closed_gcs_uri),
+      (def_.right_eye_open_gcs_uri
+       if pose.right_eye_open else def_.right_eye_closed_gcs_uri),
+      _get_mouth_gcs_uri(definition=def_, pose_state=pose),
+    )
+    head_key = (
+      tuple(
+        self._get_component_placement_key(uri, pose.head_transform,
+                                          logical_canvas_size)
+        for uri in head_uris),
+      mask_cutoff_y if pose.head_masking_enabled else None,
+    )
+    surface_line_key = ((
+      def_.surface_line_gcs_uri,
+      self._load_component_asset(def_.surface_line_gcs_uri).version,
+      int(round(def_.height - pose.surface_line_offset)),
+    ) if pose.surface_line_visible else None)
+    left_hand_key = ((
+      self._get_component_placement_key(def_.left_hand_gcs_uri,
+                                        pose.left_hand_transform,
+                                        logical_canvas_size),
+      mask_cutoff_y if pose.left_hand_masking_enabled else None,
+    ) if pose.left_hand_visible else None)
+    right_hand_key = ((
+      self._get_component_placement_key(def_.right_hand_gcs_uri,
+                                        pose.right_hand_transform,
+                                        logical_canvas_size),
+      mask_cutoff_y if pose.right_hand_masking_enabled else None,
+    ) if pose.right_hand_visible else None)
+    return (
+      logical_canvas_size,
+      head_key,
+      surface_line_key,
+      left_hand_key,
+      right_hand_key,
+    )
+
+  def _get_component_placement_key(
+    self,
+    gcs_uri: str,
+    transform: Transform,
+    canvas_size: tuple[int, int],
+  ) -> tuple[object, ...]:
+    component = self._load_component_asset(gcs_uri)
+    return (gcs_uri, component.version,
+            *_get_transform_geometry(component.image.size, transform,
+                                     canvas_size))
 
   def _load_component(self, gcs_uri: str) -> Image.Image:
-    cached = self._component_cache.get(gcs_uri)
-    if cached is not None:
+    return self._load_component_asset(gcs_uri).image
+
+  def _load_component_asset(self, gcs_uri: str) -> _ComponentAsset:
+    cached = _component_cache.get(gcs_uri)
+    if isinstance(cached, _ComponentAsset):
       return cached
     image = cloud_storage.download_image_from_gcs(gcs_uri).convert("RGBA")
-    self._component_cache[gcs_uri] = image
-    return image
+    component = _ComponentAsset(image=image, version=next(_component_versions))
+    _component_cache.put(gcs_uri, component, image)
+    return component
 
   def _build_component_layer(
     self,
@@ -551,7 +720,7 @@ class PosableCharacter:
     canvas_height: int,
     boundary_offset: float,
   ) -> Image.Image:
-    cutoff_y = int(round(canvas_height - boundary_offset))
+    cutoff_y = _get_mask_cutoff_y(canvas_height, boundary_offset)
     visible_height = cutoff_y - component_y
     if visible_height >= component.height:
       return component
@@ -569,18 +738,14 @@ class PosableCharacter:
     transform: Transform,
     canvas_size: tuple[int, int],
   ) -> tuple[Image.Image, int, int]:
-    target_width = max(1, int(round(component.width * transform.scale_x)))
-    target_height = max(1, int(round(component.height * transform.scale_y)))
+    target_width, target_height, x, y = _get_transform_geometry(
+      component.size, transform, canvas_size)
     resized = component
     if (target_width, target_height) != component.size:
       resized = component.resize(
         (target_width, target_height),
         resample=Image.Resampling.LANCZOS,
       )
-    base_x = (canvas_size[0] - target_width) / 2
-    base_y = (canvas_size[1] - target_height) / 2
-    x = int(round(base_x + transform.translate_x))
-    y = int(round(base_y + transform.translate_y))
     return resized, x, y
 
   def _validate_assets(self) -> None:
@@ -615,6 +780,25 @@ def _coerce_transform(
   return Transform.from_tuple(transform)
 
 
+def _get_transform_geometry(
+  component_size: tuple[int, int],
+  transform: Transform,
+  canvas_size: tuple[int, int],
+) -> tuple[int, int, int, int]:
+  """Return (width, height, x, y) of a transformed component, in pixels."""
+  target_width = max(1, int(round(component_size[0] * transform.scale_x)))
+  target_height = max(1, int(round(component_size[1] * transform.scale_y)))
+  base_x = (canvas_size[0] - target_width) / 2
+  base_y = (canvas_size[1] - target_height) / 2
+  x = int(round(base_x + transform.translate_x))
+  y = int(round(base_y + transform.translate_y))
+  return target_width, target_height, x, y
+
+
+def _get_mask_cutoff_y(canvas_height: int, boundary_offset: float) -> int:
+  return int(round(canvas_height - boundary_offset))
+
+
 def _get_mouth_gcs_uri(
   *,
   definition: models.PosableCharacterDef,
@@ -5,7 +5,7 @@ from __future__ import annotations
 import unittest
 from unittest.mock import patch
 
-from common import models
+from common import models, posable_character
 from common.posable_character import (MouthState, PoseState, PosableCharacter,
                                       Transform)
 from PIL import Image
@@ -64,6 +64,10 @@ class TransformTest(unittest.TestCase):
 
 class PosableCharacterTest(unittest.TestCase):
 
+  def setUp(self):
+    posable_character.clear_sprite_caches()
+    self.addCleanup(posable_character.clear_sprite_caches)
+
   def _build_character(self) -> SampleCharacter:
     return SampleCharacter()
 
@@ -91,8 +95,7 @@ class PosableCharacterTest(unittest.TestCase):
 
   def test_get_render_frame_info_requires_rendered_pose(self):
     character = self._build_character()
-    with self.assertRaisesRegex(RuntimeError,
-                                "Call get_image\\(\\) first"):
+    with self.assertRaisesRegex(RuntimeError, "Call get_image\\(\\) first"):
       _ = character.get_render_frame_info()
 
   def test_set_pose_accepts_transform_tuples(self):
@@ -253,6 +256,78 @@ class PosableCharacterTest(unittest.TestCase):
     self.assertIs(image_one, image_two)
     self.assertEqual(mock_download.call_count, 7)
 
+  @patch("common.posable_character.cloud_storage.download_image_from_gcs")
+  def test_sprite_and_component_caches_are_shared_across_instances(
+      self, mock_download):
+    images = self._default_images()
+    mock_download.side_effect = lambda uri: images[uri]
+
+    image_one = self._build_character().get_image()
+    second = self._build_character()
+    second.set_pose(mouth_state=MouthState.OPEN)
+    _ = second.get_image()
+    second.set_pose(mouth_state=MouthState.CLOSED)
+    image_two = second.get_image()
+
+    self.assertIs(image_one, image_two)
+    # Only the open mouth is new; every other asset is already cached.
+    self.assertEqual(mock_download.call_count, 8)
+
+  @patch("common.posable_character.cloud_storage.download_image_from_gcs")
+  def test_component_cache_expires_reuploaded_assets(self, mock_download):
+    images = self._default_images()
+    mock_download.side_effect = lambda uri: images[uri]
+    now = [1000.0]
+
+    with patch.object(posable_character.time, "monotonic", lambda: now[0]):
+      image_one = self._build_character().get_image()
+      images[_SAMPLE_DEF.head_gcs_uri] = _make_image((0, 0, 255, 255))
+      now[0] += posable_character._COMPONENT_CACHE_TTL_SEC - 1
+      image_two = self._build_character().get_image()
+      now[0] += 1
+      image_three = self._build_character().get_image()
+
+    self.assertIs(image_one, image_two)
+    self.assertEqual(mock_download.call_count, 14)
+    # Re-downloaded assets get new versions, so the stale sprite is not reused.
+    self.assertIsNot(image_two, image_three)
+
+  @patch("common.posable_character.cloud_storage.download_image_from_gcs")
+  def test_pose_cache_key_quantizes_transforms_to_pixels(self, mock_download):
+    images = self._default_images()
+    mock_download.side_effect = lambda uri: images[uri]
+
+    character = self._build_character()
+    character.set_pose(head_transform=Transform(translate_x=1.1),
+                       surface_line_offset=50.2)
+    image_one = character.get_image()
+    character.set_pose(head_transform=Transform(translate_x=0.9),
+                       surface_line_offset=49.9)
+    image_two = character.get_image()
+    character.set_pose(head_transform=Transform(translate_x=2.0))
+    image_three = character.get_image()
+
+    self.assertIs(image_one, image_two)
+    self.assertIsNot(image_two, image_three)
+
+  @patch("common.posable_character.cloud_storage.download_image_from_gcs")
+  def test_pose_sprite_cache_evicts_least_recently_used_by_bytes(
+      self, mock_download):
+    images = self._default_images()
+    mock_download.side_effect = lambda uri: images[uri]
+    # Each 4x4 RGBA sprite is 64 bytes; budget for two of them.
+    cache = posable_character._ImageLruCache(max_bytes=128)
+    with patch.object(posable_character, "_pose_sprite_cache", cache):
+      character = self._build_character()
+      for translate_x in (0.0, 1.0, 2.0):
+        character.set_pose(head_transform=Transform(translate_x=translate_x))
+        _ = character.get_image()
+
+      self.assertEqual(cache.total_bytes, 128)
+      character.set_pose(head_transform=Transform(translate_x=0.0))
+      key = character._get_pose_cache_key()
+      self.assertIsNone(cache.get(key))
+
   @patch("common.posable_character.cloud_storage.download_image_from_gcs")
   def test_pose_change_returns_new_image(self, mock_download):
     images = self._default_images()
@@ -426,7 +501,7 @@ class PosableCharacterTest(unittest.TestCase):
     # Verify transient fields are initialized
     self.assertTrue(character.left_eye_open)
     self.assertEqual(character.mouth_state, MouthState.CLOSED)
-    self.assertIsInstance(character._image_cache, dict)
+    self.assertIsNone(character._last_rendered)
 
     # Verify it works with get_image (mocking download)
     with patch("common.posable_character.cloud_storage.download_image_from_gcs"
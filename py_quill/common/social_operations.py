@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 from common import image_operations, joke_media_operations, models, utils
 from functions.prompts import social_post_prompts
@@ -378,46 +379,44 @@ def _generate_social_post_media_images(
   image_bytes_by_platform: dict[models.SocialPlatform, list[bytes]] = {}
   updated = False
 
-  # Pinterest: always its own asset
-  if not post.is_platform_posted(models.SocialPlatform.PINTEREST):
-    image_urls, image_bytes_list = _create_social_post_image(
-      post,
-      models.SocialPlatform.PINTEREST,
-    )
-    image_bytes_by_platform[models.SocialPlatform.PINTEREST] = image_bytes_list
-    post.pinterest_image_urls = image_urls
-    updated = True
-
-  # Instagram + Facebook: shared square asset for single-image posts, or
-  # shared carousel for JOKE_CAROUSEL.
+  # Pinterest always gets its own asset. Instagram + Facebook share a square
+  # asset for single-image posts, or a shared carousel for JOKE_CAROUSEL.
+  render_pinterest = not post.is_platform_posted(
+    models.SocialPlatform.PINTEREST)
   shared_platforms = (models.SocialPlatform.INSTAGRAM,
                       models.SocialPlatform.FACEBOOK)
   unposted_shared_platforms = [
     platform for platform in shared_platforms
     if not post.is_platform_posted(platform)
   ]
+  # Reuse images either shared platform already has.
+  existing_square_urls = post.instagram_image_urls or post.facebook_image_urls
+  render_shared = bool(unposted_shared_platforms) and not existing_square_urls
+
+  rendered = _create_social_post_images(
+    post,
+    ([models.SocialPlatform.PINTEREST] if render_pinterest else []) +
+    ([models.SocialPlatform.INSTAGRAM] if render_shared else []),
+  )
+
+  if render_pinterest:
+    image_urls, image_bytes_list = rendered[models.SocialPlatform.PINTEREST]
+    image_bytes_by_platform[models.SocialPlatform.PINTEREST] = image_bytes_list
+    post.pinterest_image_urls = image_urls
+    updated = True
+
   if unposted_shared_platforms:
-    # Check if either platform already has images we can reuse
-    existing_square_urls = post.instagram_image_urls or post.facebook_image_urls
-    if existing_square_urls:
-      for platform in unposted_shared_platforms:
-        if platform == models.SocialPlatform.INSTAGRAM:
-          post.instagram_image_urls = existing_square_urls
-        elif platform == models.SocialPlatform.FACEBOOK:
-          post.facebook_image_urls = existing_square_urls
-      updated = True
-    else:
-      image_urls, image_bytes_list = _create_social_post_image(
-        post,
-        models.SocialPlatform.INSTAGRAM,
-      )
+    image_urls = existing_square_urls
+    if render_shared:
+      image_urls, image_bytes_list = rendered[models.SocialPlatform.INSTAGRAM]
       for platform in unposted_shared_platforms:
         image_bytes_by_platform[platform] = image_bytes_list
-        if platform == models.SocialPlatform.INSTAGRAM:
-          post.instagram_image_urls = image_urls
-        elif platform == models.SocialPlatform.FACEBOOK:
-          post.facebook_image_urls = image_urls
-      updated = True
+    for platform in unposted_shared_platforms:
+      if platform == models.SocialPlatform.INSTAGRAM:
+        post.instagram_image_urls = image_urls
+      elif platform == models.SocialPlatform.FACEBOOK:
+        post.facebook_image_urls = image_urls
+    updated = True
 
   return post, image_bytes_by_platform, updated
 
@@ -557,11 +556,47 @@ def _generate_facebook_post_text(
   return post
 
 
+def _create_social_post_images(
+  post: models.JokeSocialPost,
+  platforms: list[models.SocialPlatform],
+) -> dict[models.SocialPlatform, tuple[list[str], list[bytes]]]:
+  """Render and upload the assets for several platforms concurrently.
+
+  All layouts share one image pool, so each joke image is downloaded once.
+  Joke images are prefetched while the layouts start rendering.
+  """
+  if not platforms:
+    return {}
+  with image_operations.ImagePool() as image_pool:
+    image_pool.prefetch([
+      url for joke in post.jokes
+      for url in (joke.setup_image_url, joke.punchline_image_url)
+    ])
+    with ThreadPoolExecutor(max_workers=len(platforms)) as executor:
+      futures = {
+        platform:
+        executor.submit(_create_social_post_image,
+                        post,
+                        platform,
+                        image_pool=image_pool)
+        for platform in platforms
+      }
+      return {
+        platform: future.result()
+        for platform, future in futures.items()
+      }
+
+
 def _create_social_post_image(
-    post: models.JokeSocialPost,
-    platform: models.SocialPlatform) -> tuple[list[str], list[bytes]]:
+  post: models.JokeSocialPost,
+  platform: models.SocialPlatform,
+  *,
+  image_pool: image_operations.ImagePool | None = None,
+) -> tuple[list[str], list[bytes]]:
   """Create social post image assets for a platform.
 
+  Images are PNG-encoded and uploaded concurrently.
+
   Returns:
     Tuple of (image_urls, image_bytes_list). For single-image posts, lists
     contain one element. For carousel posts, lists contain multiple elements,
@@ -571,12 +606,17 @@ def _create_social_post_image(
   if post.type == models.JokeSocialPostType.JOKE_CAROUSEL:
     if platform == models.SocialPlatform.PINTEREST:
       post_images = [
-        image_operations.create_joke_giraffe_image(jokes=post.jokes, )
+        image_operations.create_joke_giraffe_image(
+          jokes=post.jokes,
+          image_pool=image_pool,
+        )
       ]
     elif platform in (models.SocialPlatform.INSTAGRAM,
                       models.SocialPlatform.FACEBOOK):
       post_images = image_operations.create_single_joke_images_4by5(
-        jokes=post.jokes, )
+        jokes=post.jokes,
+        image_pool=image_pool,
+      )
   elif post.type in (models.JokeSocialPostType.JOKE_GRID,
                      models.JokeSocialPostType.JOKE_GRID_TEASER):
     if platform == models.SocialPlatform.PINTEREST:
@@ -585,6 +625,7 @@ def _create_social_post_image(
           jokes=post.jokes,
           block_last_panel=post.type ==
           models.JokeSocialPostType.JOKE_GRID_TEASER,
+          image_pool=image_pool,
         )
       ]
     elif platform in (models.SocialPlatform.INSTAGRAM,
@@ -594,6 +635,7 @@ def _create_social_post_image(
           jokes=post.jokes,
           block_last_panel=post.type ==
           models.JokeSocialPostType.JOKE_GRID_TEASER,
+          image_pool=image_pool,
         )
       ]
   else:
@@ -602,16 +644,24 @@ def _create_social_post_image(
     raise SocialPostRequestError(
       f"Unsupported platform: {platform} for post type: {post.type}")
 
-  image_urls: list[str] = []
-  image_bytes_list: list[bytes] = []
-  for img in post_images:
-    uploaded_gcs_uri, img_bytes = cloud_storage.upload_image_to_gcs(
-      img,
-      'social_post',
-      'png',
-    )
-    image_urls.append(cloud_storage.get_public_cdn_url(uploaded_gcs_uri))
-    image_bytes_list.append(img_bytes)
+  # Upload names carry the platform and image index: they are otherwise only
+  # unique by timestamp, which concurrent uploads can share.
+  with ThreadPoolExecutor(max_workers=len(post_images)) as executor:
+    uploads = list(
+      executor.map(
+        lambda index, img: cloud_storage.upload_image_to_gcs(
+          img,
+          f'social_post_{platform.value}_{index}',
+          'png',
+        ),
+        range(len(post_images)),
+        post_images,
+      ))
+  image_urls = [
+    cloud_storage.get_public_cdn_url(uploaded_gcs_uri)
+    for uploaded_gcs_uri, _ in uploads
+  ]
+  image_bytes_list = [img_bytes for _, img_bytes in uploads]
   return image_urls, image_bytes_list
 
 
@@ -65,8 +65,96 @@ def test_create_social_post_image_pinterest_carousel_uses_giraffe(
 
   assert image_urls == ["https://cdn.example.com/social_post.png"]
   assert image_bytes == [b"image-bytes"]
-  giraffe_mock.assert_called_once_with(jokes=jokes)
-  assert upload_calls == [(giraffe_image, "social_post", "png")]
+  giraffe_mock.assert_called_once_with(jokes=jokes, image_pool=None)
+  assert upload_calls == [(giraffe_image, "social_post_pinterest_0", "png")]
+
+
+def test_generate_social_post_media_images_renders_platforms_from_shared_pool(
+  monkeypatch: pytest.MonkeyPatch, ):
+  jokes = [
+    models.PunnyJoke(
+      key=f"j{index}",
+      setup_text=f"Setup {index}",
+      punchline_text=f"Punchline {index}",
+      setup_image_url=f"setup-{index}",
+      punchline_image_url=f"punch-{index}",
+    ) for index in range(2)
+  ]
+  post = models.JokeSocialPost(
+    type=models.JokeSocialPostType.JOKE_GRID,
+    jokes=jokes,
+    link_url="https://example.com/jokes/tag",
+  )
+
+  downloaded_urls: list[str] = []
+
+  def _fake_download(url):
+    downloaded_urls.append(url)
+    return Image.new('RGB', (8, 8), color='white')
+
+  monkeypatch.setattr(social_operations.cloud_storage,
+                      "download_image_from_gcs", _fake_download)
+
+  pinterest_image = Image.new('RGB', (1000, 500), color='white')
+  square_image = Image.new('RGB', (1080, 1350), color='white')
+  image_pools = []
+
+  def _fake_grid_3x2(*, jokes, block_last_panel, image_pool):
+    assert not block_last_panel
+    for joke in jokes:
+      _ = image_pool.get(joke.setup_image_url)
+    image_pools.append(image_pool)
+    return pinterest_image
+
+  def _fake_grid_4by5(*, jokes, block_last_panel, image_pool):
+    assert not block_last_panel
+    for joke in jokes:
+      _ = image_pool.get(joke.punchline_image_url)
+    image_pools.append(image_pool)
+    return square_image
+
+  monkeypatch.setattr(social_operations.image_operations,
+                      "create_joke_grid_image_3x2", _fake_grid_3x2)
+  monkeypatch.setattr(social_operations.image_operations,
+                      "create_joke_grid_image_4by5", _fake_grid_4by5)
+
+  def _fake_upload(image, file_name_base, extension, **_kwargs):
+    assert extension == "png"
+    name = "pin" if image is pinterest_image else "square"
+    return f"gs://bucket/{file_name_base}.png", name.encode()
+
+  monkeypatch.setattr(social_operations.cloud_storage, "upload_image_to_gcs",
+                      _fake_upload)
+  monkeypatch.setattr(
+    social_operations.cloud_storage,
+    "get_public_cdn_url",
+    lambda uri: uri.replace("gs://bucket", "https://cdn.example.com"),
+  )
+
+  post, image_bytes_by_platform, updated = (
+    social_operations._generate_social_post_media_images(post))
+
+  assert updated
+  assert post.pinterest_image_urls == [
+    "https://cdn.example.com/social_post_pinterest_0.png"
+  ]
+  assert post.instagram_image_urls == [
+    "https://cdn.example.com/social_post_instagram_0.png"
+  ]
+  assert post.facebook_image_urls == post.instagram_image_urls
+  assert image_bytes_by_platform == {
+    models.SocialPlatform.PINTEREST: [b"pin"],
+    models.SocialPlatform.INSTAGRAM: [b"square"],
+    models.SocialPlatform.FACEBOOK: [b"square"],
+  }
+  # One pool for both layouts; every joke image downloaded exactly once.
+  assert len(image_pools) == 2 and image_pools[0] is image_pools[1]
+  assert sorted(downloaded_urls) == [
+    "punch-0",
+    "punch-1",
+    "setup-0",
+    "setup-1",
+  ]
 
 
 def test_generate_social_post_media_joke_video_sets_shared_video_uris(
@@ -23,6 +23,18 @@ from services import amazon, firestore
 _RECENT_STATS_DAILY_DECAY_FACTOR = 0.9
 _MAX_FIRESTORE_WRITE_BATCH_SIZE = 100
 _LAST_RECENT_STATS_UPDATE_TIME_FIELD_NAME = "last_recent_stats_update_time"
+_RECENT_STATS_FIELD_NAMES = (
+  "num_viewed_users_recent",
+  "num_saved_users_recent",
+  "num_shared_users_recent",
+)
+# The hourly scan reads every model field except generation metadata, plus the
+# raw recent-stats bookkeeping fields that the decay step needs.
+_JOKE_MAINTENANCE_FIELDS = (
+  *firestore.JOKE_SCAN_FIELDS,
+  *_RECENT_STATS_FIELD_NAMES,
+  _LAST_RECENT_STATS_UPDATE_TIME_FIELD_NAME,
+)
 
 
 @scheduler_fn.on_schedule(
@@ -153,7 +165,7 @@ def auto_ads_stats_fetch_http(req: flask.Request) -> flask.Response:
 def _joke_maintenance_internal(
     run_time_utc: datetime.datetime) -> dict[str, int]:
   """Run maintenance tasks for jokes.
-  
+
   Returns:
     Combined dictionary with all maintenance statistics from joke updates and category cache refresh
   """
@@ -421,11 +433,7 @@ def _build_recent_decay_payload(data: dict[str, object]) -> dict[str, object]:
   """Construct the payload that applies decay to the supplied joke data."""
   payload: dict[str, object] = {}
 
-  for field_name in (
-      "num_viewed_users_recent",
-      "num_saved_users_recent",
-      "num_shared_users_recent",
-  ):
+  for field_name in _RECENT_STATS_FIELD_NAMES:
     original_value = data.get(field_name)
     if not original_value:
       continue
@@ -498,19 +506,13 @@ def _compute_joke_payload_and_stats(
 
 
 def _sync_joke_and_append_if_public(
-  joke_doc_id: str,
   joke: models.PunnyJoke,
   public_jokes: list[models.PunnyJoke],
+  search_sync: joke_operations.JokeSearchSyncPipeline,
 ) -> None:
-  """Sync joke to search collection if not draft; append to public_jokes if public."""
+  """Queue joke for search sync if not draft; append to public_jokes if public."""
   if joke.state != models.JokeState.DRAFT:
-    try:
-      joke_operations.sync_joke_to_search_collection(joke=joke,
-                                                     new_embedding=None)
-    except Exception as sync_error:
-      logger.warn(
-        f"Failed to sync joke {joke_doc_id} to search collection: {sync_error}"
-      )
+    search_sync.add(joke)
   if joke.is_public:
     public_jokes.append(joke)
 
@@ -529,7 +531,10 @@ def _update_joke_attributes(
   db_client = firestore.db()
   jokes_collection = db_client.collection("jokes")
   book_id_by_joke, duplicate_book_jokes = _build_book_id_index(db_client)
-  joke_docs = cast(Iterator[DocumentSnapshot], jokes_collection.stream())
+  joke_docs = cast(
+    Iterator[DocumentSnapshot],
+    jokes_collection.select(list(_JOKE_MAINTENANCE_FIELDS)).stream(),
+  )
 
   batch = db_client.batch()
   writes_in_batch = 0
@@ -541,41 +546,42 @@ def _update_joke_attributes(
   public_jokes: list[models.PunnyJoke] = []
   jokes_by_id: dict[str, models.PunnyJoke] = {}
 
-  for joke_doc in joke_docs:
-    if not joke_doc.exists:
-      continue
-    joke_data = joke_doc.to_dict() or {}
-    joke_id = cast(str, joke_doc.id)
-    joke_doc_ref = cast(DocumentReference, joke_doc.reference)
-    expected_book_id = book_id_by_joke.get(joke_id)
-    payload, stats_delta = _compute_joke_payload_and_stats(
-      joke_data, run_time_utc, expected_book_id)
-    public_updated += stats_delta["public_updated"]
-    book_id_updated += stats_delta["book_id_updated"]
-    jokes_decayed += stats_delta["jokes_decayed"]
-
-    final_joke_data = {**joke_data, **payload}
-    try:
-      joke = models.PunnyJoke.from_firestore_dict(final_joke_data, joke_id)
-    except Exception as parse_error:
-      logger.warn(f"Failed to parse joke {joke_id}, skipping: {parse_error}")
-      continue
-    jokes_by_id[joke_id] = joke
+  with joke_operations.JokeSearchSyncPipeline() as search_sync:
+    for joke_doc in joke_docs:
+      if not joke_doc.exists:
+        continue
+      joke_data = joke_doc.to_dict() or {}
+      joke_id = cast(str, joke_doc.id)
+      joke_doc_ref = cast(DocumentReference, joke_doc.reference)
+      expected_book_id = book_id_by_joke.get(joke_id)
+      payload, stats_delta = _compute_joke_payload_and_stats(
+        joke_data, run_time_utc, expected_book_id)
+      public_updated += stats_delta["public_updated"]
+      book_id_updated += stats_delta["book_id_updated"]
+      jokes_decayed += stats_delta["jokes_decayed"]
+
+      final_joke_data = {**joke_data, **payload}
+      try:
+        joke = models.PunnyJoke.from_firestore_dict(final_joke_data, joke_id)
+      except Exception as parse_error:
+        logger.warn(f"Failed to parse joke {joke_id}, skipping: {parse_error}")
+        continue
+      jokes_by_id[joke_id] = joke
 
-    # Perform actions based on the final state.
-    if payload:
-      batch.update(joke_doc_ref, payload)
-      writes_in_batch += 1
-    else:
-      jokes_skipped += 1
+      # Perform actions based on the final state.
+      if payload:
+        batch.update(joke_doc_ref, payload)
+        writes_in_batch += 1
+      else:
+        jokes_skipped += 1
 
-    _sync_joke_and_append_if_public(joke_id, joke, public_jokes)
+      _sync_joke_and_append_if_public(joke, public_jokes, search_sync)
 
-    if writes_in_batch >= _MAX_FIRESTORE_WRITE_BATCH_SIZE:
-      logger.info(f"Committing batch of {writes_in_batch} writes")
-      batch.commit()  # pyright: ignore[reportUnusedCallResult]
-      batch = db_client.batch()
-      writes_in_batch = 0
+      if writes_in_batch >= _MAX_FIRESTORE_WRITE_BATCH_SIZE:
+        logger.info(f"Committing batch of {writes_in_batch} writes")
+        batch.commit()  # pyright: ignore[reportUnusedCallResult]
+        batch = db_client.batch()
+        writes_in_batch = 0
 
   if writes_in_batch:
     logger.info(f"Committing final batch of {writes_in_batch} writes")
@@ -598,6 +604,8 @@ def _update_joke_attributes(
     "duplicate_book_jokes": duplicate_book_jokes,
     "jokes_skipped": jokes_skipped,
     "num_public_jokes": len(public_jokes),
+    "search_docs_updated": search_sync.docs_updated,
+    "search_sync_failures": search_sync.failures,
   }, jokes_by_id
 
 
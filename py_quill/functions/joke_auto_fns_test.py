@@ -8,7 +8,7 @@ from typing import cast
 from unittest.mock import MagicMock, Mock
 
 import pytest
-from common import models
+from common import joke_operations, models
 from functions import joke_auto_fns
 from services import amazon, firestore
 
@@ -40,6 +40,7 @@ def _setup_mock_db_and_batch(monkeypatch, docs, book_docs=None):
   def _collection_side_effect(name):
     collection = MagicMock()
     if name == "jokes":
+      collection.select.return_value = collection
       collection.stream.return_value = docs
     elif name == "joke_books":
       collection.stream.return_value = book_docs or []
@@ -59,7 +60,8 @@ def _setup_decay_test_mocks(monkeypatch,
   """Helper to set up common mocks for decay tests."""
   if mock_sync:
     monkeypatch.setattr(
-      'common.joke_operations.sync_joke_to_search_collection', Mock())
+      'common.joke_operations.diff_jokes_against_search_collection',
+      Mock(return_value=[]))
   if mock_update_feed:
     monkeypatch.setattr('functions.joke_auto_fns.firestore.update_joke_feed',
                         Mock())
@@ -790,9 +792,9 @@ class TestDecayRecentJokeStats:
     doc = _create_mock_joke_doc("joke-1", overrides=overrides)
 
     _, mock_batch = _setup_mock_db_and_batch(monkeypatch, [doc])
-    mock_sync = Mock()
+    mock_sync = Mock(return_value=[])
     monkeypatch.setattr(
-      'common.joke_operations.sync_joke_to_search_collection', mock_sync)
+      'common.joke_operations.diff_jokes_against_search_collection', mock_sync)
     monkeypatch.setattr('functions.joke_auto_fns.firestore.update_joke_feed',
                         Mock())
     monkeypatch.setattr(
@@ -814,6 +816,34 @@ class TestDecayRecentJokeStats:
       "last_recent_stats_update_time"] is firestore.SERVER_TIMESTAMP
     mock_sync.assert_called_once()
 
+  def test_scan_reads_field_mask_without_generation_metadata(
+      self, monkeypatch):
+    """The hourly scan projects away generation metadata but keeps the raw
+    recent-stats fields that decay needs."""
+    now_utc = _create_test_datetime()
+    doc = _create_mock_joke_doc("joke-1")
+    mock_db, _ = _setup_mock_db_and_batch(monkeypatch, [doc])
+    collections = {}
+    make_collection = mock_db.collection.side_effect
+
+    def _recording_collection(name):
+      collections[name] = make_collection(name)
+      return collections[name]
+
+    mock_db.collection.side_effect = _recording_collection
+    _setup_decay_test_mocks(monkeypatch)
+
+    _, jokes_by_id = joke_auto_fns._update_joke_attributes(now_utc)
+
+    selected = collections["jokes"].select.call_args.args[0]
+    assert "generation_metadata" not in selected
+    for field_name in ("setup_text", "state", "public_timestamp",
+                       "num_viewed_users_recent", "num_saved_users_recent",
+                       "num_shared_users_recent",
+                       "last_recent_stats_update_time"):
+      assert field_name in selected
+    assert list(jokes_by_id) == ["joke-1"]
+
   def test_skips_when_recently_updated_and_still_syncs(self, monkeypatch):
     """Test that a recently updated joke is skipped for writes but still syncs search."""
     now_utc = _create_test_datetime()
@@ -826,9 +856,9 @@ class TestDecayRecentJokeStats:
 
     _, mock_batch = _setup_mock_db_and_batch(monkeypatch, [doc])
 
-    mock_sync = Mock()
+    mock_sync = Mock(return_value=[])
     monkeypatch.setattr(
-      'common.joke_operations.sync_joke_to_search_collection', mock_sync)
+      'common.joke_operations.diff_jokes_against_search_collection', mock_sync)
     monkeypatch.setattr('functions.joke_auto_fns.firestore.update_joke_feed',
                         Mock())
     monkeypatch.setattr(
@@ -949,7 +979,8 @@ class TestDecayRecentJokeStats:
 
     _, mock_batch = _setup_mock_db_and_batch(monkeypatch, [doc])
     monkeypatch.setattr(
-      'common.joke_operations.sync_joke_to_search_collection', Mock())
+      'common.joke_operations.diff_jokes_against_search_collection',
+      Mock(return_value=[]))
     monkeypatch.setattr('functions.joke_auto_fns.firestore.update_joke_feed',
                         Mock())
     monkeypatch.setattr(
@@ -1151,7 +1182,8 @@ class TestDecayRecentJokeStats:
 
     _, mock_batch = _setup_mock_db_and_batch(monkeypatch, docs)
     monkeypatch.setattr(
-      'common.joke_operations.sync_joke_to_search_collection', Mock())
+      'common.joke_operations.diff_jokes_against_search_collection',
+      Mock(return_value=[]))
     monkeypatch.setattr(
       'common.joke_category_operations.refresh_category_caches',
       Mock(
@@ -1235,7 +1267,8 @@ class TestDecayRecentJokeStats:
 
     _, mock_batch = _setup_mock_db_and_batch(monkeypatch, [doc1, doc2, doc3])
     monkeypatch.setattr(
-      'common.joke_operations.sync_joke_to_search_collection', Mock())
+      'common.joke_operations.diff_jokes_against_search_collection',
+      Mock(return_value=[]))
     monkeypatch.setattr(
       'common.joke_category_operations.refresh_category_caches',
       Mock(
@@ -1345,9 +1378,9 @@ class TestDecayRecentJokeStats:
     doc.to_dict.return_value = full_doc_data
 
     _, mock_batch = _setup_mock_db_and_batch(monkeypatch, [doc])
-    mock_sync = Mock()
+    mock_sync = Mock(return_value=[])
     monkeypatch.setattr(
-      'common.joke_operations.sync_joke_to_search_collection', mock_sync)
+      'common.joke_operations.diff_jokes_against_search_collection', mock_sync)
     monkeypatch.setattr('functions.joke_auto_fns.firestore.update_joke_feed',
                         Mock())
     monkeypatch.setattr(
@@ -1366,14 +1399,11 @@ class TestDecayRecentJokeStats:
     joke_auto_fns._joke_maintenance_internal(now_utc)  # pylint: disable=protected-access
 
     mock_sync.assert_called_once()
-    call_args = mock_sync.call_args
-    joke = call_args.kwargs['joke']
-    new_embedding = call_args.kwargs['new_embedding']
+    [joke] = mock_sync.call_args.args[0]
 
     # Verify joke data
     assert joke.key == "joke1"
     assert joke.is_public == expected_is_public
-    assert new_embedding is None
 
     # Verify fraction if specified
     if expected_fraction is not None:
@@ -1417,9 +1447,9 @@ class TestDecayRecentJokeStats:
     }
 
     _, mock_batch = _setup_mock_db_and_batch(monkeypatch, [doc1, doc2])
-    mock_sync = Mock()
+    mock_sync = Mock(return_value=[])
     monkeypatch.setattr(
-      'common.joke_operations.sync_joke_to_search_collection', mock_sync)
+      'common.joke_operations.diff_jokes_against_search_collection', mock_sync)
     monkeypatch.setattr('functions.joke_auto_fns.firestore.update_joke_feed',
                         Mock())
     monkeypatch.setattr(
@@ -1437,9 +1467,9 @@ class TestDecayRecentJokeStats:
 
     joke_auto_fns._joke_maintenance_internal(now_utc)
 
-    # Verify sync was called for both jokes
-    assert mock_sync.call_count == 2
-    synced_ids = {call.kwargs['joke'].key for call in mock_sync.call_args_list}
+    # Verify both jokes were diffed in a single chunk
+    mock_sync.assert_called_once()
+    synced_ids = {joke.key for joke in mock_sync.call_args.args[0]}
     assert synced_ids == {"joke1", "joke2"}
 
   def test_sync_handles_errors_gracefully(self, monkeypatch):
@@ -1463,9 +1493,10 @@ class TestDecayRecentJokeStats:
     _, mock_batch = _setup_mock_db_and_batch(monkeypatch, [doc])
 
     # Mock sync to raise an exception
+    monkeypatch.setattr('common.joke_operations.logger', Mock())
     mock_sync = Mock(side_effect=Exception("Sync failed"))
     monkeypatch.setattr(
-      'common.joke_operations.sync_joke_to_search_collection', mock_sync)
+      'common.joke_operations.diff_jokes_against_search_collection', mock_sync)
     monkeypatch.setattr('functions.joke_auto_fns.firestore.update_joke_feed',
                         Mock())
     monkeypatch.setattr(
@@ -1484,10 +1515,10 @@ class TestDecayRecentJokeStats:
     # Verify sync was called
     mock_sync.assert_called_once()
     # Verify error was logged by checking the mocked logger
-    mock_logger = joke_auto_fns.logger
+    mock_logger = joke_operations.logger
     mock_logger.warn.assert_called()
     warn_call = str(mock_logger.warn.call_args)
-    assert "Failed to sync joke joke1" in warn_call
+    assert "Failed to sync 1 jokes to search collection" in warn_call
     assert "Sync failed" in warn_call
 
 
@@ -1509,7 +1540,8 @@ class TestBookIdEnsurer:
 
     _, mock_batch = _setup_mock_db_and_batch(monkeypatch, [doc], [book_doc])
     monkeypatch.setattr(
-      'common.joke_operations.sync_joke_to_search_collection', Mock())
+      'common.joke_operations.diff_jokes_against_search_collection',
+      Mock(return_value=[]))
     monkeypatch.setattr('functions.joke_auto_fns.firestore.update_joke_feed',
                         Mock())
     monkeypatch.setattr(
@@ -1540,7 +1572,8 @@ class TestBookIdEnsurer:
 
     _, mock_batch = _setup_mock_db_and_batch(monkeypatch, [doc], [])
     monkeypatch.setattr(
-      'common.joke_operations.sync_joke_to_search_collection', Mock())
+      'common.joke_operations.diff_jokes_against_search_collection',
+      Mock(return_value=[]))
     monkeypatch.setattr('functions.joke_auto_fns.firestore.update_joke_feed',
                         Mock())
     monkeypatch.setattr(
@@ -2,7 +2,8 @@
 
 import json
 import traceback
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
 
 from agents import agents_common, constants
 from agents.endpoints import all_agents
@@ -15,12 +16,15 @@ from functions.function_utils import (AuthError, error_response,
                                       handle_health_check, html_response,
                                       success_response)
 from google.cloud.firestore import FieldFilter
-from google.cloud.firestore_bundle import FirestoreBundle
+from google.cloud.firestore_v1.base_document import DocumentSnapshot
 from google.cloud.firestore_v1.field_path import FieldPath
-from services import cloud_storage, firestore, search
+from services import cloud_storage, firestore, firestore_bundle, search
 
 BUNDLE_SECRET_HEADER = "X-Bundle-Secret"
 
+_MANUAL_TAG_READ_CHUNK_SIZE = 100
+_MANUAL_TAG_MAX_READ_WORKERS = 4
+
 
 @https_fn.on_request(
   memory=options.MemoryOption.GB_4,
@@ -58,48 +62,21 @@ def get_joke_bundle(req: https_fn.Request) -> https_fn.Response:
       return error_response('Unauthorized', req=req, status=403)
 
   try:
-    client = firestore.db()
-    bundle = FirestoreBundle('data-bundle')
-
-    # Feed documents
-    feed_docs = client.collection('joke_feed')\
-      .order_by(FieldPath.document_id())\
-      .stream()
-    for doc in feed_docs:
-      bundle.add_document(doc)
-
-    # Categories and per-category cache docs
-    categories = client.collection('joke_categories')\
-      .order_by(FieldPath.document_id())\
-      .stream()
-    for category in categories:
-      bundle.add_document(category)
-      cache_doc = category.reference.collection('category_jokes').document(
-        'cache').get()
-      if cache_doc.exists:
-        bundle.add_document(cache_doc)
-
-    # Public jokes
-    public_jokes = client.collection('jokes').where(
-      filter=FieldFilter('is_public', '==', True)).stream()
-    for joke_doc in public_jokes:
-      bundle.add_document(joke_doc)
-
-    bundle_bytes = bundle.build()
-
-    gcs_uri = cloud_storage.get_gcs_uri(
-      'snickerdoodle_temp_files',
-      'firestore_bundle',
-      'txt',
+    result = firestore_bundle.build_and_publish_bundle(
+      _iter_joke_bundle_documents(firestore.db()),
+      bundle_id='data-bundle',
     )
-    cloud_storage.upload_bytes_to_gcs(
-      bundle_bytes,
-      gcs_uri,
-      'application/octet-stream',
+    delta_url = (cloud_storage.get_public_url(result.delta_gcs_uri)
+                 if result.delta_gcs_uri else None)
+    return success_response(
+      {
+        'bundle_url': cloud_storage.get_public_url(result.bundle_gcs_uri),
+        'bundle_hash': result.bundle_hash,
+        'delta_url': delta_url,
+        'base_bundle_hash': result.base_bundle_hash,
+      },
+      req=req,
     )
-    bundle_url = cloud_storage.get_public_url(gcs_uri)
-
-    return success_response({'bundle_url': bundle_url}, req=req)
   except Exception as exc:  # pylint: disable=broad-except
     logger.error(f"Failed to build Firestore bundle: {str(exc)}")
     logger.error(traceback.format_exc())
@@ -108,6 +85,33 @@ def get_joke_bundle(req: https_fn.Request) -> https_fn.Response:
                           status=500)
 
 
+def _iter_joke_bundle_documents(client: Any) -> Iterator[DocumentSnapshot]:
+  """Yield the documents of the client data bundle as they are read."""
+  # Feed documents
+  yield from client.collection('joke_feed')\
+    .order_by(FieldPath.document_id())\
+    .stream()
+
+  # Categories, then their per-category cache docs in one batch read
+  categories = list(
+    client.collection('joke_categories')\
+      .order_by(FieldPath.document_id())\
+      .stream())
+  yield from categories
+  cache_refs = [
+    category.reference.collection('category_jokes').document('cache')
+    for category in categories
+  ]
+  if cache_refs:
+    for cache_doc in client.get_all(cache_refs):
+      if cache_doc.exists:
+        yield cache_doc
+
+  # Public jokes
+  yield from client.collection('jokes').where(
+    filter=FieldFilter('is_public', '==', True)).stream()
+
+
 @https_fn.on_request(
   memory=options.MemoryOption.GB_1,
   timeout_sec=1800,
@@ -234,16 +238,18 @@ def _run_manual_season_tag(
     html_table += "</tbody></table>"
     return html_table
 
+  search_results = [result for result in search_results if result.joke_id]
+  jokes_by_id = _get_punny_jokes_by_id(
+    list(dict.fromkeys(result.joke_id for result in search_results)))
+
+  seasonal_updates: dict[str, dict[str, Any]] = {}
   for result in search_results:
     if max_jokes and updated_count >= max_jokes:
       logger.info(f"Reached max_jokes limit of {max_jokes}.")
       break
 
     joke_id = result.joke_id
-    if not joke_id:
-      continue
-
-    joke = firestore.get_punny_joke(joke_id)
+    joke = jokes_by_id.get(joke_id)
     if not joke:
       logger.warn(f"Could not retrieve joke with id: {joke_id}")
       continue
@@ -265,8 +271,7 @@ def _run_manual_season_tag(
         "distance":
         result.vector_distance,
       })
-      if not dry_run:
-        firestore.update_punny_joke(joke_id, {"seasonal": seasonal})
+      seasonal_updates[joke_id] = {"seasonal": seasonal}
       updated_count += 1
     else:
       skipped_jokes.append({
@@ -282,11 +287,17 @@ def _run_manual_season_tag(
         joke.punchline_text,
       })
 
+  failed_ids: list[str] = []
+  if not dry_run:
+    failed_ids = firestore.bulk_update_punny_jokes(seasonal_updates)
+
   # Generate HTML response
   html = "<html><body>"
   html += "<h1>Manual Season Tag Results</h1>"
   html += f"<h2>Dry Run: {dry_run}</h2>"
   html += f"<h2>Updated Jokes ({len(updated_jokes)})</h2>"
+  if failed_ids:
+    html += f"<p>Failed to update: {', '.join(failed_ids)}</p>"
   if updated_jokes:
     # Round distances for display.
     for joke in updated_jokes:
@@ -307,6 +318,20 @@ def _run_manual_season_tag(
   return html
 
 
+def _get_punny_jokes_by_id(joke_ids: list[str]) -> dict[str, models.PunnyJoke]:
+  """Load jokes with concurrent, chunked batch reads, keyed by joke ID."""
+  chunks = [
+    joke_ids[i:i + _MANUAL_TAG_READ_CHUNK_SIZE]
+    for i in range(0, len(joke_ids), _MANUAL_TAG_READ_CHUNK_SIZE)
+  ]
+  if not chunks:
+    return {}
+  with ThreadPoolExecutor(
+      max_workers=min(len(chunks), _MANUAL_TAG_MAX_READ_WORKERS)) as executor:
+    joke_lists = list(executor.map(firestore.get_punny_jokes, chunks))
+  return {joke.key: joke for jokes in joke_lists for joke in jokes if joke.key}
+
+
 @https_fn.on_request(
   memory=options.MemoryOption.GB_1,
   min_instances=1,
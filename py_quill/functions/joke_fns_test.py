@@ -80,13 +80,13 @@ def test_run_manual_season_tag_updates_joke(monkeypatch):
                          "width=1024,format=auto,quality=75/punch.png"),
   )
   monkeypatch.setattr(
-    joke_fns.firestore, "get_punny_joke", lambda joke_id: fetched_joke
-    if joke_id == "j1" else None)
+    joke_fns.firestore, "get_punny_jokes", lambda joke_ids: [fetched_joke]
+    if "j1" in joke_ids else [])
 
   updates = []
   monkeypatch.setattr(
-    joke_fns.firestore, "update_punny_joke",
-    lambda joke_id, payload: updates.append((joke_id, payload)))
+    joke_fns.firestore, "bulk_update_punny_jokes",
+    lambda updates_by_id: updates.extend(updates_by_id.items()) or [])
 
   html_response = joke_fns._run_manual_season_tag(
     query="scarecrow",
@@ -120,13 +120,14 @@ def test_run_manual_season_tag_respects_dry_run(monkeypatch):
 
   monkeypatch.setattr(joke_fns.search, "search_jokes", fake_search)
   monkeypatch.setattr(
-    joke_fns.firestore, "get_punny_joke",
-    lambda joke_id: _manual_tag_joke(joke_id, "Setup", "Punch", None))
+    joke_fns.firestore, "get_punny_jokes", lambda joke_ids: [
+      _manual_tag_joke(joke_id, "Setup", "Punch", None) for joke_id in joke_ids
+    ])
 
   updates = []
   monkeypatch.setattr(
-    joke_fns.firestore, "update_punny_joke",
-    lambda joke_id, payload: updates.append((joke_id, payload)))
+    joke_fns.firestore, "bulk_update_punny_jokes",
+    lambda updates_by_id: updates.extend(updates_by_id.items()) or [])
 
   html_response = joke_fns._run_manual_season_tag(
     query="pumpkin",
@@ -153,13 +154,15 @@ def test_run_manual_season_tag_skips_already_seasonal(monkeypatch):
 
   monkeypatch.setattr(joke_fns.search, "search_jokes", fake_search)
   monkeypatch.setattr(
-    joke_fns.firestore, "get_punny_joke", lambda joke_id: _manual_tag_joke(
-      joke_id, "Ghost joke", "Boo!", target_seasonal))
+    joke_fns.firestore, "get_punny_jokes", lambda joke_ids: [
+      _manual_tag_joke(joke_id, "Ghost joke", "Boo!", target_seasonal)
+      for joke_id in joke_ids
+    ])
 
   updates = []
   monkeypatch.setattr(
-    joke_fns.firestore, "update_punny_joke",
-    lambda joke_id, payload: updates.append((joke_id, payload)))
+    joke_fns.firestore, "bulk_update_punny_jokes",
+    lambda updates_by_id: updates.extend(updates_by_id.items()) or [])
 
   html_response = joke_fns._run_manual_season_tag(
     query="ghost",
@@ -189,14 +192,13 @@ def test_run_manual_season_tag_respects_max_jokes(monkeypatch):
   monkeypatch.setattr(joke_fns.search, "search_jokes",
                       lambda **kwargs: results)  # pylint: disable=unused-argument
 
-  joke_lookup = {j.key: j for j in jokes}
-  monkeypatch.setattr(joke_fns.firestore, "get_punny_joke",
-                      lambda joke_id: joke_lookup.get(joke_id))
+  monkeypatch.setattr(joke_fns.firestore, "get_punny_jokes",
+                      lambda joke_ids: [j for j in jokes if j.key in joke_ids])
 
   updates = []
   monkeypatch.setattr(
-    joke_fns.firestore, "update_punny_joke",
-    lambda joke_id, payload: updates.append((joke_id, payload)))
+    joke_fns.firestore, "bulk_update_punny_jokes",
+    lambda updates_by_id: updates.extend(updates_by_id.items()) or [])
 
   html_response = joke_fns._run_manual_season_tag(
     query="any",
@@ -210,6 +212,55 @@ def test_run_manual_season_tag_respects_max_jokes(monkeypatch):
   assert "Updated Jokes (1)" in html_response
 
 
+def test_run_manual_season_tag_batches_reads_and_writes(monkeypatch):
+  """Search hits are loaded in chunked batch reads and written in one bulk."""
+  target_seasonal = "Halloween"
+  jokes = [
+    _manual_tag_joke(f"j{i}", f"Setup {i}", f"Punch {i}",
+                     target_seasonal if i == 2 else None) for i in range(5)
+  ]
+  results = [_manual_tag_result(joke) for joke in jokes]
+  monkeypatch.setattr(joke_fns.search, "search_jokes",
+                      lambda **kwargs: results)  # pylint: disable=unused-argument
+  monkeypatch.setattr(joke_fns, "_MANUAL_TAG_READ_CHUNK_SIZE", 2)
+
+  read_chunks = []
+
+  def fake_get_punny_jokes(joke_ids):
+    read_chunks.append(list(joke_ids))
+    return [joke for joke in jokes if joke.key in joke_ids]
+
+  monkeypatch.setattr(joke_fns.firestore, "get_punny_jokes",
+                      fake_get_punny_jokes)
+  bulk_calls = []
+
+  def fake_bulk_update(updates_by_id):
+    bulk_calls.append(dict(updates_by_id))
+    return ["j4"]
+
+  monkeypatch.setattr(joke_fns.firestore, "bulk_update_punny_jokes",
+                      fake_bulk_update)
+
+  html_response = joke_fns._run_manual_season_tag(
+    query="spooky",
+    seasonal=target_seasonal,
+    threshold=0.5,
+    dry_run=False,
+    max_jokes=0,
+  )
+
+  assert sorted(read_chunks) == [["j0", "j1"], ["j2", "j3"], ["j4"]]
+  assert bulk_calls == [{
+    joke_id: {
+      "seasonal": target_seasonal
+    }
+    for joke_id in ["j0", "j1", "j3", "j4"]
+  }]
+  assert "Updated Jokes (4)" in html_response
+  assert f"Skipped Jokes (already {target_seasonal}) (1)" in html_response
+  assert "Failed to update: j4" in html_response
+
+
 def test_run_manual_season_tag_handles_no_results(monkeypatch):
   """Manual tagging should handle empty search results gracefully."""
   monkeypatch.setattr(joke_fns.search, "search_jokes", lambda **kwargs: [])  # pylint: disable=unused-argument
@@ -217,8 +268,8 @@ def test_run_manual_season_tag_handles_no_results(monkeypatch):
 
   updates = []
   monkeypatch.setattr(
-    joke_fns.firestore, "update_punny_joke",
-    lambda joke_id, payload: updates.append((joke_id, payload)))
+    joke_fns.firestore, "bulk_update_punny_jokes",
+    lambda updates_by_id: updates.extend(updates_by_id.items()) or [])
 
   html_response = joke_fns._run_manual_season_tag(
     query="nonexistent",
@@ -456,8 +507,9 @@ def _setup_bundle_success(monkeypatch):
   mock_category_doc.exists = True
   mock_cache_doc = Mock()
   mock_cache_doc.exists = True
-  mock_category_doc.reference.collection.return_value.document.return_value.get.return_value = (
-    mock_cache_doc)
+  mock_cache_ref = Mock()
+  mock_category_doc.reference.collection.return_value.document.return_value = (
+    mock_cache_ref)
   mock_joke_doc = Mock()
 
   mock_feed_collection.order_by.return_value.stream.return_value = [
@@ -475,32 +527,31 @@ def _setup_bundle_success(monkeypatch):
     "joke_categories": mock_categories_collection,
     "jokes": mock_jokes_collection,
   }[name]
+  mock_db.get_all.return_value = [mock_cache_doc]
 
-  uploaded = {}
+  built = {}
 
-  def fake_upload_bytes(data, gcs_uri, content_type):
-    uploaded["bytes"] = data
-    uploaded["gcs_uri"] = gcs_uri
-    uploaded["content_type"] = content_type
+  def fake_build_and_publish_bundle(snapshots, *, bundle_id):
+    built["documents"] = list(snapshots)
+    built["bundle_id"] = bundle_id
+    return joke_fns.firestore_bundle.BundleBuildResult(
+      bundle_hash="abc123",
+      bundle_gcs_uri="gs://temp/firestore_bundle/abc123.txt",
+      num_documents=len(built["documents"]),
+      base_bundle_hash="prev456",
+      delta_gcs_uri="gs://temp/firestore_bundle/delta_prev456_abc123.txt",
+    )
 
   monkeypatch.setattr(joke_fns.firestore, "db", lambda: mock_db)
-  monkeypatch.setattr(joke_fns.cloud_storage, "get_gcs_uri",
-                      lambda bucket, base, ext: "gs://temp/bundle.txt")
-  monkeypatch.setattr(joke_fns.cloud_storage, "upload_bytes_to_gcs",
-                      fake_upload_bytes)
+  monkeypatch.setattr(joke_fns.firestore_bundle, "build_and_publish_bundle",
+                      fake_build_and_publish_bundle)
   monkeypatch.setattr(
     joke_fns.cloud_storage, "get_public_url",
     lambda uri: uri.replace("gs://", "https://storage.googleapis.com/"))
 
-  mock_bundle = Mock()
-  mock_bundle.add_document.return_value = mock_bundle
-  mock_bundle.build.return_value = b"bundle-bytes"
-  monkeypatch.setattr(joke_fns, "FirestoreBundle",
-                      lambda name: mock_bundle)  # noqa: ARG005
-
   return (
-    mock_bundle,
-    uploaded,
+    mock_db,
+    built,
     mock_feed_doc,
     mock_category_doc,
     mock_cache_doc,
@@ -512,8 +563,8 @@ def test_get_joke_bundle_success(monkeypatch):
   """Builds bundle, uploads to storage, and returns the public URL."""
   monkeypatch.setattr(joke_fns.utils, "is_emulator", lambda: True)
   (
-    mock_bundle,
-    uploaded,
+    mock_db,
+    built,
     mock_feed_doc,
     mock_category_doc,
     mock_cache_doc,
@@ -524,16 +575,26 @@ def test_get_joke_bundle_success(monkeypatch):
 
   assert resp.status_code == 200
   payload = json.loads(resp.get_data(as_text=True))
-  assert payload["data"][
-    "bundle_url"] == "https://storage.googleapis.com/temp/bundle.txt"
+  assert payload["data"] == {
+    "bundle_url":
+    "https://storage.googleapis.com/temp/firestore_bundle/abc123.txt",
+    "bundle_hash":
+    "abc123",
+    "delta_url": ("https://storage.googleapis.com/temp/firestore_bundle/"
+                  "delta_prev456_abc123.txt"),
+    "base_bundle_hash":
+    "prev456",
+  }
 
-  mock_bundle.add_document.assert_any_call(mock_feed_doc)
-  mock_bundle.add_document.assert_any_call(mock_category_doc)
-  mock_bundle.add_document.assert_any_call(mock_cache_doc)
-  mock_bundle.add_document.assert_any_call(mock_joke_doc)
-  assert uploaded["bytes"] == b"bundle-bytes"
-  assert uploaded["gcs_uri"] == "gs://temp/bundle.txt"
-  assert uploaded["content_type"] == "application/octet-stream"
+  assert built["bundle_id"] == "data-bundle"
+  assert built["documents"] == [
+    mock_feed_doc,
+    mock_category_doc,
+    mock_cache_doc,
+    mock_joke_doc,
+  ]
+  # Category cache docs are fetched in one batch read.
+  mock_db.get_all.assert_called_once()
 
 
 def test_get_joke_bundle_secret_bypasses_admin(monkeypatch):
@@ -544,18 +605,17 @@ def test_get_joke_bundle_secret_bypasses_admin(monkeypatch):
   get_user_id = Mock()
   monkeypatch.setattr(joke_fns, "get_user_id", get_user_id)
 
-  mock_bundle, uploaded, _, _, _, _ = _setup_bundle_success(monkeypatch)
+  _, built, _, _, _, _ = _setup_bundle_success(monkeypatch)
 
   resp = joke_fns.get_joke_bundle(
     DummyReq(method='POST', headers={"X-Bundle-Secret": "secret123"}))
 
   assert resp.status_code == 200
   payload = json.loads(resp.get_data(as_text=True))
-  assert payload["data"][
-    "bundle_url"] == "https://storage.googleapis.com/temp/bundle.txt"
+  assert payload["data"]["bundle_url"] == (
+    "https://storage.googleapis.com/temp/firestore_bundle/abc123.txt")
   get_user_id.assert_not_called()
-  assert uploaded["bytes"] == b"bundle-bytes"
-  assert uploaded["content_type"] == "application/octet-stream"
+  assert len(built["documents"]) == 4
 
 
 def test_get_joke_bundle_secret_mismatch_rejected(monkeypatch):
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import datetime
-from unittest.mock import Mock
+from unittest.mock import ANY, Mock
 
 import pytest
 from common import models
@@ -159,12 +159,17 @@ def test_social_post_creation_process_success(monkeypatch: pytest.MonkeyPatch):
   create_image_mock.assert_called_once_with(
     jokes=jokes,
     block_last_panel=True,
+    image_pool=ANY,
   )
   assert create_4by5_image_mock.call_count == 1
   create_4by5_image_mock.assert_called_with(
     jokes=jokes,
     block_last_panel=True,
+    image_pool=ANY,
   )
+  # Both layouts render from the same downloaded joke images.
+  assert (create_image_mock.call_args.kwargs["image_pool"]
+          is create_4by5_image_mock.call_args.kwargs["image_pool"])
   create_mock.assert_called_once()
   created_arg = create_mock.call_args[0][0]
   assert isinstance(created_arg, models.JokeSocialPost)
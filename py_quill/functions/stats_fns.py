@@ -3,35 +3,14 @@
 import datetime
 import zoneinfo
 
+from common import joke_stats
 from firebase_functions import https_fn, options, scheduler_fn
-from google.cloud.firestore import FieldFilter
 from firebase_functions import logger
 from services import firestore as firestore_service
+from web.utils import stats as stats_utils
 
-
-def _bucket_jokes_viewed(count: int) -> str:
-  """Bucket joke view counts into human-friendly ranges."""
-  safe_count = max(0, count)
-  if safe_count == 0:
-    return "0"
-  if safe_count < 10:
-    return "1-9"
-  if safe_count < 100:
-    lower = (safe_count // 10) * 10
-    upper = lower + 9
-    return f"{lower}-{upper}"
-
-  lower = max(100, (safe_count // 50) * 50)
-  upper = lower + 49
-  return f"{lower}-{upper}"
-
-
-def _to_int(value: object) -> int:
-  """Best-effort conversion to int with fallback to zero."""
-  try:
-    return int(value)
-  except Exception:
-    return 0
+# Stats docs shown on the admin stats charts, including the new one.
+_CHART_STATS_DOCS = 30
 
 
 @https_fn.on_request(
@@ -74,73 +53,37 @@ def joke_stats_calculate(event: scheduler_fn.ScheduledEvent) -> None:
                                          second=0,
                                          microsecond=0)
 
-  # Stats calculation logic
-  now_utc = datetime.datetime.now(datetime.timezone.utc)
-  cutoff_7d = now_utc - datetime.timedelta(hours=168)
-  cutoff_1d = now_utc - datetime.timedelta(hours=24)
-
-  # Query users active in the last 7 days (superset of 1 day)
-  users_query = firestore_service.db().collection("joke_users").where(
-    filter=FieldFilter("last_login_at", ">=", cutoff_7d))
-
-  num_1d_users_by_days_used: dict[str, int] = {}
-  num_1d_users_by_jokes_viewed: dict[str, int] = {}
-  num_7d_users_by_jokes_viewed: dict[str, int] = {}
-  num_7d_users_by_days_used_by_jokes_viewed: dict[str, dict[str, int]] = {}
-
-  for doc in users_query.stream():
-    data = doc.to_dict() or {}
-    last_login = data.get("last_login_at")
-
-    # Ensure last_login is timezone-aware UTC for comparison
-    if isinstance(last_login, datetime.datetime):
-      if last_login.tzinfo is None:
-        last_login = last_login.replace(tzinfo=datetime.timezone.utc)
-      else:
-        last_login = last_login.astimezone(datetime.timezone.utc)
-    else:
-      continue  # Skip invalid dates
-
-    client_days_used = str(_to_int(data.get("client_num_days_used", 0)))
-    client_viewed_bucket = _bucket_jokes_viewed(
-      _to_int(data.get("client_num_viewed", 0)))
-
-    # 7-day stats (already filtered by query, but double check date)
-    if last_login >= cutoff_7d:
-      num_7d_users_by_jokes_viewed[client_viewed_bucket] = (
-        num_7d_users_by_jokes_viewed.get(client_viewed_bucket, 0) + 1)
-
-      # Matrix: Days Used -> Jokes Viewed
-      if client_days_used not in num_7d_users_by_days_used_by_jokes_viewed:
-        num_7d_users_by_days_used_by_jokes_viewed[client_days_used] = {}
-
-      days_map = num_7d_users_by_days_used_by_jokes_viewed[client_days_used]
-      days_map[client_viewed_bucket] = days_map.get(client_viewed_bucket, 0) + 1
-
-    # 1-day stats
-    if last_login >= cutoff_1d:
-      num_1d_users_by_days_used[
-        client_days_used] = num_1d_users_by_days_used.get(client_days_used,
-                                                          0) + 1
-      num_1d_users_by_jokes_viewed[client_viewed_bucket] = (
-        num_1d_users_by_jokes_viewed.get(client_viewed_bucket, 0) + 1)
+  # Daily histograms count each user once per active day and are never
+  # moved between days, so the stats for yesterday do not depend on when
+  # this runs.
+  window_day_ids = [
+    (yesterday_la - datetime.timedelta(days=offset)).strftime("%Y%m%d")
+    for offset in range(joke_stats.ROLLING_WINDOW_DAYS)
+  ]
+  rollups = firestore_service.get_joke_stats_daily_rollups(window_day_ids)
+  yesterday_rollup = rollups.get(doc_id)
+  users_1d = yesterday_rollup.users if yesterday_rollup else {}
+  users_7d = joke_stats.window_users(rollups, window_day_ids)
 
   # Prepare data
   stats_data = {
-    "stats_date":
-    yesterday_start,
-    "created_at":
-    now_la,
-    "num_1d_users_by_days_used":
-    num_1d_users_by_days_used,
-    "num_1d_users_by_jokes_viewed":
-    num_1d_users_by_jokes_viewed,
-    "num_7d_users_by_jokes_viewed":
-    num_7d_users_by_jokes_viewed,
-    "num_7d_users_by_days_used_by_jokes_viewed":
-    num_7d_users_by_days_used_by_jokes_viewed,
+    "stats_date": yesterday_start,
+    "created_at": now_la,
+    "num_1d_users_by_days_used": joke_stats.row_totals(users_1d),
+    "num_1d_users_by_jokes_viewed": joke_stats.column_totals(users_1d),
+    "num_7d_users_by_jokes_viewed": joke_stats.column_totals(users_7d),
+    "num_7d_users_by_days_used_by_jokes_viewed": users_7d,
   }
 
+  # Pre-render the admin charts so the dashboard is a single read.
+  chart_stats = [
+    stats
+    for stats in firestore_service.get_joke_stats_docs(limit=_CHART_STATS_DOCS)
+    if stats.get("id") != doc_id
+  ][-(_CHART_STATS_DOCS - 1):]
+  chart_stats.append({**stats_data, "id": doc_id})
+  stats_data["charts"] = stats_utils.build_stats_chart_data(chart_stats)
+
   # Upsert into Firestore
   firestore_service.db().collection("joke_stats").document(doc_id).set(
     stats_data, merge=True)
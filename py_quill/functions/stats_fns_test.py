@@ -1,35 +1,14 @@
-"""Tests for stats_fns bucketing logic."""
+"""Tests for stats_fns daily stats calculation."""
 import datetime
 
-import pytest
-
+from common import joke_stats
 from functions import stats_fns
 
 
-def test_bucket_jokes_viewed_ranges():
-  """Ensure bucket ranges match the defined spec."""
-  assert stats_fns._bucket_jokes_viewed(0) == "0"
-  assert stats_fns._bucket_jokes_viewed(1) == "1-9"
-  assert stats_fns._bucket_jokes_viewed(9) == "1-9"
-  assert stats_fns._bucket_jokes_viewed(10) == "10-19"
-  assert stats_fns._bucket_jokes_viewed(99) == "90-99"
-  assert stats_fns._bucket_jokes_viewed(100) == "100-149"
-  assert stats_fns._bucket_jokes_viewed(149) == "100-149"
-  assert stats_fns._bucket_jokes_viewed(150) == "150-199"
-
-
-def test_to_int_best_effort():
-  """_to_int should gracefully handle non-numeric input."""
-  assert stats_fns._to_int(5) == 5
-  assert stats_fns._to_int("7") == 7
-  assert stats_fns._to_int(None) == 0
-  assert stats_fns._to_int("abc") == 0
-
-
-def test_bucket_used_in_stats_loop(monkeypatch):
-  """Verify bucketing is applied inside stats calculation."""
-  # Capture writes to Firestore
+def test_joke_stats_calculate_merges_daily_rollups(monkeypatch):
+  """Stats are merged from the last 7 daily histograms with rendered charts."""
   recorded = {}
+  requested_day_ids = []
 
   class _FakeDocRef:
 
@@ -43,71 +22,98 @@ def test_bucket_used_in_stats_loop(monkeypatch):
 
   class _FakeCollection:
 
-    def __init__(self):
-      self._docs = []
-
-    def where(self, filter=None):  # noqa: A002
-      return self
-
-    def stream(self):
-      return self._docs
-
     def document(self, doc_id):
       return _FakeDocRef(doc_id)
 
-  fake_collection = _FakeCollection()
-
   class _FakeFirestore:
 
     def collection(self, name):
-      assert name in {"joke_stats", "joke_users"}
-      return fake_collection
+      assert name == "joke_stats"
+      return _FakeCollection()
+
+  def _fake_rollups(day_ids):
+    requested_day_ids.extend(day_ids)
+    return {
+      # Yesterday, including a user also active on day_ids[4].
+      day_ids[0]:
+      joke_stats.DailyRollup(
+        users={
+          "3": {
+            "1-9": 1,
+            "100-149": 1,
+          },
+        },
+        superseded_users={
+          day_ids[4]: {
+            "2": {
+              "1-9": 1,
+            },
+          },
+        },
+      ),
+      day_ids[4]:
+      joke_stats.DailyRollup(users={
+        "2": {
+          "1-9": 1,
+        },
+        "3": {
+          "1-9": 2,
+        },
+        "1": {
+          "0": 1,
+        },
+      }),
+    }
 
-  # Patch db() to return fake
   monkeypatch.setattr(stats_fns.firestore_service, "db",
                       lambda: _FakeFirestore())
-
-  # Build fake user docs
-  class _FakeDoc:
-
-    def __init__(self, last_login, days_used, viewed):
-      self._data = {
-        "last_login_at": last_login,
-        "client_num_days_used": days_used,
-        "client_num_viewed": viewed,
-      }
-
-    def to_dict(self):
-      return self._data
+  monkeypatch.setattr(stats_fns.firestore_service,
+                      "get_joke_stats_daily_rollups", _fake_rollups)
+  monkeypatch.setattr(
+    stats_fns.firestore_service, "get_joke_stats_docs", lambda limit: [{
+      "id": "20000101",
+      "num_1d_users_by_jokes_viewed": {
+        "1-9": 4
+      },
+    }])
 
   now = datetime.datetime.now(datetime.timezone.utc)
-  yesterday = now - datetime.timedelta(hours=12)
-  # Two users: one with 5 jokes, one with 120 jokes
-  fake_collection._docs = [
-    _FakeDoc(yesterday, 3, 5),
-    _FakeDoc(yesterday, 3, 120),
-  ]
-
-  # Run
   stats_fns.joke_stats_calculate.__wrapped__(
-    stats_fns.scheduler_fn.ScheduledEvent(
-      job_name=None, schedule_time=now))
+    stats_fns.scheduler_fn.ScheduledEvent(job_name=None, schedule_time=now))
+
+  doc_id = recorded["doc_id"]
+  assert requested_day_ids[0] == doc_id
+  assert len(requested_day_ids) == 7
+  assert requested_day_ids == sorted(requested_day_ids, reverse=True)
 
-  assert recorded["doc_id"]  # YYYYMMDD string
   data = recorded["data"]
-  # Buckets should be aggregated into the defined ranges
+  assert data["num_1d_users_by_days_used"] == {"3": 2}
   assert data["num_1d_users_by_jokes_viewed"] == {
     "1-9": 1,
     "100-149": 1,
   }
   assert data["num_7d_users_by_jokes_viewed"] == {
-    "1-9": 1,
+    "0": 1,
+    "1-9": 3,
     "100-149": 1,
   }
-  # Matrix keyed by days used
-  by_days = data["num_7d_users_by_days_used_by_jokes_viewed"]
-  assert by_days["3"] == {
-    "1-9": 1,
-    "100-149": 1,
+  assert data["num_7d_users_by_days_used_by_jokes_viewed"] == {
+    "3": {
+      "1-9": 3,
+      "100-149": 1,
+    },
+    "1": {
+      "0": 1,
+    },
   }
   assert recorded["merge"] is True
+
+  charts = data["charts"]
+  assert charts["dau_data"]["labels"] == ["20000101", doc_id]
+  dau_by_label = {
+    dataset["label"]: dataset["data"]
+    for dataset in charts["dau_data"]["datasets"]
+  }
+  assert dau_by_label["1-9 jokes"] == [4, 1]
+  assert dau_by_label["100-149 jokes"] == [0, 1]
+  assert charts["retention_data"]["labels"] == ["1", "3"]
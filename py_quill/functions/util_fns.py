@@ -1,4 +1,4 @@
-"""Utility cloud functions for Firestore migrations."""
+"""Utility cloud functions for Firestore migrations and backfills."""
 
 from __future__ import annotations
 
@@ -6,7 +6,7 @@ import datetime
 import json
 import tempfile
 import traceback
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import Any, cast
 
 import numpy as np
@@ -16,7 +16,7 @@ from functions.function_utils import get_bool_param, get_int_param, get_param
 from google.cloud.firestore import FieldFilter, Query
 from moviepy.video.io.VideoFileClip import VideoFileClip
 from PIL import Image
-from services import cloud_storage, firestore
+from services import cloud_storage, firestore, search
 from storage import joke_videos_firestore
 
 _DEFAULT_REEL_TELLER_CHARACTER_DEF_ID = "cat_orange_tabby"
@@ -92,6 +92,83 @@ def run_firestore_migration(req: Any) -> Any:
     )
 
 
+@https_fn.on_request(
+  memory=options.MemoryOption.GB_1,
+  timeout_sec=1800,
+)
+def run_embedding_backfill(req: Any) -> Any:
+  """Re-embed joke_search docs whose embedding is missing or stale.
+
+  Query params:
+    model: Embedding model (default: the current search model).
+    output_dimensionality: Embedding size (default: the current search size).
+    page_size: joke_search docs scanned per page (default 200).
+    max_pages: Stop after this many pages (default 0, no limit).
+    start_after: Resume after this joke_search doc id.
+    resume: When start_after is empty, continue from the last checkpoint
+      (default true).
+    dry_run: Only count stale docs (default true).
+  """
+  if req.path == "/__/health":
+    return _https_response("OK", status=200)
+
+  if req.method != "GET":
+    return _https_response(
+      json.dumps({
+        "error": "Only GET requests are supported",
+        "success": False
+      }),
+      status=405,
+      mimetype="application/json",
+    )
+
+  try:
+    model = str(get_param(req, "model", "") or search.EMBEDDING_MODEL)
+    output_dimensionality = get_int_param(req, "output_dimensionality",
+                                          search.EMBEDDING_DIMENSIONALITY)
+    start_after = str(get_param(req, "start_after", "") or "")
+    if not start_after and get_bool_param(req, "resume", True):
+      start_after = search.resume_cursor(model, output_dimensionality) or ""
+
+    result = search.backfill_joke_search_embeddings(
+      model=model,
+      output_dimensionality=output_dimensionality,
+      page_size=get_int_param(req, "page_size", 200),
+      max_pages=get_int_param(req, "max_pages", 0),
+      start_after=start_after or None,
+      dry_run=get_bool_param(req, "dry_run", True),
+    )
+    return _https_response(
+      json.dumps({
+        "success": True,
+        "data": asdict(result),
+      }),
+      status=200,
+      mimetype="application/json",
+    )
+  except ValueError as exc:
+    return _https_response(
+      json.dumps({
+        "success": False,
+        "error": str(exc),
+      }),
+      status=400,
+      mimetype="application/json",
+    )
+  except Exception as exc:  # pylint: disable=broad-except
+    logger.error(f"Embedding backfill failed: {exc}")
+    logger.error(traceback.format_exc())
+    return _https_response(
+      json.dumps({
+        "success": False,
+        "error": str(exc),
+        "message": "Failed to run embedding backfill"
+      }),
+      status=500,
+      mimetype="application/json",
+    )
+
+
 def run_joke_video_backfill_from_social_posts(*, dry_run: bool, limit: int,
                                               start_after: str) -> str:
   """Backfill `joke_videos` documents from existing reel social posts."""
@@ -90,6 +90,7 @@ update_joke_book_files = joke_book_fns.update_joke_book_files
 
 # Export util functions
 run_firestore_migration = util_fns.run_firestore_migration
+run_embedding_backfill = util_fns.run_embedding_backfill
 
 # Export the web functions
 web = web_fns.web
@@ -1617,44 +1617,20 @@ def _decompose_advertised_row_allocations(
           kdp_price_candidates_by_country_asin),
       )
 
-  best_score: tuple[float, int, int, tuple[int, ...]] | None = None
-  best_units_by_index: tuple[int, ...] | None = None
-  best_prices_by_index: tuple[float, ...] | None = None
   advertised_index = next(
     (index for index, variant in enumerate(variants)
      if variant.asin == canonical_advertised_asin),
     0,
   )
-
-  for units_by_index in _enumerate_unit_allocations(normalized_units,
-                                                    len(variants)):
-    active_indices = [
-      index for index, unit_count in enumerate(units_by_index)
-      if unit_count > 0
-    ]
-    if not active_indices:
-      continue
-
-    candidate_prices_by_index = {
-      index: candidate_prices_by_asin[variants[index].asin]
-      for index in active_indices
-    }
-    for prices_by_index in _enumerate_price_combinations(
-        candidate_prices_by_index):
-      base_total_sales = sum(units_by_index[index] * prices_by_index[index]
-                             for index in active_indices)
-      sales_delta_abs = abs(total_sales_usd - base_total_sales)
-      score = (
-        sales_delta_abs,
-        len(active_indices),
-        -units_by_index[advertised_index],
-        units_by_index,
-      )
-      if best_score is None or score < best_score:
-        best_score = score
-        best_units_by_index = units_by_index
-        best_prices_by_index = tuple(
-          prices_by_index.get(index, 0.0) for index in range(len(variants)))
+  best = _best_unit_price_allocation(
+    total_units=normalized_units,
+    candidate_prices_by_index=[
+      candidate_prices_by_asin[variant.asin] for variant in variants
+    ],
+    total_sales_usd=total_sales_usd,
+    preferred_index=advertised_index,
+  )
+  best_units_by_index, best_prices_by_index = best or (None, None)
 
   if best_units_by_index is None or best_prices_by_index is None:
     return [
@@ -1760,50 +1736,149 @@ def _resolve_candidate_prices_for_variant(
   return tuple(sorted(candidate_prices))
 
 
-def _enumerate_unit_allocations(total_units: int,
-                                variant_count: int) -> list[tuple[int, ...]]:
-  """Return all non-negative integer splits that sum to `total_units`."""
-  if variant_count <= 0:
-    return []
-
-  output: list[tuple[int, ...]] = []
-
-  def _recurse(
-    index: int,
-    units_remaining: int,
-    current: list[int],
-  ) -> None:
-    if index == variant_count - 1:
-      output.append(tuple(current + [units_remaining]))
-      return
-    for units_here in range(units_remaining + 1):
-      _recurse(index + 1, units_remaining - units_here, current + [units_here])
-
-  _recurse(0, total_units, [])
-  return output
+def _usd_to_micros(amount_usd: float) -> int:
+  """Convert USD to integer micro-dollars (price candidates' precision)."""
+  return round(amount_usd * 1_000_000)
 
 
-def _enumerate_price_combinations(
-  candidate_prices_by_index: dict[int, tuple[float, ...]],
-) -> list[dict[int, float]]:
-  """Return cartesian combinations of candidate prices by variant index."""
-  indices = sorted(candidate_prices_by_index.keys())
-  if not indices:
-    return [{}]
+def _best_unit_price_allocation(
+  *,
+  total_units: int,
+  candidate_prices_by_index: list[tuple[float, ...]],
+  total_sales_usd: float,
+  preferred_index: int,
+) -> tuple[tuple[int, ...], tuple[float, ...]] | None:
+  """Split units across variants and pick prices to best match total sales.
+
+  Candidates are ranked by, in order: the absolute difference between
+  `total_sales_usd` and the sum of units times price (in micro-dollars), the
+  number of variants with units, the most units on `preferred_index`, the
+  smallest units tuple, and the earliest candidate price per variant.
+
+  Branch and bound over variants in index order. A subtree is skipped once the
+  closest its remaining units could get to the target (each at the cheapest or
+  priciest remaining candidate price) cannot beat the best allocation so far.
+  The last two variants are solved in closed form, since the total is linear
+  in the units given to either one.
+
+  Returns:
+      `(units_by_index, prices_by_index)`, with price 0.0 for variants without
+      units, or None if there are no units or variants.
+  """
+  variant_count = len(candidate_prices_by_index)
+  if variant_count <= 0 or total_units <= 0:
+    return None
 
-  output: list[dict[int, float]] = []
+  candidate_prices = [
+    prices or (0.0, ) for prices in candidate_prices_by_index
+  ]
+  price_micros = [
+    tuple(_usd_to_micros(price) for price in prices)
+    for prices in candidate_prices
+  ]
+  target = _usd_to_micros(total_sales_usd)
+
+  # Cheapest and priciest candidate over variants `index` onwards.
+  min_price_from = [min(prices) for prices in price_micros]
+  max_price_from = [max(prices) for prices in price_micros]
+  for index in range(variant_count - 2, -1, -1):
+    min_price_from[index] = min(min_price_from[index],
+                                min_price_from[index + 1])
+    max_price_from[index] = max(max_price_from[index],
+                                max_price_from[index + 1])
+
+  units = [0] * variant_count
+  positions = [0] * variant_count
+  best: list[tuple[Any, ...]] = []
+
+  def _consider(sales: int, active: int) -> None:
+    score = (
+      abs(target - sales),
+      active,
+      -units[preferred_index],
+      tuple(units),
+      tuple(positions[index] for index in range(variant_count)
+            if units[index] > 0),
+    )
+    if not best or score < best[0]:
+      best[:] = [score]
+
+  def _solve_last_pair(units_left: int, sales: int, active: int) -> None:
+    first, last = variant_count - 2, variant_count - 1
+    for first_position, first_price in enumerate(price_micros[first]):
+      for last_position, last_price in enumerate(price_micros[last]):
+        # total = base + u * slope, for u units on `first`.
+        base = sales + units_left * last_price
+        slope = first_price - last_price
+        if slope == 0:
+          # Every split ties on sales; one variant alone has fewer active.
+          unit_options = {0, units_left}
+        else:
+          nearest = (target - base) // slope
+          unit_options = {
+            min(units_left, max(0, nearest)),
+            min(units_left, max(0, nearest + 1)),
+          }
+        positions[first] = first_position
+        positions[last] = last_position
+        for first_units in sorted(unit_options):
+          units[first] = first_units
+          units[last] = units_left - first_units
+          _consider(
+            base + first_units * slope,
+            active + (first_units > 0) + (first_units < units_left),
+          )
+    units[first] = units[last] = 0
+
+  def _search(index: int, units_left: int, sales: int, active: int) -> None:
+    if best:
+      low = sales + units_left * min_price_from[index]
+      high = sales + units_left * max_price_from[index]
+      preferred_units = (units[preferred_index]
+                         if preferred_index < index else units_left)
+      bound = (
+        max(0, low - target, target - high),
+        active + (units_left > 0),
+        -preferred_units,
+      )
+      if bound > best[0][:3]:
+        return
 
-  def _recurse(position: int, current: dict[int, float]) -> None:
-    if position >= len(indices):
-      output.append(dict(current))
+    if units_left == 0:
+      _consider(sales, active)
+      return
+    if index == variant_count - 1:
+      units[index] = units_left
+      for position, price in enumerate(price_micros[index]):
+        positions[index] = position
+        _consider(sales + units_left * price, active + 1)
+      units[index] = 0
+      return
+    if index == variant_count - 2:
+      _solve_last_pair(units_left, sales, active)
       return
-    index = indices[position]
-    for price in candidate_prices_by_index.get(index, (0.0, )):
-      current[index] = price
-      _recurse(position + 1, current)
 
-  _recurse(0, {})
-  return output
+    for units_here in range(units_left + 1):
+      units[index] = units_here
+      if units_here == 0:
+        _search(index + 1, units_left, sales, active)
+        continue
+      for position, price in enumerate(price_micros[index]):
+        positions[index] = position
+        _search(index + 1, units_left - units_here, sales + units_here * price,
+                active + 1)
+    units[index] = 0
+
+  _search(0, total_units, 0, 0)
+
+  _, _, _, best_units, best_positions = best[0]
+  best_prices = [0.0] * variant_count
+  active_indices = [
+    index for index, unit_count in enumerate(best_units) if unit_count > 0
+  ]
+  for index, position in zip(active_indices, best_positions):
+    best_prices[index] = candidate_prices[index][position]
+  return best_units, tuple(best_prices)
 
 
 def _accumulate_asin_country_totals(
@@ -5,9 +5,12 @@ This file must be sychronized with the spec in `amazon_ads_stats_spec.md`.
 
 from __future__ import annotations
 
+import contextlib
 import datetime
+import time
 from collections import deque
 from dataclasses import dataclass
+from typing import Iterator
 
 from common import book_defs, models
 from firebase_functions import logger
@@ -39,7 +42,12 @@ def reconcile_daily_sales(
   earliest_changed_date: datetime.date,
   run_time_utc: datetime.datetime | None = None,
 ) -> dict[str, object]:
-  """Recompute reconciled daily stats from a rolling 14-day lookback start."""
+  """Recompute reconciled daily stats from a rolling 14-day lookback start.
+
+  Days before the lookback start are never recomputed: their stored docs are
+  checkpoints whose ending unmatched lots seed the run. Only recomputed days
+  whose rounded output differs from the stored doc are written.
+  """
   if run_time_utc is None:
     run_time_utc = datetime.datetime.now(datetime.timezone.utc)
   elif run_time_utc.tzinfo is None:
@@ -47,10 +55,12 @@ def reconcile_daily_sales(
   else:
     run_time_utc = run_time_utc.astimezone(datetime.timezone.utc)
 
-  ads_bounds = _get_collection_date_bounds(
-    firestore.AMAZON_ADS_DAILY_STATS_COLLECTION)
-  kdp_bounds = _get_collection_date_bounds(
-    firestore.AMAZON_KDP_DAILY_STATS_COLLECTION)
+  timings_sec: dict[str, float] = {}
+  with _timed_phase(timings_sec, "load_bounds"):
+    ads_bounds = _get_collection_date_bounds(
+      firestore.AMAZON_ADS_DAILY_STATS_COLLECTION)
+    kdp_bounds = _get_collection_date_bounds(
+      firestore.AMAZON_KDP_DAILY_STATS_COLLECTION)
   if ads_bounds is None or kdp_bounds is None:
     logger.info(
       "Skipping sales reconciliation: missing ads or KDP source data.")
@@ -69,79 +79,116 @@ def reconcile_daily_sales(
     earliest_changed_date - datetime.timedelta(days=_MATCH_LOOKBACK_DAYS),
     earliest_raw_date,
   )
-  seed_date = start_date - datetime.timedelta(days=1)
-  lots_by_key = _load_seed_lots(seed_date)
-  seeded_from_previous_day = lots_by_key is not None
-  if lots_by_key is None:
-    start_date = earliest_raw_date
-    lots_by_key = {}
+  with _timed_phase(timings_sec, "load_seed"):
+    seed_date = start_date - datetime.timedelta(days=1)
+    lots_by_key = _load_seed_lots(seed_date)
+    seeded_from_previous_day = lots_by_key is not None
+    if lots_by_key is None:
+      checkpoint = _load_nearest_checkpoint(
+        seed_date,
+        earliest_raw_date=earliest_raw_date,
+      )
+      if checkpoint is None:
+        seed_date = None
+        start_date = earliest_raw_date
+        lots_by_key = {}
+      else:
+        seed_date, lots_by_key = checkpoint
+        start_date = seed_date + datetime.timedelta(days=1)
 
   end_date = max(ads_max_date, kdp_max_date)
-  ads_rows = firestore.list_amazon_ads_daily_stats(
-    start_date=start_date,
-    end_date=end_date,
-  )
-  kdp_rows = firestore.list_amazon_kdp_daily_stats(
-    start_date=start_date,
-    end_date=end_date,
-  )
+  with _timed_phase(timings_sec, "load_sources"):
+    ads_rows = firestore.list_amazon_ads_daily_stats(
+      start_date=start_date,
+      end_date=end_date,
+    )
+    kdp_rows = firestore.list_amazon_kdp_daily_stats(
+      start_date=start_date,
+      end_date=end_date,
+    )
   ads_by_date = {row.date: row for row in ads_rows}
   kdp_by_date = {row.date: row for row in kdp_rows}
 
   settled_through_date = latest_common_source_date - datetime.timedelta(
     days=_MATCH_LOOKBACK_DAYS)
-  docs_by_date = _initialize_docs_by_date(
-    start_date=start_date,
-    end_date=end_date,
-    settled_through_date=settled_through_date,
-    run_time_utc=run_time_utc,
-  )
+  with _timed_phase(timings_sec, "reconcile"):
+    docs_by_date = _initialize_docs_by_date(
+      start_date=start_date,
+      end_date=end_date,
+      settled_through_date=settled_through_date,
+      run_time_utc=run_time_utc,
+    )
+
+    current_date = start_date
+    while current_date <= end_date:
+      expired_lots = _prune_expired_lots(lots_by_key, current_date)
+      _record_unmatched_click_date_lots(
+        expired_lots,
+        docs_by_date=docs_by_date,
+      )
+      _append_ads_lots_for_day(
+        current_date=current_date,
+        ads_stat=ads_by_date.get(current_date),
+        lots_by_key=lots_by_key,
+      )
+      _apply_kdp_reconciliation_for_day(
+        current_date=current_date,
+        kdp_stat=kdp_by_date.get(current_date),
+        lots_by_key=lots_by_key,
+        docs_by_date=docs_by_date,
+      )
+      docs_by_date[
+        current_date].zzz_ending_unmatched_ads_lots_by_asin_country = (
+          _snapshot_lots(lots_by_key))
+      current_date += datetime.timedelta(days=1)
 
-  current_date = start_date
-  while current_date <= end_date:
-    expired_lots = _prune_expired_lots(lots_by_key, current_date)
     _record_unmatched_click_date_lots(
-      expired_lots,
+      _flatten_lots(lots_by_key),
       docs_by_date=docs_by_date,
     )
-    _append_ads_lots_for_day(
-      current_date=current_date,
-      ads_stat=ads_by_date.get(current_date),
-      lots_by_key=lots_by_key,
-    )
-    _apply_kdp_reconciliation_for_day(
-      current_date=current_date,
-      kdp_stat=kdp_by_date.get(current_date),
-      lots_by_key=lots_by_key,
-      docs_by_date=docs_by_date,
+    _round_docs(docs_by_date)
+    reconciled_docs = [
+      docs_by_date[date_value] for date_value in sorted(docs_by_date.keys())
+    ]
+
+  with _timed_phase(timings_sec, "diff"):
+    changed_docs = _changed_reconciled_docs(
+      reconciled_docs,
+      _load_existing_reconciled_docs(start_date=start_date, end_date=end_date),
     )
-    docs_by_date[
-      current_date].zzz_ending_unmatched_ads_lots_by_asin_country = (
-        _snapshot_lots(lots_by_key))
-    current_date += datetime.timedelta(days=1)
-
-  _record_unmatched_click_date_lots(
-    _flatten_lots(lots_by_key),
-    docs_by_date=docs_by_date,
-  )
-  _round_docs(docs_by_date)
-  reconciled_docs = [
-    docs_by_date[date_value] for date_value in sorted(docs_by_date.keys())
-  ]
-  _upsert_reconciled_docs(reconciled_docs)
+  with _timed_phase(timings_sec, "write"):
+    if changed_docs:
+      _upsert_reconciled_docs(changed_docs)
 
   stats: dict[str, object] = {
     "reconciled_days": len(reconciled_docs),
+    "written_days": len(changed_docs),
+    "unchanged_days": len(reconciled_docs) - len(changed_docs),
     "reconciled_start_date": start_date.isoformat(),
     "reconciled_end_date": end_date.isoformat(),
     "earliest_changed_date": earliest_changed_date.isoformat(),
     "seeded_from_previous_day": seeded_from_previous_day,
+    "seed_date": seed_date.isoformat() if seed_date else None,
     "settled_through_date": settled_through_date.isoformat(),
+    "timings_sec": timings_sec,
   }
   logger.info(f"Sales reconciliation completed: {stats}")
   return stats
 
 
+@contextlib.contextmanager
+def _timed_phase(
+  timings_sec: dict[str, float],
+  phase: str,
+) -> Iterator[None]:
+  """Record the wall time of one reconciliation phase in seconds."""
+  start_time = time.perf_counter()
+  try:
+    yield
+  finally:
+    timings_sec[phase] = round(time.perf_counter() - start_time, 3)
+
+
 def _get_collection_date_bounds(
   collection_name: str, ) -> tuple[datetime.date, datetime.date] | None:
   """Return `(min_date, max_date)` for a date-keyed Firestore collection."""
@@ -175,6 +222,31 @@ def _load_seed_lots(
   daily_stat = firestore.get_amazon_sales_reconciled_daily_stat(seed_date)
   if daily_stat is None:
     return None
+  return _lots_from_reconciled_doc(daily_stat)
+
+
+def _load_nearest_checkpoint(
+  seed_date: datetime.date,
+  *,
+  earliest_raw_date: datetime.date,
+) -> tuple[datetime.date, dict[
+    _AsinCountryKey, deque[models.AmazonSalesReconciledAdsLot]]] | None:
+  """Load ending lots from the latest reconciled day before `seed_date`.
+
+  A day's ending lots only depend on source data up to that day, so any
+  earlier stored day can seed the run instead of replaying all history.
+  """
+  daily_stat = firestore.get_latest_amazon_sales_reconciled_daily_stat(
+    on_or_before=seed_date)
+  if daily_stat is None or daily_stat.date < earliest_raw_date:
+    return None
+  return daily_stat.date, _lots_from_reconciled_doc(daily_stat)
+
+
+def _lots_from_reconciled_doc(
+  daily_stat: models.AmazonSalesReconciledDailyStats,
+) -> dict[_AsinCountryKey, deque[models.AmazonSalesReconciledAdsLot]]:
+  """Copy a reconciled doc's ending unmatched lots into working queues."""
   output: dict[_AsinCountryKey, deque[models.AmazonSalesReconciledAdsLot]] = {}
   for asin, country_map in (
       daily_stat.zzz_ending_unmatched_ads_lots_by_asin_country.items()):
@@ -634,6 +706,46 @@ def _snapshot_lots(
   return output
 
 
+def _load_existing_reconciled_docs(
+  *,
+  start_date: datetime.date,
+  end_date: datetime.date,
+) -> dict[datetime.date, models.AmazonSalesReconciledDailyStats]:
+  """Load the stored reconciled docs for the recompute range by date."""
+  return {
+    daily_stat.date: daily_stat
+    for daily_stat in firestore.list_amazon_sales_reconciled_daily_stats(
+      start_date=start_date,
+      end_date=end_date,
+    )
+  }
+
+
+def _changed_reconciled_docs(
+  docs: list[models.AmazonSalesReconciledDailyStats],
+  existing_by_date: dict[datetime.date,
+                         models.AmazonSalesReconciledDailyStats],
+) -> list[models.AmazonSalesReconciledDailyStats]:
+  """Return docs whose payload differs from the stored one.
+
+  `reconciled_at` is ignored, so a day is only rewritten when its rounded
+  output (or settled flag) changes.
+  """
+
+  def _comparable(
+    daily_stat: models.AmazonSalesReconciledDailyStats, ) -> dict[str, object]:
+    payload = daily_stat.to_dict(include_key=False)
+    payload.pop("reconciled_at", None)
+    return payload
+
+  changed: list[models.AmazonSalesReconciledDailyStats] = []
+  for doc in docs:
+    existing = existing_by_date.get(doc.date)
+    if existing is None or _comparable(existing) != _comparable(doc):
+      changed.append(doc)
+  return changed
+
+
 def _upsert_reconciled_docs(
   docs: list[models.AmazonSalesReconciledDailyStats], ) -> None:
   """Upsert reconciled daily docs in Firestore batches."""
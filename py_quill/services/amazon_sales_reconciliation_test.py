@@ -5,11 +5,26 @@ from __future__ import annotations
 import datetime
 from collections import deque
 
+import pytest
 from common import models
 from services import amazon_sales_reconciliation
 from services import firestore
 
 
+@pytest.fixture(autouse=True)
+def _stub_stored_reconciled_docs(monkeypatch):
+  monkeypatch.setattr(
+    amazon_sales_reconciliation,
+    "_load_existing_reconciled_docs",
+    lambda *, start_date, end_date: {},
+  )
+  monkeypatch.setattr(
+    firestore,
+    "get_latest_amazon_sales_reconciled_daily_stat",
+    lambda *, on_or_before: None,
+  )
+
+
 def _build_ads_daily_stat(
   date_value: datetime.date,
   *,
@@ -524,3 +539,161 @@ def test_reconcile_daily_sales_does_not_cross_match_countries(monkeypatch):
   assert click_day.by_asin_country[asin]["US"].ads_click_date_units == 0
   assert click_day.by_asin_country[asin][
     "US"].unmatched_ads_click_date_units == 1
+
+
+def _install_sources(monkeypatch, *, asin, kdp_sales_usd, requested_ranges):
+  """Install bounds and source rows for a short Jan 2026 history."""
+
+  def _bounds(collection_name: str):
+    del collection_name
+    return (datetime.date(2026, 1, 1), datetime.date(2026, 1, 20))
+
+  monkeypatch.setattr(
+    amazon_sales_reconciliation,
+    "_get_collection_date_bounds",
+    _bounds,
+  )
+  monkeypatch.setattr(
+    firestore,
+    "list_amazon_ads_daily_stats",
+    lambda *, start_date, end_date: requested_ranges.append(
+      (start_date, end_date)) or [
+        _build_ads_daily_stat(datetime.date(2026, 1, 8), asin=asin, units=1),
+      ],
+  )
+  monkeypatch.setattr(
+    firestore,
+    "list_amazon_kdp_daily_stats",
+    lambda *, start_date, end_date: [
+      _build_kdp_daily_stat(
+        datetime.date(2026, 1, 10),
+        asin=asin,
+        units=1,
+        sales_usd=kdp_sales_usd,
+        royalty_usd=4.0,
+        print_cost_usd=2.0,
+      ),
+    ],
+  )
+
+
+def test_reconcile_daily_sales_seeds_from_nearest_checkpoint(monkeypatch):
+  asin = "B0G9765J19"
+  requested_ranges: list[tuple[datetime.date, datetime.date]] = []
+  _install_sources(monkeypatch,
+                   asin=asin,
+                   kdp_sales_usd=10.0,
+                   requested_ranges=requested_ranges)
+  monkeypatch.setattr(
+    amazon_sales_reconciliation,
+    "_load_seed_lots",
+    lambda seed_date: None,
+  )
+  checkpoint_requests = []
+
+  def _latest(*, on_or_before):
+    checkpoint_requests.append(on_or_before)
+    return models.AmazonSalesReconciledDailyStats(
+      date=datetime.date(2026, 1, 3),
+      zzz_ending_unmatched_ads_lots_by_asin_country={
+        asin: {
+          "US": [
+            models.AmazonSalesReconciledAdsLot(
+              purchase_date=datetime.date(2026, 1, 2),
+              units_remaining=1,
+            ),
+          ],
+        },
+      },
+    )
+
+  monkeypatch.setattr(firestore,
+                      "get_latest_amazon_sales_reconciled_daily_stat", _latest)
+  captured_docs: list[models.AmazonSalesReconciledDailyStats] = []
+  monkeypatch.setattr(
+    amazon_sales_reconciliation,
+    "_upsert_reconciled_docs",
+    lambda docs: captured_docs.extend(docs),
+  )
+
+  stats = amazon_sales_reconciliation.reconcile_daily_sales(
+    earliest_changed_date=datetime.date(2026, 1, 20))
+
+  assert checkpoint_requests == [datetime.date(2026, 1, 5)]
+  assert stats["seeded_from_previous_day"] is False
+  assert stats["seed_date"] == "2026-01-03"
+  assert stats["reconciled_start_date"] == "2026-01-04"
+  assert requested_ranges == [
+    (datetime.date(2026, 1, 4), datetime.date(2026, 1, 20)),
+  ]
+
+  # The checkpoint's Jan 2 lot is matched before the Jan 8 lot.
+  by_date = {doc.date.isoformat(): doc for doc in captured_docs}
+  assert by_date["2026-01-10"].by_asin_country[asin][
+    "US"].ads_ship_date_units == 1
+  assert by_date["2026-01-08"].unmatched_ads_click_date_units_total == 1
+  assert "2026-01-02" not in by_date
+
+
+def test_reconcile_daily_sales_skips_unchanged_days(monkeypatch):
+  asin = "B0G9765J19"
+  _install_sources(monkeypatch,
+                   asin=asin,
+                   kdp_sales_usd=10.0,
+                   requested_ranges=[])
+  monkeypatch.setattr(
+    amazon_sales_reconciliation,
+    "_load_seed_lots",
+    lambda seed_date: {},
+  )
+  stored: dict[datetime.date, models.AmazonSalesReconciledDailyStats] = {}
+  written: list[list[str]] = []
+
+  def _upsert(docs):
+    written.append([doc.date.isoformat() for doc in docs])
+    for doc in docs:
+      stored[doc.date] = (
+        models.AmazonSalesReconciledDailyStats.from_firestore_dict(
+          doc.to_dict(), key=doc.date.isoformat()))
+
+  monkeypatch.setattr(amazon_sales_reconciliation, "_upsert_reconciled_docs",
+                      _upsert)
+  monkeypatch.setattr(
+    amazon_sales_reconciliation,
+    "_load_existing_reconciled_docs",
+    lambda *, start_date, end_date: {
+      date_value: doc
+      for date_value, doc in stored.items()
+      if start_date <= date_value <= end_date
+    },
+  )
+
+  first = amazon_sales_reconciliation.reconcile_daily_sales(
+    earliest_changed_date=datetime.date(2026, 1, 1),
+    run_time_utc=datetime.datetime(2026, 1, 21),
+  )
+  assert first["written_days"] == 20
+  assert set(first["timings_sec"]) == {
+    "load_bounds", "load_seed", "load_sources", "reconcile", "diff", "write"
+  }
+
+  # Same sources at a later run time: nothing to write.
+  second = amazon_sales_reconciliation.reconcile_daily_sales(
+    earliest_changed_date=datetime.date(2026, 1, 1),
+    run_time_utc=datetime.datetime(2026, 1, 22),
+  )
+  assert second["reconciled_days"] == 20
+  assert second["written_days"] == 0
+  assert len(written) == 1
+
+  # A changed KDP sale rewrites only its ship and click dates.
+  _install_sources(monkeypatch,
+                   asin=asin,
+                   kdp_sales_usd=12.0,
+                   requested_ranges=[])
+  third = amazon_sales_reconciliation.reconcile_daily_sales(
+    earliest_changed_date=datetime.date(2026, 1, 1),
+    run_time_utc=datetime.datetime(2026, 1, 23),
+  )
+  assert third["written_days"] == 2
+  assert written[-1] == ["2026-01-08", "2026-01-10"]
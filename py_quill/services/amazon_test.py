@@ -4,7 +4,10 @@ from __future__ import annotations
 
 import datetime
 import gzip
+import itertools
 import json
+import random
+import sys
 
 import pytest
 from common import models
@@ -1691,3 +1694,118 @@ def test_get_ads_stats_context_uses_latest_available_reports(monkeypatch):
     "profile-1",
     models.AmazonAdsReportKey.SP_CAMPAIGNS_PLACEMENT,
   )].report_id == "placement-id"
+
+
+def _exhaustive_unit_price_allocation(total_units, candidate_prices,
+                                      total_sales_usd, preferred_index):
+  """Reference search over every unit split and price combination."""
+  best = None
+  target = round(total_sales_usd * 1_000_000)
+  for units in itertools.product(range(total_units + 1),
+                                 repeat=len(candidate_prices)):
+    if sum(units) != total_units:
+      continue
+    active = [index for index, count in enumerate(units) if count > 0]
+    for positions in itertools.product(
+        *[range(len(candidate_prices[index])) for index in active]):
+      prices = [0.0] * len(units)
+      for index, position in zip(active, positions):
+        prices[index] = candidate_prices[index][position]
+      sales = sum(units[index] * round(prices[index] * 1_000_000)
+                  for index in active)
+      score = (abs(target - sales), len(active), -units[preferred_index],
+               units, positions)
+      if best is None or score < best[0]:
+        best = (score, units, tuple(prices))
+  return best[1], best[2]
+
+
+def test_best_unit_price_allocation_matches_exhaustive_search():
+  rng = random.Random(7)
+  price_pool = [0.0, 2.99, 4.99, 5.0, 7.5, 9.99, 11.99, 14.99]
+  for _ in range(300):
+    variant_count = rng.randint(1, 4)
+    total_units = rng.randint(1, 6)
+    candidate_prices = [
+      tuple(sorted(rng.sample(price_pool, rng.randint(1, 3))))
+      for _ in range(variant_count)
+    ]
+    if rng.random() < 0.5:
+      total_sales_usd = sum(
+        rng.choice(candidate_prices[rng.randrange(variant_count)])
+        for _ in range(total_units))
+    else:
+      total_sales_usd = round(rng.uniform(0, 80), 2)
+    preferred_index = rng.randrange(variant_count)
+
+    assert amazon._best_unit_price_allocation(
+      total_units=total_units,
+      candidate_prices_by_index=candidate_prices,
+      total_sales_usd=total_sales_usd,
+      preferred_index=preferred_index,
+    ) == _exhaustive_unit_price_allocation(total_units, candidate_prices,
+                                           total_sales_usd, preferred_index)
+
+
+def test_best_unit_price_allocation_prefers_fewer_variants_on_ties():
+  # 2 x 4.99 == 1 x 9.98: the single-variant split wins the tie.
+  assert amazon._best_unit_price_allocation(
+    total_units=2,
+    candidate_prices_by_index=[(4.99, ), (9.98, )],
+    total_sales_usd=9.98,
+    preferred_index=1,
+  ) == ((2, 0), (4.99, 0.0))
+  # Equal prices: all units go to the preferred variant.
+  assert amazon._best_unit_price_allocation(
+    total_units=5,
+    candidate_prices_by_index=[(9.99, ), (9.99, )],
+    total_sales_usd=49.95,
+    preferred_index=1,
+  ) == ((0, 5), (0.0, 9.99))
+  assert amazon._best_unit_price_allocation(
+    total_units=0,
+    candidate_prices_by_index=[(9.99, )],
+    total_sales_usd=0.0,
+    preferred_index=0,
+  ) is None
+
+
+def test_best_unit_price_allocation_search_is_bounded():
+  """The search explores far fewer nodes than exhaustive enumeration.
+
+  Enumerating every split and price for (3, 2000) alone is ~54M candidates.
+  Nodes are counted by profiling calls to the search's inner functions.
+  """
+  prices = (2.99, 4.99, 9.99)
+  max_nodes_by_case = {
+    (2, 10_000): 10,
+    (3, 250): 2_500,
+    (3, 1_000): 10_000,
+    (3, 2_000): 20_000,
+    (4, 40): 20_000,
+  }
+  node_names = {"_search", "_solve_last_pair"}
+  nodes_by_case = {}
+  for (variant_count, total_units) in max_nodes_by_case:
+    nodes = 0
+
+    def _count_nodes(frame, event, _):
+      nonlocal nodes
+      if event == "call" and frame.f_code.co_name in node_names:
+        nodes += 1
+
+    sys.setprofile(_count_nodes)
+    try:
+      units, _ = amazon._best_unit_price_allocation(
+        total_units=total_units,
+        candidate_prices_by_index=[prices] * variant_count,
+        total_sales_usd=total_units * 7.123,
+        preferred_index=0,
+      )
+    finally:
+      sys.setprofile(None)
+    nodes_by_case[(variant_count, total_units)] = nodes
+    assert sum(units) == total_units
+
+  assert all(nodes_by_case[case] <= max_nodes
+             for case, max_nodes in max_nodes_by_case.items()), nodes_by_case
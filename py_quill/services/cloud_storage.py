@@ -256,6 +256,17 @@ def get_audio_gcs_uri(file_name_base: str,
   return get_gcs_uri(bucket, f"audio/{file_name_base}", extension)
 
 
+def get_audio_artifact_gcs_uri(artifact_key: str, name: str,
+                               extension: str) -> str:
+  """Get a deterministic GCS URI for a content-addressed audio artifact.
+
+  Unlike `get_audio_gcs_uri`, no timestamp is appended: the same artifact key
+  always maps to the same object.
+  """
+  return (f"gs://{config.PUBLIC_FILE_BUCKET_NAME}/audio/artifacts/"
+          f"{artifact_key}/{name}.{extension}")
+
+
 def get_video_gcs_uri(file_name_base: str,
                       extension: str,
                       temp: bool = False) -> str:
@@ -1,23 +1,39 @@
 """Firestore operations."""
 
+import atexit
+import bisect
+import dataclasses
 import datetime
+import hashlib
+import json
+import os
 import pprint
-from typing import Any, Collection
+import signal
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Collection, Iterator
 from zoneinfo import ZoneInfo
 
-from common import models, posable_character_sequence, utils
+from common import joke_stats, models, posable_character_sequence, utils
 from firebase_admin import firestore, firestore_async
 from firebase_functions import logger
 from google.cloud.firestore import (SERVER_TIMESTAMP, AsyncClient, Client,
-                                    DocumentReference, FieldFilter, Query,
-                                    Transaction, transactional)
+                                    DocumentReference, FieldFilter, Increment,
+                                    Query, Transaction, transactional)
 from google.cloud.firestore_v1.field_path import FieldPath
+from google.rpc import code_pb2
 
 _db: Client | None = None  # pylint: disable=invalid-name
 _async_db: AsyncClient | None = None  # pylint: disable=invalid-name
 
 OPERATION = "_operation"
 OPERATION_TIMESTAMP = "_operation_timestamp"
+# Append-only subcollection (one document per entry) holding the operations log
+# of a joke or social post. Supersedes the `metadata/operations` array doc.
+OPERATIONS_LOG_COLLECTION = "operations_log"
 JOKE_FIELDS_TO_LOG = {
   # Main text fields
   "setup_text",
@@ -61,6 +77,59 @@ AMAZON_KDP_DAILY_STATS_COLLECTION = "amazon_kdp_daily_stats"
 AMAZON_SALES_RECONCILED_DAILY_STATS_COLLECTION = (
   "amazon_sales_reconciled_daily_stats")
 
+# Firestore field masks for bulk joke reads. Every mask includes the joke text
+# because `PunnyJoke` requires it; fields missing from a mask are left at their
+# model defaults.
+JOKE_TEXT_FIELDS: tuple[str, ...] = ("setup_text", "punchline_text")
+"""Only the joke text, e.g. for prompt context."""
+
+JOKE_TILE_FIELDS: tuple[str, ...] = (
+  *JOKE_TEXT_FIELDS,
+  "setup_image_url",
+  "seasonal",
+  "tags",
+  "num_saved_users_fraction",
+)
+"""What an admin thumbnail tile shows and sorts by."""
+
+JOKE_SCAN_FIELDS: tuple[str, ...] = tuple(
+  sorted(
+    models.dataclass_field_names(models.PunnyJoke) -
+    {"key", "generation_metadata"}))
+"""Every `PunnyJoke` field except the (large) generation metadata."""
+
+# `/usage` pings are write-behind: the day-bucket transaction only runs when a
+# user's day index may have changed; otherwise client counters are coalesced
+# in memory and flushed in batches.
+_JOKE_USER_USAGE_MAX_CACHED_USERS = 10_000
+_JOKE_USER_USAGE_FLUSH_MAX_USERS = 200
+_JOKE_USER_USAGE_FLUSH_INTERVAL_SECONDS = 30.0
+_JOKE_USER_USAGE_MAX_WRITE_ATTEMPTS = 3
+
+# Daily joke_users histograms (see `common.joke_stats`) per Los Angeles date
+# (YYYYMMDD), maintained by the usage transaction. Each day is split into
+# shard docs `joke_stats_daily/{day}/shards/{n}` chosen by user ID, so usage
+# transactions do not all write one document; readers sum the shards.
+JOKE_STATS_DAILY_COLLECTION = "joke_stats_daily"
+JOKE_STATS_DAILY_SHARDS_COLLECTION = "shards"
+JOKE_STATS_DAILY_NUM_SHARDS = 16
+JOKE_STATS_DAILY_USERS_FIELD = "num_users_by_days_used_by_jokes_viewed"
+JOKE_STATS_DAILY_SUPERSEDED_USERS_FIELD = (
+  "superseded_num_users_by_days_used_by_jokes_viewed")
+_JOKE_STATS_TIMEZONE = ZoneInfo("America/Los_Angeles")
+# Fields of joke_users docs that key their daily histogram entry.
+_JOKE_STATS_COUNT_FIELDS = ('client_num_days_used', 'client_num_viewed')
+
+_JOKE_FEED_CHUNK_SIZE = 50
+
+_BULK_JOKE_UPDATE_CHUNK_SIZE = 200
+_BULK_JOKE_UPDATE_MAX_WRITE_ATTEMPTS = 3
+
+# In-process joke feed cache: ~50 jokes per chunk, so 64 chunks bounds memory
+# to a few thousand decoded jokes per instance.
+_JOKE_FEED_CACHE_MAX_CHUNKS = 64
+_JOKE_FEED_BUILD_CHECK_INTERVAL_SECONDS = 60.0
+
 
 def get_async_db() -> AsyncClient:
   """Get the firestore async client."""
@@ -313,6 +382,26 @@ def get_amazon_sales_reconciled_daily_stat(
   )
 
 
+def get_latest_amazon_sales_reconciled_daily_stat(
+  *,
+  on_or_before: datetime.date,
+) -> models.AmazonSalesReconciledDailyStats | None:
+  """Return the latest reconciled daily stats document on or before a date."""
+  docs = db().collection(AMAZON_SALES_RECONCILED_DAILY_STATS_COLLECTION).where(
+    filter=FieldFilter("date", "<=", on_or_before.isoformat())).order_by(
+      "date",
+      direction=Query.DESCENDING,
+    ).limit(1).stream()
+  for doc in docs:
+    data = doc.to_dict()
+    if isinstance(data, dict):
+      return models.AmazonSalesReconciledDailyStats.from_firestore_dict(
+        data,
+        key=doc.id,
+      )
+  return None
+
+
 def list_amazon_sales_reconciled_daily_stats(
   *,
   start_date: datetime.date,
@@ -366,9 +455,13 @@ def _prepare_jokes_query(
   states: list[models.JokeState] | None,
   *,
   category_id: str | None = None,
+  field_paths: Collection[str] | None = None,
   async_mode: bool,
 ):
-  """Build a Firestore query for jokes filtered by state (and optional category)."""
+  """Build a Firestore query for jokes filtered by state (and optional category).
+
+  If `field_paths` is given, only those fields are read (a `select` mask).
+  """
   if not states:
     states = [models.JokeState.DAILY, models.JokeState.PUBLISHED]
   state_values = [s.value for s in states]
@@ -378,6 +471,8 @@ def _prepare_jokes_query(
   category_id = (category_id or "").strip() or None
   if category_id:
     query = query.where(filter=FieldFilter("category_id", "==", category_id))
+  if field_paths:
+    query = query.select(list(field_paths))
   return query
 
 
@@ -389,6 +484,7 @@ def get_joke_by_state(
   category_id: str | None = None,
   sort_field: str = 'creation_time',
   without_social_post: bool = False,
+  field_paths: Collection[str] | None = None,
 ) -> tuple[list[tuple[models.PunnyJoke, str]], str | None]:
   """Fetch a page of jokes for the admin UI.
 
@@ -404,6 +500,8 @@ def get_joke_by_state(
     without_social_post: If True, only return jokes where `joke_social_post_id`
       is null. Requires a composite Firestore index on
       (state, joke_social_post_id, public_timestamp).
+    field_paths: Optional field mask (e.g. `JOKE_SCAN_FIELDS`); when given,
+      only these fields are read. Defaults to full documents.
 
   Returns:
     (entries, next_cursor):
@@ -415,6 +513,7 @@ def get_joke_by_state(
   query = _prepare_jokes_query(
     states,
     category_id=category_id,
+    field_paths=field_paths,
     async_mode=False,
   )
   if without_social_post:
@@ -452,13 +551,22 @@ def get_joke_by_state(
 
 
 def get_all_jokes(
-    states: list[models.JokeState] | None = None) -> list[models.PunnyJoke]:
+  states: list[models.JokeState] | None = None,
+  *,
+  field_paths: Collection[str] | None = None,
+) -> list[models.PunnyJoke]:
   """Get jokes from firestore filtered by state.
 
   Args:
       states: List of JokeState values to include. Defaults to DAILY and PUBLISHED.
+      field_paths: Optional field mask (e.g. `JOKE_TEXT_FIELDS`); when given,
+        only these fields are read. Defaults to full documents.
   """
-  docs = _prepare_jokes_query(states, async_mode=False).stream()
+  docs = _prepare_jokes_query(
+    states,
+    field_paths=field_paths,
+    async_mode=False,
+  ).stream()
   return [
     models.PunnyJoke.from_firestore_dict(doc.to_dict(), key=doc.id)
     for doc in docs if doc.exists and doc.to_dict() is not None
@@ -466,13 +574,22 @@ def get_all_jokes(
 
 
 async def get_all_jokes_async(
-    states: list[models.JokeState] | None = None) -> list[models.PunnyJoke]:
+  states: list[models.JokeState] | None = None,
+  *,
+  field_paths: Collection[str] | None = None,
+) -> list[models.PunnyJoke]:
   """Get jokes from firestore asynchronously filtered by state.
 
   Args:
       states: List of JokeState values to include. Defaults to DAILY and PUBLISHED.
+      field_paths: Optional field mask (e.g. `JOKE_TEXT_FIELDS`); when given,
+        only these fields are read. Defaults to full documents.
   """
-  docs = _prepare_jokes_query(states, async_mode=True).stream()
+  docs = _prepare_jokes_query(
+    states,
+    field_paths=field_paths,
+    async_mode=True,
+  ).stream()
   return [
     models.PunnyJoke.from_firestore_dict(doc.to_dict(), key=doc.id)
     async for doc in docs if doc.exists and doc.to_dict() is not None
@@ -558,7 +675,7 @@ def delete_joke_social_post(post_id: str) -> bool:
   """Delete a social post by Firestore document id.
 
   Note: Firestore does not automatically delete subcollections. We explicitly
-  delete the known metadata doc used by the admin operations log.
+  delete the operations log entries and the legacy metadata doc.
   """
   post_id = (post_id or "").strip()
   if not post_id:
@@ -569,9 +686,11 @@ def delete_joke_social_post(post_id: str) -> bool:
   if not getattr(snapshot, "exists", False):
     return False
 
-  # Best-effort cleanup of known metadata doc.
+  # Best-effort cleanup of the operations log.
   try:
     post_ref.collection("metadata").document("operations").delete()
+    for entry in post_ref.collection(OPERATIONS_LOG_COLLECTION).stream():
+      entry.reference.delete()
   except Exception:  # pylint: disable=broad-except
     pass
 
@@ -582,8 +701,14 @@ def delete_joke_social_post(post_id: str) -> bool:
 def update_social_post(
   post_id: str,
   update_data: dict[str, Any],
+  *,
+  operation: str | None = None,
 ) -> dict[str, Any]:
-  """Update a social post document and return changed fields."""
+  """Update a social post document and return changed fields.
+
+  If `operation` is given, an operations log entry for the changed fields is
+  written in the same batch as the update.
+  """
   post_id = (post_id or "").strip()
   if not post_id:
     raise ValueError("post_id is required")
@@ -604,7 +729,12 @@ def update_social_post(
     if key not in existing_data or existing_data.get(key) != value:
       changed_fields[key] = value
 
-  post_ref.update(update_payload)
+  batch = db().batch()
+  batch.update(post_ref, update_payload)
+  if operation:
+    batch.set(_new_operation_log_ref(post_ref),
+              _build_operation_log_entry(operation, changed_fields))
+  batch.commit()
   return changed_fields
 
 
@@ -616,62 +746,105 @@ def upsert_social_post(
   if not operation:
     operation = "CREATE" if not social_post.key else "UPDATE"
 
-  saved_post: models.JokeSocialPost | None
   if social_post.key:
-    updated_fields = update_social_post(
+    _ = update_social_post(
       social_post.key,
       social_post.to_dict(),
+      operation=operation,
     )
-    saved_post = social_post
-  else:
-    joke_ids: list[str] = []
-    for joke in social_post.jokes:
-      if joke.key:
-        joke_ids.append(joke.key)
-    custom_id = utils.create_timestamped_firestore_key(
-      social_post.type.value,
-      *(joke_ids[:2] if joke_ids else []),
-    )
-    post_ref = db().collection('joke_social_posts').document(custom_id)
-    if post_ref.get().exists:
-      return None
-
-    post_data = social_post.to_dict()
-    updated_fields = post_data.copy()
-    post_data['creation_time'] = SERVER_TIMESTAMP
-    post_data['last_modification_time'] = SERVER_TIMESTAMP
-
-    post_ref.set(post_data)
-    social_post.key = custom_id
-    saved_post = social_post
-
-  # Update operations log
-  if saved_post and saved_post.key:
-    current_time = datetime.datetime.now(ZoneInfo("America/Los_Angeles"))
-    log_fields = {
-      OPERATION: operation,
-      OPERATION_TIMESTAMP: current_time,
-    }
-    for key, value in updated_fields.items():
-      if value == SERVER_TIMESTAMP:
-        value = "OPERATION_TIMESTAMP"
-      log_fields[key] = value
+    return social_post
+
+  joke_ids: list[str] = []
+  for joke in social_post.jokes:
+    if joke.key:
+      joke_ids.append(joke.key)
+  custom_id = utils.create_timestamped_firestore_key(
+    social_post.type.value,
+    *(joke_ids[:2] if joke_ids else []),
+  )
+  post_ref = db().collection('joke_social_posts').document(custom_id)
+  if post_ref.get().exists:
+    return None
 
-    operations_ref = (db().collection('joke_social_posts').document(
-      saved_post.key).collection('metadata').document('operations'))
-    operations_doc = operations_ref.get()
-    log_entries: list[dict[str, Any]] = []
-    if operations_doc.exists:
-      existing_data = operations_doc.to_dict() or {}
-      existing_log = existing_data.get('log')
-      if isinstance(existing_log, list):
-        log_entries.extend(entry for entry in existing_log
-                           if isinstance(entry, dict))
+  post_data = social_post.to_dict()
+  updated_fields = post_data.copy()
+  post_data['creation_time'] = SERVER_TIMESTAMP
+  post_data['last_modification_time'] = SERVER_TIMESTAMP
 
-    log_entries.append(log_fields)
-    operations_ref.set({'log': log_entries}, merge=True)
+  batch = db().batch()
+  batch.set(post_ref, post_data)
+  batch.set(_new_operation_log_ref(post_ref),
+            _build_operation_log_entry(operation, updated_fields))
+  batch.commit()
+  social_post.key = custom_id
+  return social_post
+
+
+def _build_operation_log_entry(
+  operation: str,
+  updated_fields: dict[str, Any],
+) -> dict[str, Any]:
+  """Build one operations log entry recording `updated_fields`."""
+  current_time = datetime.datetime.now(ZoneInfo("America/Los_Angeles"))
+  log_fields: dict[str, Any] = {
+    OPERATION: operation,
+    OPERATION_TIMESTAMP: current_time,
+  }
+  for key, value in updated_fields.items():
+    if value == SERVER_TIMESTAMP:
+      # Replace SERVER_TIMESTAMP with a string literal. Readers can derive
+      # the timestamp from the operation timestamp field.
+      value = "OPERATION_TIMESTAMP"
+    log_fields[key] = value
+  return log_fields
 
-  return saved_post
+
+def _new_operation_log_ref(doc_ref: DocumentReference) -> DocumentReference:
+  """Return a new auto-id entry ref in `doc_ref`'s operations log."""
+  return doc_ref.collection(OPERATIONS_LOG_COLLECTION).document()
+
+
+def get_operations_log(
+  collection_name: str,
+  doc_id: str,
+  cursor: str | None = None,
+  limit: int = 20,
+) -> tuple[list[dict[str, Any]], str | None]:
+  """Fetch a page of a document's operations log, newest first.
+
+  Args:
+    collection_name: Parent collection, e.g. 'jokes' or 'joke_social_posts'.
+    doc_id: Parent document id.
+    cursor: Optional log entry id to start *after* (cursor pagination).
+    limit: Maximum number of entries to return.
+
+  Returns:
+    (entries, next_cursor), where next_cursor is None on the last page.
+  """
+  doc_id = (doc_id or "").strip()
+  if not doc_id:
+    return [], None
+
+  log_collection = db().collection(collection_name).document(
+    doc_id).collection(OPERATIONS_LOG_COLLECTION)
+  query = log_collection.order_by(
+    OPERATION_TIMESTAMP,
+    direction=Query.DESCENDING,
+  )
+  if cursor:
+    try:
+      snapshot = log_collection.document(cursor).get()
+      if getattr(snapshot, 'exists', False):
+        query = query.start_after(snapshot)
+    except Exception:
+      # Invalid cursor or transient Firestore issue; fall back to first page.
+      pass
+
+  docs = list(query.limit(limit + 1).stream())
+  page_docs = docs[:limit]
+  entries = [doc.to_dict() or {} for doc in page_docs]
+  next_cursor = page_docs[-1].id if (len(docs) > limit and page_docs) else None
+  return entries, next_cursor
 
 
 def upsert_joke_sheet(sheet: models.JokeSheet) -> models.JokeSheet:
@@ -773,6 +946,34 @@ def get_joke_sheet(sheet_id: str) -> models.JokeSheet | None:
   return models.JokeSheet.from_firestore_dict(data, key=doc.id)
 
 
+def get_joke_sheets(sheet_ids: Collection[str]) -> dict[str, models.JokeSheet]:
+  """Fetch joke sheets by document id in a single batch read.
+
+  Returns:
+    Map of sheet id -> JokeSheet. Blank and missing ids are omitted.
+  """
+  normalized_ids = list(
+    dict.fromkeys(sheet_id.strip() for sheet_id in sheet_ids
+                  if isinstance(sheet_id, str) and sheet_id.strip()))
+  if not normalized_ids:
+    return {}
+
+  client = db()
+  refs = [
+    client.collection("joke_sheets").document(sheet_id)
+    for sheet_id in normalized_ids
+  ]
+  sheets: dict[str, models.JokeSheet] = {}
+  for doc in client.get_all(refs):
+    if not getattr(doc, "exists", False):
+      continue
+    data = doc.to_dict()
+    if data is None:
+      continue
+    sheets[doc.id] = models.JokeSheet.from_firestore_dict(data, key=doc.id)
+  return sheets
+
+
 def delete_joke_sheet(sheet_id: str) -> bool:
   """Delete a joke sheet by Firestore document id."""
   sheet_id = (sheet_id or "").strip()
@@ -958,14 +1159,22 @@ def get_all_joke_categories(
   *,
   fetch_cached_jokes: bool = False,
   use_cache: bool = False,
+  fetch_live_sheet_ids: bool = False,
 ) -> list[models.JokeCategory]:
   """Get all joke categories from the 'joke_categories' collection.
 
+  Extra per-category documents are read with one batched `get_all` per kind
+  (in parallel), so the number of round trips does not grow with the number of
+  categories.
+
   Args:
     fetch_cached_jokes: When True, also fetch `category_jokes/cache` and populate
       `category.jokes` from the cached joke payload.
     use_cache: When True, read the category list from `joke_cache/joke_categories`
       instead of scanning the `joke_categories` collection.
+    fetch_live_sheet_ids: When True with `use_cache`, also read the live
+      category documents to populate the lunchbox `joke_sheets_*_id` fields,
+      which the category list cache does not carry.
   """
   client = db()
 
@@ -1009,16 +1218,68 @@ def get_all_joke_categories(
     return categories_from_collection
 
   categories = _iter_categories()
-  if fetch_cached_jokes:
-    for category in categories:
-      if not category.id:
-        continue
-      category_ref = client.collection("joke_categories").document(category.id)
-      _populate_category_cached_jokes(category, category_ref)
+  fetch_live_docs = fetch_live_sheet_ids and use_cache
+  if not fetch_cached_jokes and not fetch_live_docs:
+    return categories
+
+  category_refs = {
+    category.id: client.collection("joke_categories").document(category.id)
+    for category in categories if category.id
+  }
+  cache_refs = {
+    category_id: category_ref.collection('category_jokes').document('cache')
+    for category_id, category_ref in category_refs.items()
+  } if fetch_cached_jokes else {}
+  live_refs = category_refs if fetch_live_docs else {}
+
+  with ThreadPoolExecutor(max_workers=2) as executor:
+    cache_docs_future = executor.submit(_get_all_by_key, client, cache_refs)
+    live_docs_future = executor.submit(_get_all_by_key, client, live_refs)
+    cache_docs = cache_docs_future.result()
+    live_docs = live_docs_future.result()
+
+  for category in categories:
+    if not category.id:
+      continue
+    cache_doc = cache_docs.get(category.id)
+    if cache_doc is not None:
+      _populate_category_cached_jokes_from_doc(category, cache_doc)
+    live_doc = live_docs.get(category.id)
+    if live_doc is not None:
+      _populate_category_sheet_ids_from_doc(category, live_doc)
 
   return categories
 
 
+def _get_all_by_key(
+  client: Client,
+  refs_by_key: dict[str, DocumentReference],
+) -> dict[str, Any]:
+  """Batch-read `refs_by_key` and return existing snapshots by the same keys."""
+  if not refs_by_key:
+    return {}
+  key_by_path = {ref.path: key for key, ref in refs_by_key.items()}
+  snapshots: dict[str, Any] = {}
+  for snapshot in client.get_all(list(refs_by_key.values())):
+    key = key_by_path.get(snapshot.reference.path)
+    if key is not None and getattr(snapshot, "exists", False):
+      snapshots[key] = snapshot
+  return snapshots
+
+
+def _populate_category_sheet_ids_from_doc(
+  category: models.JokeCategory,
+  category_doc: Any,
+) -> None:
+  """Set the lunchbox sheet ids on `category` from its live document."""
+  data = category_doc.to_dict() or {}
+  for field_name in ("joke_sheets_branded_id", "joke_sheets_unbranded_id"):
+    raw_sheet_id = data.get(field_name)
+    sheet_id = raw_sheet_id.strip() if isinstance(raw_sheet_id, str) else ""
+    if sheet_id:
+      setattr(category, field_name, sheet_id)
+
+
 def get_joke_category(category_id: str) -> models.JokeCategory | None:
   """Get a joke category by ID, populating its cached jokes."""
   if not category_id:
@@ -1046,6 +1307,14 @@ def _populate_category_cached_jokes(
   cache_doc = category_ref.collection('category_jokes').document('cache').get()
   if not cache_doc.exists:
     return
+  _populate_category_cached_jokes_from_doc(category, cache_doc)
+
+
+def _populate_category_cached_jokes_from_doc(
+  category: models.JokeCategory,
+  cache_doc: Any,
+) -> None:
+  """Populate category.jokes from a fetched `category_jokes/cache` snapshot."""
   cache_data = cache_doc.to_dict() or {}
   jokes_data = cache_data.get('jokes', [])
   if not isinstance(jokes_data, list):
@@ -1145,9 +1414,15 @@ def create_joke_category(
 
 
 def get_uncategorized_public_jokes(
-  all_categories: list[models.JokeCategory], ) -> list[models.PunnyJoke]:
+  all_categories: list[models.JokeCategory],
+  *,
+  field_paths: Collection[str] | None = JOKE_TILE_FIELDS,
+) -> list[models.PunnyJoke]:
   """Get all public jokes not in any category (via category_id index).
 
+  Only `field_paths` are read (by default, what the admin tiles show); pass
+  None to read full documents.
+
   Note: `all_categories` is unused; it is kept for backwards compatibility with
   older callers that passed the category list.
   """
@@ -1157,6 +1432,8 @@ def get_uncategorized_public_jokes(
     filter=FieldFilter("is_public", "==", True))
   query = query.where(
     filter=FieldFilter("category_id", "==", UNCATEGORIZED_CATEGORY_ID))
+  if field_paths:
+    query = query.select(list(field_paths))
   docs = query.stream()
 
   results: list[models.PunnyJoke] = []
@@ -1332,69 +1609,42 @@ def upsert_punny_joke(
     operation = "CREATE" if not punny_joke.key else "UPDATE"
 
   # If joke has a key, try to update existing, otherwise create new
-  saved_joke: models.PunnyJoke | None
   if punny_joke.key:
-    updated_fields = update_punny_joke(
+    _ = update_punny_joke(
       punny_joke.key,
       punny_joke.to_dict(include_key=False),
       update_metadata=update_metadata,
+      operation=operation,
     )
-    saved_joke = punny_joke
-  else:
-    # Create new joke with custom ID
-    custom_id = utils.create_firestore_key(
-      punny_joke.punchline_text,
-      punny_joke.setup_text,
-      max_length=30,
-    )
-
-    joke_ref = db().collection('jokes').document(custom_id)
-    if joke_ref.get().exists:
-      return None
+    return punny_joke
 
-    joke_data = punny_joke.to_dict(include_key=False)
-    updated_fields = joke_data.copy()
-    joke_data['creation_time'] = SERVER_TIMESTAMP
-    joke_data['last_modification_time'] = SERVER_TIMESTAMP
+  # Create new joke with custom ID
+  custom_id = utils.create_firestore_key(
+    punny_joke.punchline_text,
+    punny_joke.setup_text,
+    max_length=30,
+  )
 
-    joke_ref.set(joke_data)
+  joke_ref = db().collection('jokes').document(custom_id)
+  if joke_ref.get().exists:
+    return None
 
-    if update_metadata:
-      metadata_ref = joke_ref.collection('metadata').document('metadata')
-      metadata_ref.set(update_metadata, merge=True)
+  joke_data = punny_joke.to_dict(include_key=False)
+  updated_fields = joke_data.copy()
+  joke_data['creation_time'] = SERVER_TIMESTAMP
+  joke_data['last_modification_time'] = SERVER_TIMESTAMP
 
-    punny_joke.key = custom_id
-    saved_joke = punny_joke
+  batch = db().batch()
+  batch.set(joke_ref, joke_data)
+  if update_metadata:
+    metadata_ref = joke_ref.collection('metadata').document('metadata')
+    batch.set(metadata_ref, update_metadata, merge=True)
+  batch.set(_new_operation_log_ref(joke_ref),
+            _build_operation_log_entry(operation, updated_fields))
+  batch.commit()
 
-  if saved_joke and saved_joke.key:
-    current_time = datetime.datetime.now(ZoneInfo("America/Los_Angeles"))
-    log_fields = {
-      OPERATION: operation,
-      OPERATION_TIMESTAMP: current_time,
-    }
-    for key, value in updated_fields.items():
-      if value == SERVER_TIMESTAMP:
-        # Replace SERVER_TIMESTAMP with a string literal. Readers can derive
-        # the timestamp from the operation timestamp field.
-        value = "OPERATION_TIMESTAMP"
-      log_fields[key] = value
-
-    # Get the existing log entries
-    operations_ref = (db().collection('jokes').document(
-      saved_joke.key).collection('metadata').document('operations'))
-    operations_doc = operations_ref.get()
-    log_entries: list[dict[str, Any]] = []
-    if operations_doc.exists:
-      existing_data = operations_doc.to_dict() or {}
-      existing_log = existing_data.get('log')
-      if isinstance(existing_log, list):
-        log_entries.extend(entry for entry in existing_log
-                           if isinstance(entry, dict))
-
-    log_entries.append(log_fields)
-    operations_ref.set({'log': log_entries}, merge=True)
-
-  return saved_joke
+  punny_joke.key = custom_id
+  return punny_joke
 
 
 def update_punny_joke(
@@ -1402,13 +1652,18 @@ def update_punny_joke(
   update_data: dict[str, Any],
   *,
   update_metadata: dict[str, Any] | None = None,
+  operation: str | None = None,
 ) -> dict[str, Any]:
   """Update a punny joke document and optionally its metadata sub-document.
 
+  All writes are committed in a single batch.
+
   Args:
     joke_id: Firestore document ID for the joke.
     update_data: Fields to update on the primary joke document.
     update_metadata: Optional fields to merge into `metadata/metadata`.
+    operation: If given, also append an operations log entry recording the
+      changed fields.
 
   Returns:
     A dict containing only the keys in `update_data` whose values differ from
@@ -1445,26 +1700,359 @@ def update_punny_joke(
                                       or existing_data.get(key) != value):
       changed_fields[key] = value
 
-  joke_ref.update(update_payload)
+  batch = db().batch()
+  batch.update(joke_ref, update_payload)
   if update_metadata:
     metadata_ref = joke_ref.collection('metadata').document('metadata')
-    metadata_ref.set(update_metadata, merge=True)
+    batch.set(metadata_ref, update_metadata, merge=True)
+  if operation:
+    batch.set(_new_operation_log_ref(joke_ref),
+              _build_operation_log_entry(operation, changed_fields))
+  batch.commit()
 
   return changed_fields
 
 
+def bulk_update_punny_jokes(
+  updates_by_id: dict[str, dict[str, Any]],
+  *,
+  chunk_size: int = _BULK_JOKE_UPDATE_CHUNK_SIZE,
+) -> list[str]:
+  """Apply field updates to many joke documents through a BulkWriter.
+
+  Unlike `update_punny_joke`, the documents are not read first and no
+  operations log is written: callers diff against jokes they already loaded.
+  Writes are flushed every `chunk_size` jokes, so an interrupted run keeps
+  every completed chunk.
+
+  Args:
+    updates_by_id: Fields to update, keyed by joke ID.
+    chunk_size: Number of jokes written between flushes.
+
+  Returns:
+    IDs of jokes whose update still failed after retries.
+  """
+  if not updates_by_id:
+    return []
+
+  failed_ids: list[str] = []
+  failed_lock = threading.Lock()
+
+  def _on_write_error(error, _writer) -> bool:
+    if error.attempts < _BULK_JOKE_UPDATE_MAX_WRITE_ATTEMPTS:
+      return True
+    joke_id = error.operation.reference.id
+    logger.warn(f"Failed to update joke {joke_id}: {error.message}")
+    with failed_lock:
+      failed_ids.append(joke_id)
+    return False
+
+  client = db()
+  jokes_collection = client.collection('jokes')
+  writer = client.bulk_writer()
+  writer.on_write_error(_on_write_error)
+  joke_ids = list(updates_by_id)
+  for start in range(0, len(joke_ids), chunk_size):
+    for joke_id in joke_ids[start:start + chunk_size]:
+      _ = writer.update(
+        jokes_collection.document(joke_id),
+        {
+          **updates_by_id[joke_id],
+          'last_modification_time': SERVER_TIMESTAMP,
+        },
+      )
+    writer.flush()
+    logger.info(f"Updated jokes {min(start + chunk_size, len(joke_ids))}/"
+                f"{len(joke_ids)}")
+  writer.close()
+  return failed_ids
+
+
 def update_joke_feed(jokes: list[dict[str, Any]]) -> None:
-  """Update the public joke feed in Firestore, chunking jokes into documents."""
+  """Update the public joke feed in Firestore, chunking jokes into documents.
+
+  Each chunk is hashed, and only chunks whose content changed since the last
+  build are written. Chunks past the end of the new feed are deleted.
+
+  The manifest at `joke_cache/joke_feed` records the chunk ids, their hashes,
+  the joke count, and a build version derived from the hashes. It is only
+  rewritten when the feed changed, and lets readers keep unchanged chunks in
+  their in-process cache (see `get_joke_feed_page_entries`).
+  """
   client = db()
   feed_collection = client.collection('joke_feed')
-  chunk_size = 50
+  manifest_ref = client.collection("joke_cache").document("joke_feed")
+
+  chunk_ids: list[str] = []
+  chunk_hashes: list[str] = []
+  chunks_by_id: dict[str, list[dict[str, Any]]] = {}
+  for i in range(0, len(jokes), _JOKE_FEED_CHUNK_SIZE):
+    chunk = jokes[i:i + _JOKE_FEED_CHUNK_SIZE]
+    doc_id = f"{i // _JOKE_FEED_CHUNK_SIZE:010d}"
+    chunk_ids.append(doc_id)
+    chunk_hashes.append(_hash_joke_feed_chunk(chunk))
+    chunks_by_id[doc_id] = chunk
+
+  previous_hashes = _read_joke_feed_manifest_hashes(manifest_ref)
+  if previous_hashes is None:
+    # No usable manifest: rewrite everything and find orphans by listing.
+    previous_hashes = {
+      doc_ref.id: ""
+      for doc_ref in feed_collection.list_documents()
+    }
+
+  chunks_written = 0
+  for doc_id, chunk_hash in zip(chunk_ids, chunk_hashes):
+    if previous_hashes.get(doc_id) == chunk_hash:
+      continue
+    feed_collection.document(doc_id).set({"jokes": chunks_by_id[doc_id]})
+    chunks_written += 1
+
+  orphaned_ids = sorted(set(previous_hashes) - set(chunk_ids))
+  build_version = hashlib.sha256("\n".join(
+    f"{doc_id}:{chunk_hash}" for doc_id, chunk_hash in zip(
+      chunk_ids, chunk_hashes)).encode("utf-8")).hexdigest()[:16]
+  if dict(zip(chunk_ids, chunk_hashes)) != previous_hashes:
+    # Written after the chunks it points to, and before orphans are deleted,
+    # so readers never see a manifest that references missing content.
+    manifest_ref.set({
+      "build_version": build_version,
+      "chunk_ids": chunk_ids,
+      "chunk_hashes": chunk_hashes,
+      "num_jokes": len(jokes),
+      "refresh_timestamp": SERVER_TIMESTAMP,
+    })
+
+  for doc_id in orphaned_ids:
+    feed_collection.document(doc_id).delete()
+
+  logger.info(f"Joke feed build {build_version}: {len(chunk_ids)} chunks, "
+              f"{chunks_written} written, {len(orphaned_ids)} deleted")
+
+
+def _hash_joke_feed_chunk(chunk: list[dict[str, Any]]) -> str:
+  """Return a stable content hash of a feed chunk's joke payloads."""
+  encoded = json.dumps(chunk,
+                       sort_keys=True,
+                       separators=(",", ":"),
+                       default=str)
+  return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _read_joke_feed_manifest_hashes(
+    manifest_ref: DocumentReference) -> dict[str, str] | None:
+  """Read {chunk_id: hash} from the feed manifest, or None if unavailable."""
+  doc = manifest_ref.get()
+  if not doc.exists:
+    return None
+  data = doc.to_dict() or {}
+  chunk_ids = data.get("chunk_ids")
+  chunk_hashes = data.get("chunk_hashes")
+  if (not isinstance(chunk_ids, list) or not isinstance(chunk_hashes, list)
+      or len(chunk_ids) != len(chunk_hashes)):
+    return None
+  return dict(zip(chunk_ids, chunk_hashes))
+
+
+# Decoded feed chunk: (index within the chunk document, joke) pairs.
+_FeedChunkEntries = list[tuple[int, models.PunnyJoke]]
+# Feed manifest: (build_version, sorted chunk ids, per-chunk content versions).
+_JokeFeedBuild = tuple[str, list[str], list[str]]
+
+
+class _JokeFeedChunkCache:
+  """Process-wide LRU cache of decoded `joke_feed` chunks.
+
+  Entries are keyed by (chunk_id, chunk_version), where the chunk version is
+  the content hash recorded in the manifest written by `update_joke_feed`, so
+  chunks that did not change across a rebuild stay cached. The manifest itself
+  is re-read at most once per `build_check_interval_seconds`, so between feed
+  rebuilds a warm instance serves feed pages without any Firestore reads or
+  model parsing.
+
+  Cached `PunnyJoke` objects are shared across requests and must be treated as
+  read-only by callers.
+  """
+
+  def __init__(self, max_chunks: int, build_check_interval_seconds: float):
+    self._max_chunks = max_chunks
+    self._build_check_interval_seconds = build_check_interval_seconds
+    self._lock = threading.Lock()
+    self._chunks: OrderedDict[tuple[str, str],
+                              _FeedChunkEntries] = OrderedDict()
+    self._build: _JokeFeedBuild | None = None
+    self._build_keys: set[tuple[str, str]] = set()
+    self._build_checked_at: float | None = None
+    self._hits = 0
+    self._misses = 0
+
+  def get_build(self) -> _JokeFeedBuild | None:
+    """Return the current feed manifest, or None if the feed is unstamped."""
+    now = time.monotonic()
+    with self._lock:
+      if (self._build_checked_at is not None and now - self._build_checked_at
+          < self._build_check_interval_seconds):
+        return self._build
+
+    build = _read_joke_feed_build()
+    with self._lock:
+      self._build = build
+      self._build_keys = set(zip(build[1], build[2])) if build else set()
+      self._build_checked_at = now
+      for key in [k for k in self._chunks if k not in self._build_keys]:
+        del self._chunks[key]
+    return build
+
+  def get_chunk(
+    self,
+    chunk_id: str,
+    chunk_version: str,
+  ) -> _FeedChunkEntries | None:
+    """Return the decoded chunk if cached, recording a hit or miss."""
+    key = (chunk_id, chunk_version)
+    with self._lock:
+      entries = self._chunks.get(key)
+      if entries is None:
+        self._misses += 1
+        return None
+      self._chunks.move_to_end(key)
+      self._hits += 1
+      return entries
+
+  def put_chunk(
+    self,
+    chunk_id: str,
+    chunk_version: str,
+    entries: _FeedChunkEntries,
+  ) -> None:
+    """Store a decoded chunk, evicting the least recently used entries."""
+    key = (chunk_id, chunk_version)
+    with self._lock:
+      if key not in self._build_keys:
+        # The feed was rebuilt while this chunk was being read.
+        return
+      self._chunks[key] = entries
+      self._chunks.move_to_end(key)
+      while len(self._chunks) > self._max_chunks:
+        self._chunks.popitem(last=False)
+
+  def stats(self) -> dict[str, Any]:
+    """Return hit/miss counters and the current cache footprint."""
+    with self._lock:
+      return {
+        "hits": self._hits,
+        "misses": self._misses,
+        "cached_chunks": len(self._chunks),
+        "build_version": self._build[0] if self._build else None,
+      }
+
+  def clear(self) -> None:
+    """Drop all cached chunks, the cached manifest, and the counters."""
+    with self._lock:
+      self._chunks.clear()
+      self._build = None
+      self._build_keys = set()
+      self._build_checked_at = None
+      self._hits = 0
+      self._misses = 0
+
+
+def _read_joke_feed_build() -> _JokeFeedBuild | None:
+  """Read the feed manifest written by `update_joke_feed`.
+
+  Manifests without chunk hashes fall back to the build version as the
+  version of every chunk.
+  """
+  doc = db().collection("joke_cache").document("joke_feed").get()
+  if not getattr(doc, "exists", False):
+    return None
+  data = doc.to_dict() or {}
+  build_version = data.get("build_version")
+  chunk_ids = data.get("chunk_ids")
+  if not isinstance(build_version, str) or not build_version:
+    return None
+  if not isinstance(chunk_ids, list):
+    return None
+  chunk_hashes = data.get("chunk_hashes")
+  if not isinstance(chunk_hashes, list) or len(chunk_hashes) != len(chunk_ids):
+    chunk_hashes = [build_version] * len(chunk_ids)
+  chunks = sorted((chunk_id, str(chunk_hash))
+                  for chunk_id, chunk_hash in zip(chunk_ids, chunk_hashes)
+                  if isinstance(chunk_id, str))
+  return (build_version, [chunk_id for chunk_id, _ in chunks],
+          [chunk_hash for _, chunk_hash in chunks])
+
+
+_JOKE_FEED_CACHE = _JokeFeedChunkCache(
+  max_chunks=_JOKE_FEED_CACHE_MAX_CHUNKS,
+  build_check_interval_seconds=_JOKE_FEED_BUILD_CHECK_INTERVAL_SECONDS,
+)
+
+
+def get_joke_feed_cache_stats() -> dict[str, Any]:
+  """Get hit/miss counters for the in-process joke feed chunk cache."""
+  return _JOKE_FEED_CACHE.stats()
+
+
+def clear_joke_feed_cache() -> None:
+  """Clear the in-process joke feed chunk cache."""
+  _JOKE_FEED_CACHE.clear()
 
-  for i in range(0, len(jokes), chunk_size):
-    chunk = jokes[i:i + chunk_size]
-    chunk_index = i // chunk_size
-    doc_id = f"{chunk_index:010d}"
-    doc_ref = feed_collection.document(doc_id)
-    doc_ref.set({"jokes": chunk})
+
+def _decode_joke_feed_chunk(doc_data: dict[str, Any]) -> _FeedChunkEntries:
+  """Parse a `joke_feed` chunk into (joke_index, joke) pairs.
+
+  Malformed jokes are skipped, but the original indices of the remaining jokes
+  are kept so that cursors stay stable.
+  """
+  doc_jokes = doc_data.get('jokes', [])
+  if not isinstance(doc_jokes, list):
+    return []
+
+  entries: _FeedChunkEntries = []
+  for joke_index, joke_dict in enumerate(doc_jokes):
+    if not isinstance(joke_dict, dict):
+      continue
+    try:
+      joke = models.PunnyJoke.from_firestore_dict(
+        joke_dict,
+        key=joke_dict.get('key'),
+      )
+    except Exception:  # pylint: disable=broad-except
+      continue
+    entries.append((joke_index, joke))
+  return entries
+
+
+def _iter_joke_feed_chunks(
+    cursor_doc_id: str | None) -> Iterator[tuple[str, _FeedChunkEntries]]:
+  """Yield decoded feed chunks in order, starting at the cursor document.
+
+  Uses the in-process chunk cache when the feed has a manifest, and falls
+  back to streaming the collection otherwise.
+  """
+  build = _JOKE_FEED_CACHE.get_build()
+  if build is None:
+    query = db().collection('joke_feed').order_by(FieldPath.document_id())
+    if cursor_doc_id:
+      query = query.start_at([cursor_doc_id])
+    for doc in query.stream():
+      if not doc.exists:
+        continue
+      yield doc.id, _decode_joke_feed_chunk(doc.to_dict() or {})
+    return
+
+  _, chunk_ids, chunk_versions = build
+  start = bisect.bisect_left(chunk_ids, cursor_doc_id) if cursor_doc_id else 0
+  for chunk_id, chunk_version in zip(chunk_ids[start:],
+                                     chunk_versions[start:]):
+    entries = _JOKE_FEED_CACHE.get_chunk(chunk_id, chunk_version)
+    if entries is None:
+      doc = db().collection('joke_feed').document(chunk_id).get()
+      entries = (_decode_joke_feed_chunk(doc.to_dict() or {})
+                 if doc.exists else [])
+      _JOKE_FEED_CACHE.put_chunk(chunk_id, chunk_version, entries)
+    yield chunk_id, entries
 
 
 def get_joke_feed_page_entries(
@@ -1473,6 +2061,9 @@ def get_joke_feed_page_entries(
 ) -> tuple[list[tuple[models.PunnyJoke, str | None]], str | None]:
   """Get a page of jokes from the joke_feed collection with per-joke cursors.
 
+  Decoded feed chunks are cached in-process by content hash, so repeated page
+  requests do not read Firestore, and a rebuild only re-reads changed chunks.
+
   Args:
     cursor: Optional cursor in format "doc_id:joke_index" (e.g., "0000000000:9").
       The joke_index is the 0-based index of the next joke to return (the first joke
@@ -1491,10 +2082,6 @@ def get_joke_feed_page_entries(
         to return (the first joke of the next page), or None if no more jokes are
         available. This cursor can be used to fetch the next page starting from this joke.
   """
-  client = db()
-  feed_collection = client.collection('joke_feed')
-  query = feed_collection.order_by(FieldPath.document_id())
-
   # Parse cursor if provided (format: "doc_id:joke_index")
   cursor_doc_id: str | None = None
   cursor_joke_index: int | None = None
@@ -1513,68 +2100,42 @@ def get_joke_feed_page_entries(
       cursor_doc_id = None
       cursor_joke_index = None
 
-  if cursor_doc_id:
-    # Start at the cursor document
-    query = query.start_at([cursor_doc_id])
-
   # Read documents until we have limit + 1 jokes worth of data
   # We'll return only limit jokes, using the extra to determine if there are more
   entries: list[tuple[models.PunnyJoke, str | None]] = []
   next_cursor_doc_id: str | None = None
   next_cursor_joke_index: int | None = None
 
-  docs = query.stream()
-  for doc in docs:
-    if not doc.exists:
-      continue
-
-    doc_data = doc.to_dict() or {}
-    doc_jokes = doc_data.get('jokes', [])
-    if not isinstance(doc_jokes, list):
-      continue
-
+  for doc_id, doc_entries in _iter_joke_feed_chunks(cursor_doc_id):
     # If this is the cursor document, start from the cursor index
     start_index = 0
-    if cursor_doc_id and doc.id == cursor_doc_id and cursor_joke_index is not None:
+    if cursor_doc_id and doc_id == cursor_doc_id and cursor_joke_index is not None:
       # Start from the cursor index (the next joke to return)
       start_index = cursor_joke_index
 
     # Process jokes from this document
-    for joke_index, joke_dict in enumerate(
-        doc_jokes[start_index:],
-        start=start_index,
-    ):
-      if not isinstance(joke_dict, dict):
+    for joke_index, joke in doc_entries:
+      if joke_index < start_index:
         continue
 
-      # Try to convert to PunnyJoke
-      try:
-        joke = models.PunnyJoke.from_firestore_dict(
-          joke_dict,
-          key=joke_dict.get('key'),
-        )
-
-        joke_position = f"{doc.id}:{joke_index}"
-
-        # If we already have limit jokes, this is the next joke - store as cursor and break.
-        if len(entries) == limit:
-          next_cursor_doc_id = doc.id
-          next_cursor_joke_index = joke_index
-          if entries:
-            # The last returned joke resumes at this next position.
-            last_joke, _ = entries[-1]
-            entries[-1] = (last_joke, joke_position)
-          break
-
-        # Append with placeholder cursor; we'll set each entry's cursor to the next joke's
-        # position once we see the next one.
-        entries.append((joke, None))
-        if len(entries) >= 2:
-          prev_joke, _ = entries[-2]
-          entries[-2] = (prev_joke, joke_position)
-      except Exception:  # pylint: disable=broad-except
-        # Skip malformed jokes, but continue reading to check if there are more
-        continue
+      joke_position = f"{doc_id}:{joke_index}"
+
+      # If we already have limit jokes, this is the next joke - store as cursor and break.
+      if len(entries) == limit:
+        next_cursor_doc_id = doc_id
+        next_cursor_joke_index = joke_index
+        if entries:
+          # The last returned joke resumes at this next position.
+          last_joke, _ = entries[-1]
+          entries[-1] = (last_joke, joke_position)
+        break
+
+      # Append with placeholder cursor; we'll set each entry's cursor to the next joke's
+      # position once we see the next one.
+      entries.append((joke, None))
+      if len(entries) >= 2:
+        prev_joke, _ = entries[-2]
+        entries[-2] = (prev_joke, joke_position)
 
     # If we've found the next joke (cursor), stop reading documents
     if next_cursor_doc_id:
@@ -2096,10 +2657,147 @@ def _to_utc_naive(dt: datetime.datetime) -> datetime.datetime:
   return dt
 
 
-def _upsert_joke_user_usage_logic(
+@dataclasses.dataclass
+class _JokeUserUsageDay:
+  """Day bucket of a `joke_users` doc as written by the usage transaction."""
+
+  created_at: datetime.datetime | None = None
+  """Naive UTC creation time; None if unknown (e.g. a just-created doc)."""
+
+  day_index: int = 0
+  num_distinct_day_used: int = 0
+  stats_counts: dict[str, Any] = dataclasses.field(default_factory=dict)
+  """Values of `_JOKE_STATS_COUNT_FIELDS` as of the write."""
+
+  stats_rollup: dict[str, str] | None = None
+  """Daily histogram entry the user was counted under by the write."""
+
+  update_time: datetime.datetime | None = None
+  """`update_time` of the doc after this instance's latest write to it.
+
+  Buffered updates are flushed with it as a precondition, so they never
+  overwrite a usage transaction that committed after them.
+  """
+
+
+def _usage_day_index(
+  created_at: datetime.datetime,
+  at: datetime.datetime,
+) -> int:
+  """Whole days between naive UTC `created_at` and `at`."""
+  return int((at - created_at).total_seconds() // 86400)
+
+
+def joke_stats_day_id(at: datetime.datetime) -> str:
+  """Return the Los Angeles date (YYYYMMDD) of a naive UTC or aware time."""
+  if at.tzinfo is None:
+    at = at.replace(tzinfo=datetime.timezone.utc)
+  return at.astimezone(_JOKE_STATS_TIMEZONE).strftime("%Y%m%d")
+
+
+def _joke_stats_rollup(
+  now_dt: datetime.datetime,
+  stats_counts: dict[str, Any],
+) -> dict[str, str]:
+  """Daily histogram entry for a user with `stats_counts` active at `now_dt`."""
+  return joke_stats.usage_rollup(
+    joke_stats_day_id(now_dt),
+    stats_counts.get('client_num_days_used'),
+    stats_counts.get('client_num_viewed'),
+  )
+
+
+def _joke_stats_daily_shard_ref(
+  day_id: str,
+  shard: int,
+) -> DocumentReference:
+  return db().collection(JOKE_STATS_DAILY_COLLECTION).document(
+    day_id).collection(JOKE_STATS_DAILY_SHARDS_COLLECTION).document(str(shard))
+
+
+def _move_joke_stats_rollup(
   transaction: Transaction,
   user_id: str,
-  now_utc: datetime.datetime | None = None,
+  previous: object,
+  current: dict[str, str],
+) -> None:
+  """Update a user's daily histogram entries from `previous` to `current`.
+
+  Within a day the entry moves between buckets. On a new active day the
+  previous day keeps its entry and the user is added to the new day, which
+  also records the previous entry as superseded when it is recent enough to
+  share a rolling window with the new day.
+  """
+  if previous == current:
+    return
+
+  def _add(matrix: dict[str, dict[str, Any]], rollup: dict[str, str],
+           amount: int) -> None:
+    row = matrix.setdefault(rollup['days_used'], {})
+    row[rollup['jokes_viewed']] = Increment(amount)
+
+  day_id = current['day']
+  users: dict[str, dict[str, Any]] = {}
+  _add(users, current, 1)
+  payload: dict[str, Any] = {JOKE_STATS_DAILY_USERS_FIELD: users}
+  if joke_stats.is_usage_rollup(previous):
+    previous_day_id = previous['day']
+    days_since = joke_stats.days_between(previous_day_id, day_id)
+    if previous_day_id == day_id:
+      _add(users, previous, -1)
+    elif days_since is not None and (0 < days_since <
+                                     joke_stats.ROLLING_WINDOW_DAYS):
+      superseded: dict[str, dict[str, Any]] = {}
+      _add(superseded, previous, 1)
+      payload[JOKE_STATS_DAILY_SUPERSEDED_USERS_FIELD] = {
+        previous_day_id: superseded
+      }
+
+  shard = zlib.crc32(user_id.encode('utf-8')) % JOKE_STATS_DAILY_NUM_SHARDS
+  transaction.set(_joke_stats_daily_shard_ref(day_id, shard),
+                  payload,
+                  merge=True)
+
+
+def get_joke_stats_daily_rollups(
+  day_ids: list[str], ) -> dict[str, joke_stats.DailyRollup]:
+  """Fetch daily joke_users histograms by day ID; missing days are omitted."""
+  unique_ids = list(dict.fromkeys(day_id for day_id in day_ids if day_id))
+  if not unique_ids:
+    return {}
+
+  client = db()
+  shards_by_day: dict[str, list[dict[str, Any]]] = {}
+  for snapshot in client.get_all([
+      _joke_stats_daily_shard_ref(day_id, shard) for day_id in unique_ids
+      for shard in range(JOKE_STATS_DAILY_NUM_SHARDS)
+  ]):
+    if not snapshot.exists:
+      continue
+    day_id = snapshot.reference.parent.parent.id
+    shards_by_day.setdefault(day_id, []).append(snapshot.to_dict() or {})
+
+  rollups: dict[str, joke_stats.DailyRollup] = {}
+  for day_id, shards in shards_by_day.items():
+    superseded_by_day: dict[str, list[object]] = {}
+    for shard in shards:
+      superseded = shard.get(JOKE_STATS_DAILY_SUPERSEDED_USERS_FIELD)
+      if not isinstance(superseded, dict):
+        continue
+      for previous_day_id, matrix in superseded.items():
+        superseded_by_day.setdefault(previous_day_id, []).append(matrix)
+    rollups[day_id] = joke_stats.DailyRollup(
+      users=joke_stats.merge_matrices(
+        shard.get(JOKE_STATS_DAILY_USERS_FIELD) for shard in shards),
+      superseded_users={
+        previous_day_id: joke_stats.merge_matrices(matrices)
+        for previous_day_id, matrices in superseded_by_day.items()
+      },
+    )
+  return rollups
+
+
+def _collect_client_usage_updates(
   *,
   client_num_days_used: int | None = None,
   client_num_saved: int | None = None,
@@ -2111,21 +2809,8 @@ def _upsert_joke_user_usage_logic(
   requested_review: bool | None = None,
   feed_cursor: str | None = None,
   local_feed_count: int | None = None,
-) -> int:
-  """Transactional helper to upsert joke user usage and return final count.
-
-  Args:
-      transaction: Firestore transaction
-      user_id: The Firebase Authentication user ID, used as document ID
-      now_utc: Optional override for current time (UTC). Useful for tests.
-
-  Returns:
-      The final value of num_distinct_day_used after the write.
-  """
-  doc_ref = db().collection('joke_users').document(user_id)
-  snapshot = doc_ref.get(transaction=transaction)
-
-  # Collect client counters if provided
+) -> dict[str, int | bool | str]:
+  """Build the client counter fields written on every usage ping."""
   client_updates: dict[str, int | bool | str] = {}
   if client_num_days_used is not None:
     client_updates['client_num_days_used'] = int(client_num_days_used)
@@ -2146,6 +2831,46 @@ def _upsert_joke_user_usage_logic(
   # Always include feed_cursor and local_feed_count (may be empty/zero)
   client_updates['feed_cursor'] = (feed_cursor or '').strip()
   client_updates['local_feed_count'] = int(local_feed_count or 0)
+  return client_updates
+
+
+def _upsert_joke_user_usage_logic(
+  transaction: Transaction,
+  user_id: str,
+  now_utc: datetime.datetime | None = None,
+  *,
+  usage_day: _JokeUserUsageDay | None = None,
+  **client_counters: Any,
+) -> int:
+  """Transactional helper to upsert joke user usage and return final count.
+
+  Args:
+      transaction: Firestore transaction
+      user_id: The Firebase Authentication user ID, used as document ID
+      now_utc: Optional override for current time (UTC). Useful for tests.
+      usage_day: If given, filled in with the written day bucket (when the
+        doc's creation time is known).
+      **client_counters: Keyword arguments of
+        `_collect_client_usage_updates`.
+
+  Returns:
+      The final value of num_distinct_day_used after the write.
+  """
+  doc_ref = db().collection('joke_users').document(user_id)
+  snapshot = doc_ref.get(transaction=transaction)
+
+  client_updates = _collect_client_usage_updates(**client_counters)
+  data = (snapshot.to_dict() or {}) if snapshot.exists else {}
+  # Use timezone-aware now in UTC, then normalize to naive UTC for arithmetic
+  now_dt = _to_utc_naive(
+    now_utc if now_utc else datetime.datetime.now(datetime.timezone.utc))
+  stats_counts = {
+    field: client_updates.get(field, data.get(field))
+    for field in _JOKE_STATS_COUNT_FIELDS
+  }
+  stats_rollup = _joke_stats_rollup(now_dt, stats_counts)
+  _move_joke_stats_rollup(transaction, user_id, data.get('stats_rollup'),
+                          stats_rollup)
 
   # Insert path
   if not snapshot.exists:
@@ -2153,13 +2878,13 @@ def _upsert_joke_user_usage_logic(
       'created_at': SERVER_TIMESTAMP,
       'last_login_at': SERVER_TIMESTAMP,
       'num_distinct_day_used': 1,
+      'stats_rollup': stats_rollup,
       **client_updates,
     }
     transaction.set(doc_ref, initial)
     return 1
 
   # Update path
-  data = snapshot.to_dict() or {}
   created_at_val = data.get('created_at')
   last_login_at_val = data.get('last_login_at') or created_at_val
   current_count = int(data.get('num_distinct_day_used', 0) or 0)
@@ -2170,6 +2895,7 @@ def _upsert_joke_user_usage_logic(
       doc_ref, {
         'last_login_at': SERVER_TIMESTAMP,
         'num_distinct_day_used': max(1, current_count),
+        'stats_rollup': stats_rollup,
       })
     return max(1, current_count)
 
@@ -2177,25 +2903,28 @@ def _upsert_joke_user_usage_logic(
   created_at_dt = _to_utc_naive(created_at_val)
   last_login_dt = _to_utc_naive(
     last_login_at_val) if last_login_at_val else created_at_dt
-  # Use timezone-aware now in UTC, then normalize to naive UTC for arithmetic
-  now_dt = _to_utc_naive(
-    now_utc if now_utc else datetime.datetime.now(datetime.timezone.utc))
 
   # Compute whole-day buckets since creation
-  seconds_per_day = 86400
-  num_days_at_last_login = int(
-    (last_login_dt - created_at_dt).total_seconds() // seconds_per_day)
-  num_days_now = int(
-    (now_dt - created_at_dt).total_seconds() // seconds_per_day)
+  num_days_at_last_login = _usage_day_index(created_at_dt, last_login_dt)
+  num_days_now = _usage_day_index(created_at_dt, now_dt)
 
   increment = 1 if num_days_now != num_days_at_last_login else 0
   final_count = current_count + increment
+  if usage_day is not None:
+    usage_day.created_at = created_at_dt
+    usage_day.day_index = num_days_now
+    usage_day.num_distinct_day_used = final_count
+    usage_day.stats_counts = stats_counts
+    usage_day.stats_rollup = stats_rollup
 
   update_payload = {
     'last_login_at': SERVER_TIMESTAMP,
     'num_distinct_day_used': final_count,
+    'stats_rollup': stats_rollup,
     **client_updates,
   }
+  # Last write of the transaction: `upsert_joke_user_usage` reads the doc's
+  # update time from the final write result.
   transaction.update(doc_ref, update_payload)
   return final_count
 
@@ -2206,16 +2935,8 @@ def _upsert_joke_user_usage_in_txn(
   user_id: str,
   now_utc: datetime.datetime | None = None,
   *,
-  client_num_days_used: int | None = None,
-  client_num_saved: int | None = None,
-  client_num_viewed: int | None = None,
-  client_num_navigated: int | None = None,
-  client_num_shared: int | None = None,
-  client_num_thumbs_up: int | None = None,
-  client_num_thumbs_down: int | None = None,
-  requested_review: bool | None = None,
-  feed_cursor: str | None = None,
-  local_feed_count: int | None = None,
+  usage_day: _JokeUserUsageDay | None = None,
+  **client_counters: Any,
 ) -> int:
   """Transactional wrapper that handles the transaction."""
   # The actual logic is in a separate function for testability
@@ -2223,19 +2944,215 @@ def _upsert_joke_user_usage_in_txn(
     transaction,
     user_id,
     now_utc,
-    client_num_days_used=client_num_days_used,
-    client_num_saved=client_num_saved,
-    client_num_viewed=client_num_viewed,
-    client_num_navigated=client_num_navigated,
-    client_num_shared=client_num_shared,
-    client_num_thumbs_up=client_num_thumbs_up,
-    client_num_thumbs_down=client_num_thumbs_down,
-    requested_review=requested_review,
-    feed_cursor=feed_cursor,
-    local_feed_count=local_feed_count,
+    usage_day=usage_day,
+    **client_counters,
   )
 
 
+class _JokeUserUsageBuffer:
+  """Process-wide write-behind buffer for `joke_users` usage pings.
+
+  Remembers the day bucket each recently seen user was in at their last
+  committed usage transaction, so later pings in the same bucket can skip the
+  transaction. Client counters are absolute snapshots, so pending updates per
+  user are coalesced (latest wins) and flushed in batches once
+  `flush_max_users` users are pending or the oldest pending update is
+  `flush_interval_seconds` old. If `on_flush_due` is given, it is also called
+  from a timer thread when that deadline passes without another ping, so
+  pending updates are written even after traffic stops.
+  """
+
+  def __init__(
+    self,
+    max_users: int,
+    flush_max_users: int,
+    flush_interval_seconds: float,
+    on_flush_due: Callable[[], Any] | None = None,
+  ):
+    self._max_users = max_users
+    self._flush_max_users = flush_max_users
+    self._flush_interval_seconds = flush_interval_seconds
+    self._on_flush_due = on_flush_due
+    self._lock = threading.Lock()
+    self._days: OrderedDict[str, _JokeUserUsageDay] = OrderedDict()
+    self._pending: dict[str, dict[str, Any]] = {}
+    self._pending_since: float | None = None
+    self._flush_timer: threading.Timer | None = None
+
+  def cached_day(
+    self,
+    user_id: str,
+    now_dt: datetime.datetime,
+  ) -> _JokeUserUsageDay | None:
+    """Return the user's last day bucket if `now_dt` still falls in it."""
+    with self._lock:
+      day = self._days.get(user_id)
+      if day is None or day.created_at is None or day.update_time is None:
+        return None
+      if _usage_day_index(day.created_at, now_dt) != day.day_index:
+        return None
+      self._days.move_to_end(user_id)
+      return day
+
+  def remember(self, user_id: str, day: _JokeUserUsageDay) -> None:
+    """Record a committed day bucket; it supersedes pending updates."""
+    with self._lock:
+      _ = self._pending.pop(user_id, None)
+      if day.created_at is None:
+        _ = self._days.pop(user_id, None)
+        return
+      self._days[user_id] = day
+      self._days.move_to_end(user_id)
+      while len(self._days) > self._max_users:
+        _ = self._days.popitem(last=False)
+
+  def stage(self, user_id: str, updates: dict[str, Any]) -> bool:
+    """Coalesce `updates` for a user; return True if a flush is due."""
+    now = time.monotonic()
+    with self._lock:
+      self._pending.setdefault(user_id, {}).update(updates)
+      if self._pending_since is None:
+        self._pending_since = now
+        self._start_flush_timer_locked()
+      return (len(self._pending) >= self._flush_max_users
+              or now - self._pending_since >= self._flush_interval_seconds)
+
+  def record_write(self, user_id: str, update_time: datetime.datetime) -> None:
+    """Advance a user's cached doc update time after a flushed write."""
+    with self._lock:
+      day = self._days.get(user_id)
+      if day is not None and (day.update_time is None
+                              or update_time > day.update_time):
+        day.update_time = update_time
+
+  def forget(self, user_id: str) -> None:
+    """Drop a user's cached day bucket and pending updates."""
+    with self._lock:
+      _ = self._days.pop(user_id, None)
+      _ = self._pending.pop(user_id, None)
+
+  def drain(self) -> dict[str, tuple[dict[str, Any], datetime.datetime]]:
+    """Remove and return pending updates with the doc update time they expect.
+
+    Updates of users whose day bucket was evicted are dropped, since without
+    the expected update time they could overwrite a newer transaction.
+    """
+    with self._lock:
+      pending, self._pending = self._pending, {}
+      self._pending_since = None
+      self._cancel_flush_timer_locked()
+      expected: dict[str, tuple[dict[str, Any], datetime.datetime]] = {}
+      for user_id, updates in pending.items():
+        day = self._days.get(user_id)
+        if day is not None and day.update_time is not None:
+          expected[user_id] = (updates, day.update_time)
+      return expected
+
+  def clear(self) -> None:
+    """Drop all cached day buckets and pending updates."""
+    with self._lock:
+      self._days.clear()
+      self._pending.clear()
+      self._pending_since = None
+      self._cancel_flush_timer_locked()
+
+  def _start_flush_timer_locked(self) -> None:
+    if self._on_flush_due is None:
+      return
+    self._flush_timer = threading.Timer(self._flush_interval_seconds,
+                                        self._on_flush_due)
+    self._flush_timer.daemon = True
+    self._flush_timer.start()
+
+  def _cancel_flush_timer_locked(self) -> None:
+    if self._flush_timer is not None:
+      self._flush_timer.cancel()
+      self._flush_timer = None
+
+
+_JOKE_USER_USAGE_BUFFER = _JokeUserUsageBuffer(
+  max_users=_JOKE_USER_USAGE_MAX_CACHED_USERS,
+  flush_max_users=_JOKE_USER_USAGE_FLUSH_MAX_USERS,
+  flush_interval_seconds=_JOKE_USER_USAGE_FLUSH_INTERVAL_SECONDS,
+  on_flush_due=lambda: flush_joke_user_usage(),  # pylint: disable=unnecessary-lambda
+)
+# SIGTERM handler that was installed before `_flush_joke_user_usage_on_sigterm`.
+_PREVIOUS_SIGTERM_HANDLER: Any = None
+
+
+def clear_joke_user_usage_buffer() -> None:
+  """Clear the in-process usage buffer without flushing it."""
+  _JOKE_USER_USAGE_BUFFER.clear()
+
+
+def flush_joke_user_usage() -> int:
+  """Write all buffered usage updates and return the number of users written."""
+  pending = _JOKE_USER_USAGE_BUFFER.drain()
+  if not pending:
+    return 0
+
+  def _on_write_result(reference, result, _writer) -> None:
+    _JOKE_USER_USAGE_BUFFER.record_write(reference.id, result.update_time)
+
+  def _on_write_error(error, _writer) -> bool:
+    if error.code == code_pb2.FAILED_PRECONDITION:
+      # A usage transaction (possibly on another instance) wrote the doc
+      # after these updates were staged; its values are newer, so drop them.
+      _JOKE_USER_USAGE_BUFFER.forget(error.operation.reference.id)
+      return False
+    if error.attempts < _JOKE_USER_USAGE_MAX_WRITE_ATTEMPTS:
+      return True
+    logger.warn(f"Failed to flush joke_users usage: {error.message}")
+    return False
+
+  client = db()
+  writer = client.bulk_writer()
+  writer.on_write_result(_on_write_result)
+  writer.on_write_error(_on_write_error)
+  for user_id, (updates, update_time) in pending.items():
+    _ = writer.update(
+      client.collection('joke_users').document(user_id),
+      updates,
+      option=client.write_option(last_update_time=update_time),
+    )
+  writer.close()
+  return len(pending)
+
+
+def _flush_joke_user_usage_on_sigterm(signum: int, frame: Any) -> None:
+  """Flush buffered usage before shutdown, then run the previous handler.
+
+  Cloud Run sends SIGTERM before stopping an instance, and `atexit` hooks do
+  not run when the process is killed by the signal's default action.
+  """
+  try:
+    _ = flush_joke_user_usage()
+  except Exception as e:  # pylint: disable=broad-except
+    logger.error(f"Failed to flush joke_users usage on SIGTERM: {e}")
+
+  previous = _PREVIOUS_SIGTERM_HANDLER
+  if callable(previous):
+    previous(signum, frame)
+  elif previous == signal.SIG_DFL:
+    _ = signal.signal(signum, signal.SIG_DFL)
+    os.kill(os.getpid(), signum)
+
+
+def _install_joke_user_usage_sigterm_flush() -> None:
+  """Chain `_flush_joke_user_usage_on_sigterm` in front of the SIGTERM handler."""
+  global _PREVIOUS_SIGTERM_HANDLER  # pylint: disable=global-statement
+  try:
+    _PREVIOUS_SIGTERM_HANDLER = signal.signal(
+      signal.SIGTERM, _flush_joke_user_usage_on_sigterm)
+  except ValueError:
+    # Not imported on the main thread; atexit and the flush timer still apply.
+    pass
+
+
+_ = atexit.register(flush_joke_user_usage)
+_install_joke_user_usage_sigterm_flush()
+
+
 def upsert_joke_user_usage(
   user_id: str,
   now_utc: datetime.datetime | None = None,
@@ -2253,6 +3170,11 @@ def upsert_joke_user_usage(
 ) -> int:
   """Create or update the joke user usage document and return final count.
 
+  The day-bucket transaction only runs when this instance has not seen the
+  user in their current day bucket, or when the user's daily stats histogram
+  entry changes. Otherwise the count is already known, and the client counters
+  are buffered and written later in a batch (see `flush_joke_user_usage`).
+
   Args:
       user_id: The user ID (document ID in collection 'joke_users').
       now_utc: Optional override for current time (UTC). Useful for tests.
@@ -2264,22 +3186,51 @@ def upsert_joke_user_usage(
   if not user_id:
     raise ValueError("user_id is required")
 
+  client_counters: dict[str, Any] = {
+    'client_num_days_used': client_num_days_used,
+    'client_num_saved': client_num_saved,
+    'client_num_viewed': client_num_viewed,
+    'client_num_navigated': client_num_navigated,
+    'client_num_shared': client_num_shared,
+    'client_num_thumbs_up': client_num_thumbs_up,
+    'client_num_thumbs_down': client_num_thumbs_down,
+    'requested_review': requested_review,
+    'feed_cursor': feed_cursor,
+    'local_feed_count': local_feed_count,
+  }
+  now_dt = _to_utc_naive(
+    now_utc if now_utc else datetime.datetime.now(datetime.timezone.utc))
+  cached_day = _JOKE_USER_USAGE_BUFFER.cached_day(user_id, now_dt)
+  if cached_day is not None:
+    client_updates = _collect_client_usage_updates(**client_counters)
+    stats_counts = {
+      field: client_updates.get(field, cached_day.stats_counts.get(field))
+      for field in _JOKE_STATS_COUNT_FIELDS
+    }
+    # Moving the user's daily histogram entry needs the transaction.
+    if _joke_stats_rollup(now_dt, stats_counts) == cached_day.stats_rollup:
+      # Stamp the ping's own time, not the flush time: a ping flushed after
+      # its day bucket ends would otherwise land in the next bucket, and the
+      # next transaction there would not count that day.
+      client_updates['last_login_at'] = now_dt.replace(
+        tzinfo=datetime.timezone.utc)
+      if _JOKE_USER_USAGE_BUFFER.stage(user_id, client_updates):
+        _ = flush_joke_user_usage()
+      return cached_day.num_distinct_day_used
+
+  usage_day = _JokeUserUsageDay()
   transaction = db().transaction()
-  return _upsert_joke_user_usage_in_txn(
+  final_count = _upsert_joke_user_usage_in_txn(
     transaction,
     user_id,
     now_utc,
-    client_num_days_used=client_num_days_used,
-    client_num_saved=client_num_saved,
-    client_num_viewed=client_num_viewed,
-    client_num_navigated=client_num_navigated,
-    client_num_shared=client_num_shared,
-    client_num_thumbs_up=client_num_thumbs_up,
-    client_num_thumbs_down=client_num_thumbs_down,
-    requested_review=requested_review,
-    feed_cursor=feed_cursor,
-    local_feed_count=local_feed_count,
+    usage_day=usage_day,
+    **client_counters,
   )
+  if transaction.write_results:
+    usage_day.update_time = transaction.write_results[-1].update_time
+  _JOKE_USER_USAGE_BUFFER.remember(user_id, usage_day)
+  return final_count
 
 
 def get_joke_stats_docs(limit: int = 30) -> list[dict[str, Any]]:
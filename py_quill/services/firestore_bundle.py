@@ -0,0 +1,262 @@
+"""Streaming, content-addressed Firestore bundle builds.
+
+Documents are serialized into length-prefixed bundle elements as they are
+read and spooled to a local temp file, so a build never holds the whole
+bundle in memory. Each document is fingerprinted by its serialized content;
+the full bundle is published under a name derived from those fingerprints,
+and a delta bundle holds only the documents that changed (or were deleted)
+since the previous build, so clients that already loaded it can skip the
+full download.
+
+The previous build is found through a small JSON manifest stored next to the
+bundles, which records the bundle hash and every document's fingerprint.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import hashlib
+import json
+import shutil
+import tempfile
+from typing import IO, Iterable
+
+from firebase_functions import logger
+from google.cloud.firestore_bundle import FirestoreBundle
+from google.cloud.firestore_bundle.types.bundle import (
+  BundledDocumentMetadata, BundleElement, BundleMetadata)
+from google.cloud.firestore_v1 import _helpers
+from google.cloud.firestore_v1.base_document import DocumentSnapshot
+from google.protobuf import json_format
+from services import cloud_storage
+
+BUNDLE_BUCKET_NAME = 'snickerdoodle_temp_files'
+_BUNDLE_PREFIX = 'firestore_bundle'
+_MANIFEST_BLOB_NAME = f'{_BUNDLE_PREFIX}/latest.json'
+_BUNDLE_CONTENT_TYPE = 'application/octet-stream'
+# Spooled elements stay in memory up to this size, then spill to disk.
+_SPOOL_MAX_MEMORY_BYTES = 8 * 1024 * 1024
+
+
+@dataclasses.dataclass(kw_only=True)
+class BundleBuildResult:
+  """Where a bundle build was published and how it differs from the last."""
+
+  bundle_hash: str
+  bundle_gcs_uri: str
+  num_documents: int
+  base_bundle_hash: str | None = None
+  delta_gcs_uri: str | None = None
+  num_changed: int = 0
+  num_deleted: int = 0
+
+
+class _BundleSpool:
+  """Length-prefixed bundle elements written to a temp file as they arrive."""
+
+  def __init__(self):
+    self._file = tempfile.SpooledTemporaryFile(
+      max_size=_SPOOL_MAX_MEMORY_BYTES)
+    self.num_documents = 0
+
+  def add(self, metadata_element: bytes, document_element: bytes | None):
+    """Append one document's metadata element and, if it exists, its body."""
+    _ = self._file.write(metadata_element)
+    if document_element is not None:
+      _ = self._file.write(document_element)
+    self.num_documents += 1
+
+  def write_bundle(self, out: IO[bytes], *, bundle_id: str) -> None:
+    """Write the bundle metadata element followed by the spooled elements."""
+    total_bytes = self._file.tell()
+    metadata = BundleElement(metadata=BundleMetadata(
+      id=bundle_id,
+      create_time=_helpers.build_timestamp(),
+      version=FirestoreBundle.BUNDLE_SCHEMA_VERSION,
+      total_documents=self.num_documents,
+      total_bytes=total_bytes,
+    ))
+    _ = out.write(_compile_bundle_element(metadata))
+    _ = self._file.seek(0)
+    shutil.copyfileobj(self._file, out)
+    _ = self._file.seek(total_bytes)
+
+  def close(self) -> None:
+    self._file.close()
+
+
+def build_and_publish_bundle(
+  snapshots: Iterable[DocumentSnapshot],
+  *,
+  bundle_id: str,
+) -> BundleBuildResult:
+  """Stream `snapshots` into a bundle and publish it with a delta bundle.
+
+  Args:
+    snapshots: Documents to bundle, read lazily. A document path seen more
+      than once keeps its first snapshot.
+    bundle_id: Bundle id recorded in the full bundle's metadata; the delta
+      bundle uses `{bundle_id}-delta`.
+
+  Returns:
+    The published bundle's hash and location. When nothing changed since the
+    previous build and its bundle still exists, the previous bundle is
+    returned and nothing is uploaded.
+  """
+  previous_manifest = _read_manifest() or {}
+  previous_hash: str | None = previous_manifest.get('bundle_hash')
+  previous_fingerprints = dict(previous_manifest.get('fingerprints', {}))
+
+  fingerprints: dict[str, str] = {}
+  full_spool = _BundleSpool()
+  delta_spool = _BundleSpool()
+  try:
+    for snapshot in snapshots:
+      path = snapshot.reference._document_path  # pylint: disable=protected-access
+      if path in fingerprints:
+        continue
+      metadata_element, document_element, fingerprint = _serialize_document(
+        snapshot)
+      fingerprints[path] = fingerprint
+      full_spool.add(metadata_element, document_element)
+      if previous_fingerprints.get(path) != fingerprint:
+        delta_spool.add(metadata_element, document_element)
+
+    bundle_hash = _bundle_hash(fingerprints)
+    if bundle_hash == previous_hash:
+      previous_gcs_uri = previous_manifest.get('bundle_gcs_uri')
+      # The temp bucket expires objects, so the manifest can outlive them.
+      if previous_gcs_uri and cloud_storage.gcs_file_exists(previous_gcs_uri):
+        logger.info(f'Firestore bundle {bundle_hash} unchanged: '
+                    f'{len(fingerprints)} documents')
+        return BundleBuildResult(
+          bundle_hash=bundle_hash,
+          bundle_gcs_uri=previous_gcs_uri,
+          num_documents=len(fingerprints),
+        )
+      logger.warn(f'Firestore bundle {bundle_hash} unchanged but missing '
+                  f'from {previous_gcs_uri}; uploading it again')
+
+    num_changed = delta_spool.num_documents
+    deleted_paths = sorted(set(previous_fingerprints) - set(fingerprints))
+    delete_time = _helpers.build_timestamp()
+    for path in deleted_paths:
+      delta_spool.add(
+        _compile_bundle_element(
+          BundleElement(document_metadata=BundledDocumentMetadata(
+            name=path,
+            read_time=delete_time,
+            exists=False,
+          ))),
+        None,
+      )
+
+    bundle_gcs_uri = _bundle_gcs_uri(bundle_hash)
+    _upload_spool(full_spool, bundle_gcs_uri, bundle_id=bundle_id)
+    delta_gcs_uri = None
+    if previous_hash and previous_hash != bundle_hash:
+      delta_gcs_uri = _bundle_gcs_uri(f'{previous_hash}_{bundle_hash}',
+                                      prefix='delta_')
+      _upload_spool(delta_spool, delta_gcs_uri, bundle_id=f'{bundle_id}-delta')
+  finally:
+    full_spool.close()
+    delta_spool.close()
+
+  # Written last so the manifest never points at a bundle that is missing.
+  _write_manifest({
+    'bundle_hash': bundle_hash,
+    'bundle_gcs_uri': bundle_gcs_uri,
+    'fingerprints': fingerprints,
+  })
+  logger.info(
+    f'Firestore bundle {bundle_hash}: {len(fingerprints)} documents, '
+    f'{num_changed} changed, {len(deleted_paths)} deleted since '
+    f'{previous_hash}')
+  return BundleBuildResult(
+    bundle_hash=bundle_hash,
+    bundle_gcs_uri=bundle_gcs_uri,
+    num_documents=len(fingerprints),
+    base_bundle_hash=previous_hash if delta_gcs_uri else None,
+    delta_gcs_uri=delta_gcs_uri,
+    num_changed=num_changed,
+    num_deleted=len(deleted_paths),
+  )
+
+
+def _serialize_document(
+    snapshot: DocumentSnapshot) -> tuple[bytes, bytes | None, str]:
+  """Return a snapshot's metadata element, document element, and fingerprint."""
+  path = snapshot.reference._document_path  # pylint: disable=protected-access
+  metadata_element = _compile_bundle_element(
+    BundleElement(document_metadata=BundledDocumentMetadata(
+      name=path,
+      read_time=snapshot.read_time,
+      exists=snapshot.exists,
+    )))
+  document_pb = snapshot._to_protobuf()  # pylint: disable=protected-access
+  if document_pb is None:
+    return metadata_element, None, ''
+
+  document_dict = json_format.MessageToDict(document_pb._pb)  # pylint: disable=protected-access
+  fingerprint = hashlib.sha256(
+    json.dumps(document_dict, sort_keys=True,
+               separators=(',', ':')).encode('utf-8')).hexdigest()
+  document_element = _compile_bundle_element(
+    BundleElement(document=document_pb._pb))  # pylint: disable=protected-access
+  return metadata_element, document_element, fingerprint
+
+
+def _compile_bundle_element(bundle_element: BundleElement) -> bytes:
+  """Serialize an element the way `FirestoreBundle.build` does."""
+  serialized = json.dumps(json_format.MessageToDict(bundle_element._pb))  # pylint: disable=protected-access
+  return f'{len(serialized)}{serialized}'.encode('utf-8')
+
+
+def _bundle_hash(fingerprints: dict[str, str]) -> str:
+  """Return a stable content hash over every document's fingerprint."""
+  return hashlib.sha256('\n'.join(
+    f'{path}:{fingerprint}' for path, fingerprint in sorted(
+      fingerprints.items())).encode('utf-8')).hexdigest()[:16]
+
+
+def _bundle_gcs_uri(name: str, *, prefix: str = '') -> str:
+  return f'gs://{BUNDLE_BUCKET_NAME}/{_BUNDLE_PREFIX}/{prefix}{name}.txt'
+
+
+def _upload_spool(spool: _BundleSpool, gcs_uri: str, *,
+                  bundle_id: str) -> None:
+  """Assemble a bundle file from `spool` and upload it to `gcs_uri`."""
+  with tempfile.NamedTemporaryFile(suffix='.txt') as bundle_file:
+    spool.write_bundle(bundle_file, bundle_id=bundle_id)
+    bundle_file.flush()
+    _ = cloud_storage.upload_file_to_gcs(bundle_file.name, gcs_uri,
+                                         _BUNDLE_CONTENT_TYPE)
+
+
+def _read_manifest() -> dict | None:
+  """Return the previous build's manifest, or None if unavailable."""
+  manifest_uri = f'gs://{BUNDLE_BUCKET_NAME}/{_MANIFEST_BLOB_NAME}'
+  try:
+    if not cloud_storage.gcs_file_exists(manifest_uri):
+      return None
+    manifest = json.loads(cloud_storage.download_bytes_from_gcs(manifest_uri))
+  except Exception as exc:  # pylint: disable=broad-except
+    logger.warn(f'Failed to read Firestore bundle manifest: {exc}')
+    return None
+  if (not isinstance(manifest, dict)
+      or not isinstance(manifest.get('bundle_hash'), str)
+      or not isinstance(manifest.get('bundle_gcs_uri'), str)
+      or not isinstance(manifest.get('fingerprints'), dict)):
+    return None
+  return manifest
+
+
+def _write_manifest(manifest: dict) -> None:
+  manifest['updated_at'] = datetime.datetime.now(
+    datetime.timezone.utc).isoformat()
+  _ = cloud_storage.upload_bytes_to_gcs(
+    json.dumps(manifest, sort_keys=True).encode('utf-8'),
+    f'gs://{BUNDLE_BUCKET_NAME}/{_MANIFEST_BLOB_NAME}',
+    'application/json',
+  )
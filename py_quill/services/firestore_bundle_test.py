@@ -0,0 +1,187 @@
+"""Tests for the firestore_bundle service."""
+
+from __future__ import annotations
+
+import datetime
+import json
+import re
+
+import pytest
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import firestore as gcf
+from google.cloud._helpers import _datetime_to_pb_timestamp
+from google.cloud.firestore_bundle import FirestoreBundle
+from google.cloud.firestore_v1.base_document import DocumentSnapshot
+from services import firestore_bundle
+
+_CLIENT = gcf.Client(project='test-project',
+                     credentials=AnonymousCredentials())
+
+
+def _snapshot(path: str, data: dict, *, updated_day: int = 1):
+  collection, doc_id = path.split('/')
+  timestamp = _datetime_to_pb_timestamp(
+    datetime.datetime(2026, 1, updated_day, tzinfo=datetime.timezone.utc))
+  return DocumentSnapshot(
+    _CLIENT.collection(collection).document(doc_id),
+    data,
+    True,
+    timestamp,
+    timestamp,
+    timestamp,
+  )
+
+
+def _parse_elements(bundle_bytes: bytes) -> list[dict]:
+  """Split a length-prefixed bundle into its JSON elements."""
+  text = bundle_bytes.decode('utf-8')
+  elements = []
+  position = 0
+  while position < len(text):
+    length_match = re.match(r'\d+', text[position:])
+    assert length_match is not None
+    position += length_match.end()
+    length = int(length_match.group())
+    elements.append(json.loads(text[position:position + length]))
+    position += length
+  return elements
+
+
+@pytest.fixture(name='gcs')
+def gcs_fixture(monkeypatch):
+  """In-memory GCS keyed by URI."""
+  blobs: dict[str, bytes] = {}
+
+  def _upload_file(file_path, gcs_uri, content_type=None):
+    del content_type
+    with open(file_path, 'rb') as f:
+      blobs[gcs_uri] = f.read()
+    return gcs_uri
+
+  def _upload_bytes(content_bytes, gcs_uri, content_type):
+    del content_type
+    blobs[gcs_uri] = content_bytes
+    return gcs_uri
+
+  monkeypatch.setattr(firestore_bundle.cloud_storage, 'upload_file_to_gcs',
+                      _upload_file)
+  monkeypatch.setattr(firestore_bundle.cloud_storage, 'upload_bytes_to_gcs',
+                      _upload_bytes)
+  monkeypatch.setattr(firestore_bundle.cloud_storage, 'gcs_file_exists',
+                      lambda gcs_uri: gcs_uri in blobs)
+  monkeypatch.setattr(firestore_bundle.cloud_storage,
+                      'download_bytes_from_gcs',
+                      lambda gcs_uri: blobs[gcs_uri])
+  return blobs
+
+
+def test_first_build_matches_firestore_bundle_output(gcs):
+  snapshots = [
+    _snapshot('joke_feed/0000000000', {
+      'jokes': [{
+        'key': 'j1'
+      }],
+    }),
+    _snapshot('jokes/j1', {
+      'setup_text': 'Why?',
+      'punchline_text': 'Because é.',
+      'is_public': True,
+    }),
+  ]
+  reference = FirestoreBundle('data-bundle')
+  for snapshot in snapshots:
+    reference.add_document(snapshot)
+
+  result = firestore_bundle.build_and_publish_bundle(iter(snapshots),
+                                                     bundle_id='data-bundle')
+
+  assert result.num_documents == 2
+  assert result.base_bundle_hash is None
+  assert result.delta_gcs_uri is None
+  assert result.bundle_gcs_uri == (
+    f'gs://snickerdoodle_temp_files/firestore_bundle/{result.bundle_hash}.txt')
+
+  elements = _parse_elements(gcs[result.bundle_gcs_uri])
+  expected = _parse_elements(reference.build().encode('utf-8'))
+  for element in (elements[0], expected[0]):
+    del element['metadata']['createTime']
+  assert elements == expected
+
+  manifest = json.loads(
+    gcs['gs://snickerdoodle_temp_files/firestore_bundle/latest.json'])
+  assert manifest['bundle_hash'] == result.bundle_hash
+  assert len(manifest['fingerprints']) == 2
+
+
+def test_rebuild_publishes_delta_and_skips_unchanged_builds(gcs):
+  first = firestore_bundle.build_and_publish_bundle(
+    [
+      _snapshot('jokes/j1', {'setup_text': 'One'}),
+      _snapshot('jokes/j2', {'setup_text': 'Two'}),
+      _snapshot('jokes/j3', {'setup_text': 'Three'}),
+    ],
+    bundle_id='data-bundle',
+  )
+
+  second = firestore_bundle.build_and_publish_bundle(
+    [
+      _snapshot('jokes/j1', {'setup_text': 'One'}),
+      _snapshot('jokes/j2', {'setup_text': 'Two!'}, updated_day=2),
+      _snapshot('jokes/j4', {'setup_text': 'Four'}),
+    ],
+    bundle_id='data-bundle',
+  )
+
+  assert second.bundle_hash != first.bundle_hash
+  assert second.base_bundle_hash == first.bundle_hash
+  assert (second.num_documents, second.num_changed,
+          second.num_deleted) == (3, 2, 1)
+  delta = _parse_elements(gcs[second.delta_gcs_uri])
+  assert delta[0]['metadata']['id'] == 'data-bundle-delta'
+  assert delta[0]['metadata']['totalDocuments'] == 3
+  delta_metadata = {
+    element['documentMetadata']['name'].rsplit('/', 1)[-1]:
+    element['documentMetadata']
+    for element in delta if 'documentMetadata' in element
+  }
+  assert sorted(delta_metadata) == ['j2', 'j3', 'j4']
+  assert delta_metadata['j2']['exists'] is True
+  # Deleted docs: proto JSON omits the false `exists` flag.
+  assert 'exists' not in delta_metadata['j3']
+  assert [
+    element['document']['fields']['setup_text']['stringValue']
+    for element in delta if 'document' in element
+  ] == ['Two!', 'Four']
+
+  # Same content again (field order and read order do not matter).
+  num_blobs = len(gcs)
+  third = firestore_bundle.build_and_publish_bundle(
+    [
+      _snapshot('jokes/j4', {'setup_text': 'Four'}),
+      _snapshot('jokes/j1', {'setup_text': 'One'}),
+      _snapshot('jokes/j2', {'setup_text': 'Two!'}, updated_day=2),
+    ],
+    bundle_id='data-bundle',
+  )
+
+  assert third.bundle_hash == second.bundle_hash
+  assert third.bundle_gcs_uri == second.bundle_gcs_uri
+  assert third.delta_gcs_uri is None
+  assert len(gcs) == num_blobs
+
+
+def test_unchanged_build_uploads_again_when_bundle_expired(gcs):
+  snapshots = [_snapshot('jokes/j1', {'setup_text': 'One'})]
+  first = firestore_bundle.build_and_publish_bundle(snapshots,
+                                                    bundle_id='data-bundle')
+  del gcs[first.bundle_gcs_uri]
+
+  second = firestore_bundle.build_and_publish_bundle(snapshots,
+                                                     bundle_id='data-bundle')
+
+  assert second.bundle_hash == first.bundle_hash
+  assert second.bundle_gcs_uri == first.bundle_gcs_uri
+  assert second.base_bundle_hash is None
+  assert second.delta_gcs_uri is None
+  metadata = _parse_elements(gcs[second.bundle_gcs_uri])[0]['metadata']
+  assert metadata['id'] == 'data-bundle'
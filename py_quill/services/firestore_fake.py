@@ -0,0 +1,166 @@
+"""In-memory Firestore client for tests, keyed by document path.
+
+Covers the slice of the client API the services use: document and collection
+references, `get`/`get_all`, `set`, ordered and paginated collection queries,
+and write batches. Reads and writes are recorded so tests can assert how many
+round trips an operation made.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from google.cloud.firestore import Query
+
+
+class FakeSnapshot:
+  """Document snapshot; `exists` is False when the document has no data."""
+
+  def __init__(self, reference: FakeDocumentRef, data: dict[str, Any] | None):
+    self.reference = reference
+    self.id = reference.id
+    self.exists = data is not None
+    self._data = data
+
+  def to_dict(self) -> dict[str, Any] | None:
+    return dict(self._data) if self._data is not None else None
+
+
+class FakeDocumentRef:
+
+  def __init__(self, db: FakeFirestore, path: str):
+    self._db = db
+    self.path = path
+    self.id = path.rsplit("/", 1)[-1]
+
+  @property
+  def parent(self) -> FakeCollectionRef:
+    return FakeCollectionRef(self._db, self.path.rsplit("/", 1)[0])
+
+  def collection(self, name: str) -> FakeCollectionRef:
+    return FakeCollectionRef(self._db, f"{self.path}/{name}")
+
+  def get(self, transaction=None) -> FakeSnapshot:  # pylint: disable=unused-argument
+    self._db.get_calls.append(self.path)
+    return FakeSnapshot(self, self._db.docs.get(self.path))
+
+  def set(self, data: dict[str, Any], merge: bool = False) -> None:
+    self._db.set_calls.append(self.path)
+    self._db.apply_write(self.path, data, merge=merge)
+
+
+class FakeCollectionRef:
+
+  def __init__(self, db: FakeFirestore, path: str):
+    self._db = db
+    self.path = path
+    self.id = path.rsplit("/", 1)[-1]
+
+  @property
+  def parent(self) -> FakeDocumentRef | None:
+    if "/" not in self.path:
+      return None
+    return FakeDocumentRef(self._db, self.path.rsplit("/", 1)[0])
+
+  def document(self, doc_id: str | None = None) -> FakeDocumentRef:
+    if doc_id is None:
+      self._db.auto_ids += 1
+      doc_id = f"auto-{self._db.auto_ids}"
+    return FakeDocumentRef(self._db, f"{self.path}/{doc_id}")
+
+  def stream(self) -> list[FakeSnapshot]:
+    """Snapshots of the documents directly in this collection."""
+    prefix = f"{self.path}/"
+    return [
+      FakeSnapshot(FakeDocumentRef(self._db, path), data)
+      for path, data in self._db.docs.items()
+      if path.startswith(prefix) and "/" not in path[len(prefix):]
+    ]
+
+  def order_by(self, field: str, direction: str | None = None) -> FakeQuery:
+    return FakeQuery(self, field, direction)
+
+
+class FakeQuery:
+  """`order_by` query over one collection with `start_after` and `limit`."""
+
+  def __init__(self, collection: FakeCollectionRef, field: str,
+               direction: str | None):
+    self._collection = collection
+    self._field = field
+    self._reverse = direction == Query.DESCENDING
+    self._after_id: str | None = None
+    self._limit: int | None = None
+
+  def start_after(self, snapshot: FakeSnapshot) -> FakeQuery:
+    self._after_id = snapshot.id
+    return self
+
+  def limit(self, count: int) -> FakeQuery:
+    self._limit = count
+    return self
+
+  def stream(self) -> list[FakeSnapshot]:
+    docs = sorted(self._collection.stream(),
+                  key=lambda doc: doc.to_dict()[self._field],
+                  reverse=self._reverse)
+    if self._after_id is not None:
+      ids = [doc.id for doc in docs]
+      docs = docs[ids.index(self._after_id) + 1:]
+    return docs[:self._limit]
+
+
+class FakeWriteBatch:
+  """Write batch applied on `commit` and recorded in `FakeFirestore.commits`."""
+
+  def __init__(self, db: FakeFirestore):
+    self._db = db
+    self._writes: list[tuple[str, str, dict[str, Any], bool]] = []
+
+  def set(self,
+          reference: FakeDocumentRef,
+          data: dict[str, Any],
+          merge: bool = False) -> None:
+    self._writes.append(("set", reference.path, data, merge))
+
+  def update(self, reference: FakeDocumentRef, data: dict[str, Any]) -> None:
+    self._writes.append(("update", reference.path, data, False))
+
+  def commit(self) -> None:
+    for op, path, data, merge in self._writes:
+      self._db.apply_write(path, data, merge=op == "update" or merge)
+    self._db.commits.append(list(self._writes))
+
+
+class FakeFirestore:
+  """In-memory Firestore client holding `docs` keyed by document path."""
+
+  def __init__(self, docs: dict[str, dict[str, Any]] | None = None):
+    self.docs = dict(docs or {})
+    self.get_calls: list[str] = []
+    self.get_all_calls: list[list[str]] = []
+    self.set_calls: list[str] = []
+    self.commits: list[list[tuple[str, str, dict[str, Any], bool]]] = []
+    self.auto_ids = 0
+
+  def collection(self, name: str) -> FakeCollectionRef:
+    return FakeCollectionRef(self, name)
+
+  def batch(self) -> FakeWriteBatch:
+    return FakeWriteBatch(self)
+
+  def get_all(self,
+              references: Iterable[FakeDocumentRef]) -> list[FakeSnapshot]:
+    references = list(references)
+    self.get_all_calls.append([ref.path for ref in references])
+    # Firestore does not guarantee get_all result order.
+    return [
+      FakeSnapshot(ref, self.docs.get(ref.path)) for ref in references[::-1]
+    ]
+
+  def apply_write(self, path: str, data: dict[str, Any], *,
+                  merge: bool) -> None:
+    if merge:
+      self.docs[path] = {**self.docs.get(path, {}), **data}
+    else:
+      self.docs[path] = dict(data)
@@ -3,6 +3,7 @@
 import pytest
 from common import models
 from services import firestore as fs
+from services import firestore_fake
 
 
 def test_get_all_joke_categories_sync(monkeypatch):
@@ -253,6 +254,7 @@ def test_get_uncategorized_public_jokes_filters_by_category_id(monkeypatch):
                       lambda field, op, value: (field, op, value))
 
   captured_filters: list[tuple[str, str, object]] = []
+  captured_selects: list[list[str]] = []
 
   class DummyDoc:
 
@@ -274,6 +276,10 @@ def test_get_uncategorized_public_jokes_filters_by_category_id(monkeypatch):
       captured_filters.append(filter)
       return self
 
+    def select(self, field_paths):
+      captured_selects.append(list(field_paths))
+      return self
+
     def stream(self):
       return [DummyDoc("j1"), DummyDoc("j2")]
 
@@ -288,4 +294,106 @@ def test_get_uncategorized_public_jokes_filters_by_category_id(monkeypatch):
   jokes = fs.get_uncategorized_public_jokes([])
   assert [j.key for j in jokes] == ["j1", "j2"]
   assert ("is_public", "==", True) in captured_filters
-  assert ("category_id", "==", "_uncategorized") in captured_filters
\ No newline at end of file
+  assert ("category_id", "==", "_uncategorized") in captured_filters
+  assert captured_selects == [list(fs.JOKE_TILE_FIELDS)]
+
+
+def test_get_all_joke_categories_hydrates_with_batched_reads(monkeypatch):
+  db = firestore_fake.FakeFirestore({
+    "joke_cache/joke_categories": {
+      "categories": [
+        {
+          "category_id": "animals",
+          "display_name": "Animals",
+          "state": "APPROVED",
+        },
+        {
+          "category_id": "food",
+          "display_name": "Food",
+          "state": "PROPOSED",
+        },
+        {
+          "category_id": "space",
+          "display_name": "Space",
+          "state": "APPROVED",
+        },
+      ],
+    },
+    "joke_categories/animals": {
+      "display_name": "Animals",
+      "joke_sheets_branded_id": " sheet-b ",
+      "joke_sheets_unbranded_id": "sheet-u",
+    },
+    "joke_categories/food": {
+      "display_name": "Food",
+    },
+    "joke_categories/animals/category_jokes/cache": {
+      "jokes": [{
+        "key": "j1",
+        "setup_text": "S1",
+        "punchline_text": "P1",
+      }],
+    },
+    "joke_categories/space/category_jokes/cache": {
+      "jokes": [{
+        "key": "j2",
+        "setup_text": "S2",
+        "punchline_text": "P2",
+        "setup_image_url": "https://img/j2.png",
+      }],
+    },
+  })
+  monkeypatch.setattr(fs, "db", lambda: db)
+
+  categories = fs.get_all_joke_categories(
+    fetch_cached_jokes=True,
+    use_cache=True,
+    fetch_live_sheet_ids=True,
+  )
+
+  by_id = {category.id: category for category in categories}
+  assert [j.key for j in by_id["animals"].jokes] == ["j1"]
+  assert by_id["food"].jokes == []
+  assert by_id["space"].jokes[0].setup_image_url == "https://img/j2.png"
+  assert by_id["animals"].joke_sheets_branded_id == "sheet-b"
+  assert by_id["animals"].joke_sheets_unbranded_id == "sheet-u"
+  assert by_id["space"].joke_sheets_branded_id is None
+
+  # One read for the category list, then one batch per document kind.
+  assert db.get_calls == ["joke_cache/joke_categories"]
+  assert sorted(sorted(paths) for paths in db.get_all_calls) == [
+    [
+      "joke_categories/animals",
+      "joke_categories/food",
+      "joke_categories/space",
+    ],
+    [
+      "joke_categories/animals/category_jokes/cache",
+      "joke_categories/food/category_jokes/cache",
+      "joke_categories/space/category_jokes/cache",
+    ],
+  ]
+
+
+def test_get_joke_sheets_reads_in_one_batch(monkeypatch):
+  db = firestore_fake.FakeFirestore({
+    "joke_sheets/s1": {
+      "pdf_gcs_uri": "gs://pdfs/s1.pdf",
+    },
+    "joke_sheets/s2": {
+      "pdf_gcs_uri": "gs://pdfs/s2.pdf",
+    },
+  })
+  monkeypatch.setattr(fs, "db", lambda: db)
+
+  sheets = fs.get_joke_sheets(["s1", " s2 ", "s1", "", "missing"])
+
+  assert sorted(sheets) == ["s1", "s2"]
+  assert sheets["s2"].pdf_gcs_uri == "gs://pdfs/s2.pdf"
+  assert [sorted(paths) for paths in db.get_all_calls] == [[
+    "joke_sheets/missing",
+    "joke_sheets/s1",
+    "joke_sheets/s2",
+  ]]
+  assert fs.get_joke_sheets([]) == {}
+  assert len(db.get_all_calls) == 1
@@ -1,94 +1,59 @@
 """Tests for the firestore module."""
 import datetime
+import signal
+import threading
+import zlib
+from types import SimpleNamespace
 
 import pytest
-from common import models
-from services import firestore
+from common import joke_stats, models
+from services import firestore, firestore_fake
 
 
-def test_upsert_punny_joke_serializes_state_string(monkeypatch):
-  """Test that the upsert_punny_joke function serializes the state string correctly."""
-  joke = models.PunnyJoke(setup_text="s", punchline_text="p")
-  joke.state = models.JokeState.DRAFT
-  joke.key = None
+@pytest.fixture(autouse=True)
+def _clear_joke_feed_cache():
+  firestore.clear_joke_feed_cache()
+  firestore.clear_joke_user_usage_buffer()
+  yield
+  firestore.clear_joke_feed_cache()
+  firestore.clear_joke_user_usage_buffer()
 
-  captured = {}
 
-  class DummyDoc:
-    """Dummy document class for testing."""
+class _FakeJokeCacheCollection:
+  """`joke_cache` collection stub whose documents never exist."""
 
-    def __init__(self):
-      self._exists = False
-      self._operations_doc = self._DummyOperationsDoc()
+  class _Doc:
+    exists = False
 
     def get(self):
-      """Dummy document class for testing."""
-
-      class R:
-        """Dummy result class for testing."""
-
-        def __init__(self):
-          self.exists = False
-
-      return R()
+      return self
 
     def set(self, data):
-      """Dummy document class for testing."""
-      captured.update(data)
-
-    class _DummyOperationsDoc:
-
-      def __init__(self):
-        self.exists = False
-
-      class _Snapshot:
-
-        def __init__(self, exists):
-          self.exists = exists
-
-        def to_dict(self):
-          return {}
-
-      def get(self):
-        return self._Snapshot(self.exists)
-
-      def set(self, *_args, **_kwargs):
-        self.exists = True
-
-    def collection(self, name):
-      assert name == 'metadata'
-
-      class DummyMetadataCol:
-
-        def __init__(self, operations_doc):
-          self._operations_doc = operations_doc
-
-        def document(self, doc_name):
-          assert doc_name == 'operations'
-          return self._operations_doc
-
-      return DummyMetadataCol(self._operations_doc)
+      pass
 
-  class DummyCol:
-    """Dummy collection class for testing."""
+    def to_dict(self):
+      return None
 
-    def document(self, _id):
-      """Dummy document class for testing."""
-      return DummyDoc()
+  def document(self, doc_id):
+    return self._Doc()
 
-  class DummyDB:
-    """Dummy database class for testing."""
 
-    def collection(self, _name):
-      """Dummy collection class for testing."""
-      return DummyCol()
+def test_upsert_punny_joke_serializes_state_string(monkeypatch):
+  """Test that the upsert_punny_joke function serializes the state string correctly."""
+  joke = models.PunnyJoke(setup_text="s", punchline_text="p")
+  joke.state = models.JokeState.DRAFT
+  joke.key = None
 
-  monkeypatch.setattr(firestore, "db", DummyDB)
+  db = firestore_fake.FakeFirestore()
+  monkeypatch.setattr(firestore, "db", lambda: db)
   # Avoid server timestamp usage complexity by monkeypatching constants
   monkeypatch.setattr(firestore, "SERVER_TIMESTAMP", "TS")
+  monkeypatch.setattr(firestore.utils, "create_firestore_key",
+                      lambda *args, **kwargs: "joke-key")
 
   res = firestore.upsert_punny_joke(joke)
   assert res is not None
+  captured = db.docs["jokes/joke-key"]
   assert captured["state"] == "DRAFT"
   assert "key" not in captured
 
@@ -108,64 +73,8 @@ def test_upsert_social_post_creates_document(monkeypatch):
     jokes=[joke],
   )
 
-  captured = {}
-
-  class DummyOperationsDoc:
-
-    def __init__(self):
-      self.exists = False
-      self.data = {}
-
-    def get(self):
-      return self
-
-    def to_dict(self):
-      return self.data
-
-    def set(self, data, merge=False):
-      self.data = data
-
-  class DummyDoc:
-    exists = False
-
-  class DummyDocRef:
-
-    def __init__(self):
-      self._operations_doc = DummyOperationsDoc()
-
-    def get(self):
-      return DummyDoc()
-
-    def set(self, data):
-      captured.update(data)
-
-    def collection(self, name):
-      assert name == "metadata"
-
-      class DummyMetadataCol:
-
-        def __init__(self, operations_doc):
-          self._operations_doc = operations_doc
-
-        def document(self, doc_name):
-          assert doc_name == "operations"
-          return self._operations_doc
-
-      return DummyMetadataCol(self._operations_doc)
-
-  class DummyCol:
-
-    def document(self, doc_id):
-      captured["doc_id"] = doc_id
-      return DummyDocRef()
-
-  class DummyDB:
-
-    def collection(self, name):
-      assert name == "joke_social_posts"
-      return DummyCol()
-
-  monkeypatch.setattr(firestore, "db", DummyDB)
+  db = firestore_fake.FakeFirestore()
+  monkeypatch.setattr(firestore, "db", lambda: db)
   monkeypatch.setattr(firestore, "SERVER_TIMESTAMP", "TS")
   monkeypatch.setattr(firestore.utils, "create_timestamped_firestore_key",
                       lambda *args: "post1")
@@ -173,7 +82,7 @@ def test_upsert_social_post_creates_document(monkeypatch):
   created = firestore.upsert_social_post(post)
 
   assert created.key == "post1"
-  assert captured["doc_id"] == "post1"
+  captured = db.docs["joke_social_posts/post1"]
   assert captured["type"] == "JOKE_GRID"
   assert captured["link_url"] == "https://snickerdoodlejokes.com/jokes/grid"
   assert captured["pinterest_title"] == "Title"
@@ -188,6 +97,10 @@ def test_upsert_social_post_creates_document(monkeypatch):
   }]
   assert captured["creation_time"] == "TS"
   assert captured["last_modification_time"] == "TS"
+  log_entry = db.docs["joke_social_posts/post1/operations_log/auto-1"]
+  assert log_entry[firestore.OPERATION] == "CREATE"
+  assert log_entry["pinterest_title"] == "Title"
+  assert len(db.commits) == 1
 
 
 def test_get_joke_social_post_returns_none_when_missing(monkeypatch):
@@ -385,66 +298,11 @@ def test_get_joke_social_posts_sets_creation_time(monkeypatch):
 
 
 def test_upsert_social_post_updates_document(monkeypatch):
-  captured = {}
-
-  class DummyOperationsDoc:
-
-    def __init__(self):
-      self.exists = False
-      self.data = {}
-
-    def get(self):
-      return self
-
-    def to_dict(self):
-      return self.data
-
-    def set(self, data, merge=False):
-      self.data = data
-
-  class DummyDoc:
-    exists = True
-
-    def to_dict(self):
-      return {"pinterest_title": "Old"}
-
-  class DummyDocRef:
-
-    def __init__(self):
-      self._operations_doc = DummyOperationsDoc()
-
-    def get(self):
-      return DummyDoc()
-
-    def update(self, data):
-      captured.update(data)
-
-    def collection(self, name):
-      assert name == "metadata"
-
-      class DummyMetadataCol:
-
-        def __init__(self, operations_doc):
-          self._operations_doc = operations_doc
-
-        def document(self, doc_name):
-          assert doc_name == "operations"
-          return self._operations_doc
-
-      return DummyMetadataCol(self._operations_doc)
-
-  class DummyCol:
-
-    def document(self, _doc_id):
-      return DummyDocRef()
-
-  class DummyDB:
-
-    def collection(self, name):
-      assert name == "joke_social_posts"
-      return DummyCol()
-
-  monkeypatch.setattr(firestore, "db", DummyDB)
+  db = firestore_fake.FakeFirestore(
+    {"joke_social_posts/post1": {
+      "pinterest_title": "Old"
+    }})
+  monkeypatch.setattr(firestore, "db", lambda: db)
   monkeypatch.setattr(firestore, "SERVER_TIMESTAMP", "TS")
 
   post = models.JokeSocialPost(
@@ -454,8 +312,14 @@ def test_upsert_social_post_updates_document(monkeypatch):
   )
   post.key = "post1"
   firestore.upsert_social_post(post)
+  captured = db.docs["joke_social_posts/post1"]
   assert captured["pinterest_title"] == "Updated"
   assert captured["last_modification_time"] == "TS"
+  log_entry = db.docs["joke_social_posts/post1/operations_log/auto-1"]
+  assert log_entry[firestore.OPERATION] == "UPDATE"
+  assert log_entry["pinterest_title"] == "Updated"
+  assert log_entry["last_modification_time"] == "OPERATION_TIMESTAMP"
+  assert len(db.commits) == 1
 
 
 def test_upsert_punny_joke_logs_operation(monkeypatch):
@@ -468,93 +332,29 @@ def test_upsert_punny_joke_logs_operation(monkeypatch):
   )
   joke.key = None
 
-  captured_main = {}
-  captured_operations: list[tuple[dict, bool]] = []
-
-  class DummyOperationsDoc:
-    """Dummy operations document for capturing writes."""
-
-    def __init__(self):
-      self._data: dict | None = None
-      self.exists = False
-
-    class _Snapshot:
-
-      def __init__(self, exists, data):
-        self.exists = exists
-        self._data = data
-
-      def to_dict(self):
-        return self._data
-
-    def get(self):
-      return self._Snapshot(self.exists, self._data)
-
-    def set(self, data, merge=False):
-      captured_operations.append((data, merge))
-      self._data = data
-      self.exists = True
-
-  class DummyDoc:
-    """Dummy joke document."""
-
-    def __init__(self):
-      self._exists = False
-      self._operations_doc = DummyOperationsDoc()
-
-    def get(self):
-
-      class Snapshot:
-
-        def __init__(self, exists):
-          self.exists = exists
-
-      return Snapshot(self._exists)
-
-    def set(self, data):
-      captured_main.update(data)
-      self._exists = True
-
-    def collection(self, name):
-      assert name == 'metadata'
-
-      class DummyMetadataCol:
-
-        def __init__(self, operations_doc):
-          self._operations_doc = operations_doc
-
-        def document(self, doc_name):
-          assert doc_name == 'operations'
-          return self._operations_doc
-
-      return DummyMetadataCol(self._operations_doc)
-
-  dummy_doc = DummyDoc()
-
-  class DummyCol:
-
-    def document(self, _id):
-      return dummy_doc
-
-  class DummyDB:
-
-    def collection(self, name):
-      assert name == 'jokes'
-      return DummyCol()
-
-  monkeypatch.setattr(firestore, "db", DummyDB)
+  db = firestore_fake.FakeFirestore()
+  monkeypatch.setattr(firestore, "db", lambda: db)
   monkeypatch.setattr(firestore, "SERVER_TIMESTAMP", "TS")
   monkeypatch.setattr(firestore.utils, "create_firestore_key",
                       lambda *args, **kwargs: "joke-key")
 
-  res = firestore.upsert_punny_joke(joke, operation="CREATE")
+  res = firestore.upsert_punny_joke(joke,
+                                    operation="CREATE",
+                                    update_metadata={"source": "test"})
 
   assert res is not None
+  captured_main = db.docs["jokes/joke-key"]
   assert captured_main["creation_time"] == "TS"
   assert captured_main["last_modification_time"] == "TS"
-  assert captured_operations[0][1] is True
-  assert "log" in captured_operations[0][0]
-  log_entry = captured_operations[0][0]["log"][0]
+  assert db.docs["jokes/joke-key/metadata/metadata"] == {"source": "test"}
+  # The joke, its metadata and the log entry are committed together.
+  assert len(db.commits) == 1
+  assert [path for _, path, _, _ in db.commits[0]] == [
+    "jokes/joke-key",
+    "jokes/joke-key/metadata/metadata",
+    "jokes/joke-key/operations_log/auto-1",
+  ]
+  log_entry = db.docs["jokes/joke-key/operations_log/auto-1"]
   assert log_entry[firestore.OPERATION] == "CREATE"
   assert isinstance(log_entry[firestore.OPERATION_TIMESTAMP],
                     datetime.datetime)
@@ -566,6 +366,73 @@ def test_upsert_punny_joke_logs_operation(monkeypatch):
   assert log_entry["punchline_scene_idea"] == "scene punch"
 
 
+def test_upsert_punny_joke_update_appends_log_entry_without_reading_log(
+    monkeypatch):
+  """Updates append one entry of changed fields in the same batch."""
+  db = firestore_fake.FakeFirestore({
+    "jokes/joke1": {
+      "setup_text": "s",
+      "punchline_text": "p",
+    },
+    "jokes/joke1/operations_log/old": {
+      firestore.OPERATION: "CREATE",
+    },
+  })
+  monkeypatch.setattr(firestore, "db", lambda: db)
+  monkeypatch.setattr(firestore, "SERVER_TIMESTAMP", "TS")
+
+  joke = models.PunnyJoke(key="joke1", setup_text="s2", punchline_text="p")
+  firestore.upsert_punny_joke(joke)
+
+  assert db.docs["jokes/joke1"]["setup_text"] == "s2"
+  assert len(db.commits) == 1
+  assert [(op, path) for op, path, _, _ in db.commits[0]] == [
+    ("update", "jokes/joke1"),
+    ("set", "jokes/joke1/operations_log/auto-1"),
+  ]
+  log_entry = db.docs["jokes/joke1/operations_log/auto-1"]
+  assert log_entry[firestore.OPERATION] == "UPDATE"
+  assert log_entry["setup_text"] == "s2"
+  assert "punchline_text" not in log_entry
+  assert db.docs["jokes/joke1/operations_log/old"] == {
+    firestore.OPERATION: "CREATE"
+  }
+
+
+def test_get_operations_log_paginates_newest_first(monkeypatch):
+  base = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+  db = firestore_fake.FakeFirestore({
+    f"jokes/joke1/operations_log/e{i}": {
+      firestore.OPERATION: f"OP{i}",
+      firestore.OPERATION_TIMESTAMP: base + datetime.timedelta(minutes=i),
+    }
+    for i in range(5)
+  })
+  db.docs["jokes/other/operations_log/x"] = {
+    firestore.OPERATION: "OTHER",
+    firestore.OPERATION_TIMESTAMP: base,
+  }
+
+  monkeypatch.setattr(firestore, "db", lambda: db)
+
+  first, cursor = firestore.get_operations_log("jokes", "joke1", limit=2)
+  second, cursor2 = firestore.get_operations_log("jokes",
+                                                 "joke1",
+                                                 cursor=cursor,
+                                                 limit=2)
+  last, cursor3 = firestore.get_operations_log("jokes",
+                                               "joke1",
+                                               cursor=cursor2,
+                                               limit=2)
+
+  assert [e[firestore.OPERATION] for e in first] == ["OP4", "OP3"]
+  assert cursor == "e3"
+  assert [e[firestore.OPERATION] for e in second] == ["OP2", "OP1"]
+  assert [e[firestore.OPERATION] for e in last] == ["OP0"]
+  assert cursor3 is None
+  assert firestore.get_operations_log("jokes", " ") == ([], None)
+
+
 def test_get_joke_by_state_orders_and_paginates(monkeypatch):
   """get_joke_by_state orders by creation_time desc and paginates by cursor."""
   captured: dict = {}
@@ -625,8 +492,13 @@ def test_get_joke_by_state_orders_and_paginates(monkeypatch):
       assert name == "jokes"
       return _Collection()
 
-  def _prepare(states, *, category_id: str | None = None, async_mode: bool):
+  def _prepare(states,
+               *,
+               category_id: str | None = None,
+               field_paths=None,
+               async_mode: bool):
     assert async_mode is False
+    assert field_paths is None
     captured["states"] = states
     captured["category_id"] = category_id
     return _Query([
@@ -695,7 +567,7 @@ def test_get_joke_by_state_without_social_post_adds_filter(monkeypatch):
     def stream(self):
       return []
 
-  def _prepare(states, *, category_id=None, async_mode):
+  def _prepare(states, *, category_id=None, field_paths=None, async_mode):
     return _Query()
 
   monkeypatch.setattr(firestore, "_prepare_jokes_query", _prepare)
@@ -710,42 +582,13 @@ def test_get_joke_by_state_without_social_post_adds_filter(monkeypatch):
   assert "joke_social_post_id" in filter_fields
 
 
-
-  captured = {}
-
-  class DummyDoc:
-
-    def __init__(self):
-      self._data = {"setup_text": "s", "punchline_text": "p"}
-
-    def get(self):
-
-      class Snapshot:
-
-        def __init__(self, data):
-          self.exists = True
-          self._data = data
-
-        def to_dict(self):
-          return self._data
-
-      return Snapshot(dict(self._data))
-
-    def update(self, data):
-      captured.update(data)
-      self._data.update(data)
-
-  class DummyCol:
-
-    def document(self, _id):
-      return DummyDoc()
-
-  class DummyDB:
-
-    def collection(self, _name):
-      return DummyCol()
-
-  monkeypatch.setattr(firestore, "db", DummyDB)
+def test_update_punny_joke_sets_is_public_true_for_published(monkeypatch):
+  db = firestore_fake.FakeFirestore(
+    {"jokes/joke1": {
+      "setup_text": "s",
+      "punchline_text": "p"
+    }})
+  monkeypatch.setattr(firestore, "db", lambda: db)
   monkeypatch.setattr(firestore, "SERVER_TIMESTAMP", "TS")
 
   diff = firestore.update_punny_joke(
@@ -753,6 +596,7 @@ def test_get_joke_by_state_without_social_post_adds_filter(monkeypatch):
     {"state": models.JokeState.PUBLISHED.value},
   )
 
+  captured = db.docs["jokes/joke1"]
   assert captured["state"] == "PUBLISHED"
   assert captured["is_public"] is True
   assert captured["last_modification_time"] == "TS"
@@ -760,44 +604,17 @@ def test_get_joke_by_state_without_social_post_adds_filter(monkeypatch):
     "state": "PUBLISHED",
     "is_public": True,
   }
+  # Without an operation, nothing is logged.
+  assert [path for _, path, _, _ in db.commits[0]] == ["jokes/joke1"]
 
 
 def test_update_punny_joke_sets_is_public_false_for_non_public(monkeypatch):
-  captured = {}
-
-  class DummyDoc:
-
-    def __init__(self):
-      self._data = {"setup_text": "s", "punchline_text": "p"}
-
-    def get(self):
-
-      class Snapshot:
-
-        def __init__(self, data):
-          self.exists = True
-          self._data = data
-
-        def to_dict(self):
-          return self._data
-
-      return Snapshot(dict(self._data))
-
-    def update(self, data):
-      captured.update(data)
-      self._data.update(data)
-
-  class DummyCol:
-
-    def document(self, _id):
-      return DummyDoc()
-
-  class DummyDB:
-
-    def collection(self, _name):
-      return DummyCol()
-
-  monkeypatch.setattr(firestore, "db", DummyDB)
+  db = firestore_fake.FakeFirestore(
+    {"jokes/joke1": {
+      "setup_text": "s",
+      "punchline_text": "p"
+    }})
+  monkeypatch.setattr(firestore, "db", lambda: db)
   monkeypatch.setattr(firestore, "SERVER_TIMESTAMP", "TS")
 
   diff = firestore.update_punny_joke(
@@ -808,6 +625,7 @@ def test_update_punny_joke_sets_is_public_false_for_non_public(monkeypatch):
     },
   )
 
+  captured = db.docs["jokes/joke1"]
   assert captured["state"] == "DAILY"
   assert captured["is_public"] is False
   assert captured["last_modification_time"] == "TS"
@@ -817,7 +635,80 @@ def test_update_punny_joke_sets_is_public_false_for_non_public(monkeypatch):
   }
 
 
-import pytest
+def test_bulk_update_punny_jokes_flushes_per_chunk(monkeypatch):
+  monkeypatch.setattr(firestore, "SERVER_TIMESTAMP", "TS")
+  events: list[object] = []
+
+  class _Failure:
+
+    def __init__(self, doc_ref, attempts):
+      self.operation = SimpleNamespace(reference=doc_ref)
+      self.attempts = attempts
+      self.message = "NOT_FOUND"
+
+  class _Writer:
+
+    def __init__(self):
+      self.error_handler = None
+
+    def on_write_error(self, handler):
+      self.error_handler = handler
+
+    def update(self, doc_ref, data):
+      if doc_ref.id != "missing":
+        events.append((doc_ref.id, data))
+        return
+      attempts = 1
+      while self.error_handler(_Failure(doc_ref, attempts), self):
+        attempts += 1
+      events.append(("failed", attempts))
+
+    def flush(self):
+      events.append("flush")
+
+    def close(self):
+      events.append("close")
+
+  class _Db:
+
+    def collection(self, name):
+      assert name == "jokes"
+      return self
+
+    def document(self, doc_id):
+      return SimpleNamespace(id=doc_id)
+
+    def bulk_writer(self):
+      return _Writer()
+
+  monkeypatch.setattr(firestore, "db", _Db)
+
+  failed_ids = firestore.bulk_update_punny_jokes(
+    {
+      "j1": {
+        "seasonal": "Halloween"
+      },
+      "missing": {
+        "seasonal": "Halloween"
+      },
+      "j3": {
+        "seasonal": "Halloween"
+      },
+    },
+    chunk_size=2,
+  )
+
+  update = {"seasonal": "Halloween", "last_modification_time": "TS"}
+  assert events == [
+    ("j1", update),
+    ("failed", 3),
+    "flush",
+    ("j3", update),
+    "flush",
+    "close",
+  ]
+  assert failed_ids == ["missing"]
+  assert firestore.bulk_update_punny_jokes({}) == []
 
 
 def test_get_all_jokes(monkeypatch):
@@ -933,14 +824,84 @@ async def test_get_all_jokes_async(monkeypatch):
     def collection(self, _name):
       return DummyCol()
 
-  monkeypatch.setattr(fs, "get_async_db", DummyDB)
+  monkeypatch.setattr(fs, "get_async_db", DummyDB)
+
+  jokes = await fs.get_all_jokes_async()
+  assert len(jokes) == 2
+  assert jokes[0].key == "joke1"
+  assert jokes[0].setup_text == "Why did the scarecrow win an award?"
+  assert jokes[1].key == "joke2"
+  assert jokes[1].punchline_text == "An Impasta."
+
+
+def _install_select_recording_db(monkeypatch, docs):
+  """Install a fake db whose jokes queries record `select` field masks."""
+  from services import firestore as fs
+
+  captured: dict[str, list] = {"selects": []}
+
+  class DummyDoc:
+
+    def __init__(self, id_, data):
+      self.id = id_
+      self.exists = True
+      self._data = data
+
+    def to_dict(self):
+      return self._data
+
+  class DummyQuery:
+
+    def where(self, filter=None):  # pylint: disable=unused-argument
+      return self
+
+    def select(self, field_paths):
+      captured["selects"].append(list(field_paths))
+      return self
+
+    def stream(self):
+      return [DummyDoc(id_, data) for id_, data in docs]
+
+  class DummyDB:
+
+    def collection(self, _name):
+      return DummyQuery()
+
+  monkeypatch.setattr(fs, "db", DummyDB)
+  return captured
+
+
+def test_get_all_jokes_applies_field_mask(monkeypatch):
+  """get_all_jokes reads only the requested fields when given a mask."""
+  from services import firestore as fs
+
+  captured = _install_select_recording_db(monkeypatch, [
+    ("joke1", {
+      "setup_text": "s",
+      "punchline_text": "p"
+    }),
+  ])
+
+  jokes = fs.get_all_jokes(field_paths=fs.JOKE_TEXT_FIELDS)
+
+  assert captured["selects"] == [["setup_text", "punchline_text"]]
+  assert [(j.key, j.setup_text, j.punchline_text)
+          for j in jokes] == [("joke1", "s", "p")]
+
+  captured["selects"].clear()
+  fs.get_all_jokes()
+  assert captured["selects"] == []
+
+
+def test_joke_scan_fields_cover_model_except_generation_metadata():
+  """The scan mask reads every PunnyJoke field but generation metadata."""
+  from services import firestore as fs
 
-  jokes = await fs.get_all_jokes_async()
-  assert len(jokes) == 2
-  assert jokes[0].key == "joke1"
-  assert jokes[0].setup_text == "Why did the scarecrow win an award?"
-  assert jokes[1].key == "joke2"
-  assert jokes[1].punchline_text == "An Impasta."
+  assert "generation_metadata" not in fs.JOKE_SCAN_FIELDS
+  assert "key" not in fs.JOKE_SCAN_FIELDS
+  expected = models.dataclass_field_names(
+    models.PunnyJoke) - {"key", "generation_metadata"}
+  assert set(fs.JOKE_SCAN_FIELDS) == expected
 
 
 def test_get_punny_jokes_batch(monkeypatch):
@@ -1665,6 +1626,9 @@ def test_upsert_joke_user_usage_insert(monkeypatch):
 
       return R()
 
+    def collection(self, _name):  # Daily stats histogram shards.
+      return DummyCol()
+
   class DummyCol:
 
     def document(self, _id):  # pylint: disable=unused-argument
@@ -1673,8 +1637,9 @@ def test_upsert_joke_user_usage_insert(monkeypatch):
   class DummyTxn:
     _read_only = False
 
-    def set(self, doc_ref, data):  # pylint: disable=unused-argument
-      captured.update(data)
+    def set(self, doc_ref, data, merge=False):  # pylint: disable=unused-argument
+      if not merge:  # Merges are daily stats histogram writes.
+        captured.update(data)
 
   class DummyDB:
 
@@ -1723,6 +1688,9 @@ def test_upsert_joke_user_usage_includes_client_navigated(monkeypatch):
 
       return R()
 
+    def collection(self, _name):  # Daily stats histogram shards.
+      return DummyCol()
+
   class DummyCol:
 
     def document(self, _id):  # pylint: disable=unused-argument
@@ -1731,8 +1699,9 @@ def test_upsert_joke_user_usage_includes_client_navigated(monkeypatch):
   class DummyTxn:
     _read_only = False
 
-    def set(self, doc_ref, data):  # pylint: disable=unused-argument
-      captured.update(data)
+    def set(self, doc_ref, data, merge=False):  # pylint: disable=unused-argument
+      if not merge:  # Merges are daily stats histogram writes.
+        captured.update(data)
 
   class DummyDB:
 
@@ -1774,6 +1743,9 @@ def test_upsert_joke_user_usage_includes_client_thumbs(monkeypatch):
 
       return R()
 
+    def collection(self, _name):  # Daily stats histogram shards.
+      return DummyCol()
+
   class DummyCol:
 
     def document(self, _id):  # pylint: disable=unused-argument
@@ -1782,8 +1754,9 @@ def test_upsert_joke_user_usage_includes_client_thumbs(monkeypatch):
   class DummyTxn:
     _read_only = False
 
-    def set(self, doc_ref, data):  # pylint: disable=unused-argument
-      captured.update(data)
+    def set(self, doc_ref, data, merge=False):  # pylint: disable=unused-argument
+      if not merge:  # Merges are daily stats histogram writes.
+        captured.update(data)
 
   class DummyDB:
 
@@ -1828,6 +1801,9 @@ def test_upsert_joke_user_usage_no_increment_same_day(monkeypatch):
     def get(self, transaction=None):  # pylint: disable=unused-argument
       return self._snap
 
+    def collection(self, _name):  # Daily stats histogram shards.
+      return DummyCol(self._snap)
+
   class DummyCol:
 
     def __init__(self, snap):
@@ -1841,6 +1817,9 @@ def test_upsert_joke_user_usage_no_increment_same_day(monkeypatch):
   class DummyTxn:
     _read_only = False
 
+    def set(self, doc_ref, data, merge=False):  # pylint: disable=unused-argument
+      pass  # Daily stats histogram writes.
+
     def update(self, doc_ref, data):  # pylint: disable=unused-argument
       updates.update(data)
 
@@ -1894,6 +1873,9 @@ def test_upsert_joke_user_usage_with_requested_review(monkeypatch):
 
       return R()
 
+    def collection(self, _name):  # Daily stats histogram shards.
+      return DummyCol()
+
   class DummyCol:
 
     def document(self, _id):  # pylint: disable=unused-argument
@@ -1902,8 +1884,9 @@ def test_upsert_joke_user_usage_with_requested_review(monkeypatch):
   class DummyTxn:
     _read_only = False
 
-    def set(self, doc_ref, data):  # pylint: disable=unused-argument
-      captured.update(data)
+    def set(self, doc_ref, data, merge=False):  # pylint: disable=unused-argument
+      if not merge:  # Merges are daily stats histogram writes.
+        captured.update(data)
 
   class DummyDB:
 
@@ -1946,6 +1929,9 @@ def test_upsert_joke_user_usage_increment_new_day(monkeypatch):
     def get(self, transaction=None):  # pylint: disable=unused-argument
       return self._snap
 
+    def collection(self, _name):  # Daily stats histogram shards.
+      return DummyCol(self._snap)
+
   class DummyCol:
 
     def __init__(self, snap):
@@ -1959,6 +1945,9 @@ def test_upsert_joke_user_usage_increment_new_day(monkeypatch):
   class DummyTxn:
     _read_only = False
 
+    def set(self, doc_ref, data, merge=False):  # pylint: disable=unused-argument
+      pass  # Daily stats histogram writes.
+
     def update(self, doc_ref, data):  # pylint: disable=unused-argument
       updates.update(data)
 
@@ -1991,6 +1980,485 @@ def test_upsert_joke_user_usage_increment_new_day(monkeypatch):
   assert updates["last_login_at"] == "TS"
 
 
+class _FakeUsageBulkWriter:
+  """Applies updates whose `last_update_time` precondition still holds."""
+
+  def __init__(self, db):
+    self._db = db
+    self.updates: list[tuple[str, dict]] = []
+    self.result_handler = None
+    self.error_handler = None
+    self.closed = False
+
+  def on_write_result(self, handler):
+    self.result_handler = handler
+
+  def on_write_error(self, handler):
+    self.error_handler = handler
+
+  def update(self, doc_ref, data, option=None):
+    if option.last_update_time != self._db.update_times.get(doc_ref.id):
+      _ = self.error_handler(
+        SimpleNamespace(code=9,
+                        attempts=1,
+                        message="precondition failed",
+                        operation=SimpleNamespace(reference=doc_ref)), self)
+      return
+    self.updates.append((doc_ref.id, data))
+    self.result_handler(
+      doc_ref, SimpleNamespace(update_time=self._db.commit_write(doc_ref.id)),
+      self)
+
+  def close(self):
+    self.closed = True
+
+
+class _FakeUsageDocRef:
+
+  def __init__(self, doc_id):
+    self.id = doc_id
+
+
+class _FakeUsageDb:
+
+  def __init__(self):
+    self.writers: list[_FakeUsageBulkWriter] = []
+    # Per-user doc update time, as a write counter.
+    self.update_times: dict[str, int] = {}
+
+  def collection(self, name):
+    assert name == "joke_users"
+    return self
+
+  def document(self, doc_id):
+    return _FakeUsageDocRef(doc_id)
+
+  def transaction(self):
+    return SimpleNamespace(write_results=None)
+
+  def bulk_writer(self):
+    writer = _FakeUsageBulkWriter(self)
+    self.writers.append(writer)
+    return writer
+
+  def write_option(self, last_update_time):
+    return SimpleNamespace(last_update_time=last_update_time)
+
+  def commit_write(self, user_id):
+    self.update_times[user_id] = self.update_times.get(user_id, 0) + 1
+    return self.update_times[user_id]
+
+
+def _install_usage_txn(monkeypatch, created, count_by_day):
+  """Replace the usage transaction with one that fills the day bucket."""
+  txn_calls = []
+
+  def _fake_txn(transaction,
+                user_id,
+                now_utc=None,
+                *,
+                usage_day=None,
+                **client_counters):
+    transaction.write_results = [
+      SimpleNamespace(update_time=firestore.db().commit_write(user_id))
+    ]
+    day_index = int((now_utc - created).total_seconds() // 86400)
+    txn_calls.append((user_id, day_index, client_counters))
+    usage_day.created_at = created
+    usage_day.day_index = day_index
+    usage_day.num_distinct_day_used = count_by_day[day_index]
+    usage_day.stats_counts = {
+      field: client_counters.get(field)
+      for field in firestore._JOKE_STATS_COUNT_FIELDS  # pylint: disable=protected-access
+    }
+    usage_day.stats_rollup = firestore._joke_stats_rollup(  # pylint: disable=protected-access
+      now_utc, usage_day.stats_counts)
+    return count_by_day[day_index]
+
+  monkeypatch.setattr(firestore, "_upsert_joke_user_usage_in_txn", _fake_txn)
+  return txn_calls
+
+
+def test_upsert_joke_user_usage_skips_transaction_within_day(monkeypatch):
+  db = _FakeUsageDb()
+  monkeypatch.setattr(firestore, "db", lambda: db)
+  monkeypatch.setattr(firestore, "SERVER_TIMESTAMP", "TS")
+  created = datetime.datetime(2024, 1, 1)
+  txn_calls = _install_usage_txn(monkeypatch, created, {3: 4, 4: 5})
+
+  day3 = created + datetime.timedelta(days=3, hours=1)
+  assert firestore.upsert_joke_user_usage("u1",
+                                          now_utc=day3,
+                                          client_num_viewed=1) == 4
+  assert firestore.upsert_joke_user_usage("u1",
+                                          now_utc=day3 +
+                                          datetime.timedelta(hours=2),
+                                          client_num_viewed=2) == 4
+  assert firestore.upsert_joke_user_usage("u1",
+                                          now_utc=day3 +
+                                          datetime.timedelta(hours=3),
+                                          client_num_viewed=3) == 4
+  assert len(txn_calls) == 1
+
+  # Only the latest counters of the buffered pings are written, stamped with
+  # the time of that ping rather than the flush.
+  assert firestore.flush_joke_user_usage() == 1
+  assert len(db.writers) == 1
+  assert db.writers[0].closed
+  assert db.writers[0].updates == [("u1", {
+    "client_num_viewed":
+    3,
+    "feed_cursor":
+    "",
+    "local_feed_count":
+    0,
+    "last_login_at":
+    (day3 + datetime.timedelta(hours=3)).replace(tzinfo=datetime.timezone.utc),
+  })]
+  assert firestore.flush_joke_user_usage() == 0
+
+  # A new day bucket goes back through the transaction.
+  assert firestore.upsert_joke_user_usage(
+    "u1", now_utc=created + datetime.timedelta(days=4, hours=1)) == 5
+  assert len(txn_calls) == 2
+
+
+def test_upsert_joke_user_usage_runs_transaction_on_stats_bucket_change(
+    monkeypatch):
+  db = _FakeUsageDb()
+  monkeypatch.setattr(firestore, "db", lambda: db)
+  created = datetime.datetime(2024, 1, 1)
+  txn_calls = _install_usage_txn(monkeypatch, created, {0: 1})
+  now = created + datetime.timedelta(hours=20)
+
+  _ = firestore.upsert_joke_user_usage("u1", now_utc=now, client_num_viewed=8)
+  _ = firestore.upsert_joke_user_usage("u1", now_utc=now, client_num_viewed=9)
+  assert len(txn_calls) == 1
+
+  # 10 views moves the user to the "10-19" histogram bucket.
+  _ = firestore.upsert_joke_user_usage("u1", now_utc=now, client_num_viewed=10)
+  assert len(txn_calls) == 2
+
+
+def test_upsert_joke_user_usage_updates_daily_stats_entries(monkeypatch):
+  """Daily histogram entries move within a day and are added on a new day."""
+  from services import firestore as fs
+
+  snap_data = {
+    'created_at': datetime.datetime(2024, 1, 1),
+    'last_login_at': datetime.datetime(2024, 1, 2, 20),
+    'num_distinct_day_used': 2,
+    'client_num_days_used': 2,
+    'client_num_viewed': 7,
+    'stats_rollup': {
+      'day': '20240102',
+      'days_used': '2',
+      'jokes_viewed': '1-9',
+    },
+  }
+
+  class DummySnap:
+    exists = True
+
+    def to_dict(self):
+      return dict(snap_data)
+
+  class DummyDoc:
+
+    def __init__(self, path):
+      self.path = path
+
+    def get(self, transaction=None):  # pylint: disable=unused-argument
+      return DummySnap()
+
+    def collection(self, name):
+      return DummyCol(f"{self.path}/{name}")
+
+  class DummyCol:
+
+    def __init__(self, path):
+      self._path = path
+
+    def document(self, doc_id):
+      return DummyDoc(f"{self._path}/{doc_id}")
+
+  stats_writes = {}
+  updates = {}
+
+  def _values(data):
+    if isinstance(data, dict):
+      return {key: _values(value) for key, value in data.items()}
+    return data.value
+
+  class DummyTxn:
+    _read_only = False
+
+    def set(self, doc_ref, data, merge=False):
+      assert merge
+      stats_writes[doc_ref.path] = _values(data)
+
+    def update(self, doc_ref, data):  # pylint: disable=unused-argument
+      updates.update(data)
+
+  class DummyDB:
+
+    def collection(self, name):
+      return DummyCol(name)
+
+  monkeypatch.setattr(fs, "db", DummyDB)
+  monkeypatch.setattr(fs, "SERVER_TIMESTAMP", "TS")
+  shard = zlib.crc32(b"user1") % fs.JOKE_STATS_DAILY_NUM_SHARDS
+  shard_path = f"joke_stats_daily/20240103/shards/{shard}"
+
+  # 2024-01-04 05:00 UTC is 2024-01-03 in Los Angeles.
+  now = datetime.datetime(2024, 1, 4, 5, tzinfo=datetime.timezone.utc)
+  count = fs._upsert_joke_user_usage_logic(  # pylint: disable=protected-access
+    DummyTxn(),
+    "user1",
+    now_utc=now,
+    client_num_days_used=3,
+  )
+
+  assert count == 3
+  assert updates["stats_rollup"] == {
+    'day': '20240103',
+    'days_used': '3',
+    'jokes_viewed': '1-9',
+  }
+  # Jan 2 keeps the user; Jan 3 counts them and supersedes the Jan 2 entry.
+  assert stats_writes == {
+    shard_path: {
+      fs.JOKE_STATS_DAILY_USERS_FIELD: {
+        "3": {
+          "1-9": 1
+        }
+      },
+      fs.JOKE_STATS_DAILY_SUPERSEDED_USERS_FIELD: {
+        "20240102": {
+          "2": {
+            "1-9": 1
+          }
+        }
+      },
+    },
+  }
+
+  # Another ping the same day moves the user's Jan 3 entry.
+  snap_data.update(updates, last_login_at=datetime.datetime(2024, 1, 4, 5))
+  stats_writes.clear()
+  _ = fs._upsert_joke_user_usage_logic(  # pylint: disable=protected-access
+    DummyTxn(),
+    "user1",
+    now_utc=now,
+    client_num_days_used=3,
+    client_num_viewed=12,
+  )
+
+  assert stats_writes == {
+    shard_path: {
+      fs.JOKE_STATS_DAILY_USERS_FIELD: {
+        "3": {
+          "1-9": -1,
+          "10-19": 1,
+        }
+      },
+    },
+  }
+
+
+def test_get_joke_stats_daily_rollups_merges_shards(monkeypatch):
+  users_field = firestore.JOKE_STATS_DAILY_USERS_FIELD
+  superseded_field = firestore.JOKE_STATS_DAILY_SUPERSEDED_USERS_FIELD
+  docs = {
+    "joke_stats_daily/20240101/shards/0": {
+      users_field: {
+        "3": {
+          "1-9": 2,
+          "10-19": 0
+        }
+      },
+    },
+    "joke_stats_daily/20240101/shards/7": {
+      users_field: {
+        "3": {
+          "1-9": 1
+        }
+      },
+      superseded_field: {
+        "20231230": {
+          "2": {
+            "1-9": 1
+          }
+        }
+      },
+    },
+  }
+  db = firestore_fake.FakeFirestore(docs)
+  monkeypatch.setattr(firestore, "db", lambda: db)
+
+  rollups = firestore.get_joke_stats_daily_rollups(
+    ["20240101", "20240102", "20240101"])
+
+  assert rollups == {
+    "20240101":
+    joke_stats.DailyRollup(
+      users={"3": {
+        "1-9": 3
+      }},
+      superseded_users={"20231230": {
+        "2": {
+          "1-9": 1
+        }
+      }},
+    ),
+  }
+  num_shards = firestore.JOKE_STATS_DAILY_NUM_SHARDS
+  assert len(db.get_all_calls) == 1
+  assert len(db.get_all_calls[0]) == 2 * num_shards
+  assert db.get_all_calls[0][num_shards] == (
+    "joke_stats_daily/20240102/shards/0")
+
+
+def test_upsert_joke_user_usage_flushes_when_buffer_is_full(monkeypatch):
+  db = _FakeUsageDb()
+  monkeypatch.setattr(firestore, "db", lambda: db)
+  monkeypatch.setattr(firestore, "SERVER_TIMESTAMP", "TS")
+  monkeypatch.setattr(
+    firestore,
+    "_JOKE_USER_USAGE_BUFFER",
+    firestore._JokeUserUsageBuffer(  # pylint: disable=protected-access
+      max_users=10,
+      flush_max_users=2,
+      flush_interval_seconds=3600,
+    ))
+  created = datetime.datetime(2024, 1, 1)
+  _install_usage_txn(monkeypatch, created, {0: 1})
+  now = created + datetime.timedelta(hours=1)
+
+  for user_id in ("u1", "u2"):
+    _ = firestore.upsert_joke_user_usage(user_id, now_utc=now)
+  assert not db.writers
+
+  _ = firestore.upsert_joke_user_usage("u1", now_utc=now, client_num_saved=2)
+  assert not db.writers
+  _ = firestore.upsert_joke_user_usage("u2", now_utc=now, client_num_saved=7)
+
+  assert len(db.writers) == 1
+  assert sorted((user_id, data["client_num_saved"])
+                for user_id, data in db.writers[0].updates) == [("u1", 2),
+                                                                ("u2", 7)]
+
+
+def _stage_usage_ping(monkeypatch, db, user_id="u1"):
+  """Run a user's first ping through the transaction and buffer a second."""
+  monkeypatch.setattr(firestore, "db", lambda: db)
+  created = datetime.datetime(2024, 1, 1)
+  txn_calls = _install_usage_txn(monkeypatch, created, {0: 1})
+  now = created + datetime.timedelta(hours=1)
+  _ = firestore.upsert_joke_user_usage(user_id, now_utc=now)
+  _ = firestore.upsert_joke_user_usage(user_id,
+                                       now_utc=now,
+                                       local_feed_count=1)
+  assert len(txn_calls) == 1
+  return txn_calls, now
+
+
+def test_flush_joke_user_usage_retries_then_gives_up(monkeypatch):
+  db = _FakeUsageDb()
+  _stage_usage_ping(monkeypatch, db)
+  _ = firestore.flush_joke_user_usage()
+
+  class _Error:
+
+    def __init__(self, attempts):
+      self.code = 14  # UNAVAILABLE
+      self.attempts = attempts
+      self.message = "unavailable"
+
+  max_attempts = firestore._JOKE_USER_USAGE_MAX_WRITE_ATTEMPTS  # pylint: disable=protected-access
+  handler = db.writers[0].error_handler
+  assert handler(_Error(1), None) is True
+  assert handler(_Error(max_attempts), None) is False
+
+
+def test_flush_joke_user_usage_drops_updates_older_than_a_transaction(
+    monkeypatch):
+  db = _FakeUsageDb()
+  txn_calls, now = _stage_usage_ping(monkeypatch, db)
+  # Another instance's usage transaction commits before the flush.
+  _ = db.commit_write("u1")
+
+  assert firestore.flush_joke_user_usage() == 1
+  assert not db.writers[0].updates
+  assert db.update_times["u1"] == 2
+
+  # The stale day bucket was forgotten, so the next ping re-reads the doc.
+  _ = firestore.upsert_joke_user_usage("u1", now_utc=now)
+  assert len(txn_calls) == 2
+
+
+def test_flush_joke_user_usage_tracks_its_own_writes(monkeypatch):
+  db = _FakeUsageDb()
+  txn_calls, now = _stage_usage_ping(monkeypatch, db)
+
+  assert firestore.flush_joke_user_usage() == 1
+  _ = firestore.upsert_joke_user_usage("u1", now_utc=now, local_feed_count=2)
+  assert firestore.flush_joke_user_usage() == 1
+
+  assert [data["local_feed_count"] for _, data in db.writers[0].updates] == [1]
+  assert [data["local_feed_count"] for _, data in db.writers[1].updates] == [2]
+  assert len(txn_calls) == 1
+
+
+def test_joke_user_usage_buffer_flushes_after_deadline_without_pings():
+  flushed = threading.Event()
+  buffer = firestore._JokeUserUsageBuffer(  # pylint: disable=protected-access
+    max_users=10,
+    flush_max_users=10,
+    flush_interval_seconds=0.01,
+    on_flush_due=flushed.set,
+  )
+
+  assert not buffer.stage("u1", {"local_feed_count": 1})
+  assert flushed.wait(timeout=5)
+
+
+def test_joke_user_usage_buffer_drain_cancels_deadline_flush():
+  flushed = threading.Event()
+  buffer = firestore._JokeUserUsageBuffer(  # pylint: disable=protected-access
+    max_users=10,
+    flush_max_users=10,
+    flush_interval_seconds=3600,
+    on_flush_due=flushed.set,
+  )
+
+  buffer.remember(
+    "u1",
+    firestore._JokeUserUsageDay(  # pylint: disable=protected-access
+      created_at=datetime.datetime(2024, 1, 1),
+      update_time=7))
+  _ = buffer.stage("u1", {"local_feed_count": 1})
+  # Without a cached update time there is no safe precondition.
+  _ = buffer.stage("u2", {"local_feed_count": 2})
+  timer = buffer._flush_timer  # pylint: disable=protected-access
+  assert buffer.drain() == {"u1": ({"local_feed_count": 1}, 7)}
+  timer.join(timeout=5)
+  assert not flushed.is_set()
+
+
+def test_sigterm_flushes_joke_user_usage_then_chains(monkeypatch):
+  db = _FakeUsageDb()
+  _stage_usage_ping(monkeypatch, db)
+  previous_calls = []
+  monkeypatch.setattr(firestore, "_PREVIOUS_SIGTERM_HANDLER",
+                      lambda signum, frame: previous_calls.append(signum))
+
+  firestore._flush_joke_user_usage_on_sigterm(signal.SIGTERM, None)  # pylint: disable=protected-access
+
+  assert [user_id for user_id, _ in db.writers[0].updates] == ["u1"]
+  assert previous_calls == [signal.SIGTERM]
+
+
 def test_update_joke_feed_single_chunk(monkeypatch):
   """Test that update_joke_feed creates a single document when jokes fit in one chunk."""
   from services import firestore as fs
@@ -2010,9 +2478,14 @@ def test_update_joke_feed_single_chunk(monkeypatch):
     def document(self, doc_id):
       return DummyDoc(doc_id)
 
+    def list_documents(self):
+      return []
+
   class DummyDB:
 
     def collection(self, collection_name):
+      if collection_name == "joke_cache":
+        return _FakeJokeCacheCollection()
       assert collection_name == "joke_feed"
       return DummyCol()
 
@@ -2046,9 +2519,14 @@ def test_update_joke_feed_multiple_chunks(monkeypatch):
     def document(self, doc_id):
       return DummyDoc(doc_id)
 
+    def list_documents(self):
+      return []
+
   class DummyDB:
 
     def collection(self, collection_name):
+      if collection_name == "joke_cache":
+        return _FakeJokeCacheCollection()
       assert collection_name == "joke_feed"
       return DummyCol()
 
@@ -2097,9 +2575,14 @@ def test_update_joke_feed_exactly_one_chunk(monkeypatch):
     def document(self, doc_id):
       return DummyDoc(doc_id)
 
+    def list_documents(self):
+      return []
+
   class DummyDB:
 
     def collection(self, collection_name):
+      if collection_name == "joke_cache":
+        return _FakeJokeCacheCollection()
       assert collection_name == "joke_feed"
       return DummyCol()
 
@@ -2133,9 +2616,14 @@ def test_update_joke_feed_exactly_two_chunks(monkeypatch):
     def document(self, doc_id):
       return DummyDoc(doc_id)
 
+    def list_documents(self):
+      return []
+
   class DummyDB:
 
     def collection(self, collection_name):
+      if collection_name == "joke_cache":
+        return _FakeJokeCacheCollection()
       assert collection_name == "joke_feed"
       return DummyCol()
 
@@ -2170,9 +2658,14 @@ def test_update_joke_feed_empty_list(monkeypatch):
     def document(self, doc_id):
       return DummyDoc(doc_id)
 
+    def list_documents(self):
+      return []
+
   class DummyDB:
 
     def collection(self, collection_name):
+      if collection_name == "joke_cache":
+        return _FakeJokeCacheCollection()
       assert collection_name == "joke_feed"
       return DummyCol()
 
@@ -2204,9 +2697,14 @@ def test_update_joke_feed_one_over_chunk(monkeypatch):
     def document(self, doc_id):
       return DummyDoc(doc_id)
 
+    def list_documents(self):
+      return []
+
   class DummyDB:
 
     def collection(self, collection_name):
+      if collection_name == "joke_cache":
+        return _FakeJokeCacheCollection()
       assert collection_name == "joke_feed"
       return DummyCol()
 
@@ -2413,6 +2911,8 @@ def test_get_joke_feed_page_no_cursor(monkeypatch):
   class DummyDB:
 
     def collection(self, collection_name):
+      if collection_name == "joke_cache":
+        return _FakeJokeCacheCollection()
       assert collection_name == "joke_feed"
       return DummyCol({
         "0000000000": [
@@ -2535,6 +3035,8 @@ def test_get_joke_feed_page_with_cursor(monkeypatch):
   class DummyDB:
 
     def collection(self, collection_name):
+      if collection_name == "joke_cache":
+        return _FakeJokeCacheCollection()
       assert collection_name == "joke_feed"
       return DummyCol(docs_by_id)
 
@@ -2577,6 +3079,8 @@ def test_get_joke_feed_page_empty_feed(monkeypatch):
   class DummyDB:
 
     def collection(self, collection_name):
+      if collection_name == "joke_cache":
+        return _FakeJokeCacheCollection()
       assert collection_name == "joke_feed"
       return DummyCol()
 
@@ -2649,6 +3153,8 @@ def test_get_joke_feed_page_single_document(monkeypatch):
   class DummyDB:
 
     def collection(self, collection_name):
+      if collection_name == "joke_cache":
+        return _FakeJokeCacheCollection()
       assert collection_name == "joke_feed"
       return DummyCol({
         "0000000000": [
@@ -2717,6 +3223,8 @@ def test_get_joke_feed_page_crosses_document_boundary(monkeypatch):
   class DummyDB:
 
     def collection(self, collection_name):
+      if collection_name == "joke_cache":
+        return _FakeJokeCacheCollection()
       assert collection_name == "joke_feed"
       return DummyCol({
         "0000000000": [
@@ -2820,6 +3328,8 @@ def test_get_joke_feed_page_partial_document_consumption(monkeypatch):
   class DummyDB:
 
     def collection(self, collection_name):
+      if collection_name == "joke_cache":
+        return _FakeJokeCacheCollection()
       assert collection_name == "joke_feed"
       return DummyCol({
         "doc1": [
@@ -2856,6 +3366,314 @@ def test_get_joke_feed_page_partial_document_consumption(monkeypatch):
   assert "doc1" in accessed_docs
 
 
+class _FeedPublishDB:
+  """In-memory client for `update_joke_feed` that records chunk writes."""
+
+  def __init__(self):
+    self.docs: dict[str, dict[str, dict]] = {"joke_feed": {}, "joke_cache": {}}
+    self.writes: list[str] = []
+    self.deletes: list[str] = []
+
+  def collection(self, collection_name):
+    db = self
+    docs = self.docs[collection_name]
+
+    class _Snapshot:
+
+      def __init__(self, data):
+        self.exists = data is not None
+        self._data = data
+
+      def to_dict(self):
+        return self._data
+
+    class _Doc:
+
+      def __init__(self, doc_id):
+        self.id = doc_id
+
+      def get(self):
+        return _Snapshot(docs.get(self.id))
+
+      def set(self, data):
+        docs[self.id] = data
+        db.writes.append(f"{collection_name}/{self.id}")
+
+      def delete(self):
+        docs.pop(self.id, None)
+        db.deletes.append(f"{collection_name}/{self.id}")
+
+    class _Col:
+
+      def document(self, doc_id):
+        return _Doc(doc_id)
+
+      def list_documents(self):
+        return [_Doc(doc_id) for doc_id in docs]
+
+    return _Col()
+
+
+def test_update_joke_feed_writes_manifest(monkeypatch):
+  """update_joke_feed records chunk ids and hashes in joke_cache/joke_feed."""
+  from services import firestore as fs
+
+  fake_db = _FeedPublishDB()
+  monkeypatch.setattr(fs, "db", lambda: fake_db)
+  monkeypatch.setattr(fs, "SERVER_TIMESTAMP", "TS")
+
+  fs.update_joke_feed([{"key": f"joke{i}"} for i in range(60)])
+
+  manifest = fake_db.docs["joke_cache"]["joke_feed"]
+  assert manifest["build_version"]
+  assert manifest["chunk_ids"] == ["0000000000", "0000000001"]
+  assert len(manifest["chunk_hashes"]) == 2
+  assert manifest["chunk_hashes"][0] != manifest["chunk_hashes"][1]
+  assert manifest["num_jokes"] == 60
+  assert manifest["refresh_timestamp"] == "TS"
+
+
+def test_update_joke_feed_only_writes_changed_chunks(monkeypatch):
+  """Unchanged rebuilds write nothing; edits rewrite only dirty chunks."""
+  from services import firestore as fs
+
+  fake_db = _FeedPublishDB()
+  monkeypatch.setattr(fs, "db", lambda: fake_db)
+  jokes = [{"key": f"joke{i}"} for i in range(120)]
+
+  fs.update_joke_feed(jokes)
+  first_version = fake_db.docs["joke_cache"]["joke_feed"]["build_version"]
+  fake_db.writes.clear()
+
+  fs.update_joke_feed(jokes)
+  assert not fake_db.writes
+
+  jokes[60] = {"key": "edited"}
+  fs.update_joke_feed(jokes)
+  assert fake_db.writes == ["joke_feed/0000000001", "joke_cache/joke_feed"]
+  assert fake_db.docs["joke_feed"]["0000000001"]["jokes"][10] == {
+    "key": "edited"
+  }
+  assert (fake_db.docs["joke_cache"]["joke_feed"]["build_version"]
+          != first_version)
+  assert not fake_db.deletes
+
+
+def test_update_joke_feed_deletes_orphaned_tail_chunks(monkeypatch):
+  """Shrinking the feed deletes chunks past the new end."""
+  from services import firestore as fs
+
+  fake_db = _FeedPublishDB()
+  monkeypatch.setattr(fs, "db", lambda: fake_db)
+
+  fs.update_joke_feed([{"key": f"joke{i}"} for i in range(120)])
+  fake_db.writes.clear()
+  fs.update_joke_feed([{"key": f"joke{i}"} for i in range(50)])
+
+  assert fake_db.writes == ["joke_cache/joke_feed"]
+  assert fake_db.deletes == ["joke_feed/0000000001", "joke_feed/0000000002"]
+  assert list(fake_db.docs["joke_feed"]) == ["0000000000"]
+  assert fake_db.docs["joke_cache"]["joke_feed"]["num_jokes"] == 50
+
+
+def test_update_joke_feed_without_manifest_lists_orphans(monkeypatch):
+  """Without a manifest, all chunks are written and stale ones deleted."""
+  from services import firestore as fs
+
+  fake_db = _FeedPublishDB()
+  fake_db.docs["joke_feed"] = {
+    "0000000000": {
+      "jokes": []
+    },
+    "0000000003": {
+      "jokes": []
+    },
+  }
+  monkeypatch.setattr(fs, "db", lambda: fake_db)
+
+  fs.update_joke_feed([{"key": "joke0"}])
+
+  assert fake_db.writes == ["joke_feed/0000000000", "joke_cache/joke_feed"]
+  assert fake_db.deletes == ["joke_feed/0000000003"]
+
+
+class _StampedFeedDB:
+  """Fake client with a stamped joke_feed that counts document reads."""
+
+  def __init__(self, chunks: dict[str, list[dict]], build_version: str):
+    self.chunks = chunks
+    self.build_version = build_version
+    self.chunk_hashes: dict[str, str] | None = None
+    self.chunk_reads: list[str] = []
+    self.stamp_reads = 0
+
+  def collection(self, collection_name):
+    db = self
+
+    class _Snapshot:
+
+      def __init__(self, data):
+        self.exists = data is not None
+        self._data = data
+
+      def to_dict(self):
+        return self._data
+
+    class _Doc:
+
+      def __init__(self, doc_id):
+        self._doc_id = doc_id
+
+      def get(self):
+        if collection_name == "joke_cache":
+          assert self._doc_id == "joke_feed"
+          db.stamp_reads += 1
+          manifest = {
+            "build_version": db.build_version,
+            "chunk_ids": list(db.chunks),
+          }
+          if db.chunk_hashes is not None:
+            manifest["chunk_hashes"] = [
+              db.chunk_hashes[chunk_id] for chunk_id in db.chunks
+            ]
+          return _Snapshot(manifest)
+        assert collection_name == "joke_feed"
+        db.chunk_reads.append(self._doc_id)
+        jokes = db.chunks.get(self._doc_id)
+        return _Snapshot(None if jokes is None else {"jokes": jokes})
+
+    class _Col:
+
+      def document(self, doc_id):
+        return _Doc(doc_id)
+
+      def order_by(self, field_path):
+        raise AssertionError("stamped feed should not be streamed")
+
+    return _Col()
+
+
+def _feed_jokes(*keys):
+  return [{
+    "key": key,
+    "setup_text": f"Setup {key}",
+    "punchline_text": f"Punch {key}",
+  } for key in keys]
+
+
+def test_get_joke_feed_page_entries_serves_repeat_pages_from_cache(
+    monkeypatch):
+  """Repeated feed pages are served from decoded chunks without reads."""
+  from services import firestore as fs
+
+  fake_db = _StampedFeedDB(
+    {
+      "0000000000": _feed_jokes("j1", "j2", "j3"),
+      "0000000001": _feed_jokes("j4", "j5"),
+    },
+    build_version="v1",
+  )
+  monkeypatch.setattr(fs, "db", lambda: fake_db)
+
+  entries, cursor = fs.get_joke_feed_page_entries(cursor=None, limit=2)
+  assert [joke.key for joke, _ in entries] == ["j1", "j2"]
+  assert cursor == "0000000000:2"
+
+  entries, cursor = fs.get_joke_feed_page_entries(cursor=cursor, limit=2)
+  assert [joke.key for joke, _ in entries] == ["j3", "j4"]
+  assert [c for _, c in entries] == ["0000000001:0", "0000000001:1"]
+  assert cursor == "0000000001:1"
+
+  entries, cursor = fs.get_joke_feed_page_entries(cursor=None, limit=2)
+  assert [joke.key for joke, _ in entries] == ["j1", "j2"]
+
+  assert fake_db.stamp_reads == 1
+  assert fake_db.chunk_reads == ["0000000000", "0000000001"]
+  stats = fs.get_joke_feed_cache_stats()
+  assert stats["hits"] == 2
+  assert stats["misses"] == 2
+  assert stats["cached_chunks"] == 2
+  assert stats["build_version"] == "v1"
+
+
+def test_get_joke_feed_page_entries_invalidates_on_new_build(monkeypatch):
+  """A new build version evicts cached chunks from the previous build."""
+  from services import firestore as fs
+
+  fake_db = _StampedFeedDB({"0000000000": _feed_jokes("old")},
+                           build_version="v1")
+  monkeypatch.setattr(fs, "db", lambda: fake_db)
+  clock = [1000.0]
+  monkeypatch.setattr(fs.time, "monotonic", lambda: clock[0])
+
+  entries, _ = fs.get_joke_feed_page_entries(limit=5)
+  assert [joke.key for joke, _ in entries] == ["old"]
+
+  fake_db.chunks = {"0000000000": _feed_jokes("new")}
+  fake_db.build_version = "v2"
+
+  # Within the check interval, the previous build is still served.
+  entries, _ = fs.get_joke_feed_page_entries(limit=5)
+  assert [joke.key for joke, _ in entries] == ["old"]
+
+  clock[0] += fs._JOKE_FEED_BUILD_CHECK_INTERVAL_SECONDS + 1
+  entries, _ = fs.get_joke_feed_page_entries(limit=5)
+  assert [joke.key for joke, _ in entries] == ["new"]
+  assert fake_db.stamp_reads == 2
+  assert fs.get_joke_feed_cache_stats()["cached_chunks"] == 1
+
+
+
+def test_get_joke_feed_page_entries_keeps_unchanged_chunks_across_builds(
+    monkeypatch):
+  """Only chunks whose hash changed are re-read after a rebuild."""
+  from services import firestore as fs
+
+  fake_db = _StampedFeedDB(
+    {
+      "0000000000": _feed_jokes("j1"),
+      "0000000001": _feed_jokes("j2"),
+    },
+    build_version="v1",
+  )
+  fake_db.chunk_hashes = {"0000000000": "h0", "0000000001": "h1"}
+  monkeypatch.setattr(fs, "db", lambda: fake_db)
+  clock = [1000.0]
+  monkeypatch.setattr(fs.time, "monotonic", lambda: clock[0])
+
+  entries, _ = fs.get_joke_feed_page_entries(limit=5)
+  assert [joke.key for joke, _ in entries] == ["j1", "j2"]
+
+  fake_db.chunks["0000000001"] = _feed_jokes("j2-edited")
+  fake_db.chunk_hashes["0000000001"] = "h1-edited"
+  fake_db.build_version = "v2"
+  clock[0] += fs._JOKE_FEED_BUILD_CHECK_INTERVAL_SECONDS + 1
+
+  entries, _ = fs.get_joke_feed_page_entries(limit=5)
+  assert [joke.key for joke, _ in entries] == ["j1", "j2-edited"]
+  assert fake_db.chunk_reads == ["0000000000", "0000000001", "0000000001"]
+  assert fs.get_joke_feed_cache_stats()["build_version"] == "v2"
+
+def test_get_joke_feed_page_entries_cache_is_bounded(monkeypatch):
+  """The chunk cache evicts least recently used chunks past its bound."""
+  from services import firestore as fs
+
+  fake_db = _StampedFeedDB(
+    {f"{i:010d}": _feed_jokes(f"j{i}")
+     for i in range(5)},
+    build_version="v1",
+  )
+  monkeypatch.setattr(fs, "db", lambda: fake_db)
+  monkeypatch.setattr(
+    fs, "_JOKE_FEED_CACHE",
+    fs._JokeFeedChunkCache(max_chunks=2, build_check_interval_seconds=60))
+
+  entries, _ = fs.get_joke_feed_page_entries(limit=10)
+
+  assert [joke.key for joke, _ in entries] == ["j0", "j1", "j2", "j3", "j4"]
+  assert fs.get_joke_feed_cache_stats()["cached_chunks"] == 2
+
+
 def test_upsert_amazon_ads_report_uses_report_name_as_doc_id(monkeypatch):
   """Reports should be upserted into Firestore keyed by report_name."""
   from services import firestore as fs
@@ -1,27 +1,31 @@
-"""Video generation service using moviepy."""
+"""Video generation service using moviepy and ffmpeg."""
 
 from __future__ import annotations
 
+import math
 import os
 import random
+import subprocess
 import tempfile
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 from common import models, utils
 from common.posable_character import PosableCharacter
 from common.posable_character_sequence import PosableCharacterSequence
 from firebase_functions import logger
-from moviepy.audio.AudioClip import CompositeAudioClip
-from moviepy.audio.io.AudioFileClip import AudioFileClip
-from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
-from moviepy.video.VideoClip import ImageClip
+from moviepy.config import FFMPEG_BINARY
 from PIL import Image
 from services import audio_voices, cloud_storage
 from services.video import joke_video_chars_on_top_script_builder
 from services.video.scene_video_renderer import generate_scene_video
 
 _DEFAULT_VIDEO_FPS = 24
+_DEFAULT_AUDIO_SAMPLE_RATE = 44100
+_MAX_DOWNLOAD_WORKERS = 8
+# Trailing ffmpeg stderr kept in error messages.
+_FFMPEG_ERROR_TAIL_CHARS = 2000
 
 
 class Error(Exception):
@@ -41,6 +45,10 @@ def create_slideshow_video(
 ) -> tuple[str, models.SingleGenerationMetadata]:
   """Create a slideshow video with timed images and audio.
 
+  The images are still, so the video is encoded by a single ffmpeg run that
+  loops each image for its segment and mixes the timed audio, instead of
+  compositing every frame in Python.
+
   Args:
     images: List of (gcs_uri, start_time_sec) tuples for images.
     audio_files: List of (gcs_uri, start_time_sec) tuples for audio WAV files.
@@ -75,11 +83,6 @@ def create_slideshow_video(
     temp=temp_output,
   )
 
-  image_clips: list[ImageClip] = []
-  audio_clips: list[AudioFileClip] = []
-  video_clip: CompositeVideoClip | None = None
-  audio_composite: CompositeAudioClip | None = None
-
   try:
     with tempfile.TemporaryDirectory() as temp_dir:
       image_paths = _download_assets_to_temp(
@@ -95,25 +98,17 @@ def create_slideshow_video(
         default_extension=".wav",
       )
 
-      base_size = _extract_base_size(image_paths)
-      image_clips = _create_image_clips(normalized_images, image_paths,
-                                        base_size, total_duration_sec)
-      video_clip = CompositeVideoClip(
-        image_clips, size=base_size).with_duration(total_duration_sec)
-
-      if audio_paths:
-        audio_clips = _create_audio_clips(normalized_audio, audio_paths)
-        audio_composite = CompositeAudioClip(audio_clips)
-        video_clip = video_clip.with_audio(audio_composite)
-
       output_path = os.path.join(temp_dir, "slideshow.mp4")
-      video_clip.write_videofile(
-        output_path,
-        codec="libx264",
-        audio_codec="aac",
-        fps=_DEFAULT_VIDEO_FPS,
-        logger=None,
-      )
+      _run_ffmpeg(
+        _build_slideshow_ffmpeg_command(
+          images=normalized_images,
+          image_paths=image_paths,
+          audio_files=normalized_audio,
+          audio_paths=audio_paths,
+          base_size=_extract_base_size(image_paths),
+          total_duration_sec=total_duration_sec,
+          output_path=output_path,
+        ))
 
       _ = cloud_storage.upload_file_to_gcs(
         output_path,
@@ -125,7 +120,7 @@ def create_slideshow_video(
       generation_time_sec = time.perf_counter() - start_time
       metadata = models.SingleGenerationMetadata(
         label="create_slideshow_video",
-        model_name="moviepy",
+        model_name="ffmpeg",
         token_counts={
           "num_images": len(normalized_images),
           "num_audio_files": len(normalized_audio),
@@ -144,27 +139,6 @@ def create_slideshow_video(
   except Exception as e:
     logger.error(f"Video generation failed:\n{traceback.format_exc()}")
     raise GenVideoError(f"Video generation failed: {e}") from e
-  finally:
-    for clip in image_clips:
-      try:
-        clip.close()
-      except Exception:
-        pass
-    for clip in audio_clips:
-      try:
-        clip.close()
-      except Exception:
-        pass
-    if audio_composite is not None:
-      try:
-        audio_composite.close()
-      except Exception:
-        pass
-    if video_clip is not None:
-      try:
-        video_clip.close()
-      except Exception:
-        pass
 
 
 def create_portrait_character_video(
@@ -372,59 +346,141 @@ def _download_assets_to_temp(
   prefix: str,
   default_extension: str,
 ) -> list[str]:
-  """Download assets from GCS into a temporary directory."""
-  paths: list[str] = []
-  for index, (gcs_uri, _) in enumerate(assets):
+  """Download assets from GCS into a temporary directory concurrently."""
+  if not assets:
+    return []
+
+  def _download(index: int, gcs_uri: str) -> str:
     _, blob_name = cloud_storage.parse_gcs_uri(gcs_uri)
     extension = os.path.splitext(blob_name)[1] or default_extension
     local_path = os.path.join(temp_dir, f"{prefix}_{index}{extension}")
     content_bytes = cloud_storage.download_bytes_from_gcs(gcs_uri)
     with open(local_path, "wb") as file_handle:
       _ = file_handle.write(content_bytes)
-    paths.append(local_path)
-  return paths
+    return local_path
+
+  max_workers = min(_MAX_DOWNLOAD_WORKERS, len(assets))
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    return list(
+      executor.map(
+        _download,
+        range(len(assets)),
+        [gcs_uri for gcs_uri, _ in assets],
+      ))
 
 
 def _extract_base_size(image_paths: list[str]) -> tuple[int, int]:
   """Get the base size from the first image."""
   if not image_paths:
     raise GenVideoError("No image paths to determine base size")
-  clip = ImageClip(image_paths[0])
-  try:
-    return clip.size
-  finally:
-    clip.close()
+  with Image.open(image_paths[0]) as image:
+    return image.size
 
 
-def _create_image_clips(
+def _image_segment_frame_counts(
   images: list[tuple[str, float]],
-  image_paths: list[str],
-  base_size: tuple[int, int],
   total_duration_sec: float,
-) -> list[ImageClip]:
-  """Create timed image clips that fill the entire slideshow canvas."""
-  clips: list[ImageClip] = []
-  for index, (_gcs_uri, start_time) in enumerate(images):
-    path = image_paths[index]
-    duration = total_duration_sec - start_time
-    if index < len(images) - 1:
-      duration = images[index + 1][1] - start_time
-    clip = ImageClip(path).with_start(start_time).with_duration(duration)
-    clip = clip.resized(new_size=base_size)
-    clips.append(clip)
-  return clips
-
-
-def _create_audio_clips(
+  fps: int,
+) -> list[int]:
+  """Return how many frames each image is shown for.
+
+  Frame `n` shows the last image starting at or before `n / fps`, so an image
+  that starts between two frames takes over at the next one. An image whose
+  whole segment falls between two frames gets no frames.
+  """
+  boundaries = [
+    math.ceil(round(start_time * fps, 6)) for _, start_time in images
+  ]
+  boundaries.append(math.ceil(round(total_duration_sec * fps, 6)))
+  return [
+    boundaries[index + 1] - boundaries[index] for index in range(len(images))
+  ]
+
+
+def _build_slideshow_ffmpeg_command(
+  *,
+  images: list[tuple[str, float]],
+  image_paths: list[str],
   audio_files: list[tuple[str, float]],
   audio_paths: list[str],
-) -> list[AudioFileClip]:
-  """Create started `AudioFileClip`s aligned to audio start times."""
-  clips: list[AudioFileClip] = []
-  for index, (_gcs_uri, start_time) in enumerate(audio_files):
-    path = audio_paths[index]
-    clips.append(AudioFileClip(path).with_start(start_time))
-  return clips
+  base_size: tuple[int, int],
+  total_duration_sec: float,
+  output_path: str,
+  fps: int = _DEFAULT_VIDEO_FPS,
+) -> list[str]:
+  """Build the ffmpeg command that encodes a still-image slideshow.
+
+  Each image is looped at `fps` and trimmed to its segment's frame count,
+  stretched to `base_size`, and the segments are concatenated. Each audio
+  file is delayed to its start time and the tracks are summed, padded with
+  silence, and cut to the video duration.
+  """
+  width, height = base_size
+  # libx264 needs even dimensions for yuv420p; otherwise let ffmpeg choose.
+  pixel_format = ",format=yuv420p" if width % 2 == 0 and height % 2 == 0 else ""
+  command = [FFMPEG_BINARY, "-y", "-loglevel", "error"]
+  filters: list[str] = []
+  video_labels: list[str] = []
+  frame_counts = _image_segment_frame_counts(images, total_duration_sec, fps)
+  for path, num_frames in zip(image_paths, frame_counts):
+    if num_frames <= 0:
+      continue
+    input_index = len(video_labels)
+    command.extend(["-loop", "1", "-framerate", str(fps), "-i", path])
+    filters.append(f"[{input_index}:v]trim=end_frame={num_frames},"
+                   "setpts=PTS-STARTPTS,"
+                   f"scale={width}:{height},setsar=1{pixel_format}"
+                   f"[v{input_index}]")
+    video_labels.append(f"[v{input_index}]")
+  filters.append(f"{''.join(video_labels)}concat=n={len(video_labels)}:v=1:a=0"
+                 "[vout]")
+
+  audio_labels: list[str] = []
+  for index, (path, (_, start_time)) in enumerate(zip(audio_paths,
+                                                      audio_files)):
+    input_index = len(video_labels) + index
+    command.extend(["-i", path])
+    delay_ms = int(round(start_time * 1000))
+    filters.append(
+      f"[{input_index}:a]aformat=sample_rates={_DEFAULT_AUDIO_SAMPLE_RATE}:"
+      f"channel_layouts=stereo,adelay={delay_ms}:all=1[a{index}]")
+    audio_labels.append(f"[a{index}]")
+  if audio_labels:
+    filters.append(
+      f"{''.join(audio_labels)}amix=inputs={len(audio_labels)}:normalize=0,"
+      f"apad,atrim=end={total_duration_sec}[aout]")
+
+  command.extend(["-filter_complex", ";".join(filters), "-map", "[vout]"])
+  if audio_labels:
+    command.extend(["-map", "[aout]", "-c:a", "aac"])
+  command.extend([
+    "-c:v",
+    "libx264",
+    "-preset",
+    "medium",
+    "-tune",
+    "stillimage",
+    "-r",
+    str(fps),
+    "-t",
+    f"{total_duration_sec}",
+    output_path,
+  ])
+  return command
+
+
+def _run_ffmpeg(command: list[str]) -> None:
+  """Run an ffmpeg command, raising `GenVideoError` if it fails."""
+  result = subprocess.run(
+    command,
+    stdout=subprocess.DEVNULL,
+    stderr=subprocess.PIPE,
+    check=False,
+  )
+  if result.returncode != 0:
+    stderr = result.stderr.decode("utf-8", errors="replace")
+    raise GenVideoError(f"ffmpeg exited with code {result.returncode}: "
+                        f"{stderr[-_FFMPEG_ERROR_TAIL_CHARS:]}")
 
 
 def _log_video_response(
@@ -16,98 +16,6 @@ from services import audio_voices, gen_video
 from services.video.mouth import apply_forced_closures
 
 
-class _FakeImageClip:
-
-  def __init__(self, path):
-    self.path = path
-    self.size = (640, 480)
-    self.start = None
-    self.duration = None
-
-  def set_start(self, start):
-    self.start = start
-    return self
-
-  def set_duration(self, duration):
-    self.duration = duration
-    return self
-
-  def resize(self, newsize):
-    self.size = newsize
-    return self
-
-  def with_start(self, start):
-    return self.set_start(start)
-
-  def with_duration(self, duration):
-    return self.set_duration(duration)
-
-  def resized(self, new_size=None, **_kwargs):
-    if new_size is not None:
-      self.size = new_size
-    return self
-
-  def close(self):
-    pass
-
-
-class _FakeAudioFileClip:
-
-  def __init__(self, path):
-    self.path = path
-    self.start = None
-
-  def set_start(self, start):
-    self.start = start
-    return self
-
-  def with_start(self, start):
-    return self.set_start(start)
-
-  def close(self):
-    pass
-
-
-class _FakeCompositeAudioClip:
-
-  def __init__(self, clips):
-    self.clips = clips
-
-  def close(self):
-    pass
-
-
-class _FakeCompositeVideoClip:
-
-  def __init__(self, clips, size=None):
-    self.clips = clips
-    self.size = size
-    self.duration = None
-    self.audio = None
-
-  def set_duration(self, duration):
-    self.duration = duration
-    return self
-
-  def set_audio(self, audio):
-    self.audio = audio
-    return self
-
-  def with_duration(self, duration):
-    return self.set_duration(duration)
-
-  def with_audio(self, audio):
-    return self.set_audio(audio)
-
-  def write_videofile(self, output_path, **_kwargs):
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "wb") as file_handle:
-      file_handle.write(b"fake")
-
-  def close(self):
-    pass
-
-
 class _FakeVideoClip:
 
   def __init__(self, make_frame, duration=None):
@@ -188,27 +96,30 @@ def _make_wav_bytes(
 
 def test_create_slideshow_video_uploads_mp4():
   images = [
-    ("gs://bucket/image1.jpg", 0.0),
-    ("gs://bucket/image2.jpg", 2.0),
+    ("gs://bucket/image1.png", 0.0),
+    ("gs://bucket/image2.png", 2.0),
   ]
   audio_files = [
     ("gs://bucket/audio1.wav", 1.0),
   ]
   upload_mock = MagicMock()
   get_uri_mock = MagicMock(return_value="gs://files/video/out.mp4")
+  ffmpeg_commands: list[list[str]] = []
+
+  def _fake_run_ffmpeg(command):
+    ffmpeg_commands.append(command)
+    with open(command[-1], "wb") as file_handle:
+      file_handle.write(b"fake")
 
   with patch.object(gen_video.utils, "is_emulator", return_value=False), \
       patch.object(gen_video.cloud_storage, "get_video_gcs_uri", get_uri_mock), \
       patch.object(gen_video.cloud_storage,
                    "download_bytes_from_gcs",
-                   return_value=b"data"), \
+                   return_value=_make_png_bytes(size=(640, 480))), \
       patch.object(gen_video.cloud_storage,
                    "upload_file_to_gcs",
                    upload_mock), \
-      patch.object(gen_video, "ImageClip", _FakeImageClip), \
-      patch.object(gen_video, "CompositeVideoClip", _FakeCompositeVideoClip), \
-      patch.object(gen_video, "AudioFileClip", _FakeAudioFileClip), \
-      patch.object(gen_video, "CompositeAudioClip", _FakeCompositeAudioClip):
+      patch.object(gen_video, "_run_ffmpeg", _fake_run_ffmpeg):
     gcs_uri, metadata = gen_video.create_slideshow_video(
       images=images,
       audio_files=audio_files,
@@ -218,12 +129,26 @@ def test_create_slideshow_video_uploads_mp4():
     )
 
   assert gcs_uri == "gs://files/video/out.mp4"
-  assert metadata.model_name == "moviepy"
+  assert metadata.model_name == "ffmpeg"
   assert metadata.token_counts["num_images"] == 2
   assert metadata.token_counts["num_audio_files"] == 1
   assert metadata.token_counts["video_duration_sec"] == 5
   assert metadata.token_counts["output_file_size_bytes"] == 4
 
+  assert len(ffmpeg_commands) == 1
+  command = ffmpeg_commands[0]
+  input_paths = [
+    command[index + 1] for index, arg in enumerate(command) if arg == "-i"
+  ]
+  assert [os.path.basename(path) for path in input_paths] == [
+    "image_0.png",
+    "image_1.png",
+    "audio_0.wav",
+  ]
+  filter_graph = command[command.index("-filter_complex") + 1]
+  assert "scale=640:480" in filter_graph
+  assert "adelay=1000:all=1" in filter_graph
+
   get_uri_mock.assert_called_once()
   assert get_uri_mock.call_args.kwargs["temp"] is True
   upload_mock.assert_called_once()
@@ -235,6 +160,50 @@ def test_create_slideshow_video_uploads_mp4():
   assert uploaded_path.endswith("slideshow.mp4")
 
 
+def test_image_segment_frame_counts_align_to_frame_boundaries():
+  counts = gen_video._image_segment_frame_counts(
+    [("gs://b/1.png", 0.0), ("gs://b/2.png", 1.01), ("gs://b/3.png", 1.02),
+     ("gs://b/4.png", 2.0)],
+    total_duration_sec=3.0,
+    fps=24,
+  )
+
+  # 1.01s and 1.02s both round up to frame 25, so image 3 is never shown.
+  assert counts == [25, 0, 23, 24]
+  assert sum(counts) == 72
+
+
+def test_build_slideshow_ffmpeg_command_skips_empty_segments_and_audio():
+  command = gen_video._build_slideshow_ffmpeg_command(
+    images=[("gs://b/1.png", 0.0), ("gs://b/2.png", 1.01),
+            ("gs://b/3.png", 1.02)],
+    image_paths=["/tmp/image_0.png", "/tmp/image_1.png", "/tmp/image_2.png"],
+    audio_files=[],
+    audio_paths=[],
+    base_size=(101, 100),
+    total_duration_sec=2.0,
+    output_path="/tmp/out.mp4",
+  )
+
+  assert [
+    command[index + 1] for index, arg in enumerate(command) if arg == "-i"
+  ] == ["/tmp/image_0.png", "/tmp/image_2.png"]
+  filter_graph = command[command.index("-filter_complex") + 1]
+  assert filter_graph == (
+    "[0:v]trim=end_frame=25,setpts=PTS-STARTPTS,scale=101:100,setsar=1[v0];"
+    "[1:v]trim=end_frame=23,setpts=PTS-STARTPTS,scale=101:100,setsar=1[v1];"
+    "[v0][v1]concat=n=2:v=1:a=0[vout]")
+  assert "[aout]" not in command
+  assert command[-1] == "/tmp/out.mp4"
+
+
+def test_run_ffmpeg_raises_with_stderr_tail():
+  result = MagicMock(returncode=1, stderr=b"bad filter graph")
+  with patch.object(gen_video.subprocess, "run", return_value=result):
+    with pytest.raises(gen_video.GenVideoError, match="bad filter graph"):
+      gen_video._run_ffmpeg(["ffmpeg"])
+
+
 def test_create_slideshow_video_requires_first_image_at_zero():
   with pytest.raises(gen_video.GenVideoError, match="First image must start"):
     gen_video.create_slideshow_video(
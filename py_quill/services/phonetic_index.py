@@ -0,0 +1,370 @@
+"""Compact, memory-mappable phonetic index over the CMU pronouncing dictionary.
+
+The index stores every CMU word with its pronunciations, plus two posting
+indices used by `services.phonetics`:
+
+- destressed phonemes -> words (homophones and multi-word segmentations)
+- rhyme part (last stressed vowel onwards) -> words (strict rhymes)
+
+Phonemes are interned to one-byte ids, so every word and phoneme sequence is a
+byte string. Each table is a sorted, offset-indexed byte blob that is searched
+with `bisect` directly on the mapped file, so loading only parses a small JSON
+header.
+
+Build the bundled index (from the NLTK `cmudict` corpus) with:
+
+  python -m services.phonetic_index [output_path]
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
+
+_MAGIC = b"PHIDX001"
+_HEADER_LENGTH_FORMAT = "<I"
+_ARRAY_ALIGNMENT = 8
+
+DEFAULT_INDEX_PATH = (Path(__file__).resolve().parents[1] / "nltk_data" /
+                      "phonetics" / "cmudict_index.bin")
+
+
+def strip_stress(phonemes: Sequence[str]) -> tuple[str, ...]:
+  """Remove stress digits from phonemes (e.g., 'AH1' -> 'AH')."""
+  return tuple("".join(c for c in p if not c.isdigit()) for p in phonemes)
+
+
+def get_rhyme_part(phonemes: Sequence[str]) -> tuple[str, ...] | None:
+  """Extract the rhyming part (from the last stressed vowel)."""
+  # Find the last syllable with primary (1) or secondary (2) stress
+  for i in range(len(phonemes) - 1, -1, -1):
+    phoneme = phonemes[i]
+    if "1" in phoneme or "2" in phoneme:
+      return tuple(phonemes[i:])
+  return None
+
+
+class _SortedBytesTable(Sequence[bytes]):
+  """Sorted byte strings stored as one blob plus an offsets array."""
+
+  def __init__(self, blob: memoryview, offsets: np.ndarray):
+    self._blob = blob
+    self._offsets = offsets.tolist()
+
+  def __len__(self) -> int:
+    return len(self._offsets) - 1
+
+  def __getitem__(self, index):  # type: ignore[override]
+    return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]])
+
+  def find(self, key: bytes) -> int | None:
+    """Return the position of `key`, or None if absent."""
+    position = bisect.bisect_left(self, key)
+    if position < len(self) and self[position] == key:
+      return position
+    return None
+
+
+class _PostingIndex:
+  """Sorted phoneme-sequence keys, each mapping to a list of word ids."""
+
+  def __init__(
+    self,
+    keys: _SortedBytesTable,
+    posting_offsets: np.ndarray,
+    postings: np.ndarray,
+  ):
+    self._keys = keys
+    self._posting_offsets = posting_offsets
+    self._postings = postings
+
+  def __len__(self) -> int:
+    return len(self._keys)
+
+  def get(self, key: bytes) -> np.ndarray | None:
+    """Return the word ids for `key`, or None if absent."""
+    position = self._keys.find(key)
+    if position is None:
+      return None
+    start = int(self._posting_offsets[position])
+    end = int(self._posting_offsets[position + 1])
+    return self._postings[start:end]
+
+
+class PhoneticIndex:
+  """Read-only phonetic index backed by a buffer (usually an mmapped file)."""
+
+  def __init__(self, buffer: bytes | mmap.mmap):
+    self._buffer = buffer
+    view = memoryview(buffer)
+    if bytes(view[:len(_MAGIC)]) != _MAGIC:
+      raise ValueError("Not a phonetic index file")
+    header_start = len(_MAGIC) + struct.calcsize(_HEADER_LENGTH_FORMAT)
+    (header_length, ) = struct.unpack_from(_HEADER_LENGTH_FORMAT, view,
+                                           len(_MAGIC))
+    header = json.loads(
+      bytes(view[header_start:header_start + header_length]).decode("utf-8"))
+
+    self._phonemes: list[str] = header["phonemes"]
+    self._phoneme_ids: dict[str, int] = {
+      phoneme: i
+      for i, phoneme in enumerate(self._phonemes)
+    }
+
+    arrays: dict[str, np.ndarray] = {}
+    for name, (dtype, offset, count) in header["arrays"].items():
+      arrays[name] = np.frombuffer(buffer,
+                                   dtype=np.dtype(dtype),
+                                   count=count,
+                                   offset=offset)
+
+    def _table(prefix: str) -> _SortedBytesTable:
+      return _SortedBytesTable(
+        memoryview(arrays[f"{prefix}_blob"].data).cast("B"),
+        arrays[f"{prefix}_offsets"],
+      )
+
+    self._words = _table("words")
+    self._word_pron_offsets = arrays["word_pron_offsets"]
+    self._pron_phoneme_offsets = arrays["pron_phoneme_offsets"]
+    self._pron_phonemes = arrays["pron_phonemes"]
+    self._destressed = _PostingIndex(_table("destressed_keys"),
+                                     arrays["destressed_posting_offsets"],
+                                     arrays["destressed_postings"])
+    self._rhymes = _PostingIndex(_table("rhyme_keys"),
+                                 arrays["rhyme_posting_offsets"],
+                                 arrays["rhyme_postings"])
+
+  @classmethod
+  def load(cls, path: str | Path) -> PhoneticIndex:
+    """Memory-map and open an index file written by `write_index`."""
+    with open(path, "rb") as file_handle:
+      buffer = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return cls(buffer)
+
+  @classmethod
+  def from_pronunciations(
+    cls,
+    pronunciations: Mapping[str, Sequence[Sequence[str]]],
+  ) -> PhoneticIndex:
+    """Build an index in memory from a CMU-style word -> prons mapping."""
+    return cls(build_index_bytes(pronunciations))
+
+  @property
+  def num_words(self) -> int:
+    """Number of dictionary words."""
+    return len(self._words)
+
+  def get_pronunciations(self, word: str) -> list[list[str]] | None:
+    """Return the dictionary pronunciations of `word`, or None if absent."""
+    position = self._words.find(word.encode("utf-8"))
+    if position is None:
+      return None
+    start = int(self._word_pron_offsets[position])
+    end = int(self._word_pron_offsets[position + 1])
+    return [self._decode_pron(pron_id) for pron_id in range(start, end)]
+
+  def get_pronunciations_batch(
+    self,
+    words: Iterable[str],
+  ) -> dict[str, list[list[str]] | None]:
+    """Return `get_pronunciations` for each word in `words`."""
+    return {word: self.get_pronunciations(word) for word in words}
+
+  def words_with_destressed_phonemes(
+    self,
+    phonemes: Sequence[str],
+  ) -> list[str]:
+    """Return words whose destressed pronunciation is exactly `phonemes`."""
+    return self._lookup(self._destressed, phonemes)
+
+  def has_destressed_phonemes(self, phonemes: Sequence[str]) -> bool:
+    """Return whether any word has the destressed pronunciation `phonemes`."""
+    key = self._encode(phonemes)
+    return key is not None and self._destressed.get(key) is not None
+
+  def words_with_rhyme_part(self, rhyme_part: Sequence[str]) -> list[str]:
+    """Return words with a pronunciation ending in `rhyme_part`."""
+    return self._lookup(self._rhymes, rhyme_part)
+
+  def _lookup(self, index: _PostingIndex,
+              phonemes: Sequence[str]) -> list[str]:
+    key = self._encode(phonemes)
+    if key is None:
+      return []
+    word_ids = index.get(key)
+    if word_ids is None:
+      return []
+    return [self._words[int(word_id)].decode("utf-8") for word_id in word_ids]
+
+  def _encode(self, phonemes: Sequence[str]) -> bytes | None:
+    try:
+      return bytes(self._phoneme_ids[phoneme] for phoneme in phonemes)
+    except KeyError:
+      return None
+
+  def _decode_pron(self, pron_id: int) -> list[str]:
+    start = int(self._pron_phoneme_offsets[pron_id])
+    end = int(self._pron_phoneme_offsets[pron_id + 1])
+    return [
+      self._phonemes[phoneme_id]
+      for phoneme_id in self._pron_phonemes[start:end].tolist()
+    ]
+
+
+def build_index_bytes(
+  pronunciations: Mapping[str, Sequence[Sequence[str]]], ) -> bytes:
+  """Serialize a CMU-style word -> pronunciations mapping into index bytes."""
+  words = sorted(pronunciations, key=lambda word: word.encode("utf-8"))
+  word_ids = {word: i for i, word in enumerate(words)}
+
+  phonemes: set[str] = set()
+  for prons in pronunciations.values():
+    for pron in prons:
+      phonemes.update(pron)
+      phonemes.update(strip_stress(pron))
+  phoneme_list = sorted(phonemes)
+  if len(phoneme_list) > 256:
+    raise ValueError(f"Too many distinct phonemes: {len(phoneme_list)}")
+  phoneme_ids = {phoneme: i for i, phoneme in enumerate(phoneme_list)}
+
+  def _encode(sequence: Sequence[str]) -> bytes:
+    return bytes(phoneme_ids[phoneme] for phoneme in sequence)
+
+  word_pron_offsets = [0]
+  pron_phoneme_offsets = [0]
+  pron_phonemes = bytearray()
+  destressed: dict[bytes, set[int]] = {}
+  rhymes: dict[bytes, set[int]] = {}
+  for word in words:
+    word_id = word_ids[word]
+    for pron in pronunciations[word]:
+      pron_phonemes.extend(_encode(pron))
+      pron_phoneme_offsets.append(len(pron_phonemes))
+
+      # Filter out non-alpha keys (like "a.") to reduce noise
+      if not word[0].isalpha():
+        continue
+      destressed.setdefault(_encode(strip_stress(pron)), set()).add(word_id)
+      rhyme_part = get_rhyme_part(pron)
+      if rhyme_part:
+        rhymes.setdefault(_encode(rhyme_part), set()).add(word_id)
+    word_pron_offsets.append(len(pron_phoneme_offsets) - 1)
+
+  arrays: dict[str, np.ndarray] = {}
+  _add_bytes_table(arrays, "words", [word.encode("utf-8") for word in words])
+  arrays["word_pron_offsets"] = np.asarray(word_pron_offsets, dtype="<u4")
+  arrays["pron_phoneme_offsets"] = np.asarray(pron_phoneme_offsets,
+                                              dtype="<u4")
+  arrays["pron_phonemes"] = np.frombuffer(bytes(pron_phonemes), dtype="u1")
+  _add_posting_index(arrays, "destressed", destressed)
+  _add_posting_index(arrays, "rhyme", rhymes)
+  return _serialize(phoneme_list, arrays)
+
+
+def write_index(
+  pronunciations: Mapping[str, Sequence[Sequence[str]]],
+  path: str | Path,
+) -> int:
+  """Build and write an index file. Returns the number of bytes written."""
+  data = build_index_bytes(pronunciations)
+  write_index_bytes(data, path)
+  return len(data)
+
+
+def write_index_bytes(data: bytes, path: str | Path) -> None:
+  """Atomically write index bytes from `build_index_bytes` to `path`."""
+  path = Path(path)
+  path.parent.mkdir(parents=True, exist_ok=True)
+  temp_path = path.with_suffix(path.suffix + ".tmp")
+  temp_path.write_bytes(data)
+  temp_path.replace(path)
+
+
+def _add_bytes_table(
+  arrays: dict[str, np.ndarray],
+  prefix: str,
+  sorted_items: list[bytes],
+) -> None:
+  offsets = np.zeros(len(sorted_items) + 1, dtype="<u4")
+  offsets[1:] = np.cumsum([len(item) for item in sorted_items])
+  arrays[f"{prefix}_blob"] = np.frombuffer(b"".join(sorted_items), dtype="u1")
+  arrays[f"{prefix}_offsets"] = offsets
+
+
+def _add_posting_index(
+  arrays: dict[str, np.ndarray],
+  prefix: str,
+  postings_by_key: dict[bytes, set[int]],
+) -> None:
+  keys = sorted(postings_by_key)
+  _add_bytes_table(arrays, f"{prefix}_keys", keys)
+  posting_lists = [sorted(postings_by_key[key]) for key in keys]
+  offsets = np.zeros(len(keys) + 1, dtype="<u4")
+  offsets[1:] = np.cumsum([len(posting) for posting in posting_lists])
+  arrays[f"{prefix}_posting_offsets"] = offsets
+  arrays[f"{prefix}_postings"] = np.asarray(
+    [word_id for posting in posting_lists for word_id in posting],
+    dtype="<u4",
+  )
+
+
+def _serialize(phonemes: list[str], arrays: dict[str, np.ndarray]) -> bytes:
+  # Array offsets depend on the header length, which depends on the offsets,
+  # so lay arrays out relative to the data start and fix up once.
+  layout: dict[str, list[object]] = {}
+  relative_offset = 0
+  for name, array in arrays.items():
+    relative_offset = _align(relative_offset)
+    layout[name] = [array.dtype.str, relative_offset, int(array.size)]
+    relative_offset += array.nbytes
+
+  prefix_length = len(_MAGIC) + struct.calcsize(_HEADER_LENGTH_FORMAT)
+  data_start = 0
+  while True:
+    header = json.dumps({
+      "phonemes": phonemes,
+      "arrays": {
+        name: [dtype, data_start + offset, count]
+        for name, (dtype, offset, count) in layout.items()
+      },
+    }).encode("utf-8")
+    aligned_start = _align(prefix_length + len(header))
+    if aligned_start == data_start:
+      break
+    data_start = aligned_start
+
+  out = bytearray(data_start + relative_offset)
+  out[:len(_MAGIC)] = _MAGIC
+  struct.pack_into(_HEADER_LENGTH_FORMAT, out, len(_MAGIC), len(header))
+  out[prefix_length:prefix_length + len(header)] = header
+  for name, array in arrays.items():
+    _, offset, _ = layout[name]
+    start = data_start + int(offset)  # type: ignore[arg-type]
+    out[start:start + array.nbytes] = array.tobytes()
+  return bytes(out)
+
+
+def _align(offset: int) -> int:
+  return (offset + _ARRAY_ALIGNMENT - 1) // _ARRAY_ALIGNMENT * _ARRAY_ALIGNMENT
+
+
+def main(argv: list[str]) -> None:
+  """Build the index from the NLTK cmudict corpus."""
+  # Imported here so that loading an index never pulls in NLTK.
+  from services import phonetics  # pylint: disable=import-outside-toplevel
+
+  output_path = Path(argv[0]) if argv else DEFAULT_INDEX_PATH
+  num_bytes = write_index(phonetics.load_cmudict(), output_path)
+  print(f"Wrote {num_bytes} bytes to {output_path}")
+
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
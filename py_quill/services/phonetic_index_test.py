@@ -0,0 +1,67 @@
+"""Tests for the phonetic index."""
+
+from services import phonetic_index
+
+_PRONUNCIATIONS = {
+  "cat": [["K", "AE1", "T"]],
+  "bat": [["B", "AE1", "T"]],
+  "read": [["R", "EH1", "D"], ["R", "IY1", "D"]],
+  "red": [["R", "EH1", "D"]],
+  "reed": [["R", "IY1", "D"]],
+  "let": [["L", "EH1", "T"]],
+  "us": [["AH1", "S"]],
+  "lettuce": [["L", "EH1", "T", "AH0", "S"]],
+  "a.": [["EY1"]],
+  "'kay": [["K", "EY1"]],
+  "café": [["K", "AE0", "F", "EY1"]],
+}
+
+
+def _build_index() -> phonetic_index.PhoneticIndex:
+  return phonetic_index.PhoneticIndex.from_pronunciations(_PRONUNCIATIONS)
+
+
+def test_get_pronunciations():
+  index = _build_index()
+
+  assert index.num_words == len(_PRONUNCIATIONS)
+  assert index.get_pronunciations("read") == [["R", "EH1", "D"],
+                                              ["R", "IY1", "D"]]
+  assert index.get_pronunciations("café") == [["K", "AE0", "F", "EY1"]]
+  assert index.get_pronunciations("a.") == [["EY1"]]
+  assert index.get_pronunciations("missing") is None
+
+
+def test_get_pronunciations_batch():
+  index = _build_index()
+
+  assert index.get_pronunciations_batch(["cat", "missing"]) == {
+    "cat": [["K", "AE1", "T"]],
+    "missing": None,
+  }
+
+
+def test_destressed_and_rhyme_lookups():
+  index = _build_index()
+
+  assert sorted(index.words_with_destressed_phonemes(
+    ("R", "EH", "D"))) == ["read", "red"]
+  assert index.has_destressed_phonemes(("L", "EH", "T"))
+  assert not index.has_destressed_phonemes(("L", "EH"))
+  assert sorted(index.words_with_rhyme_part(("AE1", "T"))) == ["bat", "cat"]
+  # Non-alphabetic entries are excluded from the posting indices.
+  assert index.get_pronunciations("'kay") == [["K", "EY1"]]
+  assert sorted(index.words_with_rhyme_part(("EY1", ))) == ["a.", "café"]
+  # Unknown phonemes never match.
+  assert index.words_with_rhyme_part(("XX1", )) == []
+
+
+def test_write_and_mmap_load_round_trip(tmp_path):
+  path = tmp_path / "nested" / "index.bin"
+
+  num_bytes = phonetic_index.write_index(_PRONUNCIATIONS, path)
+  index = phonetic_index.PhoneticIndex.load(path)
+
+  assert path.stat().st_size == num_bytes
+  assert index.get_pronunciations("lettuce") == [["L", "EH1", "T", "AH0", "S"]]
+  assert index.words_with_destressed_phonemes(("AH", "S")) == ["us"]
@@ -1,12 +1,18 @@
 """Phonetic service for finding rhymes and homophones (including multi-word)."""
 
 import os
-from collections import defaultdict
 from pathlib import Path
-from typing import Sequence
+from typing import TYPE_CHECKING, Sequence
 
 import nltk
-from g2p_en import G2p
+from firebase_functions import logger
+
+from services.phonetic_index import (DEFAULT_INDEX_PATH, PhoneticIndex,
+                                     build_index_bytes, get_rhyme_part,
+                                     strip_stress)
+
+if TYPE_CHECKING:
+    from g2p_en import G2p
 
 # Ensure bundled NLTK data (if present) is discoverable.
 # This logic is duplicated from transcript_alignment.py to keep services independent.
@@ -24,73 +30,48 @@ def _ensure_nltk_data_path() -> None:
 
 
 # Singleton instances
-_G2P: G2p | None = None
-_CMUDICT: dict[str, list[list[str]]] | None = None
+_G2P: "G2p | None" = None
+# Phonetic index over the CMU dictionary. Memory-mapped from the prebuilt file
+# (built by the functions predeploy hook, see `services.phonetic_index`) when
+# present, otherwise built in memory from the raw dictionary.
+_INDEX: PhoneticIndex | None = None
 
-# Indices for fast lookup
-# Maps tuple of phonemes -> list of words
-_PHONEMES_TO_WORDS: dict[tuple[str, ...], list[str]] = defaultdict(list)
-# Maps rhyming part (tuple of phonemes) -> list of words
-_RHYME_PART_TO_WORDS: dict[tuple[str, ...], list[str]] = defaultdict(list)
-# Maps tuple of destressed phonemes -> list of words (for approximate homophones/oronyms)
-_DESTRESSED_PHONEMES_TO_WORDS: dict[tuple[str, ...], list[str]] = defaultdict(list)
+# Phoneme sequences longer than this are not segmented into multi-word phrases.
+_MAX_SEGMENTATION_PHONEMES = 20
 
 
-def _get_g2p() -> G2p:
+def _get_g2p() -> "G2p":
     """Get or create the G2P converter singleton."""
     global _G2P
     if _G2P is None:
         _ensure_nltk_data_path()
+        # g2p_en is slow to import, and only needed for words not in the index.
+        from g2p_en import G2p  # pylint: disable=import-outside-toplevel
         _G2P = G2p()
     return _G2P
 
 
-def _strip_stress(phonemes: Sequence[str]) -> tuple[str, ...]:
-    """Remove stress digits from phonemes (e.g., 'AH1' -> 'AH')."""
-    return tuple("".join(c for c in p if not c.isdigit()) for p in phonemes)
-
-
-def _load_dictionaries() -> None:
-    """Load CMU dictionary and build indices if not already loaded."""
-    global _CMUDICT
-    if _CMUDICT is not None:
-        return
-
+def load_cmudict() -> dict[str, list[list[str]]]:
+    """Load the raw NLTK CMU dictionary, downloading it if necessary."""
     _ensure_nltk_data_path()
     try:
-        _CMUDICT = nltk.corpus.cmudict.dict()
+        return nltk.corpus.cmudict.dict()
     except LookupError:
         nltk.download("cmudict")
-        _CMUDICT = nltk.corpus.cmudict.dict()
+        return nltk.corpus.cmudict.dict()
 
-    # Build indices
-    for word, prons in _CMUDICT.items():
-        # Filter out non-alpha keys (like "a.") to reduce noise
-        if not word[0].isalpha():
-            continue
 
-        for p in prons:
-            p_tuple = tuple(p)
-            _PHONEMES_TO_WORDS[p_tuple].append(word)
-
-            # Destressed index
-            p_destressed = _strip_stress(p)
-            _DESTRESSED_PHONEMES_TO_WORDS[p_destressed].append(word)
-
-            rhyme_part = _get_rhyme_part(p)
-            if rhyme_part:
-                _RHYME_PART_TO_WORDS[rhyme_part].append(word)
-
-
-def _get_rhyme_part(phonemes: Sequence[str]) -> tuple[str, ...] | None:
-    """Extract the rhyming part (from the last stressed vowel)."""
-    # Find the last syllable with primary (1) or secondary (2) stress
-    for i in range(len(phonemes) - 1, -1, -1):
-        phoneme = phonemes[i]
-        # Check for stress marker (1 or 2)
-        if "1" in phoneme or "2" in phoneme:
-            return tuple(phonemes[i:])
-    return None
+def _get_index() -> PhoneticIndex:
+    """Load the phonetic index if not already loaded."""
+    global _INDEX
+    if _INDEX is None:
+        if DEFAULT_INDEX_PATH.exists():
+            _INDEX = PhoneticIndex.load(DEFAULT_INDEX_PATH)
+        else:
+            logger.warn(f"Phonetic index not found at {DEFAULT_INDEX_PATH}; "
+                        "building it in memory from cmudict")
+            _INDEX = PhoneticIndex(build_index_bytes(load_cmudict()))
+    return _INDEX
 
 
 def _get_pronunciations(text: str) -> list[list[str]]:
@@ -100,14 +81,12 @@ def _get_pronunciations(text: str) -> list[list[str]]:
     For single words found in CMU dict, returns all known pronunciations.
     For unknown words or phrases, returns a single predicted pronunciation using G2P.
     """
-    _load_dictionaries()
-    assert _CMUDICT is not None
-
     text_lower = text.lower()
 
     # 1. Try direct CMU dict lookup (single word)
-    if text_lower in _CMUDICT:
-        return _CMUDICT[text_lower]
+    prons = _get_index().get_pronunciations(text_lower)
+    if prons is not None:
+        return prons
 
     # 2. Fallback to G2P (unknown word or phrase)
     g2p = _get_g2p()
@@ -146,8 +125,8 @@ def _find_segmentations(
         suffix = phonemes[i:]
 
         # Check if prefix forms a word (using destressed index)
-        if prefix in _DESTRESSED_PHONEMES_TO_WORDS:
-            words_for_prefix = _DESTRESSED_PHONEMES_TO_WORDS[prefix]
+        words_for_prefix = _get_index().words_with_destressed_phonemes(prefix)
+        if words_for_prefix:
 
             # Recurse on suffix
             suffix_segmentations = _find_segmentations(suffix, memo)
@@ -168,7 +147,10 @@ def find_homophones(text: str) -> list[str]:
     Excludes the input text itself.
     Uses destressed phonemes to allow flexibility in stress (e.g. for puns).
     """
-    _load_dictionaries()
+    return _find_homophones(text, memo={})
+
+
+def _find_homophones(text: str, memo: dict) -> list[str]:
     prons = _get_pronunciations(text)
     if not prons:
         return []
@@ -178,17 +160,17 @@ def find_homophones(text: str) -> list[str]:
 
     for p in prons:
         # Use destressed phonemes for homophone matching
-        p_destressed = _strip_stress(p)
+        p_destressed = strip_stress(p)
 
         # 1. Single word matches (via destressed index)
-        candidates = _DESTRESSED_PHONEMES_TO_WORDS.get(p_destressed, [])
+        candidates = _get_index().words_with_destressed_phonemes(p_destressed)
         for c in candidates:
             if c != input_lower:
                 homophones.add(c)
 
         # 2. Multi-word segmentation
-        if len(p_destressed) < 20:
-            segmentations = _find_segmentations(p_destressed)
+        if len(p_destressed) < _MAX_SEGMENTATION_PHONEMES:
+            segmentations = _find_segmentations(p_destressed, memo)
             for seg in segmentations:
                 phrase = " ".join(seg)
                 if phrase != input_lower:
@@ -203,7 +185,6 @@ def find_rhymes(text: str) -> list[str]:
     Based on the last stressed vowel to the end of the word.
     Excludes the input text itself.
     """
-    _load_dictionaries()
     prons = _get_pronunciations(text)
     if not prons:
         return []
@@ -212,9 +193,9 @@ def find_rhymes(text: str) -> list[str]:
     input_lower = text.lower()
 
     for p in prons:
-        rhyme_part = _get_rhyme_part(p)
+        rhyme_part = get_rhyme_part(p)
         if rhyme_part:
-            candidates = _RHYME_PART_TO_WORDS.get(rhyme_part, [])
+            candidates = _get_index().words_with_rhyme_part(rhyme_part)
             for c in candidates:
                 if c != input_lower:
                     rhymes.add(c)
@@ -236,3 +217,26 @@ def get_phonetic_matches(text: str) -> tuple[list[str], list[str]]:
     homophones = find_homophones(text)
     rhymes = find_rhymes(text)
     return homophones, rhymes
+
+
+def get_phonetic_matches_batch(
+    texts: Sequence[str],
+) -> dict[str, tuple[list[str], list[str]]]:
+    """Get homophones and rhymes for many inputs at once.
+
+    Equivalent to calling `get_phonetic_matches` per input, but duplicate
+    inputs are resolved once and multi-word segmentations of shared phoneme
+    suffixes are reused across inputs.
+
+    Args:
+        texts: Input words or phrases.
+
+    Returns:
+        A dict mapping each input to its (homophones, rhymes) tuple.
+    """
+    memo: dict = {}
+    results: dict[str, tuple[list[str], list[str]]] = {}
+    for text in texts:
+        if text not in results:
+            results[text] = (_find_homophones(text, memo), find_rhymes(text))
+    return results
@@ -44,3 +44,31 @@ def test_case_insensitivity():
     h_lower = phonetics.find_homophones("read")
     h_upper = phonetics.find_homophones("READ")
     assert h_lower == h_upper
+
+def test_get_phonetic_matches_batch():
+    matches = phonetics.get_phonetic_matches_batch(["read", "cat", "read"])
+    assert set(matches) == {"read", "cat"}
+    assert matches["read"] == phonetics.get_phonetic_matches("read")
+    assert matches["cat"] == phonetics.get_phonetic_matches("cat")
+
+
+_FAKE_CMUDICT = {
+    "cat": [["K", "AE1", "T"]],
+    "hat": [["HH", "AE1", "T"]],
+}
+
+
+def test_get_index_builds_in_memory_when_index_file_is_missing(monkeypatch, tmp_path):
+    index_path = tmp_path / "phonetics" / "cmudict_index.bin"
+    warnings = []
+    monkeypatch.setattr(phonetics, "DEFAULT_INDEX_PATH", index_path)
+    monkeypatch.setattr(phonetics, "load_cmudict", lambda: _FAKE_CMUDICT)
+    monkeypatch.setattr(phonetics.logger, "warn", warnings.append)
+    monkeypatch.setattr(phonetics, "_INDEX", None)
+
+    built = phonetics._get_index()
+
+    assert built.get_pronunciations("cat") == [["K", "AE1", "T"]]
+    assert not index_path.exists()
+    assert len(warnings) == 1
+    assert str(index_path) in warnings[0]
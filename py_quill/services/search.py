@@ -1,15 +1,24 @@
 """Library for embeddings."""
 
 import dataclasses
+import datetime
+import hashlib
+import threading
 import time
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
+import numpy as np
 from common import config, models
 from firebase_functions import logger
 from google import genai
+from google.genai import errors as genai_errors
 from google.cloud import firestore
+from google.cloud.firestore import SERVER_TIMESTAMP, FieldFilter
 from google.cloud.firestore_v1.base_vector_query import DistanceMeasure
+from google.cloud.firestore_v1.field_path import FieldPath
 from google.cloud.firestore_v1.vector import Vector
 from google.genai.types import EmbedContentConfig
 from services import firestore as firestore_service
@@ -17,6 +26,34 @@ from services import firestore as firestore_service
 _genai_client = None  # pylint: disable=invalid-name
 _firestore_client = None  # pylint: disable=invalid-name
 
+EMBEDDING_MODEL = "gemini-embedding-001"
+EMBEDDING_DIMENSIONALITY = 2048
+# Model that produced a joke_search doc's `text_embedding`.
+EMBEDDING_MODEL_FIELD = "embedding_model"
+# Set on every joke_search write so that local indexes can refresh
+# incrementally.
+INDEX_UPDATED_AT_FIELD = "index_updated_at"
+
+_EMBEDDING_TEXTS_PER_REQUEST = 100
+_EMBEDDING_MAX_CONCURRENT_REQUESTS = 8
+_EMBEDDING_BACKFILL_CHECKPOINT_DOC = "embedding_backfill"
+# Firestore rejects write batches with more writes than this.
+_MAX_BATCH_WRITES = 500
+
+_QUERY_EMBEDDING_CACHE_COLLECTION = "joke_search_query_cache"
+_QUERY_EMBEDDING_MEMORY_CACHE_SIZE = 512
+# Persisted query embeddings carry an `expire_at` field; a Firestore TTL policy
+# on it (see firestore.indexes.json) deletes them after this long.
+_QUERY_EMBEDDING_CACHE_TTL = datetime.timedelta(days=30)
+
+_LOCAL_INDEX_REFRESH_INTERVAL_SEC = 300
+_LOCAL_INDEX_FULL_RELOAD_INTERVAL_SEC = 3600
+# Re-read docs written slightly before the last refresh to tolerate clock skew
+# between this instance and Firestore server timestamps.
+_LOCAL_INDEX_REFRESH_OVERLAP = datetime.timedelta(seconds=60)
+_LOCAL_INDEX_SCORE_BLOCK_ROWS = 1024
+_LOCAL_INDEX_FIELDS = ["text_embedding", "public_timestamp", "is_public"]
+
 _TOKEN_COSTS = {
   # https://cloud.google.com/vertex-ai/generative-ai/pricing#embedding-models
   "gemini-embedding-001": {
@@ -55,8 +92,8 @@ def get_firestore_client() -> firestore.Client:
 def get_embedding(
   text: str,
   task_type: TaskType,
-  model: str = "gemini-embedding-001",
-  output_dimensionality: int = 2048,
+  model: str = EMBEDDING_MODEL,
+  output_dimensionality: int = EMBEDDING_DIMENSIONALITY,
 ) -> tuple[Vector, models.GenerationMetadata]:
   """Get an embedding for a text."""
   start_time = time.perf_counter()
@@ -91,6 +128,219 @@ def get_embedding(
   return Vector(float_list), generation_metadata
 
 
+def get_embeddings_batch(
+  texts: list[str],
+  task_type: TaskType,
+  model: str = EMBEDDING_MODEL,
+  output_dimensionality: int = EMBEDDING_DIMENSIONALITY,
+  texts_per_request: int = _EMBEDDING_TEXTS_PER_REQUEST,
+  max_concurrency: int = _EMBEDDING_MAX_CONCURRENT_REQUESTS,
+  max_retries: int = 3,
+) -> list[tuple[Vector, models.GenerationMetadata]]:
+  """Get embeddings for many texts, packing several texts per request.
+
+  Requests are issued concurrently (at most `max_concurrency` at a time) and
+  retried with exponential backoff on rate limit and server errors. Each
+  request's cost and time are split across its texts in proportion to their
+  token counts.
+
+  Returns:
+    One (embedding, generation metadata) pair per input text, in input order.
+  """
+  if not texts:
+    return []
+  if texts_per_request <= 0:
+    raise ValueError("texts_per_request must be positive")
+
+  chunks = [
+    texts[i:i + texts_per_request]
+    for i in range(0, len(texts), texts_per_request)
+  ]
+  results: list[tuple[Vector, models.GenerationMetadata]] = []
+  with ThreadPoolExecutor(
+      max_workers=max(1, min(max_concurrency, len(chunks)))) as executor:
+    for chunk_results in executor.map(
+        lambda chunk: _embed_chunk_with_retry(
+          chunk,
+          task_type=task_type,
+          model=model,
+          output_dimensionality=output_dimensionality,
+          max_retries=max_retries,
+        ),
+        chunks,
+    ):
+      results.extend(chunk_results)
+  return results
+
+
+def _embed_chunk_with_retry(
+  texts: list[str],
+  task_type: TaskType,
+  model: str,
+  output_dimensionality: int,
+  max_retries: int,
+) -> list[tuple[Vector, models.GenerationMetadata]]:
+  """Embed one request's worth of texts, retrying transient errors."""
+  initial_delay = 2
+  backoff_factor = 2
+  max_delay = 30
+
+  retry_count = 0
+  while True:
+    try:
+      return _embed_chunk(
+        texts,
+        task_type=task_type,
+        model=model,
+        output_dimensionality=output_dimensionality,
+        retry_count=retry_count,
+      )
+    except Exception as e:  # pylint: disable=broad-except
+      if not _is_retryable_embedding_error(e) or retry_count >= max_retries:
+        raise
+      retry_count += 1
+      delay = min(max_delay,
+                  initial_delay * (backoff_factor**(retry_count - 1)))
+      logger.warn(f"Embedding request for {len(texts)} texts failed: {e}\n"
+                  f"Retrying in {delay} seconds... "
+                  f"({retry_count}/{max_retries})")
+      time.sleep(delay)
+
+
+def _is_retryable_embedding_error(error: Exception) -> bool:
+  """Whether an embedding request error is transient."""
+  if isinstance(error, genai_errors.ServerError):
+    return True
+  return isinstance(error, genai_errors.ClientError) and error.code == 429
+
+
+def _embed_chunk(
+  texts: list[str],
+  task_type: TaskType,
+  model: str,
+  output_dimensionality: int,
+  retry_count: int,
+) -> list[tuple[Vector, models.GenerationMetadata]]:
+  """Embed texts in a single `embed_content` request."""
+  start_time = time.perf_counter()
+  response = get_genai_client().models.embed_content(
+    model=model,
+    contents=texts,
+    config=EmbedContentConfig(
+      task_type=task_type,
+      output_dimensionality=output_dimensionality,
+    ),
+  )
+  generation_time_sec = time.perf_counter() - start_time
+
+  embeddings = response.embeddings or []
+  if len(embeddings) != len(texts):
+    raise ValueError(
+      f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+
+  token_counts = [
+    int(e.statistics.token_count)
+    if e.statistics and e.statistics.token_count is not None else 0
+    for e in embeddings
+  ]
+  # Weights for splitting the request time; fall back to text length when the
+  # API does not report per-text token counts.
+  weights = token_counts if sum(token_counts) > 0 else [len(t) for t in texts]
+  total_weight = sum(weights) or 1
+
+  results: list[tuple[Vector, models.GenerationMetadata]] = []
+  for embedding, input_tokens, weight in zip(embeddings, token_counts,
+                                             weights):
+    generation_metadata = models.GenerationMetadata()
+    generation_metadata.add_generation(
+      models.SingleGenerationMetadata(
+        label=f"embedding_{model}_{task_type}",
+        model_name=model,
+        token_counts={
+          "input_tokens": input_tokens,
+        },
+        generation_time_sec=generation_time_sec * weight / total_weight,
+        cost=input_tokens * _TOKEN_COSTS[model]["input_tokens"],
+        retry_count=retry_count,
+      ))
+    results.append((Vector(embedding.values or []), generation_metadata))
+  return results
+
+
+_query_embedding_cache: OrderedDict[str, Vector] = OrderedDict()
+_query_embedding_cache_lock = threading.Lock()
+
+
+def normalize_query(query: str) -> str:
+  """Normalize a search query for embedding cache lookups."""
+  return " ".join(query.casefold().split())
+
+
+def get_query_embedding(
+  query: str,
+  model: str = EMBEDDING_MODEL,
+  output_dimensionality: int = EMBEDDING_DIMENSIONALITY,
+) -> Vector:
+  """Get a RETRIEVAL_QUERY embedding for a query, with caching.
+
+  The embedding is computed from `query` as given, but cached under its
+  normalized form, both in memory and in the `joke_search_query_cache`
+  collection, so repeated queries (e.g. topic pages) do not call the
+  embedding API again, even across instances. Persisted entries expire after
+  `_QUERY_EMBEDDING_CACHE_TTL`.
+  """
+  normalized_query = normalize_query(query)
+  cache_key = hashlib.sha256(
+    f"{model}:{output_dimensionality}:{normalized_query}".encode(
+      "utf-8")).hexdigest()
+
+  with _query_embedding_cache_lock:
+    cached = _query_embedding_cache.get(cache_key)
+    if cached is not None:
+      _query_embedding_cache.move_to_end(cache_key)
+      return cached
+
+  doc_ref = get_firestore_client().collection(
+    _QUERY_EMBEDDING_CACHE_COLLECTION).document(cache_key)
+  embedding: Vector | None = None
+  try:
+    doc = doc_ref.get()
+    if doc.exists:
+      stored = (doc.to_dict() or {}).get("embedding")
+      if isinstance(stored, Vector):
+        embedding = stored
+  except Exception as e:  # pylint: disable=broad-except
+    logger.warn(f"Failed reading query embedding cache for '{query}': {e}")
+
+  if embedding is None:
+    embedding, _ = get_embedding(
+      query,
+      TaskType.RETRIEVAL_QUERY,
+      model=model,
+      output_dimensionality=output_dimensionality,
+    )
+    expire_at = (datetime.datetime.now(datetime.timezone.utc) +
+                 _QUERY_EMBEDDING_CACHE_TTL)
+    try:
+      doc_ref.set({
+        "query": normalized_query,
+        "model": model,
+        "output_dimensionality": output_dimensionality,
+        "embedding": embedding,
+        "created_at": SERVER_TIMESTAMP,
+        "expire_at": expire_at,
+      })
+    except Exception as e:  # pylint: disable=broad-except
+      logger.warn(f"Failed writing query embedding cache for '{query}': {e}")
+
+  with _query_embedding_cache_lock:
+    _query_embedding_cache[cache_key] = embedding
+    _query_embedding_cache.move_to_end(cache_key)
+    while len(_query_embedding_cache) > _QUERY_EMBEDDING_MEMORY_CACHE_SIZE:
+      _query_embedding_cache.popitem(last=False)
+  return embedding
+
+
 @dataclasses.dataclass
 class JokeSearchResult:
   """A search result for a punny joke."""
@@ -102,6 +352,212 @@ class JokeSearchResult:
   punchline_image_url: str | None = None
 
 
+@dataclasses.dataclass(frozen=True)
+class _LocalIndexSnapshot:
+  """Immutable arrays backing a `_LocalJokeSearchIndex`."""
+  joke_ids: tuple[str, ...]
+  # L2-normalized embeddings, shape (num_jokes, dims).
+  embeddings: np.ndarray
+  # Seconds since epoch; NaN when the joke has no public_timestamp.
+  public_timestamps: np.ndarray
+
+
+_EMPTY_LOCAL_INDEX_SNAPSHOT = _LocalIndexSnapshot(
+  joke_ids=(),
+  embeddings=np.zeros((0, 0), dtype=np.float16),
+  public_timestamps=np.zeros(0, dtype=np.float64),
+)
+
+
+class _LocalJokeSearchIndex:
+  """In-memory copy of the public `joke_search` embeddings.
+
+  Embeddings are L2-normalized and stored as float16, so cosine distance is
+  `1 - dot(query, row)` and a brute-force top-k over a few thousand jokes takes
+  a few milliseconds. The index is loaded lazily, refreshed incrementally from
+  docs whose `index_updated_at` changed since the last refresh, and fully
+  reloaded periodically to drop deleted jokes.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._snapshot = _EMPTY_LOCAL_INDEX_SNAPSHOT
+    self._loaded_at: float | None = None
+    self._refreshed_at: float | None = None
+    self._watermark: datetime.datetime | None = None
+
+  def search(
+    self,
+    query_embedding: Vector,
+    limit: int,
+    distance_threshold: float | None,
+    public_before: datetime.datetime | None,
+  ) -> list[JokeSearchResult]:
+    """Return the nearest public jokes by cosine distance."""
+    self._ensure_fresh()
+    snapshot = self._snapshot
+    if not snapshot.joke_ids or limit <= 0:
+      return []
+
+    query = np.asarray(list(query_embedding), dtype=np.float32)
+    norm = float(np.linalg.norm(query))
+    if norm == 0.0 or query.shape[0] != snapshot.embeddings.shape[1]:
+      return []
+    query /= norm
+
+    distances = np.empty(len(snapshot.joke_ids), dtype=np.float32)
+    for start in range(0, len(snapshot.joke_ids),
+                       _LOCAL_INDEX_SCORE_BLOCK_ROWS):
+      block = snapshot.embeddings[start:start + _LOCAL_INDEX_SCORE_BLOCK_ROWS]
+      distances[start:start +
+                len(block)] = 1.0 - block.astype(np.float32) @ query
+
+    candidates = np.ones(len(distances), dtype=bool)
+    if public_before is not None:
+      # NaN timestamps compare False, matching Firestore's missing-field rule.
+      candidates &= snapshot.public_timestamps <= public_before.timestamp()
+    if distance_threshold is not None:
+      candidates &= distances <= distance_threshold
+    candidate_rows = np.flatnonzero(candidates)
+    if len(candidate_rows) > limit:
+      top = np.argpartition(distances[candidate_rows], limit - 1)[:limit]
+      candidate_rows = candidate_rows[top]
+    candidate_rows = candidate_rows[np.argsort(distances[candidate_rows],
+                                               kind="stable")]
+
+    return [
+      JokeSearchResult(
+        joke_id=snapshot.joke_ids[row],
+        vector_distance=float(distances[row]),
+      ) for row in candidate_rows
+    ]
+
+  def clear(self) -> None:
+    """Drop the loaded index so that the next search reloads it."""
+    with self._lock:
+      self._snapshot = _EMPTY_LOCAL_INDEX_SNAPSHOT
+      self._loaded_at = None
+      self._refreshed_at = None
+      self._watermark = None
+
+  def _ensure_fresh(self) -> None:
+    now = time.monotonic()
+    with self._lock:
+      if (self._loaded_at is None
+          or now - self._loaded_at >= _LOCAL_INDEX_FULL_RELOAD_INTERVAL_SEC):
+        self._full_reload(now)
+      elif (self._refreshed_at is None
+            or now - self._refreshed_at >= _LOCAL_INDEX_REFRESH_INTERVAL_SEC):
+        self._incremental_refresh(now)
+
+  def _full_reload(self, now: float) -> None:
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+    query = get_firestore_client().collection("joke_search").where(
+      filter=FieldFilter("is_public", "==", True))
+    rows: dict[str, tuple[np.ndarray, float]] = {}
+    for doc in query.select(_LOCAL_INDEX_FIELDS).stream():
+      row = _local_index_row(doc.to_dict() or {})
+      if row is not None:
+        rows[doc.id] = row
+    self._snapshot = _build_local_index_snapshot(rows)
+    self._loaded_at = now
+    self._refreshed_at = now
+    self._watermark = started_at - _LOCAL_INDEX_REFRESH_OVERLAP
+    logger.info(f"Loaded local joke search index with {len(rows)} jokes")
+
+  def _incremental_refresh(self, now: float) -> None:
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+    query = get_firestore_client().collection("joke_search").where(
+      filter=FieldFilter(INDEX_UPDATED_AT_FIELD, ">", self._watermark))
+    changed: dict[str, tuple[np.ndarray, float] | None] = {}
+    for doc in query.select(_LOCAL_INDEX_FIELDS).stream():
+      data = doc.to_dict() or {}
+      changed[doc.id] = (_local_index_row(data)
+                         if data.get("is_public") is True else None)
+    if changed:
+      snapshot = self._snapshot
+      rows = {
+        joke_id: (snapshot.embeddings[i], snapshot.public_timestamps[i])
+        for i, joke_id in enumerate(snapshot.joke_ids)
+      }
+      for joke_id, row in changed.items():
+        if row is None:
+          rows.pop(joke_id, None)
+        else:
+          rows[joke_id] = row
+      self._snapshot = _build_local_index_snapshot(rows)
+      logger.info(
+        f"Refreshed local joke search index: {len(changed)} changed, {len(rows)} total"
+      )
+    self._refreshed_at = now
+    self._watermark = started_at - _LOCAL_INDEX_REFRESH_OVERLAP
+
+
+def _local_index_row(data: dict) -> tuple[np.ndarray, float] | None:
+  """Convert a joke_search doc into a normalized float16 row, if indexable."""
+  embedding = data.get("text_embedding")
+  if not isinstance(embedding, Vector):
+    return None
+  values = np.asarray(list(embedding), dtype=np.float32)
+  norm = float(np.linalg.norm(values))
+  if norm == 0.0:
+    return None
+  public_timestamp = data.get("public_timestamp")
+  timestamp = (public_timestamp.timestamp() if isinstance(
+    public_timestamp, datetime.datetime) else float("nan"))
+  return (values / norm).astype(np.float16), timestamp
+
+
+def _build_local_index_snapshot(
+  rows: dict[str, tuple[np.ndarray, float]], ) -> _LocalIndexSnapshot:
+  """Stack rows into a snapshot, dropping rows with a minority dimension."""
+  if not rows:
+    return _EMPTY_LOCAL_INDEX_SNAPSHOT
+  dims_counts: dict[int, int] = {}
+  for embedding, _ in rows.values():
+    dims_counts[embedding.shape[0]] = dims_counts.get(embedding.shape[0],
+                                                      0) + 1
+  dims = max(dims_counts, key=lambda d: dims_counts[d])
+  joke_ids = tuple(
+    sorted(joke_id for joke_id, (embedding, _) in rows.items()
+           if embedding.shape[0] == dims))
+  return _LocalIndexSnapshot(
+    joke_ids=joke_ids,
+    embeddings=np.stack([rows[joke_id][0] for joke_id in joke_ids]),
+    public_timestamps=np.array([rows[joke_id][1] for joke_id in joke_ids],
+                               dtype=np.float64),
+  )
+
+
+_local_index = _LocalJokeSearchIndex()
+
+
+def clear_local_index() -> None:
+  """Drop the in-memory joke search index (it reloads on next use)."""
+  _local_index.clear()
+
+
+def _local_index_public_before(
+  field_filters: list[tuple[str, str, object]],
+  distance_measure,
+) -> tuple[bool, datetime.datetime | None]:
+  """Return (supported, public_before) for serving a search locally.
+
+  The local index only holds public jokes and only supports
+  `public_timestamp <= value` filters with cosine distance.
+  """
+  if distance_measure != DistanceMeasure.COSINE:
+    return False, None
+  public_before: datetime.datetime | None = None
+  for field, op, value in field_filters:
+    if (field != "public_timestamp" or op != "<="
+        or not isinstance(value, datetime.datetime)):
+      return False, None
+    if public_before is None or value < public_before:
+      public_before = value
+  return True, public_before
+
+
 def search_jokes(
   query: str,
   label: str,
@@ -110,36 +566,60 @@ def search_jokes(
   distance_measure=DistanceMeasure.COSINE,
   distance_threshold: float | None = None,
   return_jokes: bool = False,
+  use_local_index: bool = False,
+  cache_query_embedding: bool = False,
 ) -> list[JokeSearchResult]:
-  """Search for jokes in Firestore."""
+  """Search for jokes in Firestore.
+
+  Args:
+    cache_query_embedding: Reuse the query's embedding through
+      `get_query_embedding`. Meant for callers with a small, recurring set of
+      queries (topic and category pages), not free-text user searches.
+    use_local_index: Serve the search from the in-memory index of public jokes
+      instead of a Firestore vector query. Only applies when every filter is a
+      `public_timestamp <=` filter and the distance measure is cosine;
+      otherwise the Firestore vector query is used.
+  """
   try:
-    client = get_firestore_client()
-    collection = client.collection("joke_search")
-
-    for field, op, value in field_filters:
-      collection = collection.where(field, op, value)
-
-    final_query = query
-    query_embedding, _ = get_embedding(final_query, TaskType.RETRIEVAL_QUERY)
-
-    vector_query = collection.find_nearest(
-      vector_field="text_embedding",
-      query_vector=Vector(query_embedding),
-      distance_measure=distance_measure,
-      limit=limit,
-      distance_threshold=distance_threshold,
-      distance_result_field="vector_distance",
-    )
-    docs = vector_query.stream()
-    results = []
-    for doc in docs:
-      data = doc.to_dict()
-      distance = data.pop("vector_distance")
-      results.append(
-        JokeSearchResult(
-          joke_id=doc.id,
-          vector_distance=distance,
-        ))
+    if cache_query_embedding:
+      query_embedding = get_query_embedding(query)
+    else:
+      query_embedding, _ = get_embedding(query, TaskType.RETRIEVAL_QUERY)
+
+    local_supported, public_before = _local_index_public_before(
+      field_filters, distance_measure)
+    if use_local_index and local_supported:
+      results = _local_index.search(
+        query_embedding,
+        limit=limit,
+        distance_threshold=distance_threshold,
+        public_before=public_before,
+      )
+    else:
+      client = get_firestore_client()
+      collection = client.collection("joke_search")
+
+      for field, op, value in field_filters:
+        collection = collection.where(field, op, value)
+
+      vector_query = collection.find_nearest(
+        vector_field="text_embedding",
+        query_vector=Vector(query_embedding),
+        distance_measure=distance_measure,
+        limit=limit,
+        distance_threshold=distance_threshold,
+        distance_result_field="vector_distance",
+      )
+      docs = vector_query.stream()
+      results = []
+      for doc in docs:
+        data = doc.to_dict()
+        distance = data.pop("vector_distance")
+        results.append(
+          JokeSearchResult(
+            joke_id=doc.id,
+            vector_distance=distance,
+          ))
 
     if return_jokes and results:
       joke_ids = [r.joke_id for r in results]
@@ -182,3 +662,170 @@ def search_jokes(
       },
     )
     raise e
+
+
+@dataclasses.dataclass
+class EmbeddingBackfillResult:
+  """Progress of a `backfill_joke_search_embeddings` run."""
+  docs_scanned: int = 0
+  docs_embedded: int = 0
+  docs_skipped_missing_text: int = 0
+  cost: float = 0.0
+  # Last joke_search doc id processed; resume with `start_after=next_cursor`.
+  next_cursor: str | None = None
+  completed: bool = False
+
+
+def is_embedding_stale(
+  data: dict,
+  model: str = EMBEDDING_MODEL,
+  output_dimensionality: int = EMBEDDING_DIMENSIONALITY,
+) -> bool:
+  """Whether a joke_search doc lacks an embedding from the given model/dims.
+
+  Docs written before `embedding_model` was recorded are assumed to use the
+  default model.
+  """
+  embedding = data.get("text_embedding")
+  if not isinstance(embedding, Vector):
+    return True
+  if len(embedding) != output_dimensionality:
+    return True
+  return data.get(EMBEDDING_MODEL_FIELD, EMBEDDING_MODEL) != model
+
+
+def backfill_joke_search_embeddings(
+  *,
+  model: str = EMBEDDING_MODEL,
+  output_dimensionality: int = EMBEDDING_DIMENSIONALITY,
+  page_size: int = 200,
+  max_pages: int = 0,
+  start_after: str | None = None,
+  dry_run: bool = False,
+) -> EmbeddingBackfillResult:
+  """Re-embed joke_search docs whose embedding is missing or stale.
+
+  Walks `joke_search` in document-id order, one page at a time. Each page's
+  stale docs are embedded with `get_embeddings_batch` and written back in one
+  batch, and the cursor is checkpointed to `joke_cache/embedding_backfill` so
+  an interrupted run can be resumed with `resume_cursor()`.
+
+  Args:
+    model: Embedding model to backfill to.
+    output_dimensionality: Embedding dimensionality to backfill to.
+    page_size: Number of joke_search docs to scan per page.
+    max_pages: Stop after this many pages (0 for no limit).
+    start_after: Resume after this joke_search doc id.
+    dry_run: Count stale docs without embedding or writing them.
+
+  Raises:
+    ValueError: If `model` has no known pricing or `page_size` is not
+      positive.
+  """
+  if model not in _TOKEN_COSTS:
+    raise ValueError(f"Unsupported embedding model: {model}")
+  if page_size <= 0:
+    raise ValueError(f"page_size must be positive, got {page_size}")
+
+  client = get_firestore_client()
+  search_collection = client.collection("joke_search")
+  result = EmbeddingBackfillResult(next_cursor=start_after or None)
+
+  pages = 0
+  while not max_pages or pages < max_pages:
+    query = search_collection.order_by(FieldPath.document_id()).select(
+      ["text_embedding", EMBEDDING_MODEL_FIELD])
+    if result.next_cursor:
+      query = query.start_after([result.next_cursor])
+    docs = list(query.limit(page_size).stream())
+    if not docs:
+      result.completed = True
+      break
+    pages += 1
+    result.docs_scanned += len(docs)
+
+    stale_ids = [
+      doc.id for doc in docs
+      if is_embedding_stale(doc.to_dict() or {}, model, output_dimensionality)
+    ]
+    jokes_by_id = {
+      joke.key: joke
+      for joke in firestore_service.get_punny_jokes(stale_ids) if joke.key
+    } if stale_ids else {}
+
+    to_embed: list[tuple[str, str]] = []
+    for joke_id in stale_ids:
+      joke = jokes_by_id.get(joke_id)
+      if not joke or not joke.setup_text or not joke.punchline_text:
+        result.docs_skipped_missing_text += 1
+        continue
+      to_embed.append((joke_id, f"{joke.setup_text} {joke.punchline_text}"))
+
+    if to_embed and not dry_run:
+      embeddings = get_embeddings_batch(
+        [text for _, text in to_embed],
+        TaskType.RETRIEVAL_DOCUMENT,
+        model=model,
+        output_dimensionality=output_dimensionality,
+      )
+      for start in range(0, len(to_embed), _MAX_BATCH_WRITES):
+        batch = client.batch()
+        for (joke_id, _), (embedding, metadata) in zip(
+            to_embed[start:start + _MAX_BATCH_WRITES],
+            embeddings[start:start + _MAX_BATCH_WRITES]):
+          batch.set(search_collection.document(joke_id), {
+            "text_embedding": embedding,
+            EMBEDDING_MODEL_FIELD: model,
+            INDEX_UPDATED_AT_FIELD: SERVER_TIMESTAMP,
+          },
+                    merge=True)
+          result.cost += metadata.total_cost
+        batch.commit()
+    result.docs_embedded += len(to_embed)
+
+    result.next_cursor = docs[-1].id
+    if not dry_run:
+      _write_backfill_checkpoint(model, output_dimensionality,
+                                 result.next_cursor)
+    logger.info(f"Embedding backfill page {pages}: scanned {len(docs)}, "
+                f"{'would embed' if dry_run else 'embedded'} {len(to_embed)}, "
+                f"cursor {result.next_cursor}")
+
+    if len(docs) < page_size:
+      result.completed = True
+      break
+
+  if result.completed and not dry_run:
+    _write_backfill_checkpoint(model, output_dimensionality, None)
+  return result
+
+
+def resume_cursor(
+  model: str = EMBEDDING_MODEL,
+  output_dimensionality: int = EMBEDDING_DIMENSIONALITY,
+) -> str | None:
+  """Return the checkpointed cursor of an unfinished backfill, if any."""
+  doc = get_firestore_client().collection("joke_cache").document(
+    _EMBEDDING_BACKFILL_CHECKPOINT_DOC).get()
+  if not getattr(doc, "exists", False):
+    return None
+  data = doc.to_dict() or {}
+  if (data.get("model") != model
+      or data.get("output_dimensionality") != output_dimensionality):
+    return None
+  cursor = data.get("cursor")
+  return cursor if isinstance(cursor, str) and cursor else None
+
+
+def _write_backfill_checkpoint(
+  model: str,
+  output_dimensionality: int,
+  cursor: str | None,
+) -> None:
+  get_firestore_client().collection("joke_cache").document(
+    _EMBEDDING_BACKFILL_CHECKPOINT_DOC).set({
+      "model": model,
+      "output_dimensionality": output_dimensionality,
+      "cursor": cursor,
+      "updated_at": SERVER_TIMESTAMP,
+    })
@@ -0,0 +1,506 @@
+"""Tests for the search module."""
+
+import datetime
+from unittest.mock import Mock
+
+import pytest
+from common import models
+from google.cloud.firestore_v1.vector import Vector
+from services import search
+
+_NOW = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class _Snapshot:
+
+  def __init__(self, doc_id, data):
+    self.id = doc_id
+    self._data = data
+    self.exists = data is not None
+
+  def to_dict(self):
+    return self._data
+
+
+class _FakeSearchQuery:
+
+  def __init__(self, client, filters):
+    self._client = client
+    self._filters = filters
+
+  def where(self, filter):  # pylint: disable=redefined-builtin
+    return _FakeSearchQuery(self._client, self._filters + [filter])
+
+  def select(self, field_paths):
+    assert "text_embedding" in field_paths
+    return self
+
+  def stream(self):
+    self._client.stream_calls.append(self._filters)
+    for doc_id, data in self._client.search_docs.items():
+      if all(self._matches(data, f) for f in self._filters):
+        yield _Snapshot(doc_id, data)
+
+  @staticmethod
+  def _matches(data, field_filter):
+    value = data.get(field_filter.field_path)
+    if field_filter.op_string == "==":
+      return value == field_filter.value
+    if field_filter.op_string == ">":
+      return value is not None and value > field_filter.value
+    raise AssertionError(f"Unexpected op {field_filter.op_string}")
+
+
+class _FakeDocRef:
+
+  def __init__(self, store, doc_id):
+    self._store = store
+    self._doc_id = doc_id
+
+  def get(self):
+    return _Snapshot(self._doc_id, self._store.get(self._doc_id))
+
+  def set(self, data):
+    self._store[self._doc_id] = data
+
+
+class _FakeCollection:
+
+  def __init__(self, client, name):
+    self._client = client
+    self._name = name
+
+  def where(self, filter):  # pylint: disable=redefined-builtin
+    assert self._name == "joke_search"
+    return _FakeSearchQuery(self._client, [filter])
+
+  def document(self, doc_id):
+    assert self._name == "joke_search_query_cache"
+    return _FakeDocRef(self._client.query_cache_docs, doc_id)
+
+
+class _FakeFirestoreClient:
+
+  def __init__(self, search_docs=None):
+    self.search_docs = search_docs or {}
+    self.query_cache_docs = {}
+    self.stream_calls = []
+
+  def collection(self, name):
+    return _FakeCollection(self, name)
+
+
+def _search_doc(embedding, *, public_timestamp=_NOW, is_public=True):
+  return {
+    "text_embedding": Vector(embedding),
+    "public_timestamp": public_timestamp,
+    "is_public": is_public,
+    search.INDEX_UPDATED_AT_FIELD: _NOW,
+  }
+
+
+@pytest.fixture(autouse=True)
+def _reset_search_caches():
+  search.clear_local_index()
+  search._query_embedding_cache.clear()  # pylint: disable=protected-access
+  yield
+  search.clear_local_index()
+  search._query_embedding_cache.clear()  # pylint: disable=protected-access
+
+
+@pytest.fixture(name="fake_client")
+def fake_client_fixture(monkeypatch):
+  client = _FakeFirestoreClient()
+  monkeypatch.setattr(search, "get_firestore_client", lambda: client)
+  return client
+
+
+@pytest.fixture(name="mock_get_embedding")
+def mock_get_embedding_fixture(monkeypatch):
+  mock = Mock(return_value=(Vector([1.0, 0.0, 0.0]), None))
+  monkeypatch.setattr(search, "get_embedding", mock)
+  return mock
+
+
+def test_get_query_embedding_caches_in_memory_and_firestore(
+    fake_client, mock_get_embedding):
+  first = search.get_query_embedding("  Jokes about  DOGS ")
+  second = search.get_query_embedding("jokes about dogs")
+
+  assert list(first) == [1.0, 0.0, 0.0]
+  assert second is first
+  mock_get_embedding.assert_called_once()
+  # The original text is embedded; the normalized form is only the key.
+  assert mock_get_embedding.call_args.args[0] == "  Jokes about  DOGS "
+  [cached_doc] = fake_client.query_cache_docs.values()
+  assert cached_doc["query"] == "jokes about dogs"
+  assert list(cached_doc["embedding"]) == [1.0, 0.0, 0.0]
+  assert cached_doc["expire_at"] > datetime.datetime.now(
+    datetime.timezone.utc) + datetime.timedelta(days=29)
+
+
+def test_get_query_embedding_reads_persistent_cache(fake_client,
+                                                    mock_get_embedding):
+  search.get_query_embedding("cats")
+  search._query_embedding_cache.clear()  # pylint: disable=protected-access
+
+  embedding = search.get_query_embedding("Cats")
+
+  assert list(embedding) == [1.0, 0.0, 0.0]
+  mock_get_embedding.assert_called_once()
+
+
+def test_search_jokes_embeds_uncached_queries_directly(monkeypatch,
+                                                       mock_get_embedding):
+  mock_collection = Mock()
+  mock_collection.where.return_value = mock_collection
+  mock_collection.find_nearest.return_value.stream.return_value = []
+  mock_client = Mock()
+  mock_client.collection.return_value = mock_collection
+  monkeypatch.setattr(search, "get_firestore_client", lambda: mock_client)
+
+  _ = search.search_jokes(
+    query="Funny DOGS",
+    label="test",
+    field_filters=[],
+  )
+
+  mock_get_embedding.assert_called_once_with("Funny DOGS",
+                                             search.TaskType.RETRIEVAL_QUERY)
+  mock_collection.document.assert_not_called()
+  assert not search._query_embedding_cache  # pylint: disable=protected-access
+
+
+def test_search_jokes_local_index_ranks_and_filters(fake_client,
+                                                    mock_get_embedding):
+  fake_client.search_docs = {
+    "close":
+    _search_doc([1.0, 0.1, 0.0]),
+    "closest":
+    _search_doc([2.0, 0.0, 0.0]),
+    "far":
+    _search_doc([0.0, 1.0, 0.0]),
+    "future":
+    _search_doc([1.0, 0.0, 0.0],
+                public_timestamp=_NOW + datetime.timedelta(days=1)),
+    "private":
+    _search_doc([1.0, 0.0, 0.0], is_public=False),
+  }
+
+  results = search.search_jokes(
+    query="dogs",
+    label="test",
+    field_filters=[("public_timestamp", "<=", _NOW)],
+    limit=5,
+    distance_threshold=0.3,
+    use_local_index=True,
+  )
+
+  assert [r.joke_id for r in results] == ["closest", "close"]
+  assert results[0].vector_distance == pytest.approx(0.0, abs=1e-3)
+  assert results[1].vector_distance == pytest.approx(0.005, abs=1e-3)
+
+
+def test_search_jokes_local_index_respects_limit(fake_client,
+                                                 mock_get_embedding):
+  fake_client.search_docs = {
+    f"joke{i}": _search_doc([1.0, 0.1 * i, 0.0])
+    for i in range(5)
+  }
+
+  results = search.search_jokes(
+    query="dogs",
+    label="test",
+    field_filters=[("public_timestamp", "<=", _NOW)],
+    limit=2,
+    use_local_index=True,
+  )
+
+  assert [r.joke_id for r in results] == ["joke0", "joke1"]
+
+
+def test_local_index_refreshes_incrementally(monkeypatch, fake_client,
+                                             mock_get_embedding):
+  clock = [1000.0]
+  monkeypatch.setattr(search.time, "monotonic", lambda: clock[0])
+  fake_client.search_docs = {"a": _search_doc([1.0, 0.0, 0.0])}
+
+  def run_search():
+    return [
+      r.joke_id for r in search.search_jokes(
+        query="dogs",
+        label="test",
+        field_filters=[("public_timestamp", "<=", _NOW)],
+        limit=5,
+        use_local_index=True,
+      )
+    ]
+
+  assert run_search() == ["a"]
+
+  later = datetime.datetime.now(datetime.timezone.utc)
+  fake_client.search_docs["b"] = {
+    **_search_doc([1.0, 0.2, 0.0]),
+    search.INDEX_UPDATED_AT_FIELD: later,
+  }
+  fake_client.search_docs["a"] = {
+    **_search_doc([1.0, 0.0, 0.0], is_public=False),
+    search.INDEX_UPDATED_AT_FIELD:
+    later,
+  }
+
+  # Served from memory until the refresh interval passes.
+  assert run_search() == ["a"]
+
+  clock[0] += search._LOCAL_INDEX_REFRESH_INTERVAL_SEC  # pylint: disable=protected-access
+  assert run_search() == ["b"]
+
+  first_filter, = fake_client.stream_calls[0]
+  assert first_filter.field_path == "is_public"
+  refresh_filter, = fake_client.stream_calls[1]
+  assert refresh_filter.field_path == search.INDEX_UPDATED_AT_FIELD
+  assert refresh_filter.op_string == ">"
+
+
+def test_search_jokes_falls_back_to_firestore_for_unsupported_filters(
+    monkeypatch, mock_get_embedding):
+  mock_collection = Mock()
+  mock_collection.where.return_value = mock_collection
+  vector_doc = Mock(id="j1")
+  vector_doc.to_dict.return_value = {"vector_distance": 0.2}
+  mock_collection.find_nearest.return_value.stream.return_value = [vector_doc]
+  mock_client = Mock()
+  mock_client.collection.return_value = mock_collection
+  query_cache_doc = Mock()
+  query_cache_doc.get.return_value = _Snapshot("q", None)
+  mock_client.collection.return_value.document.return_value = query_cache_doc
+  monkeypatch.setattr(search, "get_firestore_client", lambda: mock_client)
+
+  results = search.search_jokes(
+    query="dogs",
+    label="test",
+    field_filters=[("tags", "array_contains", "dogs")],
+    use_local_index=True,
+  )
+
+  assert [r.joke_id for r in results] == ["j1"]
+  mock_collection.find_nearest.assert_called_once()
+
+
+def _embed_response(vectors, token_counts):
+  return Mock(embeddings=[
+    Mock(values=vector, statistics=Mock(token_count=tokens))
+    for vector, tokens in zip(vectors, token_counts)
+  ])
+
+
+def test_get_embeddings_batch_packs_requests_and_splits_cost(monkeypatch):
+  mock_client = Mock()
+
+  def embed_content(model, contents, config):
+    return _embed_response([[float(len(text))] for text in contents],
+                           [len(text) for text in contents])
+
+  mock_client.models.embed_content.side_effect = embed_content
+  monkeypatch.setattr(search, "get_genai_client", lambda: mock_client)
+
+  texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+  results = search.get_embeddings_batch(
+    texts,
+    search.TaskType.RETRIEVAL_DOCUMENT,
+    texts_per_request=2,
+  )
+
+  assert mock_client.models.embed_content.call_count == 3
+  assert [list(vector) for vector, _ in results] == [[1.0], [2.0], [3.0],
+                                                     [4.0], [5.0]]
+  rate = search._TOKEN_COSTS[search.EMBEDDING_MODEL]["input_tokens"]  # pylint: disable=protected-access
+  for text, (_, metadata) in zip(texts, results):
+    [generation] = metadata.generations
+    assert generation.token_counts == {"input_tokens": len(text)}
+    assert generation.cost == pytest.approx(len(text) * rate)
+
+
+def test_get_embeddings_batch_retries_transient_errors(monkeypatch):
+  mock_client = Mock()
+  mock_client.models.embed_content.side_effect = [
+    search.genai_errors.ServerError(503, {"error": {
+      "message": "busy"
+    }}),
+    _embed_response([[1.0], [2.0]], [3, 1]),
+  ]
+  monkeypatch.setattr(search, "get_genai_client", lambda: mock_client)
+  monkeypatch.setattr(search.time, "sleep", Mock())
+
+  results = search.get_embeddings_batch(["x", "y"],
+                                        search.TaskType.RETRIEVAL_DOCUMENT)
+
+  assert [list(vector) for vector, _ in results] == [[1.0], [2.0]]
+  assert results[0][1].generations[0].retry_count == 1
+
+
+def test_get_embeddings_batch_raises_non_retryable_errors(monkeypatch):
+  mock_client = Mock()
+  mock_client.models.embed_content.side_effect = ValueError("bad request")
+  monkeypatch.setattr(search, "get_genai_client", lambda: mock_client)
+
+  with pytest.raises(ValueError):
+    search.get_embeddings_batch(["x"], search.TaskType.RETRIEVAL_DOCUMENT)
+  assert mock_client.models.embed_content.call_count == 1
+
+
+class _FakeBackfillQuery:
+
+  def __init__(self, client, start_after=None, limit=None):
+    self._client = client
+    self._start_after = start_after
+    self._limit = limit
+
+  def order_by(self, _field_path):
+    return self
+
+  def select(self, _field_paths):
+    return self
+
+  def start_after(self, values):
+    return _FakeBackfillQuery(self._client, values[0], self._limit)
+
+  def limit(self, n):
+    return _FakeBackfillQuery(self._client, self._start_after, n)
+
+  def stream(self):
+    doc_ids = sorted(self._client.search_docs)
+    if self._start_after:
+      doc_ids = [d for d in doc_ids if d > self._start_after]
+    for doc_id in doc_ids[:self._limit]:
+      yield _Snapshot(doc_id, self._client.search_docs[doc_id])
+
+
+class _FakeBackfillBatch:
+
+  def __init__(self, client):
+    self._client = client
+    self._writes = []
+
+  def set(self, doc_ref, data, merge=False):
+    assert merge
+    self._writes.append((doc_ref, data))
+
+  def commit(self):
+    self._client.commit_sizes.append(len(self._writes))
+    for doc_ref, data in self._writes:
+      self._client.search_docs.setdefault(doc_ref.doc_id, {}).update(data)
+
+
+class _FakeBackfillClient:
+
+  def __init__(self, search_docs):
+    self.search_docs = search_docs
+    self.cache_docs = {}
+    self.commit_sizes = []
+
+  def collection(self, name):
+    client = self
+    if name == "joke_search":
+      query = _FakeBackfillQuery(self)
+      query.document = lambda doc_id: Mock(doc_id=doc_id)
+      return query
+    assert name == "joke_cache"
+    return Mock(document=lambda doc_id: _FakeDocRef(client.cache_docs, doc_id))
+
+  def batch(self):
+    return _FakeBackfillBatch(self)
+
+
+def test_backfill_joke_search_embeddings_reembeds_stale_docs(monkeypatch):
+  client = _FakeBackfillClient({
+    "current": {
+      "text_embedding": Vector([0.5, 0.5]),
+    },
+    "missing": {},
+    "no_text": {},
+    "wrong_dims": {
+      "text_embedding": Vector([0.5]),
+    },
+  })
+  monkeypatch.setattr(search, "get_firestore_client", lambda: client)
+  monkeypatch.setattr(
+    search.firestore_service, "get_punny_jokes", lambda ids: [
+      models.PunnyJoke(key=joke_id, setup_text="s", punchline_text=joke_id)
+      for joke_id in ids if joke_id != "no_text"
+    ])
+  metadata = models.GenerationMetadata()
+  metadata.add_generation(
+    models.SingleGenerationMetadata(model_name="m", cost=0.5))
+  mock_batch = Mock(side_effect=lambda texts, *_, **__:
+                    [(Vector([1.0, 1.0]), metadata) for _ in texts])
+  monkeypatch.setattr(search, "get_embeddings_batch", mock_batch)
+
+  result = search.backfill_joke_search_embeddings(output_dimensionality=2,
+                                                  page_size=3)
+
+  assert result.completed
+  assert result.docs_scanned == 4
+  assert result.docs_embedded == 2
+  assert result.docs_skipped_missing_text == 1
+  assert result.cost == pytest.approx(1.0)
+  assert [call.args[0]
+          for call in mock_batch.call_args_list] == [["s missing"],
+                                                     ["s wrong_dims"]]
+  assert list(client.search_docs["wrong_dims"]["text_embedding"]) == [1.0, 1.0]
+  assert client.search_docs["missing"][
+    search.EMBEDDING_MODEL_FIELD] == search.EMBEDDING_MODEL
+  assert "text_embedding" not in client.search_docs["no_text"]
+  assert search.resume_cursor(output_dimensionality=2) is None
+
+
+def test_backfill_joke_search_embeddings_checkpoints_for_resume(monkeypatch):
+  client = _FakeBackfillClient({f"j{i}": {} for i in range(5)})
+  monkeypatch.setattr(search, "get_firestore_client", lambda: client)
+  monkeypatch.setattr(search.firestore_service, "get_punny_jokes",
+                      lambda ids: [])
+
+  first = search.backfill_joke_search_embeddings(page_size=2, max_pages=1)
+
+  assert not first.completed
+  assert first.next_cursor == "j1"
+  assert search.resume_cursor() == "j1"
+  assert search.resume_cursor(model="other-model") is None
+
+  second = search.backfill_joke_search_embeddings(
+    page_size=2, start_after=search.resume_cursor())
+
+  assert second.completed
+  assert second.docs_scanned == 3
+  assert search.resume_cursor() is None
+
+
+def test_backfill_joke_search_embeddings_splits_write_batches(monkeypatch):
+  client = _FakeBackfillClient({f"j{i}": {} for i in range(5)})
+  monkeypatch.setattr(search, "get_firestore_client", lambda: client)
+  monkeypatch.setattr(search, "_MAX_BATCH_WRITES", 2)
+  monkeypatch.setattr(
+    search.firestore_service, "get_punny_jokes", lambda ids: [
+      models.PunnyJoke(key=joke_id, setup_text="s", punchline_text="p")
+      for joke_id in ids
+    ])
+  monkeypatch.setattr(
+    search, "get_embeddings_batch",
+    lambda texts, *_, **__: [(Vector([1.0]), models.GenerationMetadata())
+                             for _ in texts])
+
+  result = search.backfill_joke_search_embeddings(output_dimensionality=1,
+                                                  page_size=10)
+
+  assert result.docs_embedded == 5
+  assert client.commit_sizes == [2, 2, 1]
+  assert all(search.EMBEDDING_MODEL_FIELD in doc
+             for doc in client.search_docs.values())
+
+
+def test_backfill_joke_search_embeddings_rejects_unknown_model(monkeypatch):
+  client = _FakeBackfillClient({"j1": {}})
+  monkeypatch.setattr(search, "get_firestore_client", lambda: client)
+
+  with pytest.raises(ValueError, match="Unsupported embedding model"):
+    search.backfill_joke_search_embeddings(model="unknown-model")
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -557,6 +558,213 @@ def test_scene_renderer_uses_half_open_image_windows():
   assert tuple(int(value) for value in pixel.tolist()) == (0, 0, 255)
 
 
+
+def test_scene_frame_renderer_reuses_sprites_and_static_layers():
+  character = _DummyCharacter()
+  sequence = PosableCharacterSequence(sequence_mouth_state=[
+    SequenceMouthEvent(
+      start_time=0.0,
+      end_time=0.5,
+      mouth_state=MouthState.OPEN,
+    )
+  ])
+  sequence.validate()
+  script = SceneScript(
+    canvas=SceneCanvas(width_px=20, height_px=20),
+    items=[
+      TimedImage(
+        gcs_uri="gs://bucket/bottom.png",
+        start_time_sec=0.0,
+        end_time_sec=2.0,
+        z_index=1,
+        rect=SceneRect(x_px=0, y_px=0, width_px=20, height_px=20),
+        fit_mode="fill",
+      ),
+      TimedCharacterSequence(
+        actor_id="actor",
+        character=character,
+        sequence=sequence,
+        start_time_sec=0.0,
+        end_time_sec=2.0,
+        z_index=5,
+        rect=SceneRect(x_px=0, y_px=0, width_px=10, height_px=10),
+        fit_mode="fill",
+      ),
+      TimedImage(
+        gcs_uri="gs://bucket/top.png",
+        start_time_sec=1.0,
+        end_time_sec=2.0,
+        z_index=10,
+        rect=SceneRect(x_px=15, y_px=15, width_px=5, height_px=5),
+        fit_mode="fill",
+      ),
+    ],
+    duration_sec=2.0,
+  )
+
+  def _image_stub(gcs_uri: str) -> Image.Image:
+    if str(gcs_uri).endswith("top.png"):
+      return Image.new("RGBA", (5, 5), (0, 0, 255, 255))
+    return Image.new("RGBA", (20, 20), (255, 0, 0, 255))
+
+  get_image_mock = MagicMock(
+    return_value=Image.new("RGBA", (100, 80), (0, 255, 0, 255)))
+  with patch.object(scene_video_renderer.cloud_storage,
+                    "download_image_from_gcs",
+                    side_effect=_image_stub), \
+      patch.object(_DummyCharacter, "get_image", get_image_mock), \
+      patch.object(_DummyCharacter,
+                   "get_render_frame_info",
+                   return_value=(0, 0, 100, 80)):
+    renderer = scene_video_renderer._SceneFrameRenderer(  # pylint: disable=protected-access
+      canvas=script.canvas,
+      prepared_images=scene_video_renderer._prepare_images(script),  # pylint: disable=protected-access
+      actor_renders=scene_video_renderer._prepare_actor_renders(script),  # pylint: disable=protected-access
+      subtitle_schedule=[],
+      subtitle_rect=None,
+    )
+    talking = renderer.render(0.1)
+    talking_again = renderer.render(0.2)
+    closed_mouth = renderer.render(0.6)
+    with_top_image = renderer.render(1.5)
+
+  # Same pose and image window: the previous frame is reused.
+  assert talking_again is talking
+  # One sprite render per distinct pose.
+  assert get_image_mock.call_count == 2
+  assert character.mouth_state == MouthState.CLOSED
+  for frame in (talking, closed_mouth, with_top_image):
+    assert tuple(frame[5, 5].tolist()) == (0, 255, 0)
+    assert tuple(frame[12, 12].tolist()) == (255, 0, 0)
+  assert tuple(closed_mouth[17, 17].tolist()) == (255, 0, 0)
+  assert tuple(with_top_image[17, 17].tolist()) == (0, 0, 255)
+
+
+def _color_window_renderer_kwargs():
+  def _prepared(color, start, end):
+    return scene_video_renderer._PreparedImage(  # pylint: disable=protected-access
+      source_order=0,
+      start_time_sec=start,
+      end_time_sec=end,
+      z_index=0,
+      sprite=Image.new("RGBA", (4, 4), color),
+      paste_position=(0, 0),
+    )
+
+  return {
+    "canvas": SceneCanvas(width_px=4, height_px=4),
+    "prepared_images": [
+      _prepared((255, 0, 0, 255), 0.0, 0.5),
+      _prepared((0, 0, 255, 255), 0.5, 1.0),
+    ],
+    "actor_renders": [],
+    "subtitle_schedule": [],
+    "subtitle_rect": None,
+  }
+
+
+def test_parallel_frame_source_streams_ranges_in_order(monkeypatch):
+  renderer_kwargs = _color_window_renderer_kwargs()
+  monkeypatch.setattr(scene_video_renderer, "_worker_renderer", None)
+  executor = ThreadPoolExecutor(
+    max_workers=1,
+    initializer=scene_video_renderer._init_frame_render_worker,  # pylint: disable=protected-access
+    initargs=(renderer_kwargs, ),
+  )
+  fallback = scene_video_renderer._SceneFrameRenderer(**renderer_kwargs)  # pylint: disable=protected-access
+  source = scene_video_renderer._ParallelFrameSource(  # pylint: disable=protected-access
+    renderer_kwargs=renderer_kwargs,
+    fallback_renderer=fallback,
+    fps=4,
+    num_frames=4,
+    num_workers=1,
+    frames_per_task=3,
+    executor=executor,
+  )
+  submitted = []
+  original_submit = executor.submit
+
+  def _recording_submit(fn, *args):
+    submitted.append(args[:2])
+    return original_submit(fn, *args)
+
+  monkeypatch.setattr(executor, "submit", _recording_submit)
+
+  try:
+    off_grid = source.get_frame(0.6)
+    frames = [source.get_frame(index / 4) for index in range(4)]
+  finally:
+    source.close()
+    executor.shutdown()
+
+  assert tuple(off_grid[0, 0].tolist()) == (0, 0, 255)
+  assert [tuple(frame[0, 0].tolist()) for frame in frames] == [
+    (255, 0, 0),
+    (255, 0, 0),
+    (0, 0, 255),
+    (0, 0, 255),
+  ]
+  assert submitted == [(0, 3), (3, 4)]
+
+
+def test_parallel_frame_source_renders_in_worker_processes():
+  renderer_kwargs = _color_window_renderer_kwargs()
+  source = scene_video_renderer._ParallelFrameSource(  # pylint: disable=protected-access
+    renderer_kwargs=renderer_kwargs,
+    fallback_renderer=scene_video_renderer._SceneFrameRenderer(  # pylint: disable=protected-access
+      **renderer_kwargs),
+    fps=4,
+    num_frames=4,
+    num_workers=2,
+    frames_per_task=1,
+  )
+  try:
+    frames = [source.get_frame(index / 4) for index in range(4)]
+  finally:
+    source.close()
+
+  assert [tuple(frame[0, 0].tolist()) for frame in frames] == [
+    (255, 0, 0),
+    (255, 0, 0),
+    (0, 0, 255),
+    (0, 0, 255),
+  ]
+
+
+@pytest.mark.parametrize(
+  "cgroup_files, expected_workers",
+  [
+    # 2 CPUs of quota and 2 GiB: memory allows 3 workers, CPU allows 2.
+    ({
+      "/sys/fs/cgroup/cpu.max": "200000 100000",
+      "/sys/fs/cgroup/memory.max": str(2 << 30),
+    }, 2),
+    # 4 CPUs but 1 GiB: only the parent fits, so render serially.
+    ({
+      "/sys/fs/cgroup/cpu.max": "400000 100000",
+      "/sys/fs/cgroup/memory.max": str(1 << 30),
+    }, 1),
+    # cgroup v1 without a CPU quota: bounded by memory and the worker cap.
+    ({
+      "/sys/fs/cgroup/cpu/cpu.cfs_quota_us": "-1",
+      "/sys/fs/cgroup/cpu/cpu.cfs_period_us": "100000",
+      "/sys/fs/cgroup/memory/memory.limit_in_bytes": str(3 << 30),
+    }, 5),
+  ],
+)
+def test_resolve_render_workers_uses_container_allocation(
+    monkeypatch, cgroup_files, expected_workers):
+  monkeypatch.setattr(scene_video_renderer.os, "sched_getaffinity",
+                      lambda _pid: set(range(16)))
+  monkeypatch.setattr(scene_video_renderer, "_read_cgroup_file",
+                      cgroup_files.get)
+
+  workers = scene_video_renderer._resolve_render_workers(None)  # pylint: disable=protected-access
+
+  assert workers == expected_workers
+  assert scene_video_renderer._resolve_render_workers(3) == 3  # pylint: disable=protected-access
+
+
 def test_render_actor_with_fit_uses_logical_dimensions_for_scaling():
   sprite = Image.new("RGBA", (100, 160), (255, 0, 0, 255))
   rect = SceneRect(x_px=0, y_px=0, width_px=100, height_px=80)
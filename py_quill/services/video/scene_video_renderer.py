@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import bisect
 import math
+import multiprocessing
 import os
 import tempfile
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from dataclasses import dataclass
 from typing import Any, TypedDict
 
@@ -33,6 +37,19 @@ _SUBTITLE_TEXT_FILL = (33, 33, 33, 255)
 _SUBTITLE_STROKE_FILL = (255, 255, 255, 255)
 _SUBTITLE_STROKE_WIDTH_PX = 3
 _SUBTITLE_LINE_SPACING_PX = 4
+# Fitted actor sprites kept per renderer. Interpolated transforms make most
+# poses unique, so this is bounded rather than growing with video length.
+_FITTED_SPRITE_CACHE_MAX_ENTRIES = 256
+# Parallel rendering: each task renders a contiguous range of frames so worker
+# sprite caches stay warm. In-flight tasks are bounded to cap frame memory.
+_MAX_RENDER_WORKERS = 8
+_FRAMES_PER_RENDER_TASK = 12
+_MAX_IN_FLIGHT_TASKS_PER_WORKER = 2
+# Memory set aside per render process (the parent included): each worker
+# re-imports the module graph and loads its own character assets.
+_RENDER_PROCESS_MEMORY_BYTES = 512 * 1024 * 1024
+# cgroup v1 reports "no limit" as a huge number rather than "max".
+_CGROUP_UNLIMITED_BYTES = 1 << 60
 
 
 class _ActorEntry(TypedDict):
@@ -75,8 +92,15 @@ def generate_scene_video(
   output_gcs_uri: str,
   label: str,
   fps: int = _DEFAULT_VIDEO_FPS,
+  render_workers: int | None = None,
 ) -> tuple[str, np.ndarray[Any, Any], models.SingleGenerationMetadata]:
-  """Render a video from a fully declarative `SceneScript`."""
+  """Render a video from a fully declarative `SceneScript`.
+
+  Frames are rendered in a process pool of `render_workers` processes
+  (default: sized from the container's CPU and memory allocation, up to
+  `_MAX_RENDER_WORKERS`) and streamed in order into moviepy's ffmpeg writer.
+  Pass `render_workers=1` to render serially.
+  """
   print(f"Generating scene video for script: {script}")
 
   script.validate()
@@ -87,6 +111,7 @@ def generate_scene_video(
   video_clip: VideoClip | None = None
   audio_composite: CompositeAudioClip | None = None
   audio_clips: list[AudioFileClip] = []
+  frame_source: _ParallelFrameSource | None = None
 
   try:
     with tempfile.TemporaryDirectory() as temp_dir:
@@ -96,16 +121,27 @@ def generate_scene_video(
       subtitle_schedule = _extract_subtitle_schedule(script)
       audio_paths = _download_audio_to_temp(audio_schedule, temp_dir=temp_dir)
 
-      def make_frame(time_sec: float) -> np.ndarray[Any, Any]:
-        return _render_scene_frame(
-          time_sec=time_sec,
-          canvas=script.canvas,
-          prepared_images=prepared_images,
-          actor_renders=actor_renders,
-          subtitle_schedule=subtitle_schedule,
-          subtitle_rect=script.subtitle_rect,
+      renderer_kwargs: dict[str, Any] = {
+        "canvas": script.canvas,
+        "prepared_images": prepared_images,
+        "actor_renders": actor_renders,
+        "subtitle_schedule": subtitle_schedule,
+        "subtitle_rect": script.subtitle_rect,
+      }
+      frame_renderer = _SceneFrameRenderer(**renderer_kwargs)
+      first_frame = frame_renderer.render(0.0)
+
+      num_workers = _resolve_render_workers(render_workers)
+      make_frame = frame_renderer.render
+      if num_workers > 1:
+        frame_source = _ParallelFrameSource(
+          renderer_kwargs=renderer_kwargs,
+          fallback_renderer=frame_renderer,
+          fps=fps,
+          num_frames=int(script.duration_sec * fps),
+          num_workers=num_workers,
         )
-      first_frame = make_frame(0.0)
+        make_frame = frame_source.get_frame
 
       video_clip = VideoClip(make_frame, duration=script.duration_sec)
       if audio_paths:
@@ -168,6 +204,8 @@ def generate_scene_video(
         video_clip.close()
       except Exception:
         pass
+    if frame_source is not None:
+      frame_source.close()
 
 
 def _render_with_fit(
@@ -363,38 +401,167 @@ def _render_scene_frame(
   subtitle_schedule: list[_SubtitleScheduleEntry],
   subtitle_rect: SceneRect | None,
 ) -> np.ndarray[Any, Any]:
-  base = Image.new("RGBA", (canvas.width_px, canvas.height_px),
-                   tuple(canvas.background_rgba))
-
-  image_index = 0
-  actor_index = 0
-  while image_index < len(prepared_images) or actor_index < len(actor_renders):
-    render_image = actor_index >= len(actor_renders)
-    if image_index < len(prepared_images) and actor_index < len(actor_renders):
-      image_key = (
-        prepared_images[image_index].z_index,
-        prepared_images[image_index].source_order,
-      )
-      actor_key = (
-        actor_renders[actor_index].z_index,
-        actor_renders[actor_index].source_order,
-      )
-      render_image = image_key <= actor_key
+  """Render a single frame without reusing caches across calls."""
+  return _SceneFrameRenderer(
+    canvas=canvas,
+    prepared_images=prepared_images,
+    actor_renders=actor_renders,
+    subtitle_schedule=subtitle_schedule,
+    subtitle_rect=subtitle_rect,
+  ).render(time_sec)
+
+
+# Fitted sprite and its paste position.
+_FittedSprite = tuple[Image.Image, int, int]
+# A composite layer plan for one image time window: the base canvas (background
+# plus every image below the first actor), followed by actor indices and
+# pre-composited runs of images between or above them, in z order.
+_LayerPlanEntry = int | Image.Image
+
 
-    if render_image:
-      image = prepared_images[image_index]
-      image_index += 1
-      times_are_valid = image.start_time_sec <= time_sec < image.end_time_sec
-      if not times_are_valid:
+@dataclass(frozen=True)
+class _WindowPlan:
+  base: Image.Image
+  layers: list[_LayerPlanEntry]
+
+
+class _SceneFrameRenderer:
+  """Renders scene frames, reusing work between frames of the same video.
+
+  - Image layers only change at image start/end times, so the images active in
+    each window between those change points are pre-composited once: images
+    below every actor are baked into a base canvas, and each run of images
+    between actors is merged into a single overlay.
+  - Fitted actor sprites are cached by (actor, pose, rect, fit mode), so an
+    unchanged pose skips `get_image`, the RGBA conversion and the resize.
+  - A frame whose window, actor poses and subtitle all match the previous frame
+    returns the previous frame as is.
+  """
+
+  def __init__(
+    self,
+    *,
+    canvas: SceneCanvas,
+    prepared_images: list[_PreparedImage],
+    actor_renders: list[_ActorRender],
+    subtitle_schedule: list[_SubtitleScheduleEntry],
+    subtitle_rect: SceneRect | None,
+  ):
+    self._canvas = canvas
+    self._prepared_images = prepared_images
+    self._actor_renders = actor_renders
+    self._subtitle_schedule = subtitle_schedule
+    self._subtitle_rect = subtitle_rect
+    self._change_points = sorted({
+      boundary
+      for image in prepared_images
+      for boundary in (image.start_time_sec, image.end_time_sec)
+    })
+    self._window_plans: dict[int, _WindowPlan] = {}
+    self._fitted_sprites: OrderedDict[tuple[object, ...],
+                                      _FittedSprite] = OrderedDict()
+    self._last_frame_key: tuple[object, ...] | None = None
+    self._last_frame: np.ndarray[Any, Any] | None = None
+
+  def render(self, time_sec: float) -> np.ndarray[Any, Any]:
+    """Render the frame at `time_sec` as an RGB array."""
+    window_index = bisect.bisect_right(self._change_points, time_sec)
+    poses = tuple(
+      _sample_actor_pose(render=render, time_sec=time_sec)
+      for render in self._actor_renders)
+    subtitle_text = (_active_subtitle_text(self._subtitle_schedule, time_sec)
+                     if self._subtitle_rect is not None else None)
+
+    for render, pose in zip(self._actor_renders, poses):
+      render.character.apply_pose_state(pose)
+
+    frame_key = (window_index, poses, subtitle_text)
+    if frame_key == self._last_frame_key and self._last_frame is not None:
+      return self._last_frame
+
+    plan = self._window_plans.get(window_index)
+    if plan is None:
+      plan = self._build_window_plan(time_sec)
+      self._window_plans[window_index] = plan
+
+    frame = plan.base.copy()
+    for layer in plan.layers:
+      if isinstance(layer, Image.Image):
+        frame.paste(layer, (0, 0), layer)
+        continue
+      fitted, x, y = self._get_fitted_sprite(self._actor_renders[layer],
+                                             poses[layer])
+      frame.paste(fitted, (x, y), fitted)
+
+    _render_subtitle_overlay(
+      base=frame,
+      time_sec=time_sec,
+      subtitle_schedule=self._subtitle_schedule,
+      subtitle_rect=self._subtitle_rect,
+    )
+    rgb = np.asarray(frame.convert("RGB"))
+    self._last_frame_key = frame_key
+    self._last_frame = rgb
+    return rgb
+
+  def _build_window_plan(self, time_sec: float) -> _WindowPlan:
+    """Pre-composite the images active at `time_sec` around the actors."""
+    size = (self._canvas.width_px, self._canvas.height_px)
+    base = Image.new("RGBA", size, tuple(self._canvas.background_rgba))
+    layers: list[_LayerPlanEntry] = []
+    overlay: Image.Image | None = None
+
+    image_index = 0
+    actor_index = 0
+    images = self._prepared_images
+    actors = self._actor_renders
+    while image_index < len(images) or actor_index < len(actors):
+      render_image = actor_index >= len(actors)
+      if image_index < len(images) and actor_index < len(actors):
+        image_key = (images[image_index].z_index,
+                     images[image_index].source_order)
+        actor_key = (actors[actor_index].z_index,
+                     actors[actor_index].source_order)
+        render_image = image_key <= actor_key
+
+      if render_image:
+        image = images[image_index]
+        image_index += 1
+        if not image.start_time_sec <= time_sec < image.end_time_sec:
+          continue
+        if not layers:
+          base.paste(image.sprite, image.paste_position, image.sprite)
+          continue
+        if overlay is None:
+          overlay = Image.new("RGBA", size, (0, 0, 0, 0))
+        overlay.alpha_composite(image.sprite, image.paste_position)
         continue
-      x, y = image.paste_position
-      base.paste(image.sprite, (x, y), image.sprite)
-      continue
 
-    render = actor_renders[actor_index]
-    actor_index += 1
-    pose = _sample_actor_pose(render=render, time_sec=time_sec)
-    render.character.apply_pose_state(pose)
+      if overlay is not None:
+        layers.append(overlay)
+        overlay = None
+      layers.append(actor_index)
+      actor_index += 1
+
+    if overlay is not None:
+      layers.append(overlay)
+    return _WindowPlan(base=base, layers=layers)
+
+  def _get_fitted_sprite(
+    self,
+    render: _ActorRender,
+    pose: PoseState,
+  ) -> _FittedSprite:
+    """Return the fitted actor sprite for `pose`, rendering it on a miss.
+
+    The character's pose must already be set to `pose`.
+    """
+    key = (render.actor_id, pose, render.rect, render.fit_mode)
+    cached = self._fitted_sprites.get(key)
+    if cached is not None:
+      self._fitted_sprites.move_to_end(key)
+      return cached
+
     sprite = render.character.get_image()
     (
       logical_origin_x,
@@ -402,7 +569,7 @@ def _render_scene_frame(
       logical_width,
       logical_height,
     ) = render.character.get_render_frame_info()
-    fitted, x, y = _render_actor_with_fit(
+    fitted = _render_actor_with_fit(
       sprite,
       rect=render.rect,
       fit_mode=render.fit_mode,
@@ -412,15 +579,175 @@ def _render_scene_frame(
       logical_width=logical_width,
       logical_height=logical_height,
     )
-    base.paste(fitted, (x, y), fitted)
+    self._fitted_sprites[key] = fitted
+    while len(self._fitted_sprites) > _FITTED_SPRITE_CACHE_MAX_ENTRIES:
+      self._fitted_sprites.popitem(last=False)
+    return fitted
+
+
+def _resolve_render_workers(render_workers: int | None) -> int:
+  """Return the number of render processes to use.
+
+  By default this is sized from the CPUs and memory allocated to this
+  container rather than the host's: one worker per allocated CPU, as long as
+  every process (the parent included) gets `_RENDER_PROCESS_MEMORY_BYTES`.
+  """
+  if render_workers is not None:
+    return max(1, render_workers)
+  by_cpu = _allocated_cpu_count()
+  memory_bytes = _allocated_memory_bytes()
+  by_memory = 1
+  if memory_bytes:
+    by_memory = memory_bytes // _RENDER_PROCESS_MEMORY_BYTES - 1
+  return max(1, min(_MAX_RENDER_WORKERS, by_cpu, by_memory))
+
+
+def _allocated_cpu_count() -> int:
+  """CPUs this process may use: its affinity mask capped by any CPU quota."""
+  try:
+    cpus = len(os.sched_getaffinity(0))
+  except AttributeError:
+    cpus = os.cpu_count() or 1
+  # cgroup v2 "<quota> <period>", or cgroup v1 quota and period files.
+  quota_text = _read_cgroup_file("/sys/fs/cgroup/cpu.max")
+  if quota_text:
+    quota, _, period = quota_text.partition(" ")
+  else:
+    quota = _read_cgroup_file("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") or "-1"
+    period = _read_cgroup_file("/sys/fs/cgroup/cpu/cpu.cfs_period_us") or "0"
+  try:
+    quota_us, period_us = int(quota), int(period)
+  except ValueError:
+    return cpus
+  if quota_us > 0 and period_us > 0:
+    cpus = min(cpus, max(1, quota_us // period_us))
+  return cpus
+
+
+def _allocated_memory_bytes() -> int | None:
+  """Memory limit of this container, or physical memory if unlimited."""
+  for path in ("/sys/fs/cgroup/memory.max",
+               "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+    limit_text = _read_cgroup_file(path)
+    if limit_text and limit_text.isdigit():
+      limit = int(limit_text)
+      if limit < _CGROUP_UNLIMITED_BYTES:
+        return limit
+  try:
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+  except (AttributeError, OSError, ValueError):
+    return None
 
-  _render_subtitle_overlay(
-    base=base,
-    time_sec=time_sec,
-    subtitle_schedule=subtitle_schedule,
-    subtitle_rect=subtitle_rect,
-  )
-  return np.asarray(base.convert("RGB"))
+
+def _read_cgroup_file(path: str) -> str | None:
+  try:
+    with open(path, encoding="utf-8") as cgroup_file:
+      return cgroup_file.read().strip()
+  except OSError:
+    return None
+
+
+# Per-process renderer used by frame rendering workers.
+_worker_renderer: _SceneFrameRenderer | None = None
+
+
+def _init_frame_render_worker(renderer_kwargs: dict[str, Any]) -> None:
+  """Build this worker's renderer, with its own character sprite caches."""
+  global _worker_renderer  # pylint: disable=global-statement
+  _worker_renderer = _SceneFrameRenderer(**renderer_kwargs)
+
+
+def _render_frame_range(
+  start_index: int,
+  stop_index: int,
+  fps: int,
+) -> list[np.ndarray[Any, Any]]:
+  """Render frames [start_index, stop_index) in the current worker."""
+  if _worker_renderer is None:
+    raise RuntimeError("Frame render worker was not initialized")
+  return [
+    _worker_renderer.render(frame_index / fps)
+    for frame_index in range(start_index, stop_index)
+  ]
+
+
+class _ParallelFrameSource:
+  """Serves frames in timeline order, rendered ahead in a process pool.
+
+  The timeline is split into contiguous frame ranges that are rendered by
+  worker processes, at most a bounded number of ranges ahead of the frame being
+  consumed. Requests for times that are not the next frame on the `fps` grid
+  (e.g. preview frames) are rendered in-process by `fallback_renderer`.
+
+  The pool is started on the first in-order frame request.
+  """
+
+  def __init__(
+    self,
+    *,
+    renderer_kwargs: dict[str, Any],
+    fallback_renderer: _SceneFrameRenderer,
+    fps: int,
+    num_frames: int,
+    num_workers: int,
+    frames_per_task: int = _FRAMES_PER_RENDER_TASK,
+    executor: Executor | None = None,
+  ):
+    self._renderer_kwargs = renderer_kwargs
+    self._fallback_renderer = fallback_renderer
+    self._fps = fps
+    self._num_frames = num_frames
+    self._num_workers = num_workers
+    self._frames_per_task = max(1, frames_per_task)
+    self._max_in_flight = num_workers * _MAX_IN_FLIGHT_TASKS_PER_WORKER
+    self._executor = executor
+    self._owns_executor = executor is None
+    self._pending: deque[Future[list[np.ndarray[Any, Any]]]] = deque()
+    self._next_submit_index = 0
+    self._next_frame_index = 0
+    self._buffered: deque[np.ndarray[Any, Any]] = deque()
+
+  def get_frame(self, time_sec: float) -> np.ndarray[Any, Any]:
+    """Return the frame at `time_sec`."""
+    frame_index = int(round(time_sec * self._fps))
+    is_next_frame = (frame_index == self._next_frame_index
+                     and frame_index < self._num_frames
+                     and math.isclose(frame_index / self._fps, time_sec))
+    if not is_next_frame:
+      return self._fallback_renderer.render(time_sec)
+
+    if not self._buffered:
+      self._fill_pipeline()
+      self._buffered.extend(self._pending.popleft().result())
+      self._fill_pipeline()
+    self._next_frame_index += 1
+    return self._buffered.popleft()
+
+  def close(self) -> None:
+    """Cancel outstanding work and shut down the pool if this source owns it."""
+    for future in self._pending:
+      future.cancel()
+    self._pending.clear()
+    if self._executor is not None and self._owns_executor:
+      self._executor.shutdown(wait=True, cancel_futures=True)
+    self._executor = None
+
+  def _fill_pipeline(self) -> None:
+    if self._executor is None:
+      self._executor = ProcessPoolExecutor(
+        max_workers=self._num_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_frame_render_worker,
+        initargs=(self._renderer_kwargs, ),
+      )
+    while (len(self._pending) < self._max_in_flight
+           and self._next_submit_index < self._num_frames):
+      start_index = self._next_submit_index
+      stop_index = min(self._num_frames, start_index + self._frames_per_task)
+      self._pending.append(
+        self._executor.submit(_render_frame_range, start_index, stop_index,
+                              self._fps))
+      self._next_submit_index = stop_index
 
 
 def _sample_actor_pose(*, render: _ActorRender, time_sec: float) -> PoseState:
@@ -506,6 +833,16 @@ def _extract_subtitle_schedule(
   return schedule
 
 
+def _active_subtitle_text(
+  subtitle_schedule: list[_SubtitleScheduleEntry],
+  time_sec: float,
+) -> str | None:
+  for start_time, end_time, text in subtitle_schedule:
+    if start_time <= time_sec < end_time:
+      return text
+  return None
+
+
 def _render_subtitle_overlay(
   *,
   base: Image.Image,
@@ -516,11 +853,7 @@ def _render_subtitle_overlay(
   if subtitle_rect is None:
     return
 
-  active_text: str | None = None
-  for start_time, end_time, text in subtitle_schedule:
-    if start_time <= time_sec < end_time:
-      active_text = text
-      break
+  active_text = _active_subtitle_text(subtitle_schedule, time_sec)
   if not active_text:
     return
 
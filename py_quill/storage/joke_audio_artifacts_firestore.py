@@ -0,0 +1,49 @@
+"""Firestore helpers for the `joke_audio_artifacts` collection.
+
+Each document indexes one content-addressed artifact of the joke audio and
+lip-sync pipeline (dialog audio, split clips, or lip-sync sequences). The
+document ID is the artifact's content hash, so identical inputs resolve to the
+same document regardless of which joke produced them.
+"""
+
+from typing import Any, cast
+
+from google.cloud.firestore import SERVER_TIMESTAMP
+from services import firestore
+
+_COLLECTION = "joke_audio_artifacts"
+
+
+def get_joke_audio_artifact(
+  artifact_key: str,
+  *,
+  stage: str,
+) -> dict[str, Any] | None:
+  """Fetch an artifact index entry, or None if missing or of another stage."""
+  normalized_key = (artifact_key or "").strip()
+  if not normalized_key:
+    return None
+  doc = firestore.db().collection(_COLLECTION).document(normalized_key).get()
+  if not getattr(doc, "exists", False):
+    return None
+  data = doc.to_dict() or {}
+  if not isinstance(data, dict) or data.get("stage") != stage:
+    return None
+  return cast(dict[str, Any], data)
+
+
+def set_joke_audio_artifact(
+  artifact_key: str,
+  *,
+  stage: str,
+  data: dict[str, Any],
+) -> None:
+  """Create or replace an artifact index entry."""
+  normalized_key = (artifact_key or "").strip()
+  if not normalized_key:
+    raise ValueError("artifact_key is required")
+  payload = dict(data)
+  payload["stage"] = stage
+  payload["creation_time"] = SERVER_TIMESTAMP
+  _ = firestore.db().collection(_COLLECTION).document(normalized_key).set(
+    payload)
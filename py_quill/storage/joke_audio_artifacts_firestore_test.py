@@ -0,0 +1,94 @@
+"""Tests for the joke_audio_artifacts_firestore module."""
+
+from storage import joke_audio_artifacts_firestore
+
+
+class _DummyDoc:
+
+  def __init__(self, data):
+    self.exists = data is not None
+    self._data = data
+
+  def to_dict(self):
+    return self._data
+
+
+def _install_dummy_db(monkeypatch, docs: dict[str, dict | None]):
+  captured: dict[str, object] = {}
+
+  class DummyDocRef:
+
+    def __init__(self, doc_id):
+      self._doc_id = doc_id
+
+    def get(self):
+      return _DummyDoc(docs.get(self._doc_id))
+
+    def set(self, data):
+      captured["doc_id"] = self._doc_id
+      captured["data"] = data
+
+  class DummyCollection:
+
+    def document(self, doc_id):
+      return DummyDocRef(doc_id)
+
+  class DummyDB:
+
+    def collection(self, name):
+      captured["collection"] = name
+      return DummyCollection()
+
+  monkeypatch.setattr(joke_audio_artifacts_firestore.firestore, "db", DummyDB)
+  return captured
+
+
+def test_get_joke_audio_artifact_returns_matching_stage(monkeypatch):
+  captured = _install_dummy_db(monkeypatch, {
+    "abc": {
+      "stage": "clips",
+      "dialog_gcs_uri": "gs://audio/dialog.wav",
+    },
+  })
+
+  artifact = joke_audio_artifacts_firestore.get_joke_audio_artifact(
+    "abc", stage="clips")
+
+  assert captured["collection"] == "joke_audio_artifacts"
+  assert artifact == {
+    "stage": "clips",
+    "dialog_gcs_uri": "gs://audio/dialog.wav",
+  }
+
+
+def test_get_joke_audio_artifact_ignores_missing_and_other_stages(monkeypatch):
+  _install_dummy_db(monkeypatch, {"abc": {"stage": "dialog"}})
+
+  assert joke_audio_artifacts_firestore.get_joke_audio_artifact(
+    "abc", stage="clips") is None
+  assert joke_audio_artifacts_firestore.get_joke_audio_artifact(
+    "missing", stage="dialog") is None
+  assert joke_audio_artifacts_firestore.get_joke_audio_artifact(
+    " ", stage="dialog") is None
+
+
+def test_set_joke_audio_artifact_writes_stage_and_timestamp(monkeypatch):
+  captured = _install_dummy_db(monkeypatch, {})
+  monkeypatch.setattr(joke_audio_artifacts_firestore, "SERVER_TIMESTAMP", "TS")
+
+  joke_audio_artifacts_firestore.set_joke_audio_artifact(
+    "abc",
+    stage="lip_sync",
+    data={"sequence_ids": {
+      "intro": "seq-1"
+    }},
+  )
+
+  assert captured["doc_id"] == "abc"
+  assert captured["data"] == {
+    "sequence_ids": {
+      "intro": "seq-1"
+    },
+    "stage": "lip_sync",
+    "creation_time": "TS",
+  }
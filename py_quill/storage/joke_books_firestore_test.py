@@ -7,6 +7,7 @@ from unittest.mock import MagicMock
 from google.cloud.firestore import ArrayUnion
 
 from common import models
+from services import firestore_fake
 from storage import joke_books_firestore
 
 
@@ -237,3 +238,95 @@ def test_promote_and_persist_uploaded_images_update_joke_docs(monkeypatch):
     'punchline_image_url': 'https://cdn/main.png'
   }
   assert promoted_url == 'https://cdn/book-setup.png'
+
+
+def test_get_joke_book_detail_raw_batches_jokes_and_metadata(monkeypatch):
+  db = firestore_fake.FakeFirestore({
+    'jokes/j1': {
+      'setup_text': 'S1',
+    },
+    'jokes/j2': {
+      'setup_text': 'S2',
+    },
+    'jokes/j2/metadata/metadata': {
+      'book_page_ready': True,
+    },
+    'jokes/j3/metadata/metadata': {
+      'book_page_ready': False,
+    },
+  })
+  monkeypatch.setattr(joke_books_firestore.firestore_service, 'db', lambda: db)
+  monkeypatch.setattr(joke_books_firestore, '_GET_ALL_CHUNK_SIZE', 4)
+  monkeypatch.setattr(
+    joke_books_firestore,
+    'get_joke_book',
+    lambda book_id: models.JokeBook(id=book_id, jokes=['j1', 'j2', 'j3']),
+  )
+  timings_sec: dict[str, float] = {}
+
+  book, entries = joke_books_firestore.get_joke_book_detail_raw(
+    'book-1', timings_sec=timings_sec)
+
+  assert book is not None and book.id == 'book-1'
+  assert entries == [
+    {
+      'id': 'j1',
+      'joke': {
+        'setup_text': 'S1'
+      },
+      'metadata': {},
+    },
+    {
+      'id': 'j2',
+      'joke': {
+        'setup_text': 'S2'
+      },
+      'metadata': {
+        'book_page_ready': True
+      },
+    },
+    {
+      'id': 'j3',
+      'joke': {},
+      'metadata': {
+        'book_page_ready': False
+      },
+    },
+  ]
+  # Six refs in chunks of four: two batch reads and no per-joke reads.
+  assert sorted(len(paths) for paths in db.get_all_calls) == [2, 4]
+  assert sorted(path for paths in db.get_all_calls for path in paths) == [
+    'jokes/j1',
+    'jokes/j1/metadata/metadata',
+    'jokes/j2',
+    'jokes/j2/metadata/metadata',
+    'jokes/j3',
+    'jokes/j3/metadata/metadata',
+  ]
+  assert set(timings_sec) == {'load_book', 'load_jokes'}
+
+
+def test_get_book_page_spread_urls_reads_metadata_in_one_batch(monkeypatch):
+  db = firestore_fake.FakeFirestore({
+    'jokes/j1/metadata/metadata': {
+      'book_page_setup_image_url': 'https://cdn/s1.png',
+      'book_page_punchline_image_url': 'https://cdn/p1.png',
+    },
+    'jokes/j2/metadata/metadata': {
+      'book_page_setup_image_url': 'https://cdn/s2.png',
+      'book_page_punchline_image_url': 'https://cdn/p2.png',
+    },
+  })
+  monkeypatch.setattr(joke_books_firestore.firestore_service, 'db', lambda: db)
+  monkeypatch.setattr(
+    joke_books_firestore,
+    'get_joke_book',
+    lambda book_id: models.JokeBook(id=book_id, jokes=['j1', 'j2']),
+  )
+
+  _, setup_pages, punchline_pages = (
+    joke_books_firestore.get_book_page_spread_urls('book-1'))
+
+  assert setup_pages == ['https://cdn/s1.png', 'https://cdn/s2.png']
+  assert punchline_pages == ['https://cdn/p1.png', 'https://cdn/p2.png']
+  assert len(db.get_all_calls) == 1
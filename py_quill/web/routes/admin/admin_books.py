@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import datetime
+import time
 from io import BytesIO
 from pathlib import Path
 from typing import cast
@@ -224,10 +225,13 @@ def admin_joke_books():
 @auth_helpers.require_admin
 def admin_joke_book_detail(book_id: str):
   """Render an image-centric view of a single joke book."""
-  book, entries = joke_books_firestore.get_joke_book_detail_raw(book_id)
+  timings_sec: dict[str, float] = {}
+  book, entries = joke_books_firestore.get_joke_book_detail_raw(
+    book_id, timings_sec=timings_sec)
   if not book:
     return flask.Response('Joke book not found', status=404)
 
+  build_start_time = time.perf_counter()
   joke_rows: list[dict[str, object]] = []
   total_book_cost = 0.0
   for sequence, entry in enumerate(entries, start=1):
@@ -243,6 +247,8 @@ def admin_joke_book_detail(book_id: str):
       metadata.get('all_book_page_punchline_image_urls'))
     book_page_ready = bool(metadata.get('book_page_ready', False))
 
+    # The loader returns raw dicts, so this is the one model build per joke;
+    # the card macro and edit payload need a PunnyJoke.
     joke_data_for_card = dict(joke_data)
     _ = joke_data_for_card.setdefault('setup_text', '')
     _ = joke_data_for_card.setdefault('punchline_text', '')
@@ -318,6 +324,10 @@ def admin_joke_book_detail(book_id: str):
       book_page_ready,
     })
 
+  timings_sec['build_rows'] = round(time.perf_counter() - build_start_time, 3)
+  logger.info(f'Joke book {book_id} detail: {len(joke_rows)} jokes, '
+              f'timings_sec={timings_sec}')
+
   if utils.is_emulator():
     generate_book_page_url = "http://127.0.0.1:5001/storyteller-450807/us-central1/generate_joke_book_page"
   else:
@@ -64,7 +64,7 @@ def test_admin_joke_book_detail_renders_images_and_placeholders(monkeypatch):
   monkeypatch.setattr(
     books_routes.joke_books_firestore,
     "get_joke_book_detail_raw",
-    lambda _book_id: (
+    lambda _book_id, **_kwargs: (
       books_routes.models.JokeBook(
         id='book-42',
         book_name='Space Llamas',
@@ -207,7 +207,7 @@ def test_admin_joke_book_detail_uses_emulator_url_when_applicable(monkeypatch):
   monkeypatch.setattr(
     books_routes.joke_books_firestore,
     "get_joke_book_detail_raw",
-    lambda _book_id: (
+    lambda _book_id, **_kwargs: (
       books_routes.models.JokeBook(
         id='book-local',
         book_name='Local Book',
@@ -5,7 +5,6 @@ from __future__ import annotations
 import flask
 from firebase_functions import logger
 from google.cloud.firestore import DELETE_FIELD
-from typing import Any, cast
 
 from common import config, joke_category_operations, models, utils
 from functions import auth_helpers
@@ -14,33 +13,6 @@ from services import firestore
 from web.routes import web_bp
 
 
-def _get_category_lunchbox_sheet_ids() -> dict[str, dict[str, str]]:
-  """Fetch live lunchbox sheet ids from the main category documents."""
-  docs: Any = firestore.db().collection("joke_categories").stream()
-  results: dict[str, dict[str, str]] = {}
-  for doc in docs:
-    if not getattr(doc, "exists", False):
-      continue
-    raw_data: Any = doc.to_dict()
-    if not isinstance(raw_data, dict):
-      continue
-    data = cast(dict[str, object], raw_data)
-    raw_branded_sheet_id = data.get("joke_sheets_branded_id")
-    branded_sheet_id = (raw_branded_sheet_id.strip() if isinstance(
-      raw_branded_sheet_id, str) else "")
-    raw_unbranded_sheet_id = data.get("joke_sheets_unbranded_id")
-    unbranded_sheet_id = (raw_unbranded_sheet_id.strip() if isinstance(
-      raw_unbranded_sheet_id, str) else "")
-    category_sheet_ids: dict[str, str] = {}
-    if branded_sheet_id:
-      category_sheet_ids["branded"] = branded_sheet_id
-    if unbranded_sheet_id:
-      category_sheet_ids["unbranded"] = unbranded_sheet_id
-    if category_sheet_ids:
-      results[doc.id] = category_sheet_ids
-  return results
-
-
 def _get_sheet_preview_image_urls(sheet: models.JokeSheet) -> list[str]:
   """Return transformed preview URLs for every page image in a sheet."""
   return [
@@ -60,30 +32,22 @@ def admin_joke_categories():
   categories = firestore.get_all_joke_categories(
     fetch_cached_jokes=True,
     use_cache=True,
+    fetch_live_sheet_ids=True,
   )
-  lunchbox_sheet_ids = _get_category_lunchbox_sheet_ids()
+  sheets_by_id = firestore.get_joke_sheets([
+    sheet_id for category in categories
+    for sheet_id in (category.joke_sheets_branded_id,
+                     category.joke_sheets_unbranded_id) if sheet_id
+  ])
   for category in categories:
-    category_id = getattr(category, "id", None)
-    if not isinstance(category_id,
-                      str) or category_id not in lunchbox_sheet_ids:
-      continue
-    category_sheet_ids = lunchbox_sheet_ids[category_id]
-    branded_sheet_id = category_sheet_ids.get("branded")
-    if branded_sheet_id:
-      category.joke_sheets_branded_id = branded_sheet_id
-      branded_sheet = firestore.get_joke_sheet(branded_sheet_id)
-      if branded_sheet:
-        setattr(category, "lunchbox_notes_branded_sheet", branded_sheet)
-        setattr(category, "lunchbox_notes_branded_image_urls",
-                _get_sheet_preview_image_urls(branded_sheet))
-    unbranded_sheet_id = category_sheet_ids.get("unbranded")
-    if unbranded_sheet_id:
-      category.joke_sheets_unbranded_id = unbranded_sheet_id
-      unbranded_sheet = firestore.get_joke_sheet(unbranded_sheet_id)
-      if unbranded_sheet:
-        setattr(category, "lunchbox_notes_unbranded_sheet", unbranded_sheet)
-        setattr(category, "lunchbox_notes_unbranded_image_urls",
-                _get_sheet_preview_image_urls(unbranded_sheet))
+    for variant in ("branded", "unbranded"):
+      sheet_id = getattr(category, f"joke_sheets_{variant}_id")
+      sheet = sheets_by_id.get(sheet_id) if sheet_id else None
+      if not sheet:
+        continue
+      setattr(category, f"lunchbox_notes_{variant}_sheet", sheet)
+      setattr(category, f"lunchbox_notes_{variant}_image_urls",
+              _get_sheet_preview_image_urls(sheet))
 
   def _state_key(category: models.JokeCategory) -> str:
     return (category.state or "").upper()
@@ -20,31 +20,6 @@ def _mock_admin_session(monkeypatch):
                       }))
 
 
-def _mock_category_doc_stream(monkeypatch, docs):
-  """Stub firestore.db() for category collection streaming."""
-
-  class _Collection:
-
-    def __init__(self, stream_docs):
-      self._stream_docs = stream_docs
-
-    def stream(self):
-      return self._stream_docs
-
-    def document(self, _doc_id):
-      return Mock()
-
-  class _Db:
-
-    def __init__(self, stream_docs):
-      self._stream_docs = stream_docs
-
-    def collection(self, _name):
-      return _Collection(self._stream_docs)
-
-  monkeypatch.setattr(categories_routes.firestore, "db", lambda: _Db(docs))
-
-
 def test_admin_create_category_calls_refresh(monkeypatch):
   """Creating a category should initialize the category cache."""
   _mock_admin_session(monkeypatch)
@@ -395,7 +370,6 @@ def test_admin_joke_categories_renders_multiline_tooltip(monkeypatch):
   monkeypatch.setattr(categories_routes.firestore,
                       "get_uncategorized_public_jokes",
                       lambda _cats: [uncategorized_joke])
-  _mock_category_doc_stream(monkeypatch, [])
 
   with app.test_client() as client:
     resp = client.get('/admin/joke-categories')
@@ -433,9 +407,17 @@ def test_admin_joke_categories_renders_lunchbox_pdf_link(monkeypatch):
     display_name="Animals",
     joke_description_query="animals",
     state="APPROVED",
+    joke_sheets_branded_id="animals-branded",
+    joke_sheets_unbranded_id="animals-unbranded",
   )
+  get_categories_kwargs = {}
+
+  def _get_all_joke_categories(**kwargs):
+    get_categories_kwargs.update(kwargs)
+    return [category]
+
   monkeypatch.setattr(categories_routes.firestore, "get_all_joke_categories",
-                      lambda **_kwargs: [category])
+                      _get_all_joke_categories)
   monkeypatch.setattr(categories_routes.firestore,
                       "get_uncategorized_public_jokes", lambda _cats: [])
   monkeypatch.setattr(categories_routes.utils, "joke_creation_big_url",
@@ -449,31 +431,34 @@ def test_admin_joke_categories_renders_lunchbox_pdf_link(monkeypatch):
     lambda gcs_uri, width=1024, image_format="jpg", quality=75:
     f"https://img.example/{quality}/{width}/{image_format}/{gcs_uri.split('/')[-1]}"
   )
-  monkeypatch.setattr(
-    categories_routes.firestore, "get_joke_sheet",
-    lambda sheet_id: models.JokeSheet(
-      key=sheet_id,
-      image_gcs_uri=f"gs://images/{sheet_id}_1.png",
-      image_gcs_uris=[
-        f"gs://images/{sheet_id}_1.png",
-        f"gs://images/{sheet_id}_2.png",
-      ],
-      pdf_gcs_uri=f"gs://pdfs/{sheet_id}.pdf",
-    ))
-
-  live_doc = Mock()
-  live_doc.exists = True
-  live_doc.id = "animals"
-  live_doc.to_dict.return_value = {
-    "joke_sheets_branded_id": "animals-branded",
-    "joke_sheets_unbranded_id": "animals-unbranded",
-  }
-  _mock_category_doc_stream(monkeypatch, [live_doc])
+  get_joke_sheets = Mock(
+    side_effect=lambda sheet_ids: {
+      sheet_id:
+      models.JokeSheet(
+        key=sheet_id,
+        image_gcs_uri=f"gs://images/{sheet_id}_1.png",
+        image_gcs_uris=[
+          f"gs://images/{sheet_id}_1.png",
+          f"gs://images/{sheet_id}_2.png",
+        ],
+        pdf_gcs_uri=f"gs://pdfs/{sheet_id}.pdf",
+      )
+      for sheet_id in sheet_ids
+    })
+  monkeypatch.setattr(categories_routes.firestore, "get_joke_sheets",
+                      get_joke_sheets)
 
   with app.test_client() as client:
     resp = client.get('/admin/joke-categories')
 
   assert resp.status_code == 200
+  assert get_categories_kwargs == {
+    "fetch_cached_jokes": True,
+    "use_cache": True,
+    "fetch_live_sheet_ids": True,
+  }
+  get_joke_sheets.assert_called_once_with(
+    ["animals-branded", "animals-unbranded"])
   html = resp.get_data(as_text=True)
   assert "Generate lunchbox notes" in html
   assert 'href="https://cdn.example/animals-branded.pdf"' in html
@@ -293,6 +293,48 @@ def test_admin_stats_rebuckets_and_colors(monkeypatch):
   assert _dataset("150-199 jokes")["data"][2] == pytest.approx(0.0, rel=1e-3)
 
 
+def test_admin_stats_uses_prerendered_charts(monkeypatch):
+  """Charts stored by the nightly job are rendered from a single doc read."""
+  _mock_admin_session(monkeypatch)
+  monkeypatch.setattr(auth_helpers.utils, "is_emulator", lambda: True)
+
+  captured: dict = {}
+
+  def _fake_render(template_name, **context):
+    captured["template"] = template_name
+    captured.update(context)
+    return "OK"
+
+  monkeypatch.setattr(dashboard_routes.flask, "render_template", _fake_render)
+
+  charts = {
+    "dau_data": {
+      "labels": ["20230102"],
+      "datasets": []
+    },
+    "retention_data": {
+      "labels": ["1"],
+      "datasets": []
+    },
+  }
+  limits = []
+
+  def _fake_get_joke_stats_docs(limit):
+    limits.append(limit)
+    return [{"id": "20230102", "charts": charts}]
+
+  monkeypatch.setattr(dashboard_routes.firestore, "get_joke_stats_docs",
+                      _fake_get_joke_stats_docs)
+
+  with app.test_client() as client:
+    resp = client.get('/admin/stats')
+
+  assert resp.status_code == 200
+  assert limits == [1]
+  assert captured["dau_data"] == charts["dau_data"]
+  assert captured["retention_data"] == charts["retention_data"]
+
+
 def test_admin_dashboard_includes_sticky_header_script(monkeypatch):
   """Test that admin dashboard includes sticky header scroll script."""
   _mock_admin_session(monkeypatch)
@@ -147,6 +147,8 @@ def _fetch_topic_jokes(
     limit=limit,
     distance_threshold=distance_threshold,
     field_filters=field_filters,
+    use_local_index=True,
+    cache_query_embedding=True,
   )
   # Fetch full jokes by IDs and sort by popularity desc, then vector distance asc
   id_to_distance = {r.joke_id: r.vector_distance for r in results}
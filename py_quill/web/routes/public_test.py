@@ -542,6 +542,8 @@ def test_fetch_topic_jokes_sorts_by_popularity_then_distance(monkeypatch):
   keys = [j.key for j in ordered]
   # C first (highest popularity), then B (tie pop, closer), then A
   assert keys == ["C", "B", "A"]
+  assert mock_search_jokes.call_args.kwargs["use_local_index"] is True
+  assert mock_search_jokes.call_args.kwargs["cache_query_embedding"] is True
 
 
 def test_handle_joke_slug_long_exact_match(monkeypatch):
@@ -2,21 +2,9 @@
 
 from __future__ import annotations
 
+from typing import Any
 
-def bucket_jokes_viewed(count: int) -> str:
-  """Bucket joke view counts into ranges for charting."""
-  safe_count = max(0, count)
-  if safe_count == 0:
-    return "0"
-  if safe_count < 10:
-    return "1-9"
-  if safe_count < 100:
-    lower = (safe_count // 10) * 10
-    upper = lower + 9
-    return f"{lower}-{upper}"
-  lower = max(100, (safe_count // 50) * 50)
-  upper = lower + 49
-  return f"{lower}-{upper}"
+from common.joke_stats import bucket_jokes_viewed
 
 
 def rebucket_counts(counts: object) -> dict[str, int]:
@@ -177,3 +165,93 @@ def day_bucket_sort_key(label: str) -> int:
     return int(label)
   except Exception:
     return 0
+
+
+def build_stats_chart_data(
+  stats_list: list[dict[str, Any]], ) -> dict[str, dict[str, Any]]:
+  """Build the DAU and retention Chart.js data for the stats dashboard.
+
+  Args:
+      stats_list: `joke_stats` docs in chronological order, with 'id' set.
+
+  Returns:
+      Dict with 'dau_data' and 'retention_data', each holding 'labels' and
+      'datasets'.
+  """
+  dau_by_doc = [
+    rebucket_counts(s.get('num_1d_users_by_jokes_viewed')) for s in stats_list
+  ]
+  matrix_by_doc = [
+    rebucket_matrix(s.get('num_7d_users_by_days_used_by_jokes_viewed'))
+    for s in stats_list
+  ]
+
+  # Collect all buckets from both DAU and retention to keep colors consistent
+  all_buckets: set[str] = set()
+  for counts in dau_by_doc:
+    all_buckets.update(counts.keys())
+  for s in stats_list:
+    all_buckets.update(
+      rebucket_counts(s.get('num_7d_users_by_jokes_viewed')).keys())
+  for matrix in matrix_by_doc:
+    for day_data in matrix.values():
+      all_buckets.update(day_data.keys())
+
+  sorted_buckets = sorted(all_buckets, key=bucket_label_sort_key)
+  color_map = build_bucket_color_map(sorted_buckets)
+
+  # --- Prepare DAU Data ---
+  dau_datasets = []
+  for idx, bucket in enumerate(sorted_buckets):
+    data_points = [counts.get(bucket, 0) for counts in dau_by_doc]
+    dau_datasets.append({
+      'label': f'{bucket} jokes',
+      'data': data_points,
+      'backgroundColor': color_map.get(bucket, '#607d8b'),
+      'stack': 'Stack 0',
+      # Draw highest buckets first so they appear at the bottom of the stack.
+      'order': -idx,
+    })
+
+  # --- Prepare Retention Data (from most recent stats doc only) ---
+  retention_matrix = rebucket_days_used(
+    matrix_by_doc[-1] if matrix_by_doc else {})
+
+  # Sort days used (labels) numerically
+  retention_labels = sorted(retention_matrix.keys(), key=day_bucket_sort_key)
+
+  # Identify all unique joke buckets in the matrix
+  retention_buckets: set[str] = set()
+  for day_data in retention_matrix.values():
+    retention_buckets.update(day_data.keys())
+  sorted_ret_buckets = sorted(retention_buckets, key=bucket_label_sort_key)
+
+  retention_datasets = []
+  for bucket in sorted_ret_buckets:
+    data_points = []
+    for day in retention_labels:
+      day_data = retention_matrix.get(day, {})
+      count = day_data.get(bucket, 0)
+      total = sum(day_data.values())
+      percentage = (count / total * 100) if total > 0 else 0
+      data_points.append(percentage)
+
+    retention_datasets.append({
+      'label':
+      f'{bucket} jokes',
+      'data':
+      data_points,
+      'backgroundColor':
+      color_map.get(bucket, '#607d8b'),
+    })
+
+  return {
+    'dau_data': {
+      'labels': [s['id'] for s in stats_list],
+      'datasets': dau_datasets,
+    },
+    'retention_data': {
+      'labels': retention_labels,
+      'datasets': retention_datasets,
+    },
+  }